@@ -15,6 +15,7 @@ from app.core.database import AsyncSessionLocal
 from app.core.security import verify_token
 from app.core.config import settings
 from app.models.user import User, UserRole
+from app.services.user_cache import UserPrincipal, user_cache
 
 
 security = HTTPBearer(auto_error=False)
@@ -41,10 +42,14 @@ async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     access_token: Optional[str] = Cookie(None),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> UserPrincipal:
     """
     Get current authenticated user from Bearer token or HttpOnly cookie.
 
+    The user's principal comes from the user cache when possible, so most
+    requests authenticate without a database query; endpoints that need
+    the full user row load it themselves.
+
     Args:
         request: FastAPI request object
         credentials: Optional JWT token from Authorization header
@@ -52,7 +57,7 @@ async def get_current_user(
         db: Database session
 
     Returns:
-        Current authenticated user
+        Principal of the current authenticated user
 
     Raises:
         HTTPException: If token is invalid or user not found
@@ -99,16 +104,22 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Get user from database
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-
+    user = await user_cache.get(user_id)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        # Get user from database
+        cache_version = user_cache.version
+        result = await db.execute(select(User).where(User.id == user_id))
+        db_user = result.scalar_one_or_none()
+
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        user = UserPrincipal.from_user(db_user)
+        await user_cache.set(user, cache_version)
 
     if not user.is_active:
         raise HTTPException(
@@ -120,8 +131,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
     """
     Get current active user.
 
@@ -143,8 +154,8 @@ async def get_current_active_user(
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
     """
     Get current admin user.
 
@@ -166,8 +177,8 @@ async def get_current_admin_user(
 
 
 async def get_current_engineer_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
     """
     Get current engineer or admin user.
 
@@ -6,7 +6,7 @@ Główny router dla API v1 łączący wszystkie endpointy.
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, scenarios, materials, optimization, import_data, units, reports, regenerators
+from app.api.v1.endpoints import auth, users, scenarios, materials, optimization, import_data, units, reports, regenerators, system
 
 api_router = APIRouter()
 
@@ -29,4 +29,7 @@ api_router.include_router(import_data.router, prefix="/import", tags=["import"])
 api_router.include_router(units.router, prefix="/units", tags=["units"])
 
 # Reporting routes
-api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
\ No newline at end of file
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+
+# System diagnostics routes
+api_router.include_router(system.router, prefix="/system", tags=["system"])
@@ -13,7 +13,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2Pas
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import get_db, get_current_user, require_admin
-from app.models.user import User, UserRole
+from app.models.user import UserRole
+from app.services.user_cache import UserPrincipal
 from app.services.auth_service import AuthService
 from app.schemas.auth_schemas import (
     UserCreate,
@@ -90,17 +91,28 @@ async def logout(response: Response):
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get current user information."""
-    return UserResponse.model_validate(current_user)
+    # The principal carries only what authorization needs
+    auth_service = AuthService(db)
+    user = await auth_service.get_user_by_id(current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return UserResponse.model_validate(user)
 
 
 @router.post("/register", response_model=UserResponse)
 async def register_user(
     user_data: UserCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    current_user: UserPrincipal = Depends(require_admin)
 ):
     """Register new user (admin only)."""
     auth_service = AuthService(db)
@@ -112,7 +124,7 @@ async def update_user(
     user_id: UUID,
     user_data: UserUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Update user information."""
     auth_service = AuthService(db)
@@ -123,7 +135,7 @@ async def update_user(
 async def change_password(
     password_data: PasswordChange,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Change user password."""
     auth_service = AuthService(db)
@@ -157,7 +169,7 @@ async def list_users(
     role: Optional[UserRole] = None,
     active_only: bool = True,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    current_user: UserPrincipal = Depends(require_admin)
 ):
     """List users (admin only)."""
     auth_service = AuthService(db)
@@ -172,7 +184,7 @@ async def list_users(
 @router.get("/stats", response_model=UserStats)
 async def get_user_stats(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    current_user: UserPrincipal = Depends(require_admin)
 ):
     """Get user statistics (admin only)."""
     auth_service = AuthService(db)
@@ -183,7 +195,7 @@ async def get_user_stats(
 async def get_user(
     user_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get user by ID."""
     # Users can view their own profile, admins can view any profile
@@ -206,7 +218,7 @@ async def get_user(
 
 @router.post("/verify-token")
 async def verify_token(
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Verify if current token is valid."""
     return {
@@ -220,7 +232,7 @@ async def verify_token(
 @router.post("/refresh")
 async def refresh_token(
     response: Response,
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Refresh JWT token (re-issue with new expiry)."""
     from app.core.security import create_access_token
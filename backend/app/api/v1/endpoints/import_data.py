@@ -14,7 +14,7 @@ from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Backgro
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import get_current_user, get_db
-from app.models.user import User
+from app.services.user_cache import UserPrincipal
 from app.models.import_job import ImportJob
 from app.schemas.import_schemas import (
     ImportPreview, ImportJobCreate, ImportJobResponse, ImportJobStatus,
@@ -31,7 +31,7 @@ router = APIRouter()
 async def preview_import_file(
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Preview uploaded file for import.
@@ -75,7 +75,7 @@ async def preview_import_file(
 async def dry_run_import(
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Perform dry run import with custom column mapping.
@@ -152,7 +152,7 @@ async def dry_run_import_simple(
     column_mapping: str = Form(...),
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Perform dry run import with simpler form handling.
@@ -219,7 +219,7 @@ async def create_import_job(
     file: UploadFile = File(...),
     job_data: str = Form(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Create a new import job.
@@ -300,7 +300,7 @@ async def create_import_job(
 async def get_import_job(
     job_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get import job details."""
     import_service = ImportService(db)
@@ -341,7 +341,7 @@ async def get_import_job(
 async def get_import_job_status(
     job_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get import job status for progress monitoring."""
     import_service = ImportService(db)
@@ -378,7 +378,7 @@ async def get_user_import_jobs(
     limit: int = 50,
     offset: int = 0,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get user's import jobs."""
     import_service = ImportService(db)
@@ -415,7 +415,7 @@ async def get_user_import_jobs(
 async def get_import_job_results(
     job_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get imported regenerator data from a completed job."""
     import_service = ImportService(db)
@@ -474,7 +474,7 @@ async def get_import_job_results(
 async def delete_import_job(
     job_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Delete an import job and its data."""
     import_service = ImportService(db)
@@ -510,7 +510,7 @@ async def delete_import_job(
 @router.get("/templates/{import_type}")
 async def get_import_template(
     import_type: str,
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get Excel template for specific import type.
@@ -565,7 +565,7 @@ async def get_import_template(
 @router.get("/validation-rules")
 async def get_validation_rules(
     import_type: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get validation rules for import types.
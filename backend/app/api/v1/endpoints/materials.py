@@ -9,7 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import get_current_user, get_db, get_current_admin_user
-from app.models.user import User
+from app.services.user_cache import UserPrincipal
 from app.schemas.regenerator_schemas import (
     MaterialCreate, MaterialUpdate, MaterialResponse, MaterialFilter
 )
@@ -22,7 +22,7 @@ router = APIRouter()
 async def create_material(
     material_data: MaterialCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Create a new material.
@@ -82,7 +82,7 @@ async def search_materials(
     limit: int = Query(50, ge=1, le=100, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Search and filter materials.
@@ -141,7 +141,7 @@ async def search_materials(
 async def get_material(
     material_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get material by ID."""
     materials_service = MaterialsService(db)
@@ -181,7 +181,7 @@ async def update_material(
     material_id: str,
     material_data: MaterialUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Update an existing material.
@@ -227,7 +227,7 @@ async def update_material(
 async def delete_material(
     material_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Delete a material (soft delete).
@@ -251,7 +251,7 @@ async def get_materials_by_type(
     material_type: str,
     is_active: bool = Query(True, description="Filter by active status"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get materials by type."""
     materials_service = MaterialsService(db)
@@ -290,7 +290,7 @@ async def get_materials_by_type(
 async def get_popular_materials(
     limit: int = Query(20, ge=1, le=50, description="Maximum number of results"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get popular/standard materials."""
     materials_service = MaterialsService(db)
@@ -330,7 +330,7 @@ async def approve_material(
     material_id: str,
     approval_status: str = Query(..., pattern="^(approved|rejected)$"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: UserPrincipal = Depends(get_current_admin_user)
 ):
     """
     Approve or reject a material.
@@ -374,7 +374,7 @@ async def approve_material(
 @router.post("/{material_id}/initialize/standard")
 async def initialize_standard_materials(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: UserPrincipal = Depends(get_current_admin_user)
 ):
     """
     Initialize standard industry materials.
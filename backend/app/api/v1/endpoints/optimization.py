@@ -4,26 +4,37 @@ Optimization endpoints.
 Endpointy optymalizacji.
 """
 
+from datetime import datetime, UTC
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, desc
 import json
 import asyncio
 
 from app.api.dependencies import get_current_user, get_db
-from app.models.user import User, UserRole
-from app.models.optimization import OptimizationScenario, OptimizationJob, OptimizationResult
+from app.models.user import UserRole
+from app.services.user_cache import UserPrincipal
+from app.models.optimization import OptimizationScenario, OptimizationJob, OptimizationResult, OptimizationTemplate
 from app.schemas.optimization_schemas import (
     OptimizationScenarioCreate, OptimizationScenarioUpdate, OptimizationScenarioResponse,
     OptimizationJobCreate, OptimizationJobResponse, OptimizationResultResponse,
     OptimizationProgress, OptimizationJobStatus, OptimizationScenarioList,
     OptimizationJobList, OptimizationTemplateCreate, OptimizationTemplateResponse,
-    OptimizationTemplateList, OptimizationCalculationPreview
+    OptimizationTemplateList, OptimizationCalculationPreview,
+    OptimizationJobBatchCreate, OptimizationJobGroupResponse, OptimizationJobGroupProgress,
+    OptimizationJobGroupResults
 )
 from app.services.optimization_service import OptimizationService
+from app.services.job_scheduler import FairShareScheduler
+from app.services.iteration_export import (
+    IterationExporter, EXPORT_FORMATS, PYARROW_AVAILABLE, export_filename
+)
+from app.services.profiling import ProfileArtifactStore, media_type_for
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.exceptions import ValidationError
 
 router = APIRouter()
 
@@ -32,7 +43,7 @@ router = APIRouter()
 @router.post("/scenarios", response_model=OptimizationScenarioResponse)
 async def create_optimization_scenario(
     scenario_data: OptimizationScenarioCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new optimization scenario."""
@@ -52,6 +63,12 @@ async def create_optimization_scenario(
     if not base_config:
         raise HTTPException(status_code=404, detail="Base configuration not found")
 
+    if scenario_data.template_id:
+        template = await db.get(OptimizationTemplate, scenario_data.template_id)
+        if not template:
+            raise HTTPException(status_code=404, detail="Optimization template not found")
+        template.usage_count = (template.usage_count or 0) + 1
+
     # Create scenario
     scenario = OptimizationScenario(
         user_id=current_user.id,
@@ -80,7 +97,8 @@ async def create_optimization_scenario(
         max_function_evaluations=scenario_data.max_function_evaluations,
         tolerance=scenario_data.tolerance,
         max_runtime_minutes=scenario_data.max_runtime_minutes,
-        objective_weights=scenario_data.objective_weights
+        objective_weights=scenario_data.objective_weights,
+        template_id=scenario_data.template_id
     )
 
     db.add(scenario)
@@ -94,7 +112,7 @@ async def create_optimization_scenario(
 async def list_optimization_scenarios(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """List optimization scenarios for the current user."""
@@ -127,7 +145,7 @@ async def list_optimization_scenarios(
 @router.get("/scenarios/{scenario_id}", response_model=OptimizationScenarioResponse)
 async def get_optimization_scenario(
     scenario_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get optimization scenario by ID."""
@@ -149,7 +167,7 @@ async def get_optimization_scenario(
 @router.get("/scenarios/{scenario_id}/calculation-preview", response_model=OptimizationCalculationPreview)
 async def get_scenario_calculation_preview(
     scenario_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -182,7 +200,7 @@ async def get_scenario_calculation_preview(
 async def update_optimization_scenario(
     scenario_id: str,
     scenario_update: OptimizationScenarioUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Update optimization scenario."""
@@ -212,7 +230,7 @@ async def update_optimization_scenario(
 @router.delete("/scenarios/{scenario_id}")
 async def delete_optimization_scenario(
     scenario_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete (deactivate) optimization scenario."""
@@ -237,7 +255,7 @@ async def delete_optimization_scenario(
 @router.post("/scenarios/bulk-delete")
 async def bulk_delete_scenarios(
     scenario_ids: list[str],
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Bulk delete (deactivate) optimization scenarios."""
@@ -275,13 +293,16 @@ async def bulk_delete_scenarios(
 async def create_optimization_job(
     scenario_id: str,
     job_data: OptimizationJobCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Create and start optimization job using Celery.
 
     Tworzy i uruchamia zadanie optymalizacji za pomocą Celery.
+
+    An identical re-submission returns the existing in-flight or recently
+    completed job instead of creating a new one.
     """
     try:
         # Permission check
@@ -367,26 +388,37 @@ async def create_optimization_job(
                 }
             )
 
-        # ✅ RATE LIMITING: Check per-user concurrent jobs limit
-        user_jobs_stmt = select(OptimizationJob).where(
-            OptimizationJob.user_id == user_id_str,
-            OptimizationJob.status.in_(['pending', 'initializing', 'running'])
-        )
-        user_jobs_result = await db.execute(user_jobs_stmt)
-        active_user_jobs = user_jobs_result.scalars().all()
+        # ✅ DEDUPLICATION: Identical re-submission attaches to the in-flight job
+        # or returns the recently completed one (its results are already stored)
+        # A profiled run has to actually solve, so it never reuses a job
+        optimization_service = OptimizationService(db)
+        if not job_data.profile:
+            existing_job = await optimization_service.find_reusable_job(
+                scenario, base_config, user_id_str, job_data.initial_values
+            )
+            if existing_job:
+                return OptimizationJobResponse.model_validate(existing_job)
+
+        # ✅ FAIR-SHARE ADMISSION: Cap in-flight plus held jobs per user
+        scheduler = FairShareScheduler(db)
+        in_flight_count, held_count = await scheduler.count_user_jobs(user_id_str)
 
-        if len(active_user_jobs) >= settings.MAX_CONCURRENT_JOBS_PER_USER:
+        if not scheduler.can_admit(in_flight_count, held_count):
+            metrics.track_job_admission("rejected")
+            max_allowed = settings.MAX_CONCURRENT_JOBS_PER_USER + settings.MAX_QUEUED_JOBS_PER_USER
             raise HTTPException(
                 status_code=429,
                 detail={
                     "error_type": "USER_RATE_LIMIT_EXCEEDED",
-                    "message": f"Przekroczono limit współbieżnych zadań użytkownika ({len(active_user_jobs)}/{settings.MAX_CONCURRENT_JOBS_PER_USER})",
-                    "details": f"Możesz mieć maksymalnie {settings.MAX_CONCURRENT_JOBS_PER_USER} aktywnych zadań optymalizacji jednocześnie",
-                    "suggestion": "Poczekaj na zakończenie lub anuluj jedno z aktywnych zadań przed utworzeniem nowego",
-                    "active_jobs_count": len(active_user_jobs),
-                    "max_allowed": settings.MAX_CONCURRENT_JOBS_PER_USER,
-                    "active_job_ids": [job.id for job in active_user_jobs],
-                    "active_job_names": [job.job_name or f"Job {job.id[:8]}" for job in active_user_jobs]
+                    "message": f"Przekroczono limit zadań użytkownika ({in_flight_count + held_count}/{max_allowed})",
+                    "details": (
+                        f"Możesz mieć maksymalnie {settings.MAX_CONCURRENT_JOBS_PER_USER} uruchomionych "
+                        f"i {settings.MAX_QUEUED_JOBS_PER_USER} oczekujących zadań optymalizacji"
+                    ),
+                    "suggestion": "Poczekaj na zakończenie lub anuluj część zadań przed utworzeniem nowego",
+                    "active_jobs_count": in_flight_count,
+                    "queued_jobs_count": held_count,
+                    "max_allowed": max_allowed
                 }
             )
 
@@ -415,17 +447,15 @@ async def create_optimization_job(
             )
 
         # Create job
-        optimization_service = OptimizationService(db)
         job = await optimization_service.create_optimization_job(
             scenario_id=scenario_id,
             user_id=user_id_str,
             job_config=job_data
         )
 
-        # Start optimization using Celery (true async with separate worker)
+        # Dispatch to Celery now, or hold until a fair-share slot frees up
         # Note: celery_task_id will be set by the task itself when it starts
-        from app.tasks.optimization_tasks import run_optimization_task
-        run_optimization_task.delay(job.id)
+        await scheduler.submit(job)
 
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -461,12 +491,157 @@ async def create_optimization_job(
     return OptimizationJobResponse.model_validate(job)
 
 
+@router.post("/jobs/batch", response_model=OptimizationJobGroupResponse)
+async def create_optimization_job_group(
+    batch: OptimizationJobBatchCreate,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Submit many optimization jobs as one group.
+
+    Utworzenie wielu zadań optymalizacji jednym żądaniem (grupa zadań).
+
+    All jobs are validated up front; if any job is invalid nothing is created.
+    Jobs are scheduled through fair-share admission like single submissions.
+    """
+    if current_user.role not in [UserRole.ADMIN, UserRole.ENGINEER]:
+        raise HTTPException(
+            status_code=403,
+            detail={
+                "error_type": "PERMISSION_DENIED",
+                "message": "Brak uprawnień do tworzenia zadań optymalizacji",
+                "details": "Wymagana rola: ADMIN lub ENGINEER",
+                "suggestion": "Skontaktuj się z administratorem w celu nadania odpowiednich uprawnień",
+                "user_role": current_user.role.value if hasattr(current_user.role, 'value') else str(current_user.role)
+            }
+        )
+
+    if len(batch.jobs) > settings.MAX_JOBS_PER_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error_type": "BATCH_TOO_LARGE",
+                "message": f"Zbyt wiele zadań w jednej grupie ({len(batch.jobs)}/{settings.MAX_JOBS_PER_BATCH})",
+                "details": f"Jedna grupa może zawierać maksymalnie {settings.MAX_JOBS_PER_BATCH} zadań",
+                "suggestion": "Podziel zadania na kilka mniejszych grup",
+                "max_allowed": settings.MAX_JOBS_PER_BATCH
+            }
+        )
+
+    user_id_str = str(current_user.id)
+    scheduler = FairShareScheduler(db)
+    in_flight_count, held_count = await scheduler.count_user_jobs(user_id_str)
+    max_allowed = settings.MAX_CONCURRENT_JOBS_PER_USER + settings.MAX_QUEUED_JOBS_PER_USER
+
+    if in_flight_count + held_count + len(batch.jobs) > max_allowed:
+        metrics.track_job_admission("rejected")
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "error_type": "USER_RATE_LIMIT_EXCEEDED",
+                "message": f"Grupa przekracza limit zadań użytkownika ({in_flight_count + held_count}+{len(batch.jobs)}/{max_allowed})",
+                "details": (
+                    f"Możesz mieć maksymalnie {settings.MAX_CONCURRENT_JOBS_PER_USER} uruchomionych "
+                    f"i {settings.MAX_QUEUED_JOBS_PER_USER} oczekujących zadań optymalizacji"
+                ),
+                "suggestion": "Zmniejsz grupę lub poczekaj na zakończenie części zadań",
+                "active_jobs_count": in_flight_count,
+                "queued_jobs_count": held_count,
+                "max_allowed": max_allowed
+            }
+        )
+
+    optimization_service = OptimizationService(db)
+    try:
+        group, job_ids = await optimization_service.create_optimization_job_group(user_id_str, batch)
+    except ValidationError as ve:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error_type": "BATCH_VALIDATION_ERROR",
+                "message": "Część zadań w grupie nie przeszła walidacji - nie utworzono żadnego zadania",
+                "details": ve.message,
+                "suggestion": "Popraw lub usuń wskazane zadania i wyślij grupę ponownie",
+                "invalid_jobs": ve.details.get("invalid_jobs", [])
+            }
+        )
+
+    # One dispatch round for the whole group (sent to Celery as a group)
+    dispatched = set(await scheduler.dispatch_pending())
+    dispatched_jobs = sum(1 for job_id in job_ids if job_id in dispatched)
+    metrics.track_job_admission("dispatched", dispatched_jobs)
+    metrics.track_job_admission("held", len(job_ids) - dispatched_jobs)
+
+    return OptimizationJobGroupResponse(
+        group_id=group.id,
+        name=group.name,
+        total_jobs=len(job_ids),
+        job_ids=job_ids,
+        dispatched_jobs=dispatched_jobs,
+        held_jobs=len(job_ids) - dispatched_jobs,
+        created_at=group.created_at
+    )
+
+
+@router.get("/job-groups/{group_id}/progress", response_model=OptimizationJobGroupProgress)
+async def get_optimization_job_group_progress(
+    group_id: str,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get aggregate progress of a job group."""
+    progress = await OptimizationService(db).get_job_group_progress(group_id, str(current_user.id))
+    if not progress:
+        raise HTTPException(status_code=404, detail="Job group not found")
+    return progress
+
+
+@router.get("/job-groups/{group_id}/results", response_model=OptimizationJobGroupResults)
+async def get_optimization_job_group_results(
+    group_id: str,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the combined results summary of a job group."""
+    results = await OptimizationService(db).get_job_group_results(group_id, str(current_user.id))
+    if not results:
+        raise HTTPException(status_code=404, detail="Job group not found")
+    return results
+
+
+@router.get("/queue/status")
+async def get_optimization_queue_status(
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get optimization queue depths and the current user's fair-share usage.
+
+    Zwraca głębokość kolejek optymalizacji i wykorzystanie limitów użytkownika.
+    """
+    scheduler = FairShareScheduler(db)
+    depths = await scheduler.publish_queue_depths()
+    in_flight_count, held_count = await scheduler.count_user_jobs(str(current_user.id))
+
+    return {
+        "queues": depths,
+        "capacity": settings.MAX_PARALLEL_OPTIMIZATIONS,
+        "user": {
+            "in_flight": in_flight_count,
+            "held": held_count,
+            "max_in_flight": settings.MAX_CONCURRENT_JOBS_PER_USER,
+            "max_held": settings.MAX_QUEUED_JOBS_PER_USER
+        }
+    }
+
+
 @router.get("/jobs", response_model=OptimizationJobList)
 async def list_optimization_jobs(
     scenario_id: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """List optimization jobs for the current user."""
@@ -499,7 +674,7 @@ async def list_optimization_jobs(
 @router.get("/jobs/{job_id}", response_model=OptimizationJobResponse)
 async def get_optimization_job(
     job_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get optimization job by ID."""
@@ -521,7 +696,7 @@ async def get_optimization_job(
 @router.get("/jobs/{job_id}/progress", response_model=OptimizationProgress)
 async def get_optimization_progress(
     job_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get real-time optimization progress."""
@@ -547,7 +722,7 @@ async def get_optimization_progress(
 @router.get("/jobs/{job_id}/status", response_model=OptimizationJobStatus)
 async def get_optimization_status(
     job_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get simple optimization job status."""
@@ -576,7 +751,7 @@ async def get_optimization_status(
 @router.post("/jobs/{job_id}/cancel")
 async def cancel_optimization_job(
     job_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Cancel running optimization job."""
@@ -601,13 +776,14 @@ async def cancel_optimization_job(
         celery_app.control.revoke(job.celery_task_id, terminate=True)
 
     job.status = 'cancelled'
+    job.completed_at = datetime.now(UTC)
     await db.commit()
 
 
 @router.post("/jobs/bulk-delete")
 async def bulk_delete_jobs(
     job_ids: list[str],
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Bulk delete optimization jobs. Only completed, failed, or cancelled jobs can be deleted."""
@@ -649,7 +825,7 @@ async def bulk_delete_jobs(
 @router.get("/jobs/{job_id}/results", response_model=OptimizationResultResponse)
 async def get_optimization_results(
     job_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get optimization results."""
@@ -684,10 +860,45 @@ async def get_optimization_iterations(
     job_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get optimization iterations for a job.
+
+    ``objective_components``, ``constraint_values`` and ``constraint_violations``
+    are not recorded per evaluation and are always null.
+    """
+
+    # Verify job belongs to user
+    user_id_str = str(current_user.id)
+    stmt = select(OptimizationJob).where(
+        OptimizationJob.id == job_id,
+        OptimizationJob.user_id == user_id_str
+    )
+    result = await db.execute(stmt)
+    job = result.scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    # Get iterations (from columnar archive or iteration rows)
+    optimization_service = OptimizationService(db)
+    return await optimization_service.get_iterations(job_id, skip=skip, limit=limit)
+
+
+@router.get("/jobs/{job_id}/iterations/export")
+async def export_optimization_iterations(
+    job_id: str,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv|arrow)$"),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get optimization iterations for a job."""
+    """
+    Stream the full iteration history of a job (NDJSON, CSV or Arrow IPC).
+
+    Strumieniowy eksport pełnej historii iteracji zadania.
+    """
 
     # Verify job belongs to user
     user_id_str = str(current_user.id)
@@ -701,42 +912,82 @@ async def get_optimization_iterations(
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    # Get iterations
-    from app.models.optimization import OptimizationIteration
-    iter_stmt = select(OptimizationIteration).where(
-        OptimizationIteration.job_id == job_id
-    ).order_by(OptimizationIteration.iteration_number.asc()).offset(skip).limit(limit)
-
-    iter_result = await db.execute(iter_stmt)
-    iterations = iter_result.scalars().all()
-
-    # Return as list of dicts
-    return [
-        {
-            "id": str(iteration.id),
-            "job_id": str(iteration.job_id),
-            "iteration_number": iteration.iteration_number,
-            "function_evaluation": iteration.function_evaluation,
-            "design_variables": iteration.design_variables,
-            "objective_value": iteration.objective_value,
-            "objective_components": iteration.objective_components,
-            "constraint_values": iteration.constraint_values,
-            "constraint_violations": iteration.constraint_violations,
-            "performance_metrics": iteration.performance_metrics,
-            "evaluation_time_seconds": iteration.evaluation_time_seconds,
-            "is_feasible": iteration.is_feasible,
-            "is_improvement": iteration.is_improvement,
-            "created_at": iteration.created_at.isoformat() if iteration.created_at else None
+    if export_format == "arrow" and not PYARROW_AVAILABLE:
+        raise HTTPException(status_code=400, detail="Arrow export is not available on this server")
+
+    # Exporter reads with its own session so the stream outlives the request session
+    exporter = IterationExporter(job_id)
+
+    return StreamingResponse(
+        exporter.stream(export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(job_id, export_format)}"',
+            "Cache-Control": "no-cache"
         }
-        for iteration in iterations
-    ]
+    )
+
+
+def _profile_file_response(artifact_id: str) -> FileResponse:
+    """Serve a stored profile artifact or raise 404."""
+    try:
+        path = ProfileArtifactStore().find(artifact_id)
+    except ValueError:
+        path = None
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type=media_type_for(path), filename=path.name)
+
+
+@router.get("/jobs/{job_id}/profile")
+async def download_optimization_profile(
+    job_id: str,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Download the profile of a job run with ``profile`` enabled.
+
+    Pobiera profil wykonania zadania (collapsed stacks lub pstats).
+    """
+
+    # Verify job belongs to user (admins may read any job)
+    stmt = select(OptimizationJob).where(OptimizationJob.id == job_id)
+    if current_user.role != UserRole.ADMIN:
+        stmt = stmt.where(OptimizationJob.user_id == str(current_user.id))
+    job = (await db.execute(stmt)).scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    profile = (job.resource_usage or {}).get("profile")
+    if not profile:
+        raise HTTPException(status_code=404, detail="Job has no profile")
+
+    return _profile_file_response(profile["artifact_id"])
+
+
+@router.get("/profiles/{artifact_id}")
+async def download_request_profile(
+    artifact_id: str,
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """
+    Download a request profile named by the ``X-Profile-Id`` response header (admin only).
+
+    Pobiera profil żądania API (tylko administrator).
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin role required")
+
+    return _profile_file_response(artifact_id)
 
 
 # Server-Sent Events for real-time updates
 @router.get("/jobs/{job_id}/events")
 async def get_optimization_events(
     job_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Stream optimization events via Server-Sent Events."""
@@ -9,7 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import get_current_user, get_db
-from app.models.user import User
+from app.services.user_cache import UserPrincipal
 from app.models.regenerator import RegeneratorConfiguration, RegeneratorType, ConfigurationStatus
 from app.schemas.regenerator_schemas import RegeneratorConfigurationCreate, RegeneratorConfigurationResponse
 from app.services.regenerator_service import RegeneratorService
@@ -20,7 +20,7 @@ router = APIRouter()
 @router.get("/", response_model=List[RegeneratorConfigurationResponse])
 async def list_regenerators(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000)
 ):
@@ -44,7 +44,7 @@ async def list_regenerators(
 async def create_regenerator(
     regenerator_data: RegeneratorConfigurationCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Create a new regenerator configuration.
@@ -73,7 +73,7 @@ async def create_regenerator(
 async def get_regenerator(
     regenerator_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get regenerator configuration by ID.
@@ -100,7 +100,7 @@ async def update_regenerator(
     regenerator_id: str,
     regenerator_data: RegeneratorConfigurationCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Update regenerator configuration.
@@ -132,7 +132,7 @@ async def update_regenerator(
 async def delete_regenerator(
     regenerator_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Delete regenerator configuration.
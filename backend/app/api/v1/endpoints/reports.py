@@ -4,16 +4,19 @@ Reporting endpoints.
 Endpointy raportowania.
 """
 
+from pathlib import Path
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, desc, or_
 import json
 import asyncio
+import mimetypes
+import os
 
 from app.api.dependencies import get_current_user, get_db
-from app.models.user import User
+from app.services.user_cache import UserPrincipal
 from app.models.reporting import Report, ReportTemplate, ReportSchedule
 from app.schemas.reporting_schemas import (
     ReportCreate, ReportUpdate, ReportResponse, ReportList,
@@ -22,7 +25,9 @@ from app.schemas.reporting_schemas import (
     ReportExportRequest, ReportExportResponse, DashboardMetrics
 )
 from app.services.reporting_service import ReportingService
+from app.services.report_files import accepts_encoding, compressed_path, etag_matches
 from app.core.config import settings
+from app.core.metrics import MetricsCollector
 
 router = APIRouter()
 
@@ -30,13 +35,13 @@ router = APIRouter()
 # Dashboard endpoints
 @router.get("/dashboard/metrics", response_model=DashboardMetrics)
 async def get_dashboard_metrics(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get dashboard metrics for current user."""
 
     reporting_service = ReportingService(db)
-    metrics = await reporting_service.get_dashboard_metrics(current_user.id)
+    metrics = await reporting_service.get_dashboard_metrics(str(current_user.id))
     return metrics
 
 
@@ -45,7 +50,7 @@ async def get_dashboard_metrics(
 async def create_report(
     report_data: ReportCreate,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new report."""
@@ -55,7 +60,7 @@ async def create_report(
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     reporting_service = ReportingService(db)
-    report = await reporting_service.create_report(current_user.id, report_data)
+    report = await reporting_service.create_report(str(current_user.id), report_data)
 
     # Start report generation in background
     background_tasks.add_task(reporting_service.generate_report, report.id)
@@ -69,12 +74,12 @@ async def list_reports(
     limit: int = Query(50, ge=1, le=100),
     report_type: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """List reports for the current user."""
 
-    conditions = [Report.user_id == current_user.id]
+    conditions = [Report.user_id == str(current_user.id)]
 
     if report_type:
         conditions.append(Report.report_type == report_type)
@@ -104,14 +109,14 @@ async def list_reports(
 @router.get("/reports/{report_id}", response_model=ReportResponse)
 async def get_report(
     report_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get report by ID."""
 
     stmt = select(Report).where(
         Report.id == report_id,
-        Report.user_id == current_user.id
+        Report.user_id == str(current_user.id)
     )
     result = await db.execute(stmt)
     report = result.scalar_one_or_none()
@@ -126,14 +131,14 @@ async def get_report(
 async def update_report(
     report_id: str,
     report_update: ReportUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Update report."""
 
     stmt = select(Report).where(
         Report.id == report_id,
-        Report.user_id == current_user.id
+        Report.user_id == str(current_user.id)
     )
     result = await db.execute(stmt)
     report = result.scalar_one_or_none()
@@ -155,14 +160,14 @@ async def update_report(
 @router.delete("/reports/{report_id}")
 async def delete_report(
     report_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete report."""
 
     stmt = select(Report).where(
         Report.id == report_id,
-        Report.user_id == current_user.id
+        Report.user_id == str(current_user.id)
     )
     result = await db.execute(stmt)
     report = result.scalar_one_or_none()
@@ -179,7 +184,7 @@ async def delete_report(
 @router.get("/reports/{report_id}/progress", response_model=ReportProgress)
 async def get_report_progress(
     report_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get report generation progress."""
@@ -187,7 +192,7 @@ async def get_report_progress(
     # Verify report belongs to user
     stmt = select(Report).where(
         Report.id == report_id,
-        Report.user_id == current_user.id
+        Report.user_id == str(current_user.id)
     )
     result = await db.execute(stmt)
     report = result.scalar_one_or_none()
@@ -204,14 +209,22 @@ async def get_report_progress(
 @router.get("/reports/{report_id}/download")
 async def download_report(
     report_id: str,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Download generated report file."""
+    """
+    Download generated report file.
+
+    The file's SHA-256 is its strong ETag: a matching If-None-Match gets a
+    304, and Range requests (with If-Range) resume interrupted downloads.
+    Clients accepting gzip get the stored gzip copy of CSV and JSON reports.
+    The file is sent by the server's zero-copy path where it offers one.
+    """
 
     stmt = select(Report).where(
         Report.id == report_id,
-        Report.user_id == current_user.id
+        Report.user_id == str(current_user.id)
     )
     result = await db.execute(stmt)
     report = result.scalar_one_or_none()
@@ -222,10 +235,35 @@ async def download_report(
     if not report.file_path or report.status != 'completed':
         raise HTTPException(status_code=404, detail="Report file not available")
 
+    file_path = Path(report.file_path)
+    path, encoding = file_path, "identity"
+    gzip_path = compressed_path(file_path)
+    if accepts_encoding(request.headers.get("accept-encoding"), "gzip") and gzip_path.exists():
+        path, encoding = gzip_path, "gzip"
+
+    # Responses differ by encoding; revalidate before reusing a stored copy
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "private, no-cache"}
+    if report.file_hash:
+        headers["ETag"] = f'"{report.file_hash}"' if encoding == "identity" else f'"{report.file_hash}-{encoding}"'
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            MetricsCollector.track_report_download("not_modified", encoding)
+            return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+
+    try:
+        stat_result = await asyncio.to_thread(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Report file not available")
+
+    MetricsCollector.track_report_download("range" if "range" in request.headers else "full", encoding)
+    filename = f"{report.title}{file_path.suffix}"
     return FileResponse(
-        path=report.file_path,
-        filename=f"{report.title}.{report.format}",
-        media_type='application/octet-stream'
+        path=path,
+        headers=headers,
+        filename=filename,
+        media_type=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        stat_result=stat_result
     )
 
 
@@ -234,14 +272,14 @@ async def export_report(
     report_id: str,
     export_request: ReportExportRequest,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Export report in different format."""
 
     stmt = select(Report).where(
         Report.id == report_id,
-        Report.user_id == current_user.id
+        Report.user_id == str(current_user.id)
     )
     result = await db.execute(stmt)
     report = result.scalar_one_or_none()
@@ -256,7 +294,7 @@ async def export_report(
     from app.models.reporting import ReportExport
     export = ReportExport(
         report_id=report_id,
-        user_id=current_user.id,
+        user_id=str(current_user.id),
         export_format=export_request.export_format,
         file_name=f"{report.title}.{export_request.export_format}",
         file_path="",  # Will be set after generation
@@ -282,7 +320,7 @@ async def export_report(
 @router.get("/reports/{report_id}/events")
 async def get_report_events(
     report_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Stream report generation events via Server-Sent Events."""
@@ -290,7 +328,7 @@ async def get_report_events(
     # Verify report belongs to user
     stmt = select(Report).where(
         Report.id == report_id,
-        Report.user_id == current_user.id
+        Report.user_id == str(current_user.id)
     )
     result = await db.execute(stmt)
     report = result.scalar_one_or_none()
@@ -346,7 +384,7 @@ async def get_report_events(
 @router.post("/templates", response_model=ReportTemplateResponse)
 async def create_report_template(
     template_data: ReportTemplateCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new report template."""
@@ -356,7 +394,7 @@ async def create_report_template(
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     template = ReportTemplate(
-        created_by_user_id=current_user.id,
+        created_by_user_id=str(current_user.id),
         name=template_data.name,
         description=template_data.description,
         category=template_data.category,
@@ -378,7 +416,7 @@ async def list_report_templates(
     limit: int = Query(50, ge=1, le=100),
     category: Optional[str] = Query(None),
     is_public: Optional[bool] = Query(None),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """List report templates."""
@@ -389,7 +427,7 @@ async def list_report_templates(
     conditions.append(
         or_(
             ReportTemplate.is_public == True,
-            ReportTemplate.created_by_user_id == current_user.id
+            ReportTemplate.created_by_user_id == str(current_user.id)
         )
     )
 
@@ -421,7 +459,7 @@ async def list_report_templates(
 @router.get("/templates/{template_id}", response_model=ReportTemplateResponse)
 async def get_report_template(
     template_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get report template by ID."""
@@ -430,7 +468,7 @@ async def get_report_template(
         ReportTemplate.id == template_id,
         or_(
             ReportTemplate.is_public == True,
-            ReportTemplate.created_by_user_id == current_user.id
+            ReportTemplate.created_by_user_id == str(current_user.id)
         )
     )
     result = await db.execute(stmt)
@@ -446,7 +484,7 @@ async def get_report_template(
 @router.post("/schedules", response_model=ReportScheduleResponse)
 async def create_report_schedule(
     schedule_data: ReportScheduleCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new report schedule."""
@@ -456,7 +494,7 @@ async def create_report_schedule(
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     schedule = ReportSchedule(
-        user_id=current_user.id,
+        user_id=str(current_user.id),
         template_id=schedule_data.template_id,
         name=schedule_data.name,
         description=schedule_data.description,
@@ -476,13 +514,13 @@ async def create_report_schedule(
 
 @router.get("/schedules", response_model=List[ReportScheduleResponse])
 async def list_report_schedules(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """List report schedules for current user."""
 
     stmt = select(ReportSchedule).where(
-        ReportSchedule.user_id == current_user.id,
+        ReportSchedule.user_id == str(current_user.id),
         ReportSchedule.is_active == True
     ).order_by(desc(ReportSchedule.created_at))
 
@@ -0,0 +1,25 @@
+"""
+System diagnostics endpoints.
+
+Endpointy diagnostyki systemu.
+"""
+
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import get_current_admin_user
+from app.core.db_pool import pool_report
+from app.services.user_cache import UserPrincipal
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+async def get_db_pool_report(
+    current_user: UserPrincipal = Depends(get_current_admin_user)
+):
+    """
+    Connection pool statistics and sizing recommendations of this process (admin only).
+
+    Statystyki puli połączeń i rekomendacje jej rozmiaru (tylko administrator).
+    """
+    return {"pools": pool_report()}
@@ -9,7 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import get_current_user, get_db, get_current_admin_user
-from app.models.user import User
+from app.services.user_cache import UserPrincipal
 from app.schemas.import_schemas import UnitConversionCreate, UnitConversionResponse
 from app.services.unit_conversion import UnitConversionService, UnitType
 
@@ -23,7 +23,7 @@ async def convert_value(
     to_unit: str,
     unit_type: UnitType,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Convert a value from one unit to another.
@@ -54,7 +54,7 @@ async def convert_value(
 async def get_supported_units(
     unit_type: Optional[UnitType] = Query(None, description="Filter by unit type"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get supported units for conversion.
@@ -78,7 +78,7 @@ async def get_supported_units(
 
 @router.get("/examples")
 async def get_conversion_examples(
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get examples of supported conversions.
@@ -93,7 +93,7 @@ async def get_conversion_examples(
 async def create_conversion_rule(
     rule_data: UnitConversionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: UserPrincipal = Depends(get_current_admin_user)
 ):
     """
     Create a new unit conversion rule.
@@ -126,7 +126,7 @@ async def get_conversion_rules(
     unit_type: Optional[UnitType] = Query(None, description="Filter by unit type"),
     is_active: bool = Query(True, description="Filter by active status"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Get conversion rules from database.
@@ -158,7 +158,7 @@ async def update_conversion_rule(
     rule_id: str,
     is_active: bool,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: UserPrincipal = Depends(get_current_admin_user)
 ):
     """
     Update a conversion rule (enable/disable).
@@ -202,7 +202,7 @@ async def update_conversion_rule(
 async def batch_convert_values(
     conversions: List[Dict[str, Any]],
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Convert multiple values in batch.
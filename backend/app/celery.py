@@ -5,8 +5,20 @@ Konfiguracja Celery dla zadań w tle - optymalizacja, eksport, import.
 """
 
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
+from kombu import Queue
+from prometheus_client import start_http_server
 
 from app.core.config import settings
+from app.core.metrics import clear_multiprocess_dir, mark_process_dead, metrics_registry
+
+
+# Queues - workers can be started per queue (celery worker -Q optimization.interactive)
+QUEUE_OPTIMIZATION_INTERACTIVE = "optimization.interactive"
+QUEUE_OPTIMIZATION_BATCH = "optimization.batch"
+QUEUE_REPORTING = "reporting"
+QUEUE_IMPORT = "import"
+QUEUE_MAINTENANCE = "maintenance"
 
 
 # Create Celery app
@@ -33,8 +45,35 @@ celery_app.conf.update(
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
+    task_acks_late=True,  # Long jobs are not prefetched/lost by a busy worker
+    task_reject_on_worker_lost=True,  # Redeliver jobs of a killed worker; they resume from checkpoints
     worker_max_tasks_per_child=1000,
     result_expires=3600,  # 1 hour
+    # Routing - interactive optimizations never wait behind sweeps, reports or imports
+    task_queues=(
+        Queue(QUEUE_OPTIMIZATION_INTERACTIVE),
+        Queue(QUEUE_OPTIMIZATION_BATCH),
+        Queue(QUEUE_REPORTING),
+        Queue(QUEUE_IMPORT),
+        Queue(QUEUE_MAINTENANCE),
+    ),
+    task_default_queue=QUEUE_MAINTENANCE,
+    task_routes={
+        "app.tasks.optimization_tasks.run_optimization_task": {"queue": QUEUE_OPTIMIZATION_INTERACTIVE},
+        "app.tasks.optimization_tasks.generate_optimization_report": {"queue": QUEUE_REPORTING},
+        "app.tasks.optimization_tasks.*": {"queue": QUEUE_MAINTENANCE},
+        "app.tasks.reporting_tasks.generate_report_task": {"queue": QUEUE_REPORTING},
+        "app.tasks.reporting_tasks.generate_scheduled_reports": {"queue": QUEUE_REPORTING},
+        "app.tasks.reporting_tasks.*": {"queue": QUEUE_MAINTENANCE},
+        "app.tasks.reports.*": {"queue": QUEUE_REPORTING},
+        "app.tasks.import_export.*": {"queue": QUEUE_IMPORT},
+        "app.tasks.maintenance.*": {"queue": QUEUE_MAINTENANCE},
+    },
+    # Redis emulates priorities with sub-queues; 0 is the highest priority
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "queue_order_strategy": "priority",
+    },
     beat_schedule={
         "cleanup-expired-tasks": {
             "task": "app.tasks.maintenance.cleanup_expired_tasks",
@@ -44,5 +83,28 @@ celery_app.conf.update(
             "task": "app.tasks.maintenance.cleanup_old_files",
             "schedule": 24 * 3600.0,  # Daily
         },
+        "rebuild-optimization-rollups": {
+            "task": "app.tasks.maintenance.rebuild_optimization_rollups",
+            "schedule": 24 * 3600.0,  # Daily; repairs drift from bulk updates and deletes
+        },
+        "dispatch-pending-optimization-jobs": {
+            "task": "app.tasks.optimization_tasks.dispatch_pending_optimization_jobs",
+            "schedule": 30.0,  # Safety net for jobs held by fair-share admission
+        },
     },
-)
\ No newline at end of file
+)
+
+
+@worker_init.connect
+def start_metrics_server(**kwargs) -> None:
+    """Serve the metrics of the worker and its pool processes (main process only)."""
+    if not settings.ENABLE_METRICS or not settings.CELERY_METRICS_PORT:
+        return
+    clear_multiprocess_dir()
+    start_http_server(settings.CELERY_METRICS_PORT, registry=metrics_registry())
+
+
+@worker_process_shutdown.connect
+def mark_pool_process_dead(pid=None, **kwargs) -> None:
+    """Drop the live gauges of an exiting pool process."""
+    mark_process_dead(pid)
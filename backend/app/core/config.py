@@ -23,6 +23,28 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     DEBUG: bool = False
 
+    # Authenticated-user cache (principal: id, role, active and verified flags)
+    USER_CACHE_BACKEND: str = "memory"  # memory | redis (shared tier + invalidation channel) | none
+    USER_CACHE_TTL_SECONDS: float = 30.0  # Also bounds staleness in processes that miss an invalidation
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # Password hashing (bcrypt runs on a bounded thread pool, off the event loop)
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # Changing it rehashes passwords at their next login
+    PASSWORD_HASH_WORKERS: int = 0  # 0 = one per CPU core
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Hash/verify calls waiting beyond the workers; more get 503
+
+    # Dashboard figures cache (per user plus one system-wide rollup)
+    DASHBOARD_CACHE_BACKEND: str = "memory"  # memory | redis (shared, dropped by workers too) | none
+    DASHBOARD_CACHE_TTL_SECONDS: float = 60.0
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 10000
+
+    # Report generation
+    REPORTS_STORAGE_PATH: str = "reports"  # Generated report files and their reuse cache
+    REPORT_SECTION_CONCURRENCY: int = 4  # Sections generated at once per report, each on its own session
+    REPORT_CACHE_MAX_MB: int = 1024  # Files kept for reuse by identical reports, least recently used go first; 0 = off
+    REPORT_PDF_WORKERS: int = 2  # Processes laying out PDF reports
+    REPORT_PDF_TIMEOUT_SECONDS: float = 120.0  # Per document; 0 = no limit
+
     # Security
     ALLOWED_HOSTS: Union[str, List[str]] = ["localhost", "127.0.0.1"]
     BACKEND_CORS_ORIGINS: Union[str, List[AnyHttpUrl]] = []
@@ -53,6 +75,12 @@ class Settings(BaseSettings):
     DATABASE_MAX_OVERFLOW: int = 20
     DATABASE_POOL_TIMEOUT: int = 30
     DATABASE_POOL_RECYCLE: int = 3600
+    DATABASE_POOL_SLOW_CHECKOUT_MS: float = 10.0  # Checkouts waiting this long count as slow
+    DATABASE_POOL_LONG_HOLD_SECONDS: float = 5.0  # Checkouts held this long are reported (SSE)
+    DATABASE_POOL_SIZING_HEADROOM: float = 0.25  # Added on top of observed concurrency
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0  # Statements at least this slow are logged; 0 disables
+    SLOW_QUERY_LOG_MAX_CHARS: int = 2000
+    QUERY_STATS_HEADERS: bool = False  # Add X-DB-Query-Count and Server-Timing to responses
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -98,11 +126,40 @@ class Settings(BaseSettings):
     DEFAULT_OPTIMIZATION_TIMEOUT: int = 3600  # 1 hour
     MAX_PARALLEL_OPTIMIZATIONS: int = 10
     OPTIMIZATION_CHECKPOINT_INTERVAL: int = 10  # iterations
+    OPTIMIZATION_CHECKPOINT_HISTORY: int = 100  # Latest evaluations kept in a checkpoint; the rest is in iteration storage
+    OPTIMIZATION_CHECKPOINT_BACKEND: str = "redis"  # redis | disk | none
+    OPTIMIZATION_CHECKPOINT_DIR: str = "/app/checkpoints"
+    OPTIMIZATION_CHECKPOINT_TTL: int = 7 * 24 * 3600  # seconds (redis backend)
+    OPTIMIZATION_MAX_RESUMES: int = 20  # Re-dispatches after a time limit before failing
+    OPTIMIZATION_ITERATION_STORAGE: str = "rows"  # rows | columnar
+    OPTIMIZATION_ITERATION_CHUNK_SIZE: int = 1024  # rows per compressed chunk (columnar storage)
+    OPTIMIZATION_PROFILE_TRACEMALLOC: bool = False  # Python heap peak per job (slows the solver)
+
+    # Stagnation-based early stopping (scenarios opt in with optimization_config["early_stopping"])
+    OPTIMIZATION_EARLY_STOPPING: bool = False  # Stop stagnating runs before ftol/maxiter for every scenario
+    OPTIMIZATION_STAGNATION_WINDOW: int = 5  # major iterations
+    OPTIMIZATION_STAGNATION_REL_TOL: float = 1e-6  # relative objective improvement over the window
+    OPTIMIZATION_STAGNATION_X_TOL: float = 1e-6  # step as a fraction of the bound range
+    OPTIMIZATION_CONSTRAINT_PLATEAU_TOL: float = 1e-4  # relative violation decrease over the window
+
+    # On-demand profiling (execution_config["profile"] or the admin-only X-Profile header)
+    PROFILE_DEFAULT_MODE: str = "sampling"  # sampling | cprofile
+    PROFILE_SAMPLING_INTERVAL_MS: int = 5
+    PROFILE_MAX_SAMPLES: int = 120000  # Sampler stops after this many stacks (10 min at 5 ms)
+    PROFILE_ARTIFACT_DIR: str = "/app/profiles"
+    PROFILE_MAX_ARTIFACTS: int = 200  # Oldest artifacts are deleted beyond this count
 
     # Rate Limiting for Optimization Jobs
     MAX_CONCURRENT_JOBS_PER_USER: int = 5  # Max concurrent jobs per user
     MAX_CONCURRENT_JOBS_PER_SCENARIO: int = 1  # Max concurrent jobs per scenario
 
+    # Fair-share scheduling (MAX_PARALLEL_OPTIMIZATIONS is the global slot count)
+    MAX_QUEUED_JOBS_PER_USER: int = 1000  # Jobs held pending beyond the in-flight cap
+    MAX_JOBS_PER_BATCH: int = 1000  # Jobs accepted by one batch submission
+    OPTIMIZATION_DEDUP_WINDOW_MINUTES: int = 60  # Reuse identical completed jobs this long (0 disables)
+    INTERACTIVE_MAX_PRIORITY: int = 2  # Priority 1..N goes to the interactive queue
+    INTERACTIVE_RESERVED_SLOTS: int = 2  # Slots batch jobs may never occupy
+
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
@@ -111,6 +168,7 @@ class Settings(BaseSettings):
     # Monitoring
     PROMETHEUS_METRICS_PATH: str = "/metrics"
     ENABLE_METRICS: bool = True
+    CELERY_METRICS_PORT: int = 0  # Celery workers serve /metrics on this port; 0 disables
 
     # Features flags
     ENABLE_PHYSICS_SOLVER_PYOMO: bool = False
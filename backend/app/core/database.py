@@ -4,12 +4,19 @@ Database configuration and session management.
 Konfiguracja bazy danych MySQL z obsługą asynchronicznych sesji.
 """
 
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
 import structlog
 
 from app.core.config import settings
+from app.core.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
 
 
 logger = structlog.get_logger(__name__)
@@ -21,6 +28,120 @@ class Base(DeclarativeBase):
     pass
 
 
+class QueryStats:
+    """SQL statements executed and database time spent within one request or block."""
+
+    __slots__ = ("route", "count", "seconds", "statements", "parent")
+
+    def __init__(self, route: Optional[str] = None, record_statements: bool = False,
+                 parent: Optional["QueryStats"] = None):
+        self.route = route
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Optional[List[str]] = [] if record_statements else None
+        self.parent = parent
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+
+@contextmanager
+def track_queries(route: Optional[str] = None, record_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    Count the statements executed in the current context.
+
+    Blocks nest: a statement is charged to every enclosing tracker, so a test
+    wrapping an API call sees the queries counted by the request middleware.
+    """
+    parent = _query_stats.get()
+    stats = QueryStats(
+        route=route if route is not None else (parent.route if parent else None),
+        record_statements=record_statements,
+        parent=parent,
+    )
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+QueryObserver = Callable[[str, float, bool], None]
+
+_query_observers: List[QueryObserver] = []
+
+
+def add_query_observer(observer: QueryObserver) -> None:
+    """
+    Call ``observer(statement, seconds, executemany)`` after every statement.
+
+    All consumers share the one pair of cursor hooks below, so each statement
+    is timed once however many modules want its duration.
+    """
+    _query_observers.append(observer)
+
+
+# Registered on the Engine class so the async, sync (Celery) and test engines are all covered
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append((cursor, time.perf_counter()))
+
+
+def _stop_query_timer(conn, cursor) -> Optional[float]:
+    """Pop the start pushed for this cursor and return the elapsed seconds."""
+    starts = conn.info.get("query_start")
+    if not starts or starts[-1][0] is not cursor:
+        return None
+    return time.perf_counter() - starts.pop()[1]
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = _stop_query_timer(conn, cursor)
+    if elapsed is not None:
+        _record_query(statement, elapsed, executemany)
+
+
+# after_cursor_execute does not fire for a failing statement; its start must not pair with the next one
+@event.listens_for(Engine, "handle_error")
+def _failed_query(exception_context):
+    execution_context = exception_context.execution_context
+    if exception_context.connection is None or execution_context is None:
+        return
+    elapsed = _stop_query_timer(exception_context.connection, execution_context.cursor)
+    if elapsed is not None:
+        _record_query(exception_context.statement or "", elapsed, False)
+
+
+def _record_query(statement: str, elapsed: float, executemany: bool) -> None:
+    stats = _query_stats.get()
+    route = stats.route if stats else None
+    while stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        if stats.statements is not None:
+            stats.statements.append(statement)
+        stats = stats.parent
+
+    for observer in _query_observers:
+        observer(statement, elapsed, executemany)
+
+    threshold_ms = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold_ms > 0 and elapsed * 1000 >= threshold_ms:
+        logger.warning(
+            "Slow query",
+            route=route,
+            duration_ms=round(elapsed * 1000, 1),
+            statement=statement[:settings.SLOW_QUERY_LOG_MAX_CHARS],
+            executemany=executemany,
+        )
+
+
+def _is_memory_database(url: str) -> bool:
+    """In-memory SQLite keeps its single connection in a static pool, not a queue pool."""
+    return url.startswith(("sqlite", "aiosqlite")) and make_url(url).database in (None, "", ":memory:")
+
+
 # Create async engine (for FastAPI endpoints)
 engine_kwargs = {
     "echo": settings.DEBUG,
@@ -35,7 +156,14 @@ if not settings.DATABASE_URL.startswith(("sqlite", "aiosqlite")):
         "pool_recycle": settings.DATABASE_POOL_RECYCLE,
     })
 
-engine = create_async_engine(settings.DATABASE_URL, **engine_kwargs)
+# Queue pools that also time checkout waits; the logging name identifies the pool's monitor
+async_pool_kwargs = {} if _is_memory_database(settings.DATABASE_URL) else {
+    "poolclass": InstrumentedAsyncQueuePool,
+    "pool_logging_name": "async",
+}
+
+engine = create_async_engine(settings.DATABASE_URL, **engine_kwargs, **async_pool_kwargs)
+instrument_engine(engine, "async")
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -49,7 +177,13 @@ AsyncSessionLocal = async_sessionmaker(
 sync_database_url = settings.DATABASE_URL.replace("mysql+aiomysql://", "mysql+pymysql://")
 sync_database_url = sync_database_url.replace("sqlite+aiosqlite://", "sqlite://")
 
-sync_engine = create_engine(sync_database_url, **engine_kwargs)
+sync_pool_kwargs = {} if _is_memory_database(sync_database_url) else {
+    "poolclass": InstrumentedQueuePool,
+    "pool_logging_name": "sync",
+}
+
+sync_engine = create_engine(sync_database_url, **engine_kwargs, **sync_pool_kwargs)
+instrument_engine(sync_engine, "sync")
 
 # Create synchronous session factory for Celery
 SyncSessionLocal = sessionmaker(
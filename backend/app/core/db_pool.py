@@ -0,0 +1,279 @@
+"""
+Connection pool instrumentation and sizing advice.
+
+Monitorowanie puli połączeń z bazą danych i rekomendacje jej rozmiaru.
+
+Pool events keep per-pool counts of open and checked-out connections and
+export them, together with checkout wait time, hold time and connection
+age, to Prometheus. The same statistics feed
+:meth:`PoolMonitor.recommendation`, which suggests ``pool_size`` and
+``max_overflow`` from the concurrency actually observed. Waiting for a
+free connection happens before any pool event fires, so engines use the
+queue pools below, which time ``Pool.connect()``; monitors are found by the
+pool's logging name, which survives ``engine.dispose()``.
+"""
+
+import math
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import MetricsCollector
+
+
+# Checkouts needed before the recommendation is based on observations
+MIN_CHECKOUTS_FOR_RECOMMENDATION = 100
+
+POOL_MONITORS: Dict[str, "PoolMonitor"] = {}
+
+
+class _TimedCheckout:
+    """Times Pool.connect(): waiting for a free connection, or opening a new one."""
+
+    def connect(self):
+        monitor = POOL_MONITORS.get(getattr(self, "logging_name", None))
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            if monitor:
+                monitor.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if monitor:
+            monitor.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool with checkout wait timing (sync engine)."""
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout wait timing (async engine)."""
+
+
+class PoolMonitor:
+    """Connection counts and checkout statistics of one engine's pool."""
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.connected = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+        self.hold_seconds_total = 0.0
+        self.long_holds = 0
+        # Connections in use right after each checkout, for percentiles
+        self.in_use_at_checkout: Counter = Counter()
+
+    @property
+    def pool_size(self) -> Optional[int]:
+        pool = self.engine.pool
+        return pool.size() if isinstance(pool, QueuePool) else None
+
+    @property
+    def max_overflow(self) -> Optional[int]:
+        pool = self.engine.pool
+        return pool._max_overflow if isinstance(pool, QueuePool) else None
+
+    @property
+    def pool_timeout(self) -> Optional[float]:
+        pool = self.engine.pool
+        return pool.timeout() if isinstance(pool, QueuePool) else None
+
+    def attach(self) -> "PoolMonitor":
+        for name in ("connect", "close", "detach", "checkout", "checkin"):
+            event.listen(self.engine, name, getattr(self, f"_on_{name}"))
+        POOL_MONITORS[self.name] = self
+        return self
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        connection_record.info["pool_created_at"] = time.monotonic()
+        with self._lock:
+            self.connected += 1
+        self.publish()
+
+    def _on_close(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connected = max(self.connected - 1, 0)
+        self.publish()
+
+    def _on_detach(self, dbapi_connection, connection_record) -> None:
+        # Detached connections are no longer the pool's; their close fires close_detached
+        self._on_close(dbapi_connection, connection_record)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        now = time.monotonic()
+        connection_record.info["pool_checked_out_at"] = now
+        created_at = connection_record.info.get("pool_created_at")
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.in_use_at_checkout[self.in_use] += 1
+        if created_at is not None:
+            MetricsCollector.track_db_pool_connection_age(self.name, now - created_at)
+        self.publish()
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        checked_out_at = connection_record.info.pop("pool_checked_out_at", None)
+        if checked_out_at is None:
+            return
+        hold_seconds = time.monotonic() - checked_out_at
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+            self.hold_seconds_total += hold_seconds
+            if hold_seconds >= settings.DATABASE_POOL_LONG_HOLD_SECONDS:
+                self.long_holds += 1
+        MetricsCollector.track_db_pool_hold(self.name, hold_seconds)
+        self.publish()
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if seconds * 1000 >= settings.DATABASE_POOL_SLOW_CHECKOUT_MS:
+                self.slow_checkouts += 1
+            if timed_out:
+                self.timeouts += 1
+        MetricsCollector.track_db_pool_checkout_wait(self.name, seconds, timed_out)
+
+    def publish(self) -> None:
+        """Export the current connection counts."""
+        pool_size = self.pool_size
+        in_use = self.in_use
+        MetricsCollector.set_db_pool_connections(
+            self.name,
+            in_use=in_use,
+            idle=max(self.connected - in_use, 0),
+            overflow=max(self.connected - pool_size, 0) if pool_size is not None else 0,
+        )
+        MetricsCollector.set_database_connections(sum(m.in_use for m in POOL_MONITORS.values()))
+
+    def _in_use_percentile(self, fraction: float) -> int:
+        total = sum(self.in_use_at_checkout.values())
+        if not total:
+            return 0
+        seen = 0
+        for in_use in sorted(self.in_use_at_checkout):
+            seen += self.in_use_at_checkout[in_use]
+            if seen >= fraction * total:
+                return in_use
+        return self.peak_in_use
+
+    def recommendation(self) -> Dict[str, Any]:
+        """
+        Observed concurrency and the pool sizing it suggests.
+
+        ``pool_size`` covers the 95th percentile of connections in use at
+        checkout and ``max_overflow`` the rest of the peak, both with
+        DATABASE_POOL_SIZING_HEADROOM on top. Figures are per process.
+        """
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started_at, 1e-9)
+            checkouts = self.checkouts
+            checkins = checkouts - self.in_use
+            mean_hold = self.hold_seconds_total / checkins if checkins > 0 else 0.0
+            observed = {
+                "window_seconds": elapsed,
+                "checkouts": checkouts,
+                "checkouts_per_second": checkouts / elapsed,
+                "connections_open": self.connected,
+                "connections_in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "p50_in_use": self._in_use_percentile(0.50),
+                "p95_in_use": self._in_use_percentile(0.95),
+                # Little's law: mean connections busy = arrival rate x mean hold time
+                "mean_in_use": checkouts / elapsed * mean_hold,
+                "mean_hold_seconds": mean_hold,
+                "long_holds": self.long_holds,
+                "mean_wait_seconds": self.wait_seconds_total / checkouts if checkouts else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+                "slow_checkouts": self.slow_checkouts,
+                "timeouts": self.timeouts,
+            }
+
+        configured = {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+        }
+        notes: List[str] = []
+        headroom = 1 + settings.DATABASE_POOL_SIZING_HEADROOM
+
+        if checkouts < MIN_CHECKOUTS_FOR_RECOMMENDATION:
+            recommended = dict(configured)
+            notes.append(
+                f"Only {checkouts} checkouts observed; keep the current settings "
+                f"until at least {MIN_CHECKOUTS_FOR_RECOMMENDATION} are recorded under load."
+            )
+        else:
+            pool_size = max(1, math.ceil(observed["p95_in_use"] * headroom))
+            peak = max(pool_size, math.ceil(observed["peak_in_use"] * headroom))
+            if observed["timeouts"]:
+                # The peak was capped by the pool itself, so it understates demand
+                capacity = (configured["pool_size"] or 0) + (configured["max_overflow"] or 0)
+                peak = max(peak, math.ceil(capacity * headroom))
+            recommended = {
+                "pool_size": pool_size,
+                "max_overflow": peak - pool_size,
+                "pool_timeout": configured["pool_timeout"],
+            }
+
+            if observed["timeouts"]:
+                notes.append(
+                    f"{observed['timeouts']} checkouts timed out: requests failed waiting for a connection."
+                )
+            if observed["slow_checkouts"] > 0.01 * checkouts:
+                notes.append(
+                    f"{observed['slow_checkouts'] / checkouts:.1%} of checkouts waited at least "
+                    f"{settings.DATABASE_POOL_SLOW_CHECKOUT_MS:g} ms for a connection."
+                )
+            if observed["long_holds"]:
+                notes.append(
+                    f"{observed['long_holds']} checkouts held a connection for "
+                    f"{settings.DATABASE_POOL_LONG_HOLD_SECONDS:g} s or more. Streaming responses (SSE) "
+                    "keep their request's session for the whole stream, so every open stream "
+                    "pins a connection; size for concurrent streams or release the session between polls."
+                )
+            if configured["pool_size"] is not None and pool_size < configured["pool_size"]:
+                notes.append(
+                    "The pool is larger than the observed concurrency; idle connections still "
+                    "count against the database server's max_connections."
+                )
+
+        notes.append(
+            "Figures are per process: multiply pool_size + max_overflow by the number of API "
+            "and worker processes when checking the database's max_connections."
+        )
+        return {
+            "pool": self.name,
+            "configured": configured,
+            "observed": observed,
+            "recommended": recommended,
+            "notes": notes,
+        }
+
+
+def instrument_engine(engine: Any, name: str) -> PoolMonitor:
+    """Start monitoring the pool of a sync or async engine."""
+    return PoolMonitor(name, getattr(engine, "sync_engine", engine)).attach()
+
+
+def pool_report() -> Dict[str, Any]:
+    """Sizing recommendations of all monitored pools."""
+    return {name: monitor.recommendation() for name, monitor in POOL_MONITORS.items()}
@@ -2,10 +2,18 @@
 Prometheus metrics for monitoring.
 
 Metryki biznesowe i techniczne dla monitoringu systemu.
+
+Multi-process deployments (several gunicorn/uvicorn workers, Celery prefork
+pools) set PROMETHEUS_MULTIPROC_DIR to an empty directory per host or
+container before the processes start. Each process then writes its values
+there, ``metrics_registry()`` aggregates them for scraping and gauges are
+combined according to their ``multiprocess_mode``. Info metrics are not
+supported in that mode and are left out of the aggregate.
 """
 
-from prometheus_client import Counter, Histogram, Gauge, Info
-from typing import Dict, Any
+import os
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, Gauge, Info, multiprocess
+from typing import ContextManager, Dict, Any, List, Optional
 import time
 
 from app.core.config import settings
@@ -28,6 +36,7 @@ optimization_duration = Histogram(
 active_optimization_jobs = Gauge(
     "fro_active_optimization_jobs",
     "Number of currently running optimizations",
+    multiprocess_mode="mostrecent",
 )
 
 fuel_savings_achieved = Histogram(
@@ -37,6 +46,60 @@ fuel_savings_achieved = Histogram(
     buckets=[0, 2, 5, 8, 10, 12, 15, 18, 20, 25],
 )
 
+# Scheduling metrics
+optimization_queue_depth = Gauge(
+    "fro_optimization_queue_depth",
+    "Optimization jobs per queue, held by admission or in flight",
+    ["queue", "state"],
+    multiprocess_mode="mostrecent",
+)
+
+optimization_admissions_total = Counter(
+    "fro_optimization_admissions_total",
+    "Fair-share admission decisions for optimization jobs",
+    ["decision"],
+)
+
+optimization_duplicates_avoided = Counter(
+    "fro_optimization_duplicates_avoided_total",
+    "Re-submitted optimization jobs served by an existing job",
+    ["outcome"],
+)
+
+optimization_queue_wait = Histogram(
+    "fro_optimization_queue_wait_seconds",
+    "Time from job submission until a worker starts it",
+    ["queue"],
+    buckets=[0.5, 1, 2, 5, 10, 30, 60, 300, 900, 3600],
+)
+
+# Job resource accounting
+optimization_phase_seconds = Histogram(
+    "fro_optimization_phase_seconds",
+    "Wall and CPU time of optimization job phases",
+    ["phase", "clock"],
+    buckets=[0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800],
+)
+
+optimization_db_seconds = Histogram(
+    "fro_optimization_db_seconds",
+    "Database time per optimization job phase",
+    ["phase"],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30],
+)
+
+optimization_evaluation_seconds = Histogram(
+    "fro_optimization_evaluation_seconds",
+    "Duration of single physics model evaluations",
+    buckets=[1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.1, 1.0],
+)
+
+optimization_peak_memory = Histogram(
+    "fro_optimization_peak_rss_megabytes",
+    "Worker peak resident memory at the end of an optimization job",
+    buckets=[64, 128, 256, 512, 1024, 2048, 4096, 8192],
+)
+
 # Technical metrics
 api_requests_total = Counter(
     "fro_api_requests_total",
@@ -51,9 +114,72 @@ api_request_duration = Histogram(
     buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
 )
 
+api_requests_in_progress = Gauge(
+    "fro_api_requests_in_progress",
+    "API requests being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+api_response_size = Histogram(
+    "fro_api_response_size_bytes",
+    "API response body size",
+    ["method", "endpoint"],
+    buckets=[100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000],
+)
+
+api_request_db_queries = Histogram(
+    "fro_api_request_db_queries",
+    "SQL statements executed per API request",
+    ["method", "endpoint"],
+    buckets=[0, 1, 2, 3, 5, 10, 20, 50, 100, 250],
+)
+
+api_request_db_duration = Histogram(
+    "fro_api_request_db_seconds",
+    "Database time per API request",
+    ["method", "endpoint"],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+
 database_connections = Gauge(
     "fro_database_connections",
     "Active database connections",
+    multiprocess_mode="livesum",
+)
+
+db_pool_connections = Gauge(
+    "fro_db_pool_connections",
+    "Pooled database connections by state",
+    ["pool", "state"],
+    multiprocess_mode="livesum",
+)
+
+db_pool_checkout_wait = Histogram(
+    "fro_db_pool_checkout_wait_seconds",
+    "Time to obtain a pooled connection, including opening a new one",
+    ["pool"],
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0],
+)
+
+db_pool_checkout_timeouts = Counter(
+    "fro_db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after pool_timeout",
+    ["pool"],
+)
+
+db_pool_hold = Histogram(
+    "fro_db_pool_hold_seconds",
+    "Time a connection stays checked out",
+    ["pool"],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0, 600.0],
+)
+
+db_pool_connection_age = Histogram(
+    "fro_db_pool_connection_age_seconds",
+    "Age of connections handed out by the pool",
+    ["pool"],
+    buckets=[1, 10, 60, 300, 900, 1800, 3600, 7200],
 )
 
 import_success_rate = Counter(
@@ -73,6 +199,7 @@ export_generation_time = Histogram(
 active_users_gauge = Gauge(
     "fro_active_users",
     "Number of active user sessions",
+    multiprocess_mode="mostrecent",
 )
 
 user_actions_total = Counter(
@@ -81,15 +208,80 @@ user_actions_total = Counter(
     ["action_type", "user_role"],
 )
 
+user_cache_lookups_total = Counter(
+    "fro_user_cache_lookups_total",
+    "Authenticated-user lookups by cache tier that answered",
+    ["result"],  # memory, redis, miss
+)
+
+dashboard_cache_lookups_total = Counter(
+    "fro_dashboard_cache_lookups_total",
+    "Dashboard figure lookups by outcome",
+    ["result"],  # hit, miss
+)
+
+report_cache_lookups_total = Counter(
+    "fro_report_cache_lookups_total",
+    "Report file lookups in the artifact cache by outcome",
+    ["result"],  # hit, miss
+)
+
+report_cache_evictions_total = Counter(
+    "fro_report_cache_evictions_total",
+    "Report files evicted from the artifact cache to stay under its quota",
+)
+
+report_downloads_total = Counter(
+    "fro_report_downloads_total",
+    "Report downloads by response and content encoding",
+    ["response", "encoding"],  # full, range, not_modified; identity, gzip
+)
+
+report_pdf_render_seconds = Histogram(
+    "fro_report_pdf_render_seconds",
+    "Time spent rendering a PDF report on the rendering pool",
+    ["outcome"],  # ok, timeout, error
+    buckets=[0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0],
+)
+
+# Password hashing pool (bcrypt off the event loop)
+password_hash_duration = Histogram(
+    "fro_password_hash_duration_seconds",
+    "Time spent hashing or verifying a password",
+    ["operation"],  # hash, verify
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+
+password_hash_queue_wait = Histogram(
+    "fro_password_hash_queue_wait_seconds",
+    "Time a password hash or verification waited for a pool thread",
+    ["operation"],
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
+)
+
+password_hash_pending = Gauge(
+    "fro_password_hash_pending",
+    "Password hashes and verifications running or queued",
+    multiprocess_mode="livesum",
+)
+
+password_hash_rejected_total = Counter(
+    "fro_password_hash_rejected_total",
+    "Password hashes and verifications rejected because the queue was full",
+    ["operation"],
+)
+
 # System health metrics
 memory_usage = Gauge(
     "fro_memory_usage_bytes",
     "Memory usage in bytes",
+    multiprocess_mode="liveall",
 )
 
 cpu_usage = Gauge(
     "fro_cpu_usage_percent",
     "CPU usage percentage",
+    multiprocess_mode="liveall",
 )
 
 # Application info
@@ -99,6 +291,44 @@ app_info = Info(
 )
 
 
+def multiprocess_enabled() -> bool:
+    """Whether metrics are shared between processes through PROMETHEUS_MULTIPROC_DIR."""
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to expose: this process' metrics, or all processes' in multi-process mode."""
+    if not multiprocess_enabled():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def clear_multiprocess_dir() -> None:
+    """
+    Remove the metric files of a previous run from PROMETHEUS_MULTIPROC_DIR.
+
+    Files of the calling process are kept, since it may already have
+    created metrics. Call once in the parent process before workers start
+    (Celery worker_init), never while other processes are writing there.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return
+    os.makedirs(path, exist_ok=True)
+    own_suffix = f"_{os.getpid()}.db"
+    for name in os.listdir(path):
+        if not name.endswith(own_suffix):
+            os.remove(os.path.join(path, name))
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """Drop the live gauges of an exited worker process from the aggregate."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
 def setup_metrics() -> None:
     """Initialize metrics with application info."""
     if settings.ENABLE_METRICS:
@@ -139,12 +369,47 @@ class MetricsCollector:
                 scenario_type=scenario_type,
             ).observe(fuel_savings)
 
+    @staticmethod
+    def track_job_admission(decision: str, count: int = 1) -> None:
+        """Track fair-share admission decision (dispatched, held, rejected)."""
+        optimization_admissions_total.labels(decision=decision).inc(count)
+
+    @staticmethod
+    def track_duplicate_avoided(outcome: str) -> None:
+        """Track a re-submission served by an existing job (in_flight, cached)."""
+        optimization_duplicates_avoided.labels(outcome=outcome).inc()
+
+    @staticmethod
+    def track_queue_wait(queue: str, wait_seconds: float) -> None:
+        """Track time a job waited before a worker picked it up."""
+        optimization_queue_wait.labels(queue=queue).observe(wait_seconds)
+
+    @staticmethod
+    def set_optimization_queue_depth(queue: str, state: str, count: int) -> None:
+        """Set number of jobs in a queue for a state (held, in_flight)."""
+        optimization_queue_depth.labels(queue=queue, state=state).set(count)
+
+    @staticmethod
+    def track_job_resource_usage(usage: Dict[str, Any], evaluation_times: Optional[List[float]] = None) -> None:
+        """Track phase timings, DB time, peak memory and evaluation times of a job run."""
+        for phase, timing in usage.get("phases", {}).items():
+            optimization_phase_seconds.labels(phase=phase, clock="wall").observe(timing["wall_seconds"])
+            optimization_phase_seconds.labels(phase=phase, clock="cpu").observe(timing["cpu_seconds"])
+            optimization_db_seconds.labels(phase=phase).observe(timing["db_seconds"])
+
+        if usage.get("peak_rss_mb") is not None:
+            optimization_peak_memory.observe(usage["peak_rss_mb"])
+
+        for seconds in evaluation_times or ():
+            optimization_evaluation_seconds.observe(seconds)
+
     @staticmethod
     def track_api_request(
         method: str,
         endpoint: str,
         status_code: int,
         duration: float,
+        response_size: Optional[int] = None,
     ) -> None:
         """Track API request metrics."""
         api_requests_total.labels(
@@ -158,6 +423,28 @@ class MetricsCollector:
             endpoint=endpoint,
         ).observe(duration)
 
+        if response_size is not None:
+            api_response_size.labels(
+                method=method,
+                endpoint=endpoint,
+            ).observe(response_size)
+
+    @staticmethod
+    def track_request_in_progress(method: str) -> ContextManager:
+        """Count a request as in flight for the duration of the block."""
+        return api_requests_in_progress.labels(method=method).track_inprogress()
+
+    @staticmethod
+    def track_request_queries(
+        method: str,
+        endpoint: str,
+        query_count: int,
+        db_seconds: float,
+    ) -> None:
+        """Track SQL statements and database time of one API request."""
+        api_request_db_queries.labels(method=method, endpoint=endpoint).observe(query_count)
+        api_request_db_duration.labels(method=method, endpoint=endpoint).observe(db_seconds)
+
     @staticmethod
     def track_import_operation(
         status: str,
@@ -190,6 +477,52 @@ class MetricsCollector:
             user_role=user_role,
         ).inc()
 
+    @staticmethod
+    def track_user_cache_lookup(result: str) -> None:
+        """Track where an authenticated-user lookup was answered."""
+        user_cache_lookups_total.labels(result=result).inc()
+
+    @staticmethod
+    def track_dashboard_cache_lookup(result: str) -> None:
+        """Track a dashboard figures cache hit or miss."""
+        dashboard_cache_lookups_total.labels(result=result).inc()
+
+    @staticmethod
+    def track_report_cache_lookup(result: str) -> None:
+        """Track a report artifact cache hit or miss."""
+        report_cache_lookups_total.labels(result=result).inc()
+
+    @staticmethod
+    def track_report_cache_evictions(count: int) -> None:
+        """Track report files evicted from the artifact cache."""
+        report_cache_evictions_total.inc(count)
+
+    @staticmethod
+    def track_report_download(response: str, encoding: str) -> None:
+        """Track a report download."""
+        report_downloads_total.labels(response=response, encoding=encoding).inc()
+
+    @staticmethod
+    def track_pdf_render(outcome: str, seconds: float) -> None:
+        """Track one PDF document rendered on the rendering pool."""
+        report_pdf_render_seconds.labels(outcome=outcome).observe(seconds)
+
+    @staticmethod
+    def track_password_hash(operation: str, wait_seconds: float, seconds: float) -> None:
+        """Track one password hash or verification on the hashing pool."""
+        password_hash_queue_wait.labels(operation=operation).observe(wait_seconds)
+        password_hash_duration.labels(operation=operation).observe(seconds)
+
+    @staticmethod
+    def track_password_hash_rejected(operation: str) -> None:
+        """Track a password operation rejected by the full queue."""
+        password_hash_rejected_total.labels(operation=operation).inc()
+
+    @staticmethod
+    def set_password_hash_pending(count: int) -> None:
+        """Set number of password operations running or queued."""
+        password_hash_pending.set(count)
+
     @staticmethod
     def set_active_users(count: int) -> None:
         """Set number of active users."""
@@ -200,6 +533,30 @@ class MetricsCollector:
         """Set number of active optimizations."""
         active_optimization_jobs.set(count)
 
+    @staticmethod
+    def set_db_pool_connections(pool: str, in_use: int, idle: int, overflow: int) -> None:
+        """Set pooled connection counts of one pool."""
+        db_pool_connections.labels(pool=pool, state="in_use").set(in_use)
+        db_pool_connections.labels(pool=pool, state="idle").set(idle)
+        db_pool_connections.labels(pool=pool, state="overflow").set(overflow)
+
+    @staticmethod
+    def track_db_pool_checkout_wait(pool: str, seconds: float, timed_out: bool = False) -> None:
+        """Track the time taken to obtain a pooled connection."""
+        db_pool_checkout_wait.labels(pool=pool).observe(seconds)
+        if timed_out:
+            db_pool_checkout_timeouts.labels(pool=pool).inc()
+
+    @staticmethod
+    def track_db_pool_hold(pool: str, seconds: float) -> None:
+        """Track how long a connection was checked out."""
+        db_pool_hold.labels(pool=pool).observe(seconds)
+
+    @staticmethod
+    def track_db_pool_connection_age(pool: str, seconds: float) -> None:
+        """Track the age of a connection at checkout."""
+        db_pool_connection_age.labels(pool=pool).observe(seconds)
+
     @staticmethod
     def set_database_connections(count: int) -> None:
         """Set number of database connections."""
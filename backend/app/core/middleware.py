@@ -0,0 +1,218 @@
+"""
+HTTP middleware.
+
+Middleware HTTP aplikacji.
+"""
+
+import time
+import uuid
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+import structlog
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from starlette.datastructures import MutableHeaders
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, track_queries
+from app.core.metrics import MetricsCollector
+from app.core.security import verify_token
+from app.models.user import User, UserRole
+from app.services.profiling import ProfileCapture, resolve_profile_mode, save_capture
+
+logger = structlog.get_logger(__name__)
+
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+# Label values for requests outside the known methods and routes
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+OTHER_METHOD = "OTHER"
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope: Dict[str, Any]) -> Optional[str]:
+    """
+    Path of the matched route with its parameters as placeholders.
+
+    ``/api/v1/optimize/jobs/42/progress`` -> ``/api/v1/optimize/jobs/{job_id}/progress``,
+    taken from the matched route itself. None when no route matched, so
+    arbitrary URLs never become metric labels.
+
+    FastAPI versions that include routers without copying their routes leave
+    the router prefixes out of ``route.path``; the prefix is then the static
+    part of the URL in front of what the route matched.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    path_regex = getattr(route, "path_regex", None)
+    if template is None or path_regex is None:
+        return template
+
+    path = scope["path"]
+    if not path_regex.match(path):
+        for index, char in enumerate(path):
+            if char == "/" and index > 0 and path_regex.match(path[index:]):
+                return path[:index] + template
+    return template
+
+
+async def _is_admin_request(request: Request) -> bool:
+    """Whether the request carries a valid token of an active admin."""
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+
+    payload = verify_token(token)
+    if not payload or not payload.get("sub"):
+        return False
+
+    try:
+        user_id = UUID(payload["sub"])
+    except ValueError:
+        return False
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+    return bool(user and user.is_active and user.role == UserRole.ADMIN)
+
+
+class RequestProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Profile single API requests on demand.
+
+    Sending ``X-Profile: sampling|cprofile|1`` as an admin runs the request
+    under the profiler; the response carries ``X-Profile-Id`` naming the
+    artifact, downloadable from ``/api/v1/optimize/profiles/{id}``. Requests
+    without the header are passed through untouched.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        requested = request.headers.get(PROFILE_HEADER)
+        if requested is None:
+            return await call_next(request)
+
+        mode: Optional[str] = resolve_profile_mode(requested)
+        if mode is None:
+            return JSONResponse(
+                status_code=400,
+                content={"detail": f"Unknown profile mode: {requested}", "type": "validation_error"},
+            )
+
+        if not await _is_admin_request(request):
+            return JSONResponse(
+                status_code=403,
+                content={"detail": "Request profiling requires the admin role", "type": "authorization_error"},
+            )
+
+        artifact_id = f"request-{uuid.uuid4().hex}"
+        try:
+            capture = ProfileCapture(artifact_id, mode).start()
+        except RuntimeError as e:
+            return JSONResponse(status_code=409, content={"detail": str(e), "type": "conflict"})
+
+        try:
+            response = await call_next(request)
+        finally:
+            info = save_capture(capture)
+
+        if info:
+            response.headers[PROFILE_ID_HEADER] = artifact_id
+            logger.info("Profiled request", path=request.url.path, method=request.method, **info)
+        return response
+
+
+class QueryCountingMiddleware:
+    """
+    Count SQL statements and database time of every request.
+
+    Statements are counted by the engine hooks in ``app.core.database`` and
+    observed per route in the ``fro_api_request_db_*`` histograms; slow ones
+    are logged with the request's route. Plain ASGI rather than
+    BaseHTTPMiddleware so the queries of a streaming response (SSE) are
+    charged to its request. With QUERY_STATS_HEADERS the response carries
+    ``X-DB-Query-Count`` and ``Server-Timing: db``; for streamed responses
+    these cover only the work done before the headers were sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(route=f"{scope['method']} {scope['path']}") as stats:
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.QUERY_STATS_HEADERS:
+                    headers = MutableHeaders(scope=message)
+                    headers[QUERY_COUNT_HEADER] = str(stats.count)
+                    headers.append("Server-Timing", f"db;dur={stats.seconds * 1000:.1f}")
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                template = route_template(scope)
+                if template is not None:
+                    MetricsCollector.track_request_queries(
+                        scope["method"], template, stats.count, stats.seconds
+                    )
+
+
+class RequestMetricsMiddleware:
+    """
+    Record Prometheus request metrics for every route.
+
+    Requests are labelled with the method, the route template and the status
+    code; unknown methods and URLs that match no route share the ``OTHER``
+    and ``unmatched`` labels, so scanners cannot create new series. Duration
+    and response size cover the whole body, including streamed ones (SSE).
+    The metrics path itself is not recorded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.ENABLE_METRICS
+            or scope["path"] == settings.PROMETHEUS_METRICS_PATH
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in HTTP_METHODS else OTHER_METHOD
+        status_code = 500
+        response_size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        with MetricsCollector.track_request_in_progress(method):
+            try:
+                await self.app(scope, receive, send_with_metrics)
+            finally:
+                MetricsCollector.track_api_request(
+                    method,
+                    route_template(scope) or UNMATCHED_ROUTE,
+                    status_code,
+                    time.perf_counter() - start,
+                    response_size,
+                )
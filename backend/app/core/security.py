@@ -5,26 +5,36 @@ Moduł bezpieczeństwa z obsługą JWT i haszowania haseł.
 """
 
 from datetime import datetime, timedelta, UTC
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
+import asyncio
 import hashlib
 import base64
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.metrics import MetricsCollector
 
 
 # Password hashing context
 # Using bcrypt with explicit rounds to avoid compatibility issues
 # SHA-256 pre-hashing is applied for passwords > 72 bytes
+# Hashes with other rounds still verify and are flagged for rehashing
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__rounds=12,  # Explicit rounds for better compatibility
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
     bcrypt__ident="2b"   # Use 2b variant for better compatibility
 )
 
+T = TypeVar("T")
+
 
 def create_access_token(
     subject: Union[str, Any],
@@ -145,6 +155,104 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(normalized_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify password and rehash it if the hash uses outdated parameters.
+
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password from database
+
+    Returns:
+        Whether the password matches, and the new hash to store or None
+    """
+    normalized_password = _normalize_password(plain_password)
+    return pwd_context.verify_and_update(normalized_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Bounded thread pool for bcrypt, keeping it off the event loop.
+
+    bcrypt releases the GIL while hashing, so threads run in parallel on all
+    cores. Calls beyond the workers wait in a queue of PASSWORD_HASH_MAX_QUEUE;
+    when that is full, new calls fail fast with ServiceUnavailableError
+    instead of making a login burst wait behind each other.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+
+    @property
+    def workers(self) -> int:
+        return settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+    async def run(self, operation: str, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` on the pool; ``operation`` labels its metrics."""
+        with self._lock:
+            if self.pending >= self.workers + settings.PASSWORD_HASH_MAX_QUEUE:
+                MetricsCollector.track_password_hash_rejected(operation)
+                raise ServiceUnavailableError("password hashing", "too many requests in progress")
+            self.pending += 1
+            MetricsCollector.set_password_hash_pending(self.pending)
+
+        submitted_at = time.perf_counter()
+
+        def timed() -> T:
+            started_at = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                MetricsCollector.track_password_hash(
+                    operation, started_at - submitted_at, time.perf_counter() - started_at
+                )
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), timed)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                MetricsCollector.set_password_hash_pending(self.pending)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash password on the password hashing pool."""
+    return await password_hasher.run("hash", get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password on the password hashing pool."""
+    return await password_hasher.run("verify", verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify password, rehashing outdated hashes, on the password hashing pool."""
+    return await password_hasher.run(
+        "verify", verify_and_update_password, plain_password, hashed_password
+    )
+
+
 def validate_password_strength(password: str) -> tuple[bool, list[str]]:
     """
     Validate password strength according to security policy.
@@ -4,7 +4,8 @@ Main FastAPI application for Forglass Regenerator Optimizer.
 Aplikacja główna systemu optymalizacji regeneratorów pieców szklarskich.
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from typing import AsyncGenerator
 
 import structlog
@@ -20,9 +21,13 @@ from pydantic import ValidationError
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.core.database import init_db
-from app.core.exceptions import FROptimizationError
+from app.core.exceptions import FROptimizationError, ServiceUnavailableError
 from app.core.logging import setup_logging
-from app.core.metrics import setup_metrics
+from app.core.middleware import QueryCountingMiddleware, RequestMetricsMiddleware, RequestProfilingMiddleware
+from app.core.metrics import mark_process_dead, metrics_registry, setup_metrics
+from app.core.security import password_hasher
+from app.services.pdf_rendering import pdf_render_pool
+from app.services.user_cache import listen_for_invalidations
 
 
 logger = structlog.get_logger(__name__)
@@ -39,11 +44,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Setup metrics collection
     setup_metrics()
 
+    # Cached user principals: follow invalidations from other processes (redis backend)
+    invalidation_listener = asyncio.create_task(listen_for_invalidations())
+
     logger.info("Application startup complete")
     yield
 
     logger.info("Shutting down application")
 
+    invalidation_listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await invalidation_listener
+
+    password_hasher.shutdown()
+    pdf_render_pool.shutdown()
+
+    # Multi-process metrics: drop this worker's live gauges
+    mark_process_dead()
+
 
 app = FastAPI(
     title="Forglass Regenerator Optimizer API",
@@ -58,6 +76,15 @@ app = FastAPI(
 # Setup logging
 setup_logging()
 
+# On-demand request profiling (admin-only X-Profile header)
+app.add_middleware(RequestProfilingMiddleware)
+
+# SQL statement counts and database time per route, slow query log
+app.add_middleware(QueryCountingMiddleware)
+
+# Request rate, latency, size and in-flight requests per route
+app.add_middleware(RequestMetricsMiddleware)
+
 # Security middleware
 app.add_middleware(
     TrustedHostMiddleware,
@@ -159,6 +186,25 @@ async def optimization_exception_handler(
     )
 
 
+@app.exception_handler(ServiceUnavailableError)
+async def service_unavailable_handler(
+    request: Request, exc: ServiceUnavailableError
+) -> JSONResponse:
+    """Handle overloaded or unavailable services; clients may retry shortly."""
+    logger.warning(
+        "Service unavailable",
+        service=exc.service_name,
+        error=str(exc),
+        path=request.url.path,
+        method=request.method,
+    )
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "type": "service_unavailable"},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Handle unexpected errors."""
@@ -179,10 +225,10 @@ async def health_check() -> dict[str, str]:
     return {"status": "healthy", "service": "fro-api"}
 
 
-@app.get("/metrics")
+@app.get(settings.PROMETHEUS_METRICS_PATH)
 async def metrics() -> Response:
     """Prometheus metrics endpoint."""
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
 
 
 # Include API routes
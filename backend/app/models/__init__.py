@@ -24,8 +24,12 @@ from app.models.regenerator import (
 from app.models.optimization import (
     OptimizationScenario,
     OptimizationJob,
+    OptimizationJobGroup,
     OptimizationResult,
     OptimizationIteration,
+    OptimizationIterationArchive,
+    OptimizationStatRollup,
+    OptimizationStatRollupLock,
     OptimizationTemplate,
     OptimizationStatus,
     OptimizationObjective,
@@ -62,8 +66,12 @@ __all__ = [
     "ConfigurationStatus",
     "OptimizationScenario",
     "OptimizationJob",
+    "OptimizationJobGroup",
     "OptimizationResult",
     "OptimizationIteration",
+    "OptimizationIterationArchive",
+    "OptimizationStatRollup",
+    "OptimizationStatRollupLock",
     "OptimizationTemplate",
     "OptimizationStatus",
     "OptimizationObjective",
@@ -9,9 +9,9 @@ from enum import Enum
 from typing import Dict, List, Optional
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text, Integer, Float, Boolean, JSON
+from sqlalchemy import Column, Date, DateTime, ForeignKey, String, Text, Integer, Float, Boolean, JSON, LargeBinary, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.mysql import CHAR
+from sqlalchemy.dialects.mysql import CHAR, LONGBLOB
 
 from app.core.database import Base
 
@@ -94,6 +94,7 @@ class OptimizationScenario(Base):
     status = Column(String(20), nullable=False, default="active")  # active, archived, deleted
     is_active = Column(Boolean, default=True)
     is_template = Column(Boolean, default=False)
+    template_id = Column(CHAR(36), ForeignKey("optimization_templates.id"), nullable=True)  # Created from
 
     # Timestamps
     created_at = Column(DateTime, default=lambda: datetime.now(UTC))
@@ -102,9 +103,29 @@ class OptimizationScenario(Base):
     # Relationships
     user = relationship("User")
     base_configuration = relationship("RegeneratorConfiguration")
+    template = relationship("OptimizationTemplate")
     optimization_jobs = relationship("OptimizationJob", back_populates="scenario")
 
 
+class OptimizationJobGroup(Base):
+    """Group of optimization jobs submitted together in one batch."""
+
+    __tablename__ = "optimization_job_groups"
+
+    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(CHAR(36), ForeignKey("users.id"), nullable=False)
+
+    name = Column(String(255), nullable=True)
+    total_jobs = Column(Integer, nullable=False, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+
+    # Relationships
+    user = relationship("User")
+    jobs = relationship("OptimizationJob", back_populates="group")
+
+
 class OptimizationJob(Base):
     """Individual optimization job execution."""
 
@@ -113,6 +134,7 @@ class OptimizationJob(Base):
     id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     scenario_id = Column(CHAR(36), ForeignKey("optimization_scenarios.id"), nullable=False)
     user_id = Column(CHAR(36), ForeignKey("users.id"), nullable=False)
+    group_id = Column(CHAR(36), ForeignKey("optimization_job_groups.id"), nullable=True)
 
     # Job metadata
     job_name = Column(String(255), nullable=True)
@@ -121,6 +143,12 @@ class OptimizationJob(Base):
     # Execution parameters (snapshot from scenario at execution time)
     execution_config = Column(JSON, nullable=False)
     initial_values = Column(JSON, nullable=False)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of scenario, configuration and inputs
+
+    # Scheduling
+    priority = Column(Integer, nullable=False, default=1)  # 1=highest, 5=lowest
+    queue_name = Column(String(50), nullable=True)  # Celery queue the job was routed to
+    dispatched_at = Column(DateTime, nullable=True)  # NULL while held by fair-share admission
 
     # Progress tracking
     status = Column(String(20), nullable=False, default=OptimizationStatus.PENDING)
@@ -147,6 +175,7 @@ class OptimizationJob(Base):
     # Resource usage
     memory_usage_mb = Column(Float, nullable=True)
     cpu_usage_percentage = Column(Float, nullable=True)
+    resource_usage = Column(JSON, nullable=True)  # Phase timings, DB time, evaluation histogram
 
     # Timestamps
     created_at = Column(DateTime, default=lambda: datetime.now(UTC))
@@ -155,8 +184,18 @@ class OptimizationJob(Base):
     # Relationships
     scenario = relationship("OptimizationScenario", back_populates="optimization_jobs")
     user = relationship("User")
+    group = relationship("OptimizationJobGroup", back_populates="jobs")
     results = relationship("OptimizationResult", back_populates="job", cascade="all, delete-orphan")
     iterations = relationship("OptimizationIteration", back_populates="job", cascade="all, delete-orphan")
+    iteration_archive = relationship(
+        "OptimizationIterationArchive", back_populates="job", uselist=False, cascade="all, delete-orphan"
+    )
+
+    __table_args__ = (
+        Index("ix_optimization_jobs_user_status", "user_id", "status"),
+        Index("ix_optimization_jobs_group_id", "group_id"),
+        Index("ix_optimization_jobs_user_content_hash", "user_id", "content_hash"),
+    )
 
 
 class OptimizationResult(Base):
@@ -262,6 +301,94 @@ class OptimizationIteration(Base):
     # Relationships
     job = relationship("OptimizationJob", back_populates="iterations")
 
+    # Keyset pagination and ordered export by (job_id, iteration_number)
+    __table_args__ = (
+        Index("ix_optimization_iterations_job_iteration", "job_id", "iteration_number"),
+    )
+
+
+class OptimizationIterationArchive(Base):
+    """Whole iteration history of a job stored as one compressed columnar blob."""
+
+    __tablename__ = "optimization_iteration_archives"
+
+    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_id = Column(CHAR(36), ForeignKey("optimization_jobs.id"), nullable=False, unique=True)
+
+    # Archive layout (see app.services.iteration_storage)
+    storage_format = Column(String(20), nullable=False)
+    row_count = Column(Integer, nullable=False, default=0)
+    chunk_size = Column(Integer, nullable=False)
+    variable_names = Column(JSON, nullable=False)
+    metric_names = Column(JSON, nullable=False)
+
+    # Compressed payload
+    payload = Column(LargeBinary().with_variant(LONGBLOB(), "mysql"), nullable=False)
+    payload_size_bytes = Column(Integer, nullable=True)
+
+    # Timestamp
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+
+    # Relationships
+    job = relationship("OptimizationJob", back_populates="iteration_archive")
+
+
+class OptimizationStatRollup(Base):
+    """
+    Totals of finished optimization jobs and their results for one day.
+
+    Rows are kept per user, scenario, template and for all jobs (``dimension``
+    with the id in ``key``, empty for ``all``) and per completion day, so
+    reports add up a few rows instead of scanning jobs and results. See
+    app.services.optimization_rollups.
+    """
+
+    __tablename__ = "optimization_stat_rollups"
+
+    dimension = Column(String(16), primary_key=True)        # user, scenario, template, all
+    key = Column(String(36), primary_key=True)
+    day = Column(Date, primary_key=True)                    # UTC day the jobs finished
+
+    # Finished jobs by status (timed out jobs count as failed)
+    jobs_finished = Column(Integer, nullable=False, default=0)
+    jobs_completed = Column(Integer, nullable=False, default=0)
+    jobs_failed = Column(Integer, nullable=False, default=0)
+    jobs_cancelled = Column(Integer, nullable=False, default=0)
+
+    # Runtime of completed jobs
+    runtime_seconds_sum = Column(Float, nullable=False, default=0.0)
+    runtime_count = Column(Integer, nullable=False, default=0)
+
+    # Results; each figure is summed and counted over its non-null values
+    results_count = Column(Integer, nullable=False, default=0)
+    fuel_savings_sum = Column(Float, nullable=False, default=0.0)
+    fuel_savings_count = Column(Integer, nullable=False, default=0)
+    co2_reduction_sum = Column(Float, nullable=False, default=0.0)
+    co2_reduction_count = Column(Integer, nullable=False, default=0)
+    thermal_efficiency_sum = Column(Float, nullable=False, default=0.0)
+    thermal_efficiency_count = Column(Integer, nullable=False, default=0)
+    annual_cost_savings_sum = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
+    # Date-range reads over all jobs
+    __table_args__ = (
+        Index("ix_optimization_stat_rollups_dimension_day", "dimension", "day"),
+    )
+
+
+class OptimizationStatRollupLock(Base):
+    """
+    Row every writer of the rollups locks until its transaction ends.
+
+    Serializes the session hooks with the rollup rebuild; see
+    app.services.optimization_rollups.
+    """
+
+    __tablename__ = "optimization_stat_rollup_locks"
+
+    name = Column(String(32), primary_key=True)
+
 
 class OptimizationTemplate(Base):
     """Pre-configured optimization templates."""
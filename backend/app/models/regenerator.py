@@ -9,7 +9,7 @@ from enum import Enum
 from typing import Dict, List, Optional
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text, Integer, Float, Boolean, JSON
+from sqlalchemy import Column, DDL, DateTime, ForeignKey, String, Text, Integer, Float, Boolean, JSON, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.mysql import CHAR
 
@@ -185,6 +185,48 @@ class Material(Base):
     approved_by = relationship("User", foreign_keys=[approved_by_user_id])
     superseded_by = relationship("Material", remote_side=[id])
 
+    __table_args__ = (
+        # Prefix matches of material codes in search
+        Index("ix_materials_material_code", "material_code"),
+    )
+
+
+# Full-text search over name, description, manufacturer and material code
+# (app.services.material_search): a FULLTEXT index on MySQL; on SQLite an
+# FTS5 table kept in step with materials by triggers
+MATERIAL_FTS_TABLE = "materials_fts"
+MATERIAL_SEARCH_COLUMNS = ("name", "description", "manufacturer", "material_code")
+
+_fts_columns = ", ".join(MATERIAL_SEARCH_COLUMNS)
+_fts_new_values = ", ".join(f"new.{column}" for column in MATERIAL_SEARCH_COLUMNS)
+
+MATERIAL_SEARCH_DDL = {
+    "mysql": [
+        f"CREATE FULLTEXT INDEX ft_materials_search ON materials ({_fts_columns})",
+    ],
+    "sqlite": [
+        f"CREATE VIRTUAL TABLE {MATERIAL_FTS_TABLE} USING fts5("
+        f"material_id UNINDEXED, {_fts_columns}, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+        f"CREATE TRIGGER {MATERIAL_FTS_TABLE}_insert AFTER INSERT ON materials BEGIN "
+        f"INSERT INTO {MATERIAL_FTS_TABLE} (material_id, {_fts_columns}) VALUES (new.id, {_fts_new_values}); END",
+        f"CREATE TRIGGER {MATERIAL_FTS_TABLE}_update AFTER UPDATE OF id, {_fts_columns} ON materials BEGIN "
+        f"DELETE FROM {MATERIAL_FTS_TABLE} WHERE material_id = old.id; "
+        f"INSERT INTO {MATERIAL_FTS_TABLE} (material_id, {_fts_columns}) VALUES (new.id, {_fts_new_values}); END",
+        f"CREATE TRIGGER {MATERIAL_FTS_TABLE}_delete AFTER DELETE ON materials BEGIN "
+        f"DELETE FROM {MATERIAL_FTS_TABLE} WHERE material_id = old.id; END",
+    ],
+}
+
+for _dialect, _statements in MATERIAL_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Material.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+# The triggers go with the table, the FTS table does not
+event.listen(
+    Material.__table__, "after_drop",
+    DDL(f"DROP TABLE IF EXISTS {MATERIAL_FTS_TABLE}").execute_if(dialect="sqlite")
+)
+
 
 class GeometryComponent(Base):
     """3D geometry components for regenerator visualization."""
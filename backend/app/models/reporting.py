@@ -94,6 +94,8 @@ class Report(Base):
     file_path = Column(String(500), nullable=True)
     download_url = Column(String(500), nullable=True)
     expires_at = Column(DateTime, nullable=True)
+    cache_key = Column(String(64), nullable=True, index=True)  # SHA-256 of definition and data watermark
+    file_hash = Column(String(64), nullable=True)  # SHA-256 of the file, its download ETag
 
     # Error handling
     error_message = Column(Text, nullable=True)
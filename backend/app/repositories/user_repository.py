@@ -4,7 +4,7 @@ User repository for database operations.
 Repository pattern dla operacji na użytkownikach.
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from sqlalchemy import select, update, and_
@@ -13,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.exceptions import ResourceNotFoundError, ResourceConflictError
 from app.models.user import User, UserRole
 from app.repositories.base import BaseRepository
+from app.services.user_cache import invalidate_user
 
 
 class UserRepository(BaseRepository[User]):
@@ -22,6 +23,18 @@ class UserRepository(BaseRepository[User]):
         """Initialize user repository."""
         super().__init__(User, session)
 
+    async def update(self, id: UUID, values: Dict[str, Any]) -> User:
+        """Update user by ID and drop its cached principal."""
+        user = await super().update(id, values)
+        await invalidate_user(id)
+        return user
+
+    async def delete(self, id: UUID) -> bool:
+        """Delete user by ID and drop its cached principal."""
+        deleted = await super().delete(id)
+        await invalidate_user(id)
+        return deleted
+
     async def get_by_username(self, username: str) -> Optional[User]:
         """
         Get user by username.
@@ -144,6 +157,7 @@ class UserRepository(BaseRepository[User]):
             raise ResourceNotFoundError("User", str(user_id))
 
         await self.session.commit()
+        await invalidate_user(user_id)
         return user
 
     async def update_last_login(self, user_id: UUID) -> User:
@@ -319,6 +333,7 @@ class UserRepository(BaseRepository[User]):
             raise ResourceNotFoundError("User", str(user_id))
 
         await self.session.commit()
+        await invalidate_user(user_id)
         return user
 
     async def activate_user(self, user_id: UUID) -> User:
@@ -347,4 +362,5 @@ class UserRepository(BaseRepository[User]):
             raise ResourceNotFoundError("User", str(user_id))
 
         await self.session.commit()
+        await invalidate_user(user_id)
         return user
\ No newline at end of file
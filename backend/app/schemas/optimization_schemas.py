@@ -152,6 +152,11 @@ class OptimizationScenarioCreate(BaseModel):
         description="Wagi dla optymalizacji wielokryterialnej (opcjonalne)"
     )
 
+    template_id: Optional[str] = Field(
+        None,
+        description="ID szablonu optymalizacji, z którego utworzono scenariusz (opcjonalne)"
+    )
+
 
 class OptimizationScenarioUpdate(BaseModel):
     """Update optimization scenario."""
@@ -199,6 +204,7 @@ class OptimizationScenarioResponse(BaseModel):
     status: str
     is_active: bool
     is_template: bool
+    template_id: Optional[str] = None
 
     created_at: datetime
     updated_at: datetime
@@ -213,6 +219,62 @@ class OptimizationJobCreate(BaseModel):
     job_name: Optional[str] = Field(None, max_length=255, description="Optional job name")
     initial_values: Optional[Dict[str, float]] = Field({}, description="Initial values for design variables")
     priority: int = Field(1, ge=1, le=5, description="Job priority (1=highest, 5=lowest)")
+    profile: Optional[str] = Field(
+        None, pattern="^(sampling|cprofile)$", description="Run under a profiler (sampling or cprofile)"
+    )
+
+
+class OptimizationJobBatchItem(BaseModel):
+    """One job of a batch submission."""
+    scenario_id: str = Field(..., description="Scenario to run")
+    job_name: Optional[str] = Field(None, max_length=255, description="Optional job name")
+    initial_values: Optional[Dict[str, float]] = Field({}, description="Initial values for design variables")
+    priority: Optional[int] = Field(None, ge=1, le=5, description="Overrides the batch priority")
+
+
+class OptimizationJobBatchCreate(BaseModel):
+    """Submit many optimization jobs as one group."""
+    name: Optional[str] = Field(None, max_length=255, description="Optional group name")
+    priority: int = Field(3, ge=1, le=5, description="Default job priority (1=highest, 5=lowest)")
+    jobs: List[OptimizationJobBatchItem] = Field(..., min_length=1, description="Jobs to create")
+
+
+class OptimizationJobGroupResponse(BaseModel):
+    """Created job group."""
+    group_id: str
+    name: Optional[str]
+    total_jobs: int
+    job_ids: List[str]
+    dispatched_jobs: int
+    held_jobs: int
+    created_at: datetime
+
+
+class OptimizationJobGroupProgress(BaseModel):
+    """Aggregate progress of a job group."""
+    group_id: str
+    name: Optional[str]
+    total_jobs: int
+    status_counts: Dict[str, int]
+    finished_jobs: int
+    progress_percentage: float
+    is_finished: bool
+
+
+class OptimizationJobGroupResults(BaseModel):
+    """Combined results summary of a job group."""
+    group_id: str
+    name: Optional[str]
+    total_jobs: int
+    completed_jobs: int
+    failed_jobs: int
+    best_job_id: Optional[str]
+    best_objective_value: Optional[float]
+    average_fuel_savings_percentage: Optional[float]
+    max_fuel_savings_percentage: Optional[float]
+    average_co2_reduction_percentage: Optional[float]
+    total_annual_cost_savings: Optional[float]
+    jobs: List[Dict[str, Any]]
 
 
 class OptimizationJobResponse(BaseModel):
@@ -220,9 +282,14 @@ class OptimizationJobResponse(BaseModel):
     id: str
     scenario_id: str
     user_id: str
+    group_id: Optional[str] = None
     job_name: Optional[str]
     celery_task_id: Optional[str]
 
+    priority: Optional[int] = None
+    queue_name: Optional[str] = None
+    dispatched_at: Optional[datetime] = None
+
     status: OptimizationStatus
     current_iteration: int
     current_function_evaluations: int
@@ -241,6 +308,7 @@ class OptimizationJobResponse(BaseModel):
 
     memory_usage_mb: Optional[float]
     cpu_usage_percentage: Optional[float]
+    resource_usage: Optional[Dict[str, Any]] = None
 
     created_at: datetime
     updated_at: datetime
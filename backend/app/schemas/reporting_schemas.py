@@ -224,6 +224,7 @@ class OptimizationSummaryConfig(BaseModel):
     metrics: List[str] = ["fuel_savings", "co2_reduction", "thermal_efficiency"]
     include_iterations: bool = False
     include_comparison: bool = True
+    include_job_rows: bool = False  # every job with its result, in Excel and CSV files
     group_by: Optional[str] = None  # scenario_type, user, date
 
 
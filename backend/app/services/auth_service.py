@@ -15,8 +15,9 @@ from fastapi import HTTPException, status
 
 from app.models.user import User, UserRole
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    verify_and_update_password_async,
+    get_password_hash_async,
     create_access_token,
     verify_token,
     validate_password_strength,
@@ -37,6 +38,7 @@ from app.schemas.auth_schemas import (
     UserActivity
 )
 from app.core.config import settings
+from app.services.user_cache import UserPrincipal, invalidate_user
 
 
 class AuthService:
@@ -48,7 +50,7 @@ class AuthService:
     async def create_user(
         self,
         user_data: UserCreate,
-        created_by: Optional[User] = None
+        created_by: Optional[UserPrincipal] = None
     ) -> UserResponse:
         """
         Create new user account.
@@ -87,7 +89,7 @@ class AuthService:
             )
 
         # Hash password
-        password_hash = get_password_hash(user_data.password)
+        password_hash = await get_password_hash_async(user_data.password)
 
         # Create user
         user = User(
@@ -123,14 +125,20 @@ class AuthService:
         if not user.is_active:
             return None
 
-        if not verify_password(login_data.password, user.password_hash):
+        is_valid, new_password_hash = await verify_and_update_password_async(
+            login_data.password, user.password_hash
+        )
+        if not is_valid:
             return None
 
-        # Update last login
+        # Update last login; rehash if the bcrypt cost has changed
+        values = {"last_login": datetime.now(UTC)}
+        if new_password_hash:
+            values["password_hash"] = new_password_hash
         await self.db.execute(
             update(User)
             .where(User.id == user.id)
-            .values(last_login=datetime.now(UTC))
+            .values(**values)
         )
         await self.db.commit()
 
@@ -248,7 +256,7 @@ class AuthService:
         self,
         user_id: UUID,
         user_data: UserUpdate,
-        current_user: User
+        current_user: UserPrincipal
     ) -> UserResponse:
         """
         Update user information.
@@ -297,6 +305,7 @@ class AuthService:
                 .values(**update_data, updated_at=datetime.now(UTC))
             )
             await self.db.commit()
+            await invalidate_user(user_id)
             await self.db.refresh(user)
 
         return UserResponse.model_validate(user)
@@ -327,7 +336,7 @@ class AuthService:
             )
 
         # Verify current password
-        if not verify_password(password_data.current_password, user.password_hash):
+        if not await verify_password_async(password_data.current_password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
@@ -342,7 +351,7 @@ class AuthService:
             )
 
         # Hash and update password
-        password_hash = get_password_hash(password_data.new_password)
+        password_hash = await get_password_hash_async(password_data.new_password)
         await self.db.execute(
             update(User)
             .where(User.id == user_id)
@@ -352,6 +361,7 @@ class AuthService:
             )
         )
         await self.db.commit()
+        await invalidate_user(user_id)
 
         return {"message": "Password changed successfully"}
 
@@ -435,7 +445,7 @@ class AuthService:
             )
 
         # Update password and clear reset token
-        password_hash = get_password_hash(reset_data.new_password)
+        password_hash = await get_password_hash_async(reset_data.new_password)
         await self.db.execute(
             update(User)
             .where(User.id == user.id)
@@ -447,6 +457,7 @@ class AuthService:
             )
         )
         await self.db.commit()
+        await invalidate_user(user.id)
 
         return {"message": "Password reset successfully"}
 
@@ -590,13 +601,14 @@ class AuthService:
                 return False
 
             # Update password
-            password_hash = get_password_hash(new_password)
+            password_hash = await get_password_hash_async(new_password)
             await self.db.execute(
                 update(User)
                 .where(User.id == user.id)
                 .values(password_hash=password_hash)
             )
             await self.db.commit()
+            await invalidate_user(user.id)
             return True
         except Exception:
             return False
@@ -624,6 +636,7 @@ class AuthService:
                 .values(role=new_role)
             )
             await self.db.commit()
+            await invalidate_user(user_id)
             return True
         except Exception:
             return False
@@ -637,6 +650,7 @@ class AuthService:
                 .values(is_active=True)
             )
             await self.db.commit()
+            await invalidate_user(user_id)
             return True
         except Exception:
             return False
@@ -650,6 +664,7 @@ class AuthService:
                 .values(is_active=False)
             )
             await self.db.commit()
+            await invalidate_user(user_id)
             return True
         except Exception:
             return False
@@ -663,6 +678,7 @@ class AuthService:
                 .values(is_verified=True)
             )
             await self.db.commit()
+            await invalidate_user(user_id)
             return True
         except Exception:
             return False
@@ -700,6 +716,7 @@ class AuthService:
                 .values(is_active=False, is_deleted=True)
             )
             await self.db.commit()
+            await invalidate_user(user_id)
             return True
         except Exception:
             return False
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+CSV report generation service.
+
+Serwis generowania raportów CSV.
+
+A report is a sequence of blocks separated by an empty line, each starting
+with its own header row: per section first its metrics
+(``section,metric,value``), then its detail table, if any (``section``
+followed by the table's columns). Table rows are written batch by batch as
+they arrive, so memory stays flat for any number of rows.
+"""
+
+import asyncio
+import csv
+import json
+from pathlib import Path
+from typing import Any, AsyncIterable, Dict
+
+
+class CSVGenerator:
+    """Streaming CSV report writer."""
+
+    async def write_report(self, sections: AsyncIterable[Dict[str, Any]], output_path: Path) -> Path:
+        """
+        Write a complete CSV report.
+
+        Args:
+            sections: Sections in report order; a section's optional ``table``
+                has ``columns`` and ``batches``, an async iterable of row lists
+            output_path: Where to write the file
+
+        Returns:
+            ``output_path``
+        """
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            first_block = True
+
+            async for section in sections:
+                name = section['name']
+                if not first_block:
+                    writer.writerow([])
+                first_block = False
+
+                writer.writerow(['section', 'metric', 'value'])
+                writer.writerows(
+                    [name, key, self._value(value)] for key, value in section.get('data', {}).items()
+                )
+
+                table = section.get('table')
+                if table:
+                    writer.writerow([])
+                    writer.writerow(['section', *table['columns']])
+                    async for batch in table['batches']:
+                        await asyncio.to_thread(writer.writerows, ([name, *row] for row in batch))
+
+        return output_path
+
+    @staticmethod
+    def _value(value: Any) -> Any:
+        """Nested values as JSON, everything else as the csv module writes it."""
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, default=str)
+        return value
@@ -0,0 +1,217 @@
+"""
+Cache of dashboard figures.
+
+Pamięć podręczna wskaźników pulpitu (dashboard).
+
+The dashboard combines per-user job figures with system-wide ones (active
+users, oldest job). Both are cached for DASHBOARD_CACHE_TTL_SECONDS: per
+user under the user's id and once for everybody under ``SYSTEM_KEY``.
+Entries live in the process (``DASHBOARD_CACHE_BACKEND=memory``) or in Redis
+(``redis``), where API processes share them and Celery workers drop them as
+jobs finish. Session hooks drop a user's entry after any commit that
+creates, deletes or changes the status of one of their optimization jobs,
+and the system entry when jobs are created or deleted. With the memory
+backend, changes committed by other processes show once the entry expires.
+
+Reads and writes use the asyncio Redis client. The hooks run inside
+``commit()`` on the event loop, so they drop this process's entries at once
+and queue the Redis deletes for a background thread; until it has deleted
+them, reads of the queued keys miss.
+"""
+
+import asyncio
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Dict, Optional, Set, Tuple
+
+import structlog
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import MetricsCollector
+from app.models.optimization import OptimizationJob
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+
+_REDIS_KEY_PREFIX = "fro:dashboard:"
+SYSTEM_KEY = "system"
+
+# Session.info key of the dashboard entries to drop after commit
+_PENDING_INVALIDATIONS = "dashboard_invalidations"
+
+
+class DashboardCache:
+    """Dashboard figures by key, in this process or in Redis, with a TTL."""
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_loop = None
+        # Keys invalidated here whose Redis entries are still to be deleted
+        self._pending: Set[str] = set()
+        self._deletes: "queue.SimpleQueue[Set[str]]" = queue.SimpleQueue()
+        self._deleter: Optional[threading.Thread] = None
+        # Bumped by every invalidation; figures computed before one are not stored
+        self.version = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.DASHBOARD_CACHE_BACKEND != "none" and settings.DASHBOARD_CACHE_TTL_SECONDS > 0
+
+    @property
+    def _uses_redis(self) -> bool:
+        return settings.DASHBOARD_CACHE_BACKEND == "redis" and REDIS_AVAILABLE
+
+    def _client(self):
+        if not self._uses_redis:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            # Connections belong to the loop that opened them; Celery tasks run one loop each
+            self._redis = aioredis.Redis.from_url(settings.REDIS_URL)
+            self._redis_loop = loop
+        return self._redis
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached figures under ``key``, or None when they have to be computed."""
+        if not self.enabled:
+            return None
+
+        client = self._client()
+        if client is not None:
+            if key in self._pending:
+                data = None
+            else:
+                try:
+                    data = await client.get(_REDIS_KEY_PREFIX + key)
+                except Exception as e:
+                    logger.warning("Dashboard cache read failed", key=key, error=str(e))
+                    data = None
+            figures = json.loads(data) if data is not None else None
+        else:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] <= time.monotonic():
+                    del self._entries[key]
+                    entry = None
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                figures = entry[0] if entry is not None else None
+
+        MetricsCollector.track_dashboard_cache_lookup("hit" if figures is not None else "miss")
+        return figures
+
+    async def set(self, key: str, figures: Dict[str, Any], version: int) -> None:
+        """
+        Cache figures computed from the database.
+
+        ``version`` is :attr:`version` read before computing them; if an
+        invalidation happened since, they may be stale and are not cached.
+        """
+        if not self.enabled or version != self.version:
+            return
+
+        client = self._client()
+        if client is not None:
+            try:
+                await client.set(
+                    _REDIS_KEY_PREFIX + key, json.dumps(figures),
+                    ex=max(1, int(settings.DASHBOARD_CACHE_TTL_SECONDS))
+                )
+            except Exception as e:
+                logger.warning("Dashboard cache write failed", key=key, error=str(e))
+            return
+
+        with self._lock:
+            self._entries[key] = (figures, time.monotonic() + settings.DASHBOARD_CACHE_TTL_SECONDS)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.DASHBOARD_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys: str) -> None:
+        """
+        Drop the figures under ``keys``.
+
+        Does not block: entries of this process go at once, Redis entries are
+        deleted by a background thread.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+            self.version += 1
+            if not (self._uses_redis and keys):
+                return
+            self._pending.update(keys)
+            if self._deleter is None or not self._deleter.is_alive():
+                self._deleter = threading.Thread(
+                    target=self._delete_pending, name="dashboard-cache-invalidation", daemon=True
+                )
+                self._deleter.start()
+        self._deletes.put(set(keys))
+
+    def _delete_pending(self) -> None:
+        client = redis.Redis.from_url(settings.REDIS_URL)
+        while True:
+            keys = self._deletes.get()
+            # Batch invalidations queued meanwhile
+            while not self._deletes.empty():
+                keys |= self._deletes.get()
+            try:
+                client.delete(*(_REDIS_KEY_PREFIX + key for key in keys))
+            except Exception as e:
+                logger.warning("Dashboard cache invalidation failed", keys=sorted(keys), error=str(e))
+            with self._lock:
+                self._pending -= keys
+
+    def clear(self) -> None:
+        """Drop everything cached in this process."""
+        with self._lock:
+            self._entries.clear()
+            self.version += 1
+
+
+dashboard_cache = DashboardCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_job_changes(session: Session, flush_context) -> None:
+    """Remember whose dashboard a flush of optimization jobs changed."""
+    keys = None
+    for job in chain(session.new, session.deleted, session.dirty):
+        if not isinstance(job, OptimizationJob) or job.user_id is None:
+            continue
+        created_or_deleted = job in session.new or job in session.deleted
+        if not created_or_deleted and not inspect(job).attrs.status.history.has_changes():
+            # Progress updates of running jobs leave the figures unchanged
+            continue
+        if keys is None:
+            keys = session.info.setdefault(_PENDING_INVALIDATIONS, set())
+        keys.add(str(job.user_id))
+        if created_or_deleted:
+            keys.add(SYSTEM_KEY)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    keys = session.info.pop(_PENDING_INVALIDATIONS, None)
+    if keys:
+        dashboard_cache.invalidate(*keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
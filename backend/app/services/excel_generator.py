@@ -2,57 +2,138 @@
 Excel report generation service.
 
 Serwis generowania raportów Excel.
+
+Workbooks are written in openpyxl write-only mode: rows go straight to each
+sheet's temporary XML file, so a section's detail table can have millions of
+rows without the workbook growing in memory. Cells are styled through named
+styles registered once per workbook instead of per-cell style objects, and
+column widths are fixed up front because write-only sheets cannot be
+measured after their rows are written.
 """
 
+import asyncio
+import json
 from datetime import datetime, UTC
 from pathlib import Path
-from typing import Dict, List, Any
-import pandas as pd
+from typing import Any, AsyncIterable, Dict, List, Tuple
+
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.chart import BarChart, LineChart, PieChart, Reference
-import json
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+# Excel sheet names have a 31 character limit
+SHEET_TITLE_LENGTH = 31
+
+LABEL_COLUMN_WIDTH = 40
+VALUE_COLUMN_WIDTH = 50
+DETAIL_COLUMN_WIDTH = 20
+
+# Longer dict/list values are cut and not pretty-printed
+JSON_VALUE_LENGTH = 1000
+
+# Number formats of the value styles, e.g. ``report_percent`` and ``report_percent_alt``
+VALUE_FORMATS = {
+    "text": "General",
+    "integer": "#,##0",
+    "decimal": "#,##0.00",
+    "percent": "0.00%",
+}
+
+
+def _solid_fill(color: str) -> PatternFill:
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+def report_styles() -> List[NamedStyle]:
+    """Named styles used by report workbooks (new objects, a style binds to one workbook)."""
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    left = Alignment(horizontal='left', vertical='center')
+
+    styles = [
+        NamedStyle("report_title", font=Font(size=18, bold=True, color='1F2937'), alignment=left),
+        NamedStyle("report_heading", font=Font(size=14, bold=True, color='1F2937')),
+        NamedStyle("report_subheading", font=Font(bold=True)),
+        NamedStyle(
+            "report_label", font=Font(bold=True, color='6B7280'), fill=_solid_fill('F3F4F6'), border=border
+        ),
+        NamedStyle(
+            "report_header", font=Font(color='FFFFFF', bold=True), fill=_solid_fill('3B82F6'),
+            border=border, alignment=left
+        ),
+    ]
+    for name, number_format in VALUE_FORMATS.items():
+        styles.append(NamedStyle(
+            f"report_{name}", font=Font(color='111827'), number_format=number_format,
+            border=border, alignment=left
+        ))
+        # Alternate rows of data tables
+        styles.append(NamedStyle(
+            f"report_{name}_alt", font=Font(color='111827'), number_format=number_format,
+            fill=_solid_fill('F9FAFB'), border=border, alignment=left
+        ))
+    return styles
 
 
 class ExcelGenerator:
-    """Excel report generator using openpyxl."""
-
-    def __init__(self):
-        self.workbook = None
-        self.worksheet = None
-
-    def generate_report_excel(self, report_data: Dict[str, Any], sections: List[Dict[str, Any]], output_path: Path) -> Path:
-        """Generate a complete Excel report."""
-
-        self.workbook = Workbook()
-
-        # Remove default worksheet
-        if 'Sheet' in self.workbook.sheetnames:
-            self.workbook.remove(self.workbook['Sheet'])
-
-        # Create summary sheet
-        self._create_summary_sheet(report_data)
-
-        # Create sections as separate worksheets
-        for section in sections:
-            self._create_section_sheet(section)
-
-        # Create charts sheet
-        self._create_charts_sheet(sections)
-
-        # Save workbook
-        self.workbook.save(output_path)
+    """Streaming Excel report writer using openpyxl write-only mode."""
+
+    async def write_report(
+        self,
+        report_data: Dict[str, Any],
+        sections: AsyncIterable[Dict[str, Any]],
+        output_path: Path
+    ) -> Path:
+        """
+        Write a complete Excel report.
+
+        Args:
+            report_data: Report metadata for the summary sheet
+            sections: Sections in report order; a section's optional ``table``
+                has ``columns`` and ``batches``, an async iterable of row lists
+            output_path: Where to save the workbook
+
+        Returns:
+            ``output_path``
+        """
+        workbook = Workbook(write_only=True)
+        for style in report_styles():
+            workbook.add_named_style(style)
+
+        self._create_summary_sheet(workbook, report_data)
+
+        charts = []
+        async for section in sections:
+            worksheet = self._create_section_sheet(workbook, section)
+            if section.get('table'):
+                await self._write_table(worksheet, section['table'])
+            charts.extend(
+                chart for chart in section.get('charts', []) if chart.get('data') and chart.get('labels')
+            )
+
+        self._create_charts_sheet(workbook, charts)
+
+        # Zipping the sheets' XML is the slow part for large tables
+        await asyncio.to_thread(workbook.save, output_path)
         return output_path
 
-    def _create_summary_sheet(self, report_data: Dict[str, Any]) -> None:
+    @staticmethod
+    def _cell(worksheet, value: Any, style: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(worksheet, value=value)
+        cell.style = style
+        return cell
+
+    def _create_summary_sheet(self, workbook: Workbook, report_data: Dict[str, Any]) -> None:
         """Create the summary worksheet."""
 
-        ws = self.workbook.create_sheet("Summary", 0)
+        ws = workbook.create_sheet("Summary")
+        ws.column_dimensions['A'].width = LABEL_COLUMN_WIDTH
+        ws.column_dimensions['B'].width = VALUE_COLUMN_WIDTH
 
-        # Title
-        ws['A1'] = report_data.get('title', 'System Report')
-        ws['A1'].font = Font(size=18, bold=True, color='1F2937')
+        ws.append([self._cell(ws, report_data.get('title', 'System Report'), "report_title")])
+        ws.append([])
 
         # Report metadata
         metadata = [
@@ -73,241 +154,127 @@ class ExcelGenerator:
                 ('End Date:', date_range.get('end_date', 'N/A'))
             ])
 
-        # Add metadata to sheet
-        for i, (key, value) in enumerate(metadata, start=3):
-            ws[f'A{i}'] = key
-            ws[f'B{i}'] = value
-            ws[f'A{i}'].font = Font(bold=True, color='6B7280')
-            ws[f'B{i}'].font = Font(color='111827')
+        for key, value in metadata:
+            ws.append([self._cell(ws, key, "report_label"), self._cell(ws, value, "report_text")])
 
-        # Style the sheet
-        self._apply_summary_styling(ws, len(metadata) + 2)
-
-    def _create_section_sheet(self, section: Dict[str, Any]) -> None:
-        """Create a worksheet for a report section."""
+    def _create_section_sheet(self, workbook: Workbook, section: Dict[str, Any]):
+        """Create a worksheet with a section's metrics and chart data."""
 
         section_name = section.get('name', 'Section').replace('_', ' ').title()
-        # Excel sheet names have a 31 character limit
-        sheet_name = section_name[:31] if len(section_name) > 31 else section_name
-
-        ws = self.workbook.create_sheet(sheet_name)
+        ws = workbook.create_sheet(section_name[:SHEET_TITLE_LENGTH])
 
-        # Section title
-        ws['A1'] = section_name
-        ws['A1'].font = Font(size=14, bold=True, color='1F2937')
+        ws.column_dimensions['A'].width = LABEL_COLUMN_WIDTH
+        ws.column_dimensions['B'].width = VALUE_COLUMN_WIDTH
+        table = section.get('table')
+        if table:
+            # The table shares columns A and B with the metrics
+            for number in range(3, len(table['columns']) + 1):
+                ws.column_dimensions[get_column_letter(number)].width = DETAIL_COLUMN_WIDTH
 
-        current_row = 3
+        ws.append([self._cell(ws, section_name, "report_heading")])
+        ws.append([])
 
         # Section data
         data = section.get('data', {})
         if data:
-            # Create data table
-            ws[f'A{current_row}'] = 'Metric'
-            ws[f'B{current_row}'] = 'Value'
-            ws[f'A{current_row}'].font = Font(bold=True)
-            ws[f'B{current_row}'].font = Font(bold=True)
-
-            current_row += 1
-
-            for key, value in data.items():
-                metric_name = key.replace('_', ' ').title()
-
-                ws[f'A{current_row}'] = metric_name
-
-                if isinstance(value, float):
-                    if 'percentage' in key.lower() or 'rate' in key.lower():
-                        ws[f'B{current_row}'] = value / 100  # Excel percentage
-                        ws[f'B{current_row}'].number_format = '0.00%'
-                    else:
-                        ws[f'B{current_row}'] = value
-                        ws[f'B{current_row}'].number_format = '#,##0.00'
-                elif isinstance(value, int):
-                    ws[f'B{current_row}'] = value
-                    ws[f'B{current_row}'].number_format = '#,##0'
-                elif isinstance(value, dict) or isinstance(value, list):
-                    ws[f'B{current_row}'] = json.dumps(value, indent=2) if len(str(value)) < 1000 else str(value)[:1000] + "..."
-                else:
-                    ws[f'B{current_row}'] = str(value)
-
-                current_row += 1
-
-            # Style the data table
-            self._apply_table_styling(ws, 3, current_row - 1, 2)
-
-        current_row += 2
+            ws.append([self._cell(ws, 'Metric', "report_header"), self._cell(ws, 'Value', "report_header")])
+            for index, (key, value) in enumerate(data.items()):
+                suffix = "_alt" if index % 2 == 0 else ""
+                value, value_format = self._metric_value(key, value)
+                ws.append([
+                    self._cell(ws, key.replace('_', ' ').title(), f"report_text{suffix}"),
+                    self._cell(ws, value, f"report_{value_format}{suffix}")
+                ])
 
         # Chart data
-        charts = section.get('charts', [])
+        charts = [chart for chart in section.get('charts', []) if chart.get('data') and chart.get('labels')]
         if charts:
-            ws[f'A{current_row}'] = 'Chart Data'
-            ws[f'A{current_row}'].font = Font(bold=True, color='1F2937')
-            current_row += 2
-
+            ws.append([])
+            ws.append([self._cell(ws, 'Chart Data', "report_heading")])
             for chart in charts:
-                chart_title = chart.get('title', 'Chart')
-                chart_data = chart.get('data', [])
-                chart_labels = chart.get('labels', [])
-
-                if chart_data and chart_labels:
-                    # Chart title
-                    ws[f'A{current_row}'] = chart_title
-                    ws[f'A{current_row}'].font = Font(bold=True)
-                    current_row += 1
-
-                    # Chart data table
-                    ws[f'A{current_row}'] = 'Label'
-                    ws[f'B{current_row}'] = 'Value'
-                    current_row += 1
-
-                    for label, value in zip(chart_labels, chart_data):
-                        ws[f'A{current_row}'] = label
-                        ws[f'B{current_row}'] = value
-                        if isinstance(value, (int, float)):
-                            ws[f'B{current_row}'].number_format = '#,##0.00'
-                        current_row += 1
-
-                    current_row += 1
-
-        # Auto-size columns
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-    def _create_charts_sheet(self, sections: List[Dict[str, Any]]) -> None:
+                ws.append([])
+                ws.append([self._cell(ws, chart.get('title', 'Chart'), "report_subheading")])
+                ws.append(['Label', 'Value'])
+                for label, value in zip(chart['labels'], chart['data']):
+                    if isinstance(value, (int, float)):
+                        value = self._cell(ws, value, "report_decimal")
+                    ws.append([label, value])
+
+        return ws
+
+    @staticmethod
+    def _metric_value(key: str, value: Any) -> Tuple[Any, str]:
+        """Cell value of a metric and the name of its value format."""
+        if isinstance(value, bool):
+            return value, "text"
+        if isinstance(value, float):
+            if 'percentage' in key.lower() or 'rate' in key.lower():
+                return value / 100, "percent"  # Excel percentage
+            return value, "decimal"
+        if isinstance(value, int):
+            return value, "integer"
+        if isinstance(value, (dict, list)):
+            text = json.dumps(value, default=str)
+            if len(text) < JSON_VALUE_LENGTH:
+                return json.dumps(value, indent=2, default=str), "text"
+            return text[:JSON_VALUE_LENGTH] + "...", "text"
+        if value is None:
+            return None, "text"
+        return str(value), "text"
+
+    async def _write_table(self, ws, table: Dict[str, Any]) -> None:
+        """Append a section's detail table below its metrics, a batch at a time."""
+        ws.append([])
+        ws.append([self._cell(ws, column, "report_header") for column in table['columns']])
+
+        def append_rows(rows: List[Any]) -> None:
+            for row in rows:
+                ws.append(row)
+
+        async for batch in table['batches']:
+            await asyncio.to_thread(append_rows, batch)
+
+    def _create_charts_sheet(self, workbook: Workbook, charts: List[Dict[str, Any]]) -> None:
         """Create a worksheet with charts."""
 
-        ws = self.workbook.create_sheet("Charts")
+        ws = workbook.create_sheet("Charts")
 
-        ws['A1'] = 'Report Charts'
-        ws['A1'].font = Font(size=14, bold=True, color='1F2937')
+        ws.append([self._cell(ws, 'Report Charts', "report_heading")])
+        ws.append([])
 
         current_row = 3
         chart_position_row = 3
 
-        for section in sections:
-            charts = section.get('charts', [])
+        for chart in charts:
+            chart_type = chart.get('type', 'bar')
+            chart_title = chart.get('title', 'Chart')
+
+            # Data for the chart, which references it by row
+            ws.append([self._cell(ws, chart_title, "report_subheading")])
+            ws.append(['Category', 'Value'])
+            start_row = current_row + 1
+            for label, value in zip(chart['labels'], chart['data']):
+                ws.append([label, value])
+            end_row = start_row + min(len(chart['labels']), len(chart['data']))
+            ws.append([])
+            ws.append([])
+            current_row = end_row + 3
+
+            if chart_type == 'line':
+                chart_obj = LineChart()
+            elif chart_type == 'pie':
+                chart_obj = PieChart()
+            else:
+                chart_obj = BarChart()
+
+            data_ref = Reference(ws, min_col=2, min_row=start_row + 1, max_row=end_row, max_col=2)
+            cats_ref = Reference(ws, min_col=1, min_row=start_row + 1, max_row=end_row)
+            chart_obj.add_data(data_ref, titles_from_data=False)
+            chart_obj.set_categories(cats_ref)
+            chart_obj.title = chart_title
+            chart_obj.width = 15
+            chart_obj.height = 10
+
+            ws.add_chart(chart_obj, f'D{chart_position_row}')
+            chart_position_row += 20
 
-            for chart in charts:
-                chart_type = chart.get('type', 'bar')
-                chart_title = chart.get('title', 'Chart')
-                chart_data = chart.get('data', [])
-                chart_labels = chart.get('labels', [])
-
-                if not chart_data or not chart_labels:
-                    continue
-
-                # Create data for chart
-                ws[f'A{current_row}'] = chart_title
-                ws[f'A{current_row}'].font = Font(bold=True)
-                current_row += 1
-
-                # Headers
-                ws[f'A{current_row}'] = 'Category'
-                ws[f'B{current_row}'] = 'Value'
-                start_row = current_row
-                current_row += 1
-
-                # Data
-                for label, value in zip(chart_labels, chart_data):
-                    ws[f'A{current_row}'] = label
-                    ws[f'B{current_row}'] = value
-                    current_row += 1
-
-                end_row = current_row - 1
-
-                # Create chart
-                try:
-                    if chart_type == 'bar':
-                        chart_obj = BarChart()
-                    elif chart_type == 'line':
-                        chart_obj = LineChart()
-                    elif chart_type == 'pie':
-                        chart_obj = PieChart()
-                    else:
-                        chart_obj = BarChart()
-
-                    # Add data to chart
-                    data_ref = Reference(ws, min_col=2, min_row=start_row + 1, max_row=end_row, max_col=2)
-                    cats_ref = Reference(ws, min_col=1, min_row=start_row + 1, max_row=end_row)
-
-                    chart_obj.add_data(data_ref, titles_from_data=False)
-                    chart_obj.set_categories(cats_ref)
-                    chart_obj.title = chart_title
-
-                    # Position chart
-                    chart_obj.anchor = f'D{chart_position_row}'
-                    chart_obj.width = 15
-                    chart_obj.height = 10
-
-                    ws.add_chart(chart_obj)
-
-                    chart_position_row += 20
-
-                except Exception as e:
-                    # If chart creation fails, just add a note
-                    ws[f'D{chart_position_row}'] = f"Chart creation failed: {str(e)}"
-                    chart_position_row += 5
-
-                current_row += 2
-
-    def _apply_summary_styling(self, ws, last_row: int) -> None:
-        """Apply styling to summary sheet."""
-
-        # Title styling
-        ws['A1'].alignment = Alignment(horizontal='left', vertical='center')
-
-        # Header fill
-        header_fill = PatternFill(start_color='F3F4F6', end_color='F3F4F6', fill_type='solid')
-
-        # Apply border to metadata area
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-
-        for row in range(3, last_row + 1):
-            for col in ['A', 'B']:
-                cell = ws[f'{col}{row}']
-                cell.border = thin_border
-                if col == 'A':
-                    cell.fill = header_fill
-
-    def _apply_table_styling(self, ws, start_row: int, end_row: int, num_cols: int) -> None:
-        """Apply styling to data tables."""
-
-        # Header styling
-        header_fill = PatternFill(start_color='3B82F6', end_color='3B82F6', fill_type='solid')
-        header_font = Font(color='FFFFFF', bold=True)
-
-        # Data styling
-        alt_fill = PatternFill(start_color='F9FAFB', end_color='F9FAFB', fill_type='solid')
-
-        # Borders
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-
-        for row in range(start_row, end_row + 1):
-            for col in range(1, num_cols + 1):
-                cell = ws.cell(row=row, column=col)
-                cell.border = thin_border
-                cell.alignment = Alignment(horizontal='left', vertical='center')
-
-                if row == start_row:  # Header row
-                    cell.fill = header_fill
-                    cell.font = header_font
-                elif row % 2 == 0:  # Alternate row coloring
-                    cell.fill = alt_fill
\ No newline at end of file
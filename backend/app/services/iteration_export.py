@@ -0,0 +1,276 @@
+"""
+Streaming export of optimization iteration history.
+
+Strumieniowy eksport historii iteracji optymalizacji (NDJSON, CSV, Arrow IPC).
+
+Rows are read in keyset-paginated batches on ``(job_id, iteration_number)`` and
+encoded batch by batch, so memory stays constant regardless of job size.
+The CSV header is fixed before the first row: archived histories list their
+variable and metric names, row histories use the scenario's design variables
+and the physics model's metrics.
+"""
+
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.models.optimization import (
+    OptimizationIteration, OptimizationIterationArchive, OptimizationJob, OptimizationScenario
+)
+from app.services.iteration_storage import IterationHistoryReader
+from app.services.optimization_service import PERFORMANCE_METRICS
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+DEFAULT_EXPORT_BATCH_SIZE = 2000
+
+_SCALAR_FIELDS = [
+    "iteration_number",
+    "function_evaluation",
+    "objective_value",
+    "evaluation_time_seconds",
+    "is_feasible",
+    "is_improvement",
+    "created_at",
+]
+
+
+class IterationExporter:
+    """Streams all iterations of a job in a chosen format."""
+
+    def __init__(
+        self,
+        job_id: str,
+        batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+    ):
+        self.job_id = job_id
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        # Names of the design variables and metrics; set before the first batch
+        self.variable_names: List[str] = []
+        self.metric_names: List[str] = []
+
+    async def iter_batches(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield iterations in batches, ordered by iteration number.
+
+        Uses the columnar archive when the job has one, otherwise keyset
+        pagination over OptimizationIteration rows. :attr:`variable_names`
+        and :attr:`metric_names` are set before the first batch is yielded.
+        """
+        async with self.session_factory() as db:
+            archive_stmt = select(OptimizationIterationArchive.payload).where(
+                OptimizationIterationArchive.job_id == self.job_id
+            )
+            payload = (await db.execute(archive_stmt)).scalar_one_or_none()
+
+            if payload is not None:
+                reader = IterationHistoryReader(payload, self.job_id)
+                self.variable_names = list(reader.variable_names)
+                self.metric_names = list(reader.metric_names)
+                for start in range(0, len(reader), self.batch_size):
+                    yield reader.read(start, self.batch_size)
+                return
+
+            design_variables = (await db.execute(
+                select(OptimizationScenario.design_variables)
+                .join(OptimizationJob, OptimizationJob.scenario_id == OptimizationScenario.id)
+                .where(OptimizationJob.id == self.job_id)
+            )).scalar_one_or_none()
+            self.variable_names = list(design_variables or {})
+            self.metric_names = list(PERFORMANCE_METRICS)
+
+            last_iteration: Optional[int] = None
+            while True:
+                batch = await self._fetch_batch(db, last_iteration)
+                if not batch:
+                    break
+                yield batch
+                if len(batch) < self.batch_size:
+                    break
+                last_iteration = batch[-1]["iteration_number"]
+
+    async def _fetch_batch(self, db: AsyncSession, after: Optional[int]) -> List[Dict[str, Any]]:
+        """Fetch one keyset page with a chunked (server-side) cursor."""
+        stmt = select(
+            OptimizationIteration.id,
+            OptimizationIteration.iteration_number,
+            OptimizationIteration.function_evaluation,
+            OptimizationIteration.design_variables,
+            OptimizationIteration.objective_value,
+            OptimizationIteration.objective_components,
+            OptimizationIteration.constraint_values,
+            OptimizationIteration.constraint_violations,
+            OptimizationIteration.performance_metrics,
+            OptimizationIteration.evaluation_time_seconds,
+            OptimizationIteration.is_feasible,
+            OptimizationIteration.is_improvement,
+            OptimizationIteration.created_at,
+        ).where(OptimizationIteration.job_id == self.job_id)
+
+        if after is not None:
+            stmt = stmt.where(OptimizationIteration.iteration_number > after)
+
+        stmt = stmt.order_by(OptimizationIteration.iteration_number.asc()).limit(self.batch_size)
+
+        rows = []
+        result = await db.stream(stmt.execution_options(yield_per=self.batch_size))
+        async for row in result:
+            rows.append({
+                "id": str(row.id),
+                "job_id": str(self.job_id),
+                "iteration_number": row.iteration_number,
+                "function_evaluation": row.function_evaluation,
+                "design_variables": row.design_variables,
+                "objective_value": row.objective_value,
+                "objective_components": row.objective_components,
+                "constraint_values": row.constraint_values,
+                "constraint_violations": row.constraint_violations,
+                "performance_metrics": row.performance_metrics,
+                "evaluation_time_seconds": row.evaluation_time_seconds,
+                "is_feasible": row.is_feasible,
+                "is_improvement": row.is_improvement,
+                "created_at": row.created_at.isoformat() if row.created_at else None
+            })
+        return rows
+
+    async def stream(self, export_format: str) -> AsyncIterator[bytes]:
+        """
+        Encode the iteration history as a byte stream.
+
+        Args:
+            export_format: One of ``ndjson``, ``csv``, ``arrow``
+
+        Yields:
+            Encoded chunks, one per batch (plus header/footer where needed)
+        """
+        if export_format == "ndjson":
+            encoder = self._stream_ndjson
+        elif export_format == "csv":
+            encoder = self._stream_csv
+        elif export_format == "arrow":
+            if not PYARROW_AVAILABLE:
+                raise ValueError("Arrow export requires pyarrow to be installed")
+            encoder = self._stream_arrow
+        else:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        rows_exported = 0
+        async for chunk, row_count in encoder():
+            rows_exported += row_count
+            yield chunk
+
+        logger.info(
+            "Iteration export finished",
+            job_id=self.job_id,
+            export_format=export_format,
+            rows=rows_exported
+        )
+
+    async def _stream_ndjson(self) -> AsyncIterator[tuple]:
+        """One JSON object per line."""
+        async for batch in self.iter_batches():
+            lines = "".join(json.dumps(row, default=str) + "\n" for row in batch)
+            yield lines.encode("utf-8"), len(batch)
+
+    async def _stream_csv(self) -> AsyncIterator[tuple]:
+        """
+        Flat CSV with ``dv.*`` and ``pm.*`` columns for design variables and metrics.
+
+        Values of variables or metrics outside the header are left out, and
+        their names logged as an error.
+        """
+        fieldnames: Optional[List[str]] = None
+        dropped: Set[str] = set()
+        async for batch in self.iter_batches():
+            buffer = io.StringIO()
+            if fieldnames is None:
+                fieldnames = (
+                    _SCALAR_FIELDS
+                    + [f"dv.{name}" for name in self.variable_names]
+                    + [f"pm.{name}" for name in self.metric_names]
+                )
+                columns = set(fieldnames)
+                writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+                writer.writeheader()
+            else:
+                writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+
+            for row in batch:
+                flat = self._flatten(row)
+                unknown = flat.keys() - columns
+                if unknown:
+                    if not unknown <= dropped:
+                        logger.error(
+                            "Iteration export dropped columns missing from the CSV header",
+                            job_id=self.job_id,
+                            columns=sorted(unknown - dropped),
+                            iteration_number=row["iteration_number"]
+                        )
+                        dropped |= unknown
+                    for name in unknown:
+                        del flat[name]
+                writer.writerow(flat)
+            yield buffer.getvalue().encode("utf-8"), len(batch)
+
+    async def _stream_arrow(self) -> AsyncIterator[tuple]:
+        """Arrow IPC stream, one record batch per page."""
+        sink = io.BytesIO()
+        writer = None
+        schema = None
+
+        async for batch in self.iter_batches():
+            flat = [self._flatten(row) for row in batch]
+            if schema is None:
+                schema = pa.Table.from_pylist(flat).schema
+                writer = pa.ipc.new_stream(sink, schema)
+            writer.write_batch(pa.RecordBatch.from_pylist(flat, schema=schema))
+            yield self._drain(sink), len(batch)
+
+        if writer is not None:
+            writer.close()
+            yield self._drain(sink), 0
+
+    @staticmethod
+    def _drain(sink: io.BytesIO) -> bytes:
+        """Take everything written to the sink so far and reset it."""
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    @staticmethod
+    def _flatten(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten nested design variables and metrics into prefixed columns."""
+        flat = {field: row[field] for field in _SCALAR_FIELDS}
+        for name, value in (row["design_variables"] or {}).items():
+            flat[f"dv.{name}"] = value
+        for name, value in (row["performance_metrics"] or {}).items():
+            flat[f"pm.{name}"] = value
+        return flat
+
+
+def export_filename(job_id: str, export_format: str) -> str:
+    """Download file name for an iteration export."""
+    extension = {"ndjson": "ndjson", "csv": "csv", "arrow": "arrows"}[export_format]
+    return f"iterations_{job_id}.{extension}"
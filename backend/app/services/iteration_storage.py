@@ -0,0 +1,279 @@
+"""
+Compressed columnar storage for optimization iteration history.
+
+Kolumnowe, skompresowane przechowywanie historii iteracji optymalizacji.
+
+The whole history of a job is kept in one compressed NPZ archive, written when
+the run ends (a resumed job's later iterations are merged into it). Every
+column is split into fixed-size row chunks stored as separate archive members,
+so reading a page only decompresses the chunks that overlap the requested range.
+"""
+
+import io
+import json
+import uuid
+from datetime import datetime, UTC
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+ITERATION_ARCHIVE_FORMAT = "npz-v1"
+DEFAULT_CHUNK_SIZE = 1024
+
+# Scalar columns: name -> numpy dtype
+_SCALAR_COLUMNS = {
+    "iteration_number": np.int64,
+    "function_evaluation": np.int64,
+    "objective_value": np.float64,
+    "evaluation_time_seconds": np.float64,
+    "created_at": np.float64,  # POSIX timestamp, UTC
+    "is_feasible": np.bool_,
+    "is_improvement": np.bool_,
+}
+
+# Matrix columns: name -> key in the metadata holding the column names
+_MATRIX_COLUMNS = {
+    "design_variables": "variable_names",
+    "performance_metrics": "metric_names",
+}
+
+
+def _member(column: str, chunk: int) -> str:
+    """Archive member name for one chunk of a column."""
+    return f"{column}.{chunk:06d}"
+
+
+def _ordered_keys(dicts: Iterable[Optional[Dict[str, Any]]]) -> List[str]:
+    """Collect keys of all dicts preserving first-seen order."""
+    keys: Dict[str, None] = {}
+    for item in dicts:
+        for key in (item or {}):
+            keys.setdefault(key, None)
+    return list(keys)
+
+
+def _to_matrix(dicts: List[Optional[Dict[str, Any]]], names: List[str]) -> np.ndarray:
+    """Build a float matrix from a list of dicts, missing values become NaN."""
+    matrix = np.full((len(dicts), len(names)), np.nan, dtype=np.float64)
+    for row, item in enumerate(dicts):
+        if not item:
+            continue
+        for col, name in enumerate(names):
+            value = item.get(name)
+            if isinstance(value, (int, float)):
+                matrix[row, col] = value
+    return matrix
+
+
+def encode_iteration_history(
+    records: List[Dict[str, Any]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Encode iteration records into a compressed columnar archive.
+
+    Args:
+        records: Iteration records as collected by the optimizer
+            (``iteration``, ``design_vars``, ``objective_value``, ``performance``
+            and optionally ``function_evaluation``, ``evaluation_time_seconds``,
+            ``is_feasible``, ``created_at``)
+        chunk_size: Number of rows per compressed chunk
+
+    Returns:
+        Dictionary with ``payload`` (bytes) and archive metadata
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+
+    row_count = len(records)
+    design_dicts = [r.get("design_vars") for r in records]
+    metric_dicts = [r.get("performance") for r in records]
+    variable_names = _ordered_keys(design_dicts)
+    metric_names = _ordered_keys(metric_dicts)
+
+    objective = np.array([r["objective_value"] for r in records], dtype=np.float64)
+
+    # Same semantics as row storage: first row or strictly better than best so far
+    is_improvement = np.ones(row_count, dtype=np.bool_)
+    if row_count > 1:
+        running_best = np.minimum.accumulate(objective)
+        is_improvement[1:] = objective[1:] < running_best[:-1]
+
+    now = datetime.now(UTC).timestamp()
+    columns: Dict[str, np.ndarray] = {
+        "iteration_number": np.array([r["iteration"] for r in records], dtype=np.int64),
+        "function_evaluation": np.array(
+            [r.get("function_evaluation", r["iteration"]) for r in records], dtype=np.int64
+        ),
+        "objective_value": objective,
+        "evaluation_time_seconds": np.array(
+            [
+                r["evaluation_time_seconds"] if r.get("evaluation_time_seconds") is not None
+                else np.nan
+                for r in records
+            ],
+            dtype=np.float64
+        ),
+        "created_at": np.array(
+            [r["created_at"].timestamp() if r.get("created_at") else now for r in records],
+            dtype=np.float64
+        ),
+        "is_feasible": np.array([r.get("is_feasible", True) for r in records], dtype=np.bool_),
+        "is_improvement": is_improvement,
+        "design_variables": _to_matrix(design_dicts, variable_names),
+        "performance_metrics": _to_matrix(metric_dicts, metric_names),
+    }
+
+    meta = {
+        "format": ITERATION_ARCHIVE_FORMAT,
+        "row_count": row_count,
+        "chunk_size": chunk_size,
+        "variable_names": variable_names,
+        "metric_names": metric_names,
+    }
+
+    members: Dict[str, np.ndarray] = {
+        "meta": np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+    }
+    for column, values in columns.items():
+        for chunk, start in enumerate(range(0, row_count, chunk_size)):
+            members[_member(column, chunk)] = values[start:start + chunk_size]
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **members)
+    payload = buffer.getvalue()
+
+    return {**meta, "payload": payload, "payload_size_bytes": len(payload)}
+
+
+class IterationHistoryReader:
+    """Lazy reader for an encoded iteration history archive."""
+
+    def __init__(self, payload: bytes, job_id: str):
+        self.job_id = job_id
+        self._archive = np.load(io.BytesIO(payload), allow_pickle=False)
+        meta = json.loads(self._archive["meta"].tobytes().decode("utf-8"))
+        if meta.get("format") != ITERATION_ARCHIVE_FORMAT:
+            raise ValueError(f"Unsupported iteration archive format: {meta.get('format')}")
+
+        self.row_count: int = meta["row_count"]
+        self.chunk_size: int = meta["chunk_size"]
+        self.variable_names: List[str] = meta["variable_names"]
+        self.metric_names: List[str] = meta["metric_names"]
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Read a row range of one column, decompressing only overlapping chunks.
+
+        Args:
+            name: Column name
+            start: First row (inclusive)
+            stop: Last row (exclusive), defaults to end of archive
+
+        Returns:
+            Numpy array with the requested rows
+        """
+        if name not in _SCALAR_COLUMNS and name not in _MATRIX_COLUMNS:
+            raise KeyError(f"Unknown iteration column: {name}")
+
+        stop = self.row_count if stop is None else min(stop, self.row_count)
+        start = max(start, 0)
+        if start >= stop:
+            if name in _MATRIX_COLUMNS:
+                width = len(getattr(self, _MATRIX_COLUMNS[name]))
+                return np.empty((0, width), dtype=np.float64)
+            return np.empty(0, dtype=_SCALAR_COLUMNS[name])
+
+        first_chunk = start // self.chunk_size
+        last_chunk = (stop - 1) // self.chunk_size
+        parts = [
+            self._archive[_member(name, chunk)]
+            for chunk in range(first_chunk, last_chunk + 1)
+        ]
+        values = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        offset = first_chunk * self.chunk_size
+        return values[start - offset:stop - offset]
+
+    def read(self, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Read iterations in the same shape as the row-based iterations endpoint.
+
+        The optimizer does not record ``objective_components``, ``constraint_values``
+        or ``constraint_violations`` per evaluation, so the archive has no columns
+        for them and they are always None (as on iteration rows).
+
+        Args:
+            skip: Number of rows to skip
+            limit: Maximum number of rows to return
+
+        Returns:
+            List of iteration dictionaries
+        """
+        stop = self.row_count if limit is None else skip + limit
+        cols = {
+            name: self.column(name, skip, stop)
+            for name in list(_SCALAR_COLUMNS) + list(_MATRIX_COLUMNS)
+        }
+
+        rows = []
+        for i in range(len(cols["iteration_number"])):
+            iteration_number = int(cols["iteration_number"][i])
+            eval_time = float(cols["evaluation_time_seconds"][i])
+            rows.append({
+                "id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"{self.job_id}/{iteration_number}")),
+                "job_id": str(self.job_id),
+                "iteration_number": iteration_number,
+                "function_evaluation": int(cols["function_evaluation"][i]),
+                "design_variables": self._row_dict(cols["design_variables"][i], self.variable_names),
+                "objective_value": float(cols["objective_value"][i]),
+                "objective_components": None,
+                "constraint_values": None,
+                "constraint_violations": None,
+                "performance_metrics": self._row_dict(cols["performance_metrics"][i], self.metric_names),
+                "evaluation_time_seconds": None if np.isnan(eval_time) else eval_time,
+                "is_feasible": bool(cols["is_feasible"][i]),
+                "is_improvement": bool(cols["is_improvement"][i]),
+                "created_at": datetime.fromtimestamp(
+                    float(cols["created_at"][i]), UTC
+                ).replace(tzinfo=None).isoformat(),
+            })
+        return rows
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Read all iterations back in the record shape ``encode_iteration_history`` takes."""
+        cols = {
+            name: self.column(name)
+            for name in list(_SCALAR_COLUMNS) + list(_MATRIX_COLUMNS)
+        }
+        records = []
+        for i in range(self.row_count):
+            eval_time = float(cols["evaluation_time_seconds"][i])
+            records.append({
+                "iteration": int(cols["iteration_number"][i]),
+                "function_evaluation": int(cols["function_evaluation"][i]),
+                "design_vars": self._row_dict(cols["design_variables"][i], self.variable_names),
+                "objective_value": float(cols["objective_value"][i]),
+                "performance": self._row_dict(cols["performance_metrics"][i], self.metric_names),
+                "evaluation_time_seconds": None if np.isnan(eval_time) else eval_time,
+                "is_feasible": bool(cols["is_feasible"][i]),
+                "created_at": datetime.fromtimestamp(float(cols["created_at"][i]), UTC),
+            })
+        return records
+
+    def tail(self, count: int) -> List[Dict[str, Any]]:
+        """Read the last ``count`` iterations, newest first."""
+        start = max(self.row_count - count, 0)
+        return list(reversed(self.read(start, count)))
+
+    @staticmethod
+    def _row_dict(values: np.ndarray, names: List[str]) -> Dict[str, float]:
+        """Convert one matrix row back to a dict, skipping missing values."""
+        return {
+            name: float(value)
+            for name, value in zip(names, values)
+            if not np.isnan(value)
+        }
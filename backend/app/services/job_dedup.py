@@ -0,0 +1,125 @@
+"""
+Content-hash deduplication of optimization jobs.
+
+Deduplikacja zadań optymalizacji na podstawie skrótu treści.
+
+Two jobs with the same scenario, base configuration, initial values and
+solver settings produce the same result, so a re-submission can attach to
+the in-flight job or reuse the completed one instead of solving again.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, Optional
+
+import structlog
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.optimization import OptimizationJob, OptimizationScenario, OptimizationStatus
+from app.models.regenerator import RegeneratorConfiguration
+from app.services.job_scheduler import ACTIVE_STATUSES
+
+logger = structlog.get_logger(__name__)
+
+
+# Bump when the solver changes in a way that invalidates earlier results
+JOB_HASH_VERSION = 1
+
+_FLOAT_DIGITS = 12
+
+_SCENARIO_FIELDS = [
+    "objective",
+    "algorithm",
+    "optimization_config",
+    "constraints_config",
+    "bounds_config",
+    "design_variables",
+    "objective_weights",
+    "max_iterations",
+    "max_function_evaluations",
+    "tolerance",
+    "max_runtime_minutes",
+]
+
+_CONFIGURATION_FIELDS = [
+    "geometry_config",
+    "materials_config",
+    "thermal_config",
+    "flow_config",
+    "constraints_config",
+]
+
+
+def _canonical(value: Any) -> Any:
+    """Normalize a JSON-like value so equal inputs serialize identically."""
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        # 1 and 1.0 (and float noise below 12 significant digits) hash alike
+        return float(f"{float(value):.{_FLOAT_DIGITS}g}")
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+
+def compute_job_content_hash(
+    scenario: OptimizationScenario,
+    base_config: RegeneratorConfiguration,
+    initial_values: Optional[Dict[str, float]]
+) -> str:
+    """
+    Compute the canonical content hash of an optimization job.
+
+    Args:
+        scenario: Scenario the job runs
+        base_config: Base regenerator configuration of the scenario
+        initial_values: Initial values of design variables
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    document = {
+        "version": JOB_HASH_VERSION,
+        "scenario": {field: getattr(scenario, field, None) for field in _SCENARIO_FIELDS},
+        "configuration": {field: getattr(base_config, field, None) for field in _CONFIGURATION_FIELDS},
+        "initial_values": initial_values or {},
+    }
+    encoded = json.dumps(_canonical(document), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+async def find_duplicate_job(
+    db: AsyncSession,
+    user_id: str,
+    content_hash: str
+) -> Optional[OptimizationJob]:
+    """
+    Find a job of the user that a re-submission can reuse.
+
+    Active jobs are reused regardless of age; completed jobs only within
+    OPTIMIZATION_DEDUP_WINDOW_MINUTES. Failed and cancelled jobs are never
+    reused. Returns None when deduplication is disabled (window of 0).
+    """
+    if settings.OPTIMIZATION_DEDUP_WINDOW_MINUTES <= 0:
+        return None
+
+    window_start = datetime.now(UTC) - timedelta(minutes=settings.OPTIMIZATION_DEDUP_WINDOW_MINUTES)
+    stmt = select(OptimizationJob).where(
+        OptimizationJob.user_id == user_id,
+        OptimizationJob.content_hash == content_hash,
+        or_(
+            OptimizationJob.status.in_(ACTIVE_STATUSES),
+            (OptimizationJob.status == OptimizationStatus.COMPLETED)
+            & (OptimizationJob.completed_at >= window_start)
+        )
+    ).order_by(OptimizationJob.created_at.desc()).limit(1)
+
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
@@ -0,0 +1,182 @@
+"""
+Lightweight resource accounting of optimization jobs.
+
+Pomiar zużycia zasobów (CPU, pamięć, czas faz) zadań optymalizacji.
+
+A JobProfiler follows one run through its phases (load, setup, solve,
+persist, finalize) and records wall time, CPU time and database time for
+each of them, the process' peak RSS, the time of every physics evaluation
+and optionally the Python heap peak (tracemalloc, off by default because
+of its overhead). The summary is stored in OptimizationJob.resource_usage
+and exported to Prometheus.
+
+Database time comes from the engine-wide query timer in app.core.database,
+which charges each statement to the phase active in the current context, so
+concurrent jobs in one process do not see each other's queries.
+"""
+
+import sys
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from app.core.config import settings
+from app.core.database import add_query_observer
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+
+# Upper bounds of the evaluation time histogram stored on the job (seconds)
+EVALUATION_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.1, 1.0)
+
+_current_phase: ContextVar[Optional["_PhaseTiming"]] = ContextVar("job_profiler_phase", default=None)
+
+
+class _PhaseTiming:
+    """Accumulated timings of one phase."""
+
+    __slots__ = ("wall_seconds", "cpu_seconds", "db_seconds", "db_statements")
+
+    def __init__(self):
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.db_seconds = 0.0
+        self.db_statements = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "db_seconds": self.db_seconds,
+            "db_statements": self.db_statements,
+        }
+
+
+def _charge_query_to_phase(statement: str, seconds: float, executemany: bool) -> None:
+    phase = _current_phase.get()
+    if phase is not None:
+        phase.db_seconds += seconds
+        phase.db_statements += 1
+
+
+add_query_observer(_charge_query_to_phase)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB."""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class JobProfiler:
+    """Collects phase timings, memory and evaluation times of one job run."""
+
+    def __init__(self, job_id: Optional[str] = None, trace_memory: Optional[bool] = None):
+        self.job_id = job_id
+        self.phases: Dict[str, _PhaseTiming] = {}
+        self.evaluation_times: List[float] = []
+        self.trace_memory = settings.OPTIMIZATION_PROFILE_TRACEMALLOC if trace_memory is None else trace_memory
+        self._started_tracemalloc = False
+        self._python_heap_peak_mb: Optional[float] = None
+        self._rss_start_mb = peak_rss_mb()
+
+    def _start_memory_tracing(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block as part of a phase; re-entering a phase accumulates."""
+        if self.trace_memory and not self.phases:
+            self._start_memory_tracing()
+        timing = self.phases.setdefault(name, _PhaseTiming())
+        token = _current_phase.set(timing)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            timing.wall_seconds += time.perf_counter() - wall_start
+            timing.cpu_seconds += time.process_time() - cpu_start
+            _current_phase.reset(token)
+
+    def record_evaluation(self, seconds: float) -> None:
+        """Record the duration of one physics evaluation."""
+        self.evaluation_times.append(seconds)
+
+    def stop(self) -> None:
+        """Capture the memory peaks; call once the run is over."""
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._python_heap_peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    @property
+    def wall_seconds(self) -> float:
+        return sum(t.wall_seconds for t in self.phases.values())
+
+    @property
+    def cpu_seconds(self) -> float:
+        return sum(t.cpu_seconds for t in self.phases.values())
+
+    @property
+    def cpu_percentage(self) -> Optional[float]:
+        """CPU time over wall time of all phases (100 = one busy core)."""
+        wall = self.wall_seconds
+        return self.cpu_seconds / wall * 100 if wall > 0 else None
+
+    def evaluation_summary(self) -> Dict[str, Any]:
+        """Statistics and histogram of physics evaluation times."""
+        if not self.evaluation_times:
+            return {"count": 0}
+
+        times = np.asarray(self.evaluation_times)
+        counts = [0] * (len(EVALUATION_BUCKETS) + 1)
+        for value in times:
+            counts[bisect_left(EVALUATION_BUCKETS, value)] += 1
+        return {
+            "count": int(times.size),
+            "total_seconds": float(times.sum()),
+            "mean_seconds": float(times.mean()),
+            "p50_seconds": float(np.percentile(times, 50)),
+            "p95_seconds": float(np.percentile(times, 95)),
+            "max_seconds": float(times.max()),
+            "histogram": {
+                "buckets": [*EVALUATION_BUCKETS, "+Inf"],
+                "counts": counts,
+            },
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Everything recorded, as stored in OptimizationJob.resource_usage."""
+        rss_peak = peak_rss_mb()
+        return {
+            "phases": {name: timing.to_dict() for name, timing in self.phases.items()},
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "cpu_percentage": self.cpu_percentage,
+            "db_seconds": sum(t.db_seconds for t in self.phases.values()),
+            "db_statements": sum(t.db_statements for t in self.phases.values()),
+            "peak_rss_mb": rss_peak,
+            # Process-wide peak; growth shows whether this job raised it
+            "peak_rss_growth_mb": (
+                rss_peak - self._rss_start_mb
+                if rss_peak is not None and self._rss_start_mb is not None else None
+            ),
+            "python_heap_peak_mb": self._python_heap_peak_mb,
+            "evaluations": self.evaluation_summary(),
+        }
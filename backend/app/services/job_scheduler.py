@@ -0,0 +1,269 @@
+"""
+Fair-share admission and dispatch of optimization jobs.
+
+Sprawiedliwe przydzielanie slotów i kolejkowanie zadań optymalizacji.
+
+Jobs are created as PENDING and only sent to Celery while a global slot
+(MAX_PARALLEL_OPTIMIZATIONS) is free. Free slots go round-robin to the users
+with the fewest jobs in flight, so one user's sweep cannot starve the others.
+Batch jobs never occupy the last INTERACTIVE_RESERVED_SLOTS slots.
+
+Several API processes may dispatch at once. A job is claimed with a
+conditional ``UPDATE ... WHERE dispatched_at IS NULL`` and only sent when
+that statement changed its row, so each job reaches the broker once on any
+database.
+"""
+
+from collections import defaultdict, deque
+from datetime import datetime, UTC
+from typing import Deque, Dict, List, Tuple
+
+import structlog
+from celery import group
+from sqlalchemy import select, update, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.celery import QUEUE_OPTIMIZATION_INTERACTIVE, QUEUE_OPTIMIZATION_BATCH
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.optimization import OptimizationJob, OptimizationStatus
+
+logger = structlog.get_logger(__name__)
+
+
+ACTIVE_STATUSES = [
+    OptimizationStatus.PENDING,
+    OptimizationStatus.INITIALIZING,
+    OptimizationStatus.RUNNING,
+]
+
+# Upper bound of held jobs inspected per dispatch round
+_DISPATCH_SCAN_LIMIT = 1000
+
+
+def broker_priority(job_priority: int) -> int:
+    """Map job priority (1=highest, 5=lowest) onto broker priority steps (0=highest)."""
+    return (min(max(job_priority, 1), 5) - 1) * 2
+
+
+class FairShareScheduler:
+    """Admits optimization jobs and dispatches them fairly across users."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def queue_for_priority(priority: int) -> str:
+        """Route high-priority jobs to the interactive queue, the rest to batch."""
+        if priority <= settings.INTERACTIVE_MAX_PRIORITY:
+            return QUEUE_OPTIMIZATION_INTERACTIVE
+        return QUEUE_OPTIMIZATION_BATCH
+
+    async def count_user_jobs(self, user_id: str) -> Tuple[int, int]:
+        """
+        Count a user's active jobs.
+
+        Returns:
+            Tuple of (jobs in flight, jobs held by admission)
+        """
+        stmt = select(
+            func.count(OptimizationJob.id),
+            func.sum(case((OptimizationJob.dispatched_at.is_(None), 1), else_=0)),
+        ).where(
+            OptimizationJob.user_id == user_id,
+            OptimizationJob.status.in_(ACTIVE_STATUSES)
+        )
+        total, held = (await self.db.execute(stmt)).one()
+        held = int(held or 0)
+        return int(total or 0) - held, held
+
+    def can_admit(self, in_flight: int, held: int) -> bool:
+        """Check the per-user cap on in-flight plus held jobs."""
+        return in_flight + held < settings.MAX_CONCURRENT_JOBS_PER_USER + settings.MAX_QUEUED_JOBS_PER_USER
+
+    async def submit(self, job: OptimizationJob) -> str:
+        """
+        Submit a freshly created job for scheduling.
+
+        Returns:
+            ``dispatched`` if the job was sent to Celery now, ``held`` otherwise
+        """
+        dispatched = await self.dispatch_pending()
+        decision = "dispatched" if job.id in dispatched else "held"
+        metrics.track_job_admission(decision)
+
+        logger.info(
+            "Optimization job admitted",
+            job_id=job.id,
+            user_id=job.user_id,
+            queue=job.queue_name,
+            decision=decision
+        )
+        return decision
+
+    async def dispatch_pending(self) -> List[str]:
+        """
+        Dispatch held jobs while global slots are free.
+
+        Returns:
+            IDs of the dispatched jobs
+        """
+        in_flight_by_user: Dict[str, int] = defaultdict(int)
+        in_flight_stmt = select(
+            OptimizationJob.user_id, func.count(OptimizationJob.id)
+        ).where(
+            OptimizationJob.dispatched_at.isnot(None),
+            OptimizationJob.status.in_(ACTIVE_STATUSES)
+        ).group_by(OptimizationJob.user_id)
+        for user_id, count in (await self.db.execute(in_flight_stmt)).all():
+            in_flight_by_user[user_id] = count
+
+        capacity = settings.MAX_PARALLEL_OPTIMIZATIONS
+        total_in_flight = sum(in_flight_by_user.values())
+        if total_in_flight >= capacity:
+            await self.publish_queue_depths()
+            return []
+
+        held_stmt = select(OptimizationJob).where(
+            OptimizationJob.dispatched_at.is_(None),
+            OptimizationJob.status == OptimizationStatus.PENDING
+        ).order_by(
+            OptimizationJob.priority.asc(), OptimizationJob.created_at.asc()
+        ).limit(_DISPATCH_SCAN_LIMIT).execution_options(populate_existing=True)
+
+        held_by_user: Dict[str, Deque[OptimizationJob]] = defaultdict(deque)
+        for job in (await self.db.execute(held_stmt)).scalars().all():
+            held_by_user[job.user_id].append(job)
+
+        batch_limit = capacity - settings.INTERACTIVE_RESERVED_SLOTS
+        selected: List[OptimizationJob] = []
+
+        while total_in_flight < capacity:
+            candidates = [
+                user_id for user_id, jobs in held_by_user.items()
+                if jobs
+                and in_flight_by_user[user_id] < settings.MAX_CONCURRENT_JOBS_PER_USER
+                and (jobs[0].queue_name != QUEUE_OPTIMIZATION_BATCH or total_in_flight < batch_limit)
+            ]
+            if not candidates:
+                break
+
+            # Fewest jobs in flight first, then interactive before batch, then oldest
+            user_id = min(
+                candidates,
+                key=lambda u: (
+                    in_flight_by_user[u],
+                    held_by_user[u][0].priority,
+                    held_by_user[u][0].created_at
+                )
+            )
+            selected.append(held_by_user[user_id].popleft())
+            in_flight_by_user[user_id] += 1
+            total_in_flight += 1
+
+        selected = await self._claim(selected)
+
+        # Mark as dispatched before sending, so a fast worker sees a consistent row
+        await self.db.commit()
+
+        if not selected:
+            await self.publish_queue_depths()
+            return []
+
+        try:
+            self._send_to_broker(selected)
+        except Exception as e:
+            logger.error(
+                "Failed to dispatch optimization jobs",
+                job_ids=[job.id for job in selected],
+                error=str(e)
+            )
+            for job in selected:
+                job.dispatched_at = None
+            await self.db.commit()
+            return []
+
+        await self.publish_queue_depths()
+        return [job.id for job in selected]
+
+    async def _claim(self, jobs: List[OptimizationJob]) -> List[OptimizationJob]:
+        """
+        Mark jobs as dispatched unless another dispatcher already did.
+
+        Returns:
+            The jobs this session claimed; the caller commits
+        """
+        claimed = []
+        now = datetime.now(UTC)
+        for job in jobs:
+            queue_name = job.queue_name or self.queue_for_priority(job.priority)
+            result = await self.db.execute(
+                update(OptimizationJob)
+                .where(OptimizationJob.id == job.id, OptimizationJob.dispatched_at.is_(None))
+                .values(dispatched_at=now, queue_name=queue_name)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                logger.debug("Optimization job claimed by another dispatcher", job_id=job.id)
+                continue
+            set_committed_value(job, "dispatched_at", now)
+            set_committed_value(job, "queue_name", queue_name)
+            claimed.append(job)
+        return claimed
+
+    def _send_to_broker(self, jobs: List[OptimizationJob]) -> None:
+        """Send jobs to their Celery queues as one group, each with its broker priority."""
+        from app.tasks.optimization_tasks import run_optimization_task
+
+        if len(jobs) == 1:
+            job = jobs[0]
+            run_optimization_task.apply_async(
+                args=[job.id],
+                queue=job.queue_name,
+                priority=broker_priority(job.priority)
+            )
+            return
+
+        group([
+            run_optimization_task.signature(
+                args=[job.id],
+                queue=job.queue_name,
+                priority=broker_priority(job.priority)
+            )
+            for job in jobs
+        ]).apply_async()
+
+    async def queue_depths(self) -> Dict[str, Dict[str, int]]:
+        """
+        Count active jobs per queue and state.
+
+        Returns:
+            Mapping of queue name to ``{"held": n, "in_flight": m}``
+        """
+        depths: Dict[str, Dict[str, int]] = {
+            QUEUE_OPTIMIZATION_INTERACTIVE: {"held": 0, "in_flight": 0},
+            QUEUE_OPTIMIZATION_BATCH: {"held": 0, "in_flight": 0},
+        }
+        stmt = select(
+            OptimizationJob.queue_name,
+            OptimizationJob.dispatched_at.is_(None),
+            func.count(OptimizationJob.id)
+        ).where(
+            OptimizationJob.status.in_(ACTIVE_STATUSES)
+        ).group_by(OptimizationJob.queue_name, OptimizationJob.dispatched_at.is_(None))
+
+        for queue_name, is_held, count in (await self.db.execute(stmt)).all():
+            queue_name = queue_name or QUEUE_OPTIMIZATION_INTERACTIVE
+            state = "held" if is_held else "in_flight"
+            depths.setdefault(queue_name, {"held": 0, "in_flight": 0})[state] += count
+
+        return depths
+
+    async def publish_queue_depths(self) -> Dict[str, Dict[str, int]]:
+        """Export current queue depths to Prometheus."""
+        depths = await self.queue_depths()
+        for queue_name, states in depths.items():
+            for state, count in states.items():
+                metrics.set_optimization_queue_depth(queue_name, state, count)
+        return depths
@@ -0,0 +1,179 @@
+"""
+Full-text material search.
+
+Wyszukiwanie pełnotekstowe materiałów.
+
+Search text is split into words. A material matches when each word starts
+a word of its name, description, manufacturer or material code, or when
+its material code or name starts with the whole search text. On MySQL the
+words are looked up in the FULLTEXT index in boolean mode, ranked by its
+relevance. On SQLite they are looked up in the FTS5 table ``materials_fts``,
+an inverted index kept in step by triggers, ranked by BM25 with matches in
+the name and code weighted above the description. Each source of
+matches is a branch of one UNION, so every branch can use its own index
+(on MySQL the code and name prefixes use their B-tree indexes; on SQLite
+the FTS5 prefix query covers them unless the text has no words). Results
+are ordered by exact code match, then code or name prefix, then
+relevance, then name.
+
+InnoDB leaves words shorter than innodb_ft_min_token_size (3 by default)
+out of its index, so such words only match as part of a code or name
+prefix on MySQL.
+"""
+
+import re
+from typing import List, Optional, Set
+
+import structlog
+from sqlalchemy import Subquery, case, func, literal, literal_column, or_, select, text, union_all
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.regenerator import MATERIAL_FTS_TABLE, MATERIAL_SEARCH_COLUMNS, MATERIAL_SEARCH_DDL, Material
+
+logger = structlog.get_logger(__name__)
+
+
+# Further words are ignored
+MAX_SEARCH_WORDS = 8
+
+# InnoDB's default innodb_ft_min_token_size
+MYSQL_MIN_WORD_LENGTH = 3
+
+# BM25 weight per FTS5 column (the unindexed material_id first)
+SQLITE_COLUMN_WEIGHTS = {"name": 10.0, "description": 1.0, "manufacturer": 3.0, "material_code": 8.0}
+
+_WORD = re.compile(r"\w+")
+
+# SQLite databases whose FTS table is known to exist
+_sqlite_indexed: Set[str] = set()
+
+
+def search_words(search: str) -> List[str]:
+    """Lowercase words of a search text, at most MAX_SEARCH_WORDS."""
+    return _WORD.findall(search.lower())[:MAX_SEARCH_WORDS]
+
+
+def _like_prefix(search: str) -> str:
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+def prefix_match(search: str):
+    """Condition of materials whose code or name starts with the search text."""
+    pattern = _like_prefix(search.strip())
+    return or_(
+        Material.material_code.like(pattern, escape="\\"),
+        Material.name.like(pattern, escape="\\")
+    )
+
+
+async def ensure_search_index(db: AsyncSession) -> None:
+    """
+    Create and fill the SQLite FTS table of a database created without it.
+
+    Tables created by ``create_all`` get it with the materials table; this
+    covers SQLite databases created before it existed.
+    """
+    bind = db.get_bind()
+    url = str(bind.url)
+    if bind.dialect.name != "sqlite" or url in _sqlite_indexed:
+        return
+
+    exists = (await db.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": MATERIAL_FTS_TABLE}
+    )).first()
+    if not exists:
+        columns = ", ".join(MATERIAL_SEARCH_COLUMNS)
+        for statement in MATERIAL_SEARCH_DDL["sqlite"]:
+            await db.execute(text(statement))
+        await db.execute(text(
+            f"INSERT INTO {MATERIAL_FTS_TABLE} (material_id, {columns}) SELECT id, {columns} FROM materials"
+        ))
+        await db.commit()
+        logger.info("Material search index built", table=MATERIAL_FTS_TABLE)
+    _sqlite_indexed.add(url)
+
+
+def _word_matches(dialect: str, words: List[str]):
+    """Select of (material_id, relevance) for materials matching every word, or None."""
+    if dialect == "mysql":
+        words = [word for word in words if len(word) >= MYSQL_MIN_WORD_LENGTH]
+    if not words:
+        return None
+
+    if dialect == "mysql":
+        relevance = match(
+            *(getattr(Material, column) for column in MATERIAL_SEARCH_COLUMNS),
+            against=" ".join(f"+{word}*" for word in words)
+        ).in_boolean_mode()
+        return select(Material.id.label("material_id"), relevance.label("relevance")).where(relevance)
+
+    if dialect == "sqlite":
+        fts = literal_column(MATERIAL_FTS_TABLE)
+        # BM25 is lower for better matches
+        relevance = -func.bm25(fts, 0.0, *(SQLITE_COLUMN_WEIGHTS[column] for column in MATERIAL_SEARCH_COLUMNS))
+        return (
+            select(literal_column("material_id"), relevance.label("relevance"))
+            .select_from(text(MATERIAL_FTS_TABLE))
+            .where(fts.op("MATCH")(" ".join(f'"{word}"*' for word in words)))
+        )
+
+    # No full-text index on other databases
+    return select(Material.id.label("material_id"), literal(0.0).label("relevance")).where(*(
+        or_(*(getattr(Material, column).ilike(f"%{word}%") for column in MATERIAL_SEARCH_COLUMNS))
+        for word in words
+    ))
+
+
+async def ranked_matches(db: AsyncSession, search: str) -> Optional[Subquery]:
+    """
+    Materials matching a search text with their relevance.
+
+    Returns:
+        Subquery of ``material_id`` and ``relevance`` (0 for code or name
+        prefix matches only), or None when the text has nothing to search for
+    """
+    if not search.strip():
+        return None
+
+    dialect = db.get_bind().dialect.name
+    await ensure_search_index(db)
+
+    branches = []
+    word_matches = _word_matches(dialect, search_words(search))
+    if word_matches is not None:
+        branches.append(word_matches)
+    # FTS5 prefix queries already find every code or name starting with the
+    # words, and SQLite's case-insensitive LIKE cannot use the B-tree index
+    if word_matches is None or dialect != "sqlite":
+        pattern = _like_prefix(search.strip())
+        branches.extend(
+            select(Material.id.label("material_id"), literal(0.0).label("relevance"))
+            .where(column.like(pattern, escape="\\"))
+            for column in (Material.material_code, Material.name)
+        )
+
+    if len(branches) == 1:
+        # One row per material already; grouping a lone FTS5 query would also
+        # take bm25() out of the context SQLite can evaluate it in
+        return branches[0].subquery("material_matches")
+
+    candidates = union_all(*branches).subquery("material_candidates")
+    return (
+        select(candidates.c.material_id, func.max(candidates.c.relevance).label("relevance"))
+        .group_by(candidates.c.material_id)
+        .subquery("material_matches")
+    )
+
+
+def search_order(matches: Subquery, search: str) -> list:
+    """ORDER BY clauses of materials joined with :func:`ranked_matches`."""
+    search = search.strip()
+    return [
+        case((func.lower(Material.material_code) == search.lower(), 0), else_=1),
+        case((prefix_match(search), 0), else_=1),
+        matches.c.relevance.desc(),
+        Material.name,
+    ]
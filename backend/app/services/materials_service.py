@@ -6,7 +6,7 @@ Serwis materiałów obsługujący bibliotekę materiałów.
 
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, update, delete
+from sqlalchemy import select, and_, func, update, delete
 from sqlalchemy.orm import selectinload
 import structlog
 
@@ -15,6 +15,7 @@ from app.models.user import User
 from app.schemas.regenerator_schemas import (
     MaterialCreate, MaterialUpdate, MaterialResponse, MaterialFilter
 )
+from app.services import material_search
 
 
 logger = structlog.get_logger(__name__)
@@ -204,6 +205,12 @@ class MaterialsService:
         """
         Search and filter materials.
 
+        A search text goes through the full-text index (see
+        material_search) and orders results by relevance; without one they
+        are ordered by name. The total count is a window function over the
+        same query, so a page and its total take one round trip; only a page
+        past the last result needs a separate count.
+
         Args:
             filters: Search and filter criteria
             limit: Maximum number of results
@@ -213,23 +220,20 @@ class MaterialsService:
             Tuple of (materials list, total count)
         """
         # Base query
-        query = select(Material).options(selectinload(Material.created_by))
-        count_query = select(func.count(Material.id))
+        query = select(Material, func.count().over().label("total_count")).options(
+            selectinload(Material.created_by)
+        )
+        order_by = [Material.name]
+
+        if filters.search:
+            matches = await material_search.ranked_matches(self.db, filters.search)
+            if matches is not None:
+                query = query.join(matches, matches.c.material_id == Material.id)
+                order_by = material_search.search_order(matches, filters.search)
 
         # Apply filters
         conditions = []
 
-        if filters.search:
-            search_term = f"%{filters.search}%"
-            conditions.append(
-                or_(
-                    Material.name.ilike(search_term),
-                    Material.description.ilike(search_term),
-                    Material.manufacturer.ilike(search_term),
-                    Material.material_code.ilike(search_term)
-                )
-            )
-
         if filters.material_type:
             conditions.append(Material.material_type == filters.material_type)
 
@@ -260,20 +264,21 @@ class MaterialsService:
         # Apply conditions
         if conditions:
             query = query.where(and_(*conditions))
-            count_query = count_query.where(and_(*conditions))
-
-        # Get total count
-        count_result = await self.db.execute(count_query)
-        total_count = count_result.scalar()
 
         # Apply ordering, limit, and offset
-        query = query.order_by(Material.name).limit(limit).offset(offset)
+        query = query.order_by(*order_by).limit(limit).offset(offset)
 
         # Execute query
-        result = await self.db.execute(query)
-        materials = result.scalars().all()
-
-        return list(materials), total_count
+        rows = (await self.db.execute(query)).all()
+        if rows:
+            total_count = rows[0].total_count
+        elif offset:
+            count_query = select(func.count()).select_from(query.limit(None).offset(None).order_by(None).subquery())
+            total_count = (await self.db.execute(count_query)).scalar_one()
+        else:
+            total_count = 0
+
+        return [row.Material for row in rows], total_count
 
     async def get_materials_by_type(
         self,
@@ -0,0 +1,199 @@
+"""
+Checkpoints of running optimization jobs.
+
+Punkty kontrolne (checkpointy) długotrwałych zadań optymalizacji.
+
+A checkpoint holds the solver state needed to continue a job after a worker
+restart or time limit: the latest iterate, the best point so far, evaluation
+and iteration counters, the most recent evaluations and algorithm-specific
+extras (e.g. multi-start or population state). Checkpoints are zlib-compressed
+JSON kept in Redis or on disk.
+
+The history in a checkpoint is a bounded tail (OPTIMIZATION_CHECKPOINT_HISTORY),
+so saving stays cheap on long runs. An interrupted run writes its evaluations
+to iteration storage before its last checkpoint; ``persisted_evaluations``
+tells the resumed run which evaluations are already stored.
+"""
+
+import json
+import os
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from app.core.config import settings
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+
+CHECKPOINT_FORMAT_VERSION = 1
+
+_REDIS_KEY_PREFIX = "fro:optimization:checkpoint:"
+
+
+@dataclass
+class OptimizationCheckpoint:
+    """Resumable solver state of one optimization job."""
+
+    job_id: str
+    content_hash: Optional[str]
+    algorithm: str
+    current_x: List[float]
+    best_x: Optional[List[float]] = None
+    best_objective: Optional[float] = None
+    major_iterations: int = 0
+    function_evaluations: int = 0
+    resume_count: int = 0
+    persisted_evaluations: int = 0
+    history: List[Dict[str, Any]] = field(default_factory=list)
+    extra: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+
+    def to_bytes(self) -> bytes:
+        """Serialize to compressed JSON."""
+        document = {"version": CHECKPOINT_FORMAT_VERSION, **asdict(self)}
+        encoded = json.dumps(document, separators=(",", ":"), default=float)
+        return zlib.compress(encoded.encode("utf-8"), 6)
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "OptimizationCheckpoint":
+        """Deserialize a checkpoint written by ``to_bytes``."""
+        document = json.loads(zlib.decompress(payload).decode("utf-8"))
+        version = document.pop("version", None)
+        if version != CHECKPOINT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {version}")
+        return cls(**document)
+
+
+class CheckpointStore(ABC):
+    """Base class of checkpoint storage backends."""
+
+    @abstractmethod
+    def save(self, checkpoint: OptimizationCheckpoint) -> None:
+        """Store the checkpoint, replacing the job's previous one."""
+
+    @abstractmethod
+    def load(self, job_id: str) -> Optional[OptimizationCheckpoint]:
+        """Get the job's latest checkpoint, ``None`` if there is none."""
+
+    @abstractmethod
+    def delete(self, job_id: str) -> None:
+        """Remove the job's checkpoint if it exists."""
+
+
+class NullCheckpointStore(CheckpointStore):
+    """Checkpointing disabled."""
+
+    def save(self, checkpoint: OptimizationCheckpoint) -> None:
+        return None
+
+    def load(self, job_id: str) -> Optional[OptimizationCheckpoint]:
+        return None
+
+    def delete(self, job_id: str) -> None:
+        return None
+
+
+class RedisCheckpointStore(CheckpointStore):
+    """Checkpoints in Redis with a TTL, so abandoned jobs clean up themselves."""
+
+    def __init__(self, url: str, ttl_seconds: int):
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    def save(self, checkpoint: OptimizationCheckpoint) -> None:
+        self.client.set(_REDIS_KEY_PREFIX + checkpoint.job_id, checkpoint.to_bytes(), ex=self.ttl_seconds)
+
+    def load(self, job_id: str) -> Optional[OptimizationCheckpoint]:
+        payload = self.client.get(_REDIS_KEY_PREFIX + job_id)
+        return OptimizationCheckpoint.from_bytes(payload) if payload else None
+
+    def delete(self, job_id: str) -> None:
+        self.client.delete(_REDIS_KEY_PREFIX + job_id)
+
+
+class DiskCheckpointStore(CheckpointStore):
+    """Checkpoints as files, replaced atomically so a crash never leaves a torn file."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.ckpt"
+
+    def save(self, checkpoint: OptimizationCheckpoint) -> None:
+        path = self._path(checkpoint.job_id)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(checkpoint.to_bytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def load(self, job_id: str) -> Optional[OptimizationCheckpoint]:
+        path = self._path(job_id)
+        if not path.exists():
+            return None
+        return OptimizationCheckpoint.from_bytes(path.read_bytes())
+
+    def delete(self, job_id: str) -> None:
+        self._path(job_id).unlink(missing_ok=True)
+
+
+class SafeCheckpointStore(CheckpointStore):
+    """Wraps a store so checkpoint I/O errors never fail the optimization itself."""
+
+    def __init__(self, store: CheckpointStore):
+        self.store = store
+
+    def save(self, checkpoint: OptimizationCheckpoint) -> None:
+        try:
+            self.store.save(checkpoint)
+        except Exception as e:
+            logger.warning("Failed to save optimization checkpoint", job_id=checkpoint.job_id, error=str(e))
+
+    def load(self, job_id: str) -> Optional[OptimizationCheckpoint]:
+        try:
+            return self.store.load(job_id)
+        except Exception as e:
+            logger.warning("Failed to load optimization checkpoint", job_id=job_id, error=str(e))
+            return None
+
+    def delete(self, job_id: str) -> None:
+        try:
+            self.store.delete(job_id)
+        except Exception as e:
+            logger.warning("Failed to delete optimization checkpoint", job_id=job_id, error=str(e))
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Create the store configured by OPTIMIZATION_CHECKPOINT_BACKEND (redis, disk, none)."""
+    backend = settings.OPTIMIZATION_CHECKPOINT_BACKEND
+
+    try:
+        if backend == "redis":
+            if not REDIS_AVAILABLE:
+                logger.warning("redis package not installed, optimization checkpoints disabled")
+                return NullCheckpointStore()
+            store = RedisCheckpointStore(settings.REDIS_URL, settings.OPTIMIZATION_CHECKPOINT_TTL)
+        elif backend == "disk":
+            store = DiskCheckpointStore(settings.OPTIMIZATION_CHECKPOINT_DIR)
+        else:
+            return NullCheckpointStore()
+    except Exception as e:
+        logger.warning("Optimization checkpoint store unavailable", backend=backend, error=str(e))
+        return NullCheckpointStore()
+
+    return SafeCheckpointStore(store)
@@ -0,0 +1,427 @@
+"""
+Incrementally maintained optimization statistics.
+
+Statystyki optymalizacji utrzymywane przyrostowo (tabele rollup).
+
+``optimization_stat_rollups`` holds, per UTC day on which jobs finished,
+the job counts by status and the sums and counts of their results' figures,
+once per user, scenario and template and once for all jobs. Session hooks
+keep it current in the same transaction as the change: a job that reaches
+a terminal status adds its figures to the totals, and a finished job that
+is deleted, changed or gets results added or removed is taken out before
+the flush and added back after it. Templates'
+``success_rate`` and ``average_improvement`` are refreshed from their
+totals at the same time. Bulk ``UPDATE``/``DELETE`` statements bypass the
+hooks; :func:`rebuild_rollups` (the ``rebuild_optimization_rollups``
+maintenance task) recomputes everything from the job and result tables.
+
+Hooks that change the totals and the rebuild first lock the row of
+``optimization_stat_rollup_locks`` (``SELECT ... FOR UPDATE``), so a rebuild
+neither overwrites figures added by a transaction that commits while it runs
+nor misses them. Writers already wait for each other on the day's ``all``
+rows, so the lock adds no contention between them.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, UTC
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import structlog
+from sqlalchemy import delete, event, func, inspect, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import NO_VALUE
+
+from app.models.optimization import (
+    OptimizationJob,
+    OptimizationResult,
+    OptimizationScenario,
+    OptimizationStatRollup,
+    OptimizationStatRollupLock,
+    OptimizationStatus,
+    OptimizationTemplate,
+)
+
+logger = structlog.get_logger(__name__)
+
+
+TERMINAL_STATUSES = frozenset({
+    OptimizationStatus.COMPLETED.value,
+    OptimizationStatus.FAILED.value,
+    OptimizationStatus.CANCELLED.value,
+    OptimizationStatus.TIMEOUT.value,
+})
+
+USER = "user"
+SCENARIO = "scenario"
+TEMPLATE = "template"
+ALL = "all"
+ALL_KEY = ""
+
+# Summed columns of a rollup row
+FIGURES = (
+    "jobs_finished",
+    "jobs_completed",
+    "jobs_failed",
+    "jobs_cancelled",
+    "runtime_seconds_sum",
+    "runtime_count",
+    "results_count",
+    "fuel_savings_sum",
+    "fuel_savings_count",
+    "co2_reduction_sum",
+    "co2_reduction_count",
+    "thermal_efficiency_sum",
+    "thermal_efficiency_count",
+    "annual_cost_savings_sum",
+)
+
+# Session.info key of template ids whose statistics to refresh after the flush
+_PENDING_TEMPLATES = "rollup_templates"
+
+# Job columns the rollups depend on; changes to others (progress) are ignored
+_JOB_FIGURE_ATTRIBUTES = ("status", "completed_at", "created_at", "runtime_seconds", "user_id", "scenario_id")
+
+# Name of the row of optimization_stat_rollup_locks writers lock
+_LOCK_NAME = "rollups"
+
+RollupKey = Tuple[str, str, date]
+
+
+def _job_figures_stmt():
+    """Per finished job: its rollup keys, day and contribution to every figure."""
+    return select(
+        OptimizationJob.id,
+        OptimizationJob.user_id,
+        OptimizationJob.scenario_id,
+        OptimizationScenario.template_id,
+        OptimizationJob.status,
+        OptimizationJob.completed_at,
+        OptimizationJob.created_at,
+        OptimizationJob.runtime_seconds,
+        func.count(OptimizationResult.id),
+        func.coalesce(func.sum(OptimizationResult.fuel_savings_percentage), 0.0),
+        func.count(OptimizationResult.fuel_savings_percentage),
+        func.coalesce(func.sum(OptimizationResult.co2_reduction_percentage), 0.0),
+        func.count(OptimizationResult.co2_reduction_percentage),
+        func.coalesce(func.sum(OptimizationResult.thermal_efficiency), 0.0),
+        func.count(OptimizationResult.thermal_efficiency),
+        func.coalesce(func.sum(OptimizationResult.annual_cost_savings), 0.0),
+    ).join(
+        OptimizationScenario, OptimizationJob.scenario_id == OptimizationScenario.id
+    ).outerjoin(
+        OptimizationResult, OptimizationResult.job_id == OptimizationJob.id
+    ).where(
+        OptimizationJob.status.in_(TERMINAL_STATUSES)
+    ).group_by(
+        OptimizationJob.id,
+        OptimizationJob.user_id,
+        OptimizationJob.scenario_id,
+        OptimizationScenario.template_id,
+        OptimizationJob.status,
+        OptimizationJob.completed_at,
+        OptimizationJob.created_at,
+        OptimizationJob.runtime_seconds,
+    )
+
+
+def _accumulate(totals: Dict[RollupKey, Dict[str, float]], row: Any, sign: int = 1) -> None:
+    """Add (or with ``sign=-1`` subtract) one job's figures to its rollup rows."""
+    (
+        _, user_id, scenario_id, template_id, status, completed_at, created_at, runtime_seconds,
+        results_count, fuel_sum, fuel_count, co2_sum, co2_count, efficiency_sum, efficiency_count,
+        annual_savings_sum,
+    ) = row
+    finished_at = completed_at or created_at
+    day = finished_at.date() if finished_at is not None else datetime.now(UTC).date()
+    completed = status == OptimizationStatus.COMPLETED.value
+    has_runtime = completed and runtime_seconds is not None
+
+    figures = {
+        "jobs_finished": 1,
+        "jobs_completed": int(completed),
+        "jobs_failed": int(status in (OptimizationStatus.FAILED.value, OptimizationStatus.TIMEOUT.value)),
+        "jobs_cancelled": int(status == OptimizationStatus.CANCELLED.value),
+        "runtime_seconds_sum": float(runtime_seconds) if has_runtime else 0.0,
+        "runtime_count": int(has_runtime),
+        "results_count": results_count,
+        "fuel_savings_sum": float(fuel_sum),
+        "fuel_savings_count": fuel_count,
+        "co2_reduction_sum": float(co2_sum),
+        "co2_reduction_count": co2_count,
+        "thermal_efficiency_sum": float(efficiency_sum),
+        "thermal_efficiency_count": efficiency_count,
+        "annual_cost_savings_sum": float(annual_savings_sum),
+    }
+
+    keys = [(USER, str(user_id)), (SCENARIO, str(scenario_id)), (ALL, ALL_KEY)]
+    if template_id is not None:
+        keys.append((TEMPLATE, str(template_id)))
+    for dimension, key in keys:
+        row_totals = totals[(dimension, key, day)]
+        for name, value in figures.items():
+            row_totals[name] = row_totals.get(name, 0) + sign * value
+
+
+def _collect(connection: Connection, job_ids: Iterable[str],
+             totals: Dict[RollupKey, Dict[str, float]], sign: int) -> None:
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    rows = connection.execute(_job_figures_stmt().where(OptimizationJob.id.in_(job_ids)))
+    for row in rows:
+        _accumulate(totals, row, sign)
+
+
+def _lock(connection: Connection) -> None:
+    """Wait for the rollup lock row and hold it until the transaction ends."""
+    table = OptimizationStatRollupLock.__table__
+    stmt = select(table.c.name).where(table.c.name == _LOCK_NAME).with_for_update()
+    if connection.execute(stmt).first() is not None:
+        return
+
+    # Databases created without the migrations have no lock row yet
+    dialect_name = connection.dialect.name
+    if dialect_name == "mysql":
+        create = mysql.insert(table).prefix_with("IGNORE")
+    elif dialect_name in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+        create = dialect_insert(table).on_conflict_do_nothing()
+    else:
+        create = insert(table)
+    connection.execute(create.values(name=_LOCK_NAME))
+    connection.execute(stmt)
+
+
+def _upsert_stmt(dialect_name: str, values: Dict[str, Any]):
+    """INSERT of one rollup row that adds to the existing row instead of failing."""
+    table = OptimizationStatRollup.__table__
+    if dialect_name == "mysql":
+        stmt = mysql.insert(table).values(**values)
+        return stmt.on_duplicate_key_update({
+            **{name: table.c[name] + stmt.inserted[name] for name in FIGURES},
+            "updated_at": stmt.inserted.updated_at,
+        })
+    if dialect_name in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+        stmt = dialect_insert(table).values(**values)
+        return stmt.on_conflict_do_update(
+            index_elements=[table.c.dimension, table.c.key, table.c.day],
+            set_={
+                **{name: table.c[name] + stmt.excluded[name] for name in FIGURES},
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+    return None
+
+
+def _apply(connection: Connection, totals: Dict[RollupKey, Dict[str, float]]) -> None:
+    """Add ``totals`` to the stored rollup rows, creating missing ones."""
+    now = datetime.now(UTC)
+    table = OptimizationStatRollup.__table__
+    for (dimension, key, day), figures in totals.items():
+        if not any(figures.values()):
+            continue
+        values = {"dimension": dimension, "key": key, "day": day, "updated_at": now}
+        values.update({name: figures.get(name, 0) for name in FIGURES})
+
+        stmt = _upsert_stmt(connection.dialect.name, values)
+        if stmt is not None:
+            connection.execute(stmt)
+            continue
+
+        updated = connection.execute(
+            update(table)
+            .where(table.c.dimension == dimension, table.c.key == key, table.c.day == day)
+            .values(updated_at=now, **{name: table.c[name] + values[name] for name in FIGURES})
+        )
+        if updated.rowcount == 0:
+            connection.execute(insert(table).values(**values))
+
+
+def _refresh_templates(connection: Connection, template_ids: Iterable[str]) -> None:
+    """Set templates' success rate and average fuel savings from their rollups."""
+    template_ids = list(template_ids)
+    if not template_ids:
+        return
+    rows = connection.execute(
+        select(
+            OptimizationStatRollup.key,
+            func.sum(OptimizationStatRollup.jobs_finished),
+            func.sum(OptimizationStatRollup.jobs_completed),
+            func.sum(OptimizationStatRollup.fuel_savings_sum),
+            func.sum(OptimizationStatRollup.fuel_savings_count),
+        ).where(
+            OptimizationStatRollup.dimension == TEMPLATE,
+            OptimizationStatRollup.key.in_(template_ids),
+        ).group_by(OptimizationStatRollup.key)
+    )
+    stats = {key: (finished, completed, fuel_sum, fuel_count)
+             for key, finished, completed, fuel_sum, fuel_count in rows}
+
+    table = OptimizationTemplate.__table__
+    for template_id in template_ids:
+        finished, completed, fuel_sum, fuel_count = stats.get(template_id, (0, 0, 0.0, 0))
+        connection.execute(
+            update(table).where(table.c.id == template_id).values(
+                success_rate=completed / finished * 100 if finished else None,
+                average_improvement=fuel_sum / fuel_count if fuel_count else None,
+            )
+        )
+
+
+def _touched_templates(totals: Dict[RollupKey, Dict[str, float]]) -> Set[str]:
+    return {key for dimension, key, _ in totals if dimension == TEMPLATE}
+
+
+def _is_finished(status: Any) -> bool:
+    return getattr(status, "value", status) in TERMINAL_STATUSES
+
+
+def _changed_jobs(session: Session, before_flush: bool) -> Set[str]:
+    """
+    Ids of finished jobs whose rollup contribution the flush changes.
+
+    Before the flush these are the jobs to take out of the rollups as stored,
+    after it the jobs to add back as they are now.
+    """
+    job_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, OptimizationResult):
+            if obj.job_id is not None:
+                job_ids.add(obj.job_id)
+            continue
+        if not isinstance(obj, OptimizationJob):
+            continue
+
+        state = inspect(obj)
+        is_new, is_deleted = obj in session.new, obj in session.deleted
+        if not (is_new or is_deleted) and not any(
+            state.attrs[name].history.has_changes() for name in _JOB_FIGURE_ATTRIBUTES
+        ):
+            # Progress updates of running jobs leave the rollups unchanged
+            continue
+
+        if before_flush:
+            if is_new:
+                continue
+            history = state.attrs.status.history
+            old_status = history.deleted[0] if history.deleted else state.attrs.status.loaded_value
+            # An unloaded status is left to the figures query, which only finds finished jobs
+            if old_status is not NO_VALUE and not _is_finished(old_status):
+                continue
+        elif is_deleted or not _is_finished(obj.status):
+            continue
+        job_ids.add(obj.id)
+    return job_ids
+
+
+@event.listens_for(Session, "before_flush")
+def _remove_changed_jobs(session: Session, flush_context, instances) -> None:
+    """Take finished jobs the flush changes or deletes out of the rollups."""
+    job_ids = _changed_jobs(session, before_flush=True)
+    if not job_ids:
+        return
+    _lock(session.connection())
+    totals: Dict[RollupKey, Dict[str, float]] = defaultdict(dict)
+    _collect(session.connection(), job_ids, totals, sign=-1)
+    _apply(session.connection(), totals)
+    session.info.setdefault(_PENDING_TEMPLATES, set()).update(_touched_templates(totals))
+
+
+@event.listens_for(Session, "after_flush")
+def _add_changed_jobs(session: Session, flush_context) -> None:
+    """Add finished jobs the flush created or changed to the rollups."""
+    job_ids = _changed_jobs(session, before_flush=False)
+    template_ids = session.info.pop(_PENDING_TEMPLATES, set())
+    if job_ids:
+        _lock(session.connection())
+        totals: Dict[RollupKey, Dict[str, float]] = defaultdict(dict)
+        _collect(session.connection(), job_ids, totals, sign=1)
+        _apply(session.connection(), totals)
+        template_ids |= _touched_templates(totals)
+    _refresh_templates(session.connection(), template_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_TEMPLATES, None)
+
+
+async def rebuild_rollups(db: AsyncSession) -> int:
+    """
+    Recompute all rollup rows and template statistics from jobs and results.
+
+    Runs in one transaction, so readers see either the old or the new
+    totals, and holds the rollup lock from before reading the jobs, so
+    transactions finishing jobs meanwhile add to the rebuilt totals after it
+    commits. Returns the number of rollup rows written.
+    """
+    await db.run_sync(lambda session: _lock(session.connection()))
+    totals: Dict[RollupKey, Dict[str, float]] = defaultdict(dict)
+    async for row in await db.stream(_job_figures_stmt()):
+        _accumulate(totals, row)
+
+    now = datetime.now(UTC)
+    rows = [
+        {"dimension": dimension, "key": key, "day": day, "updated_at": now,
+         **{name: figures.get(name, 0) for name in FIGURES}}
+        for (dimension, key, day), figures in totals.items()
+    ]
+
+    await db.execute(delete(OptimizationStatRollup))
+    if rows:
+        await db.execute(insert(OptimizationStatRollup), rows)
+
+    template_ids = (await db.execute(select(OptimizationTemplate.id))).scalars().all()
+    await db.run_sync(lambda session: _refresh_templates(session.connection(), template_ids))
+    await db.commit()
+
+    logger.info("Optimization rollups rebuilt", rows=len(rows), templates=len(template_ids))
+    return len(rows)
+
+
+async def rollup_totals(
+    db: AsyncSession,
+    dimension: str,
+    keys: Optional[Iterable[str]] = None,
+    start_day: Optional[date] = None,
+    end_day: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Figures per day of one dimension, summed over ``keys`` (all keys if None).
+
+    Returns one dict per day in ascending order with ``day`` and every name
+    in :data:`FIGURES`; days are inclusive bounds.
+    """
+    columns = [getattr(OptimizationStatRollup, name) for name in FIGURES]
+    stmt = select(
+        OptimizationStatRollup.day, *(func.sum(column).label(column.key) for column in columns)
+    ).where(OptimizationStatRollup.dimension == dimension)
+    if keys is not None:
+        stmt = stmt.where(OptimizationStatRollup.key.in_([str(key) for key in keys]))
+    if start_day is not None:
+        stmt = stmt.where(OptimizationStatRollup.day >= start_day)
+    if end_day is not None:
+        stmt = stmt.where(OptimizationStatRollup.day <= end_day)
+    stmt = stmt.group_by(OptimizationStatRollup.day).order_by(OptimizationStatRollup.day)
+
+    return [dict(row._mapping) for row in await db.execute(stmt)]
+
+
+def sum_days(days: Iterable[Dict[str, Any]]) -> Dict[str, float]:
+    """Add up per-day figures returned by :func:`rollup_totals`."""
+    totals = dict.fromkeys(FIGURES, 0)
+    for figures in days:
+        for name in FIGURES:
+            totals[name] += figures[name] or 0
+    return totals
+
+
+def average(totals: Dict[str, float], figure: str) -> float:
+    """Mean of a result figure (``fuel_savings`` etc.) over its non-null values."""
+    count = totals[f"{figure}_count"]
+    return totals[f"{figure}_sum"] / count if count else 0.0
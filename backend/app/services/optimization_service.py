@@ -11,24 +11,52 @@ import structlog
 import asyncio
 from scipy.optimize import minimize, OptimizeResult
 from scipy.optimize import NonlinearConstraint, LinearConstraint, Bounds
+import time
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
 
 from app.models.optimization import (
-    OptimizationScenario, OptimizationJob, OptimizationResult, OptimizationIteration,
-    OptimizationStatus, OptimizationObjective, OptimizationAlgorithm
+    OptimizationScenario, OptimizationJob, OptimizationJobGroup, OptimizationResult, OptimizationIteration,
+    OptimizationIterationArchive, OptimizationStatus, OptimizationObjective, OptimizationAlgorithm
 )
 from app.models.regenerator import RegeneratorConfiguration
 from app.schemas.optimization_schemas import (
-    OptimizationJobCreate, OptimizationProgress, OptimizationResultResponse
+    OptimizationJobCreate, OptimizationJobBatchCreate, OptimizationProgress, OptimizationResultResponse
+)
+from app.services.iteration_storage import encode_iteration_history, IterationHistoryReader
+from app.services.job_scheduler import FairShareScheduler, ACTIVE_STATUSES
+from app.services.job_dedup import compute_job_content_hash, find_duplicate_job
+from app.services.optimization_checkpoint import CheckpointStore, OptimizationCheckpoint, get_checkpoint_store
+from app.services.job_profiler import JobProfiler
+from app.services import optimization_rollups  # noqa: F401  Session hooks keep the statistics rollups current
+from app.services.profiling import ProfileCapture, resolve_profile_mode, save_capture
+from app.services.early_stopping import (
+    EarlyStoppingConfig, StagnationMonitor, CRITERION_FTOL, CRITERION_MAX_ITERATIONS
 )
 from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.core.metrics import metrics
 
 logger = structlog.get_logger(__name__)
 
 
+# Metrics calculate_thermal_performance returns, in order
+PERFORMANCE_METRICS = (
+    "thermal_efficiency",
+    "heat_transfer_rate",
+    "pressure_drop",
+    "ntu_value",
+    "effectiveness",
+    "heat_transfer_coefficient",
+    "surface_area",
+    "wall_heat_loss",
+    "reynolds_number",
+    "nusselt_number",
+)
+
+
 class RegeneratorPhysicsModel:
     """
     Physics model for regenerator thermal calculations.
@@ -180,6 +208,9 @@ class OptimizationService:
         self.db = db
         self.physics_model = None
         self.progress_callback = None  # Optional callback for Celery progress updates
+        self.checkpoint_store: Optional[CheckpointStore] = None  # Defaults to the configured store
+        self.profiler = JobProfiler()  # Replaced by the worker task to include its own phases
+        self._profile_capture: Optional[ProfileCapture] = None
 
     async def create_optimization_job(
         self,
@@ -204,8 +235,14 @@ class OptimizationService:
             scenario_id=scenario_id,
             user_id=user_id,
             job_name=job_config.job_name,
-            execution_config=scenario.optimization_config,
+            execution_config=(
+                {**(scenario.optimization_config or {}), "profile": job_config.profile}
+                if job_config.profile else scenario.optimization_config
+            ),
             initial_values=job_config.initial_values or {},
+            content_hash=compute_job_content_hash(scenario, base_config, job_config.initial_values),
+            priority=job_config.priority,
+            queue_name=FairShareScheduler.queue_for_priority(job_config.priority),
             status=OptimizationStatus.PENDING
         )
 
@@ -216,58 +253,320 @@ class OptimizationService:
         logger.info("Created optimization job", job_id=job.id, scenario_id=scenario_id)
         return job
 
-    async def run_optimization(self, job_id: str) -> OptimizationResult:
+    async def find_reusable_job(
+        self,
+        scenario: OptimizationScenario,
+        base_config: RegeneratorConfiguration,
+        user_id: str,
+        initial_values: Optional[Dict[str, float]]
+    ) -> Optional[OptimizationJob]:
+        """
+        Find an in-flight or recently completed identical job of the user.
+
+        Locks the scenario row first, so concurrent identical submissions
+        (double clicks, client retries) serialize instead of both missing.
+        """
+        await self.db.execute(
+            select(OptimizationScenario.id)
+            .where(OptimizationScenario.id == scenario.id)
+            .with_for_update()
+        )
+        content_hash = compute_job_content_hash(scenario, base_config, initial_values)
+        job = await find_duplicate_job(self.db, user_id, content_hash)
+
+        if job:
+            outcome = "cached" if job.status == OptimizationStatus.COMPLETED else "in_flight"
+            metrics.track_duplicate_avoided(outcome)
+            logger.info(
+                "Duplicate optimization job avoided",
+                job_id=job.id,
+                scenario_id=scenario.id,
+                outcome=outcome
+            )
+        return job
+
+    async def create_optimization_job_group(
+        self,
+        user_id: str,
+        batch: OptimizationJobBatchCreate
+    ) -> Tuple[OptimizationJobGroup, List[str]]:
+        """
+        Create a group of optimization jobs in one transaction.
+
+        All scenarios are validated with two set-based queries and the jobs
+        are added in one flush, so the dashboard cache and statistics rollup
+        hooks see them. The batch is all-or-nothing.
+
+        Returns:
+            Tuple of (job group, IDs of the created jobs in submission order)
+
+        Raises:
+            ValidationError: If any job fails validation; ``details["invalid_jobs"]``
+                lists the failing items by index
+        """
+        scenario_ids = {item.scenario_id for item in batch.jobs}
+
+        scenario_stmt = select(OptimizationScenario, RegeneratorConfiguration).outerjoin(
+            RegeneratorConfiguration,
+            RegeneratorConfiguration.id == OptimizationScenario.base_configuration_id
+        ).where(
+            OptimizationScenario.id.in_(scenario_ids),
+            OptimizationScenario.user_id == user_id
+        )
+        scenarios = {}
+        base_configs = {}
+        for scenario, base_config in (await self.db.execute(scenario_stmt)).all():
+            scenarios[scenario.id] = scenario
+            base_configs[scenario.id] = base_config
+
+        active_stmt = select(
+            OptimizationJob.scenario_id, func.count(OptimizationJob.id)
+        ).where(
+            OptimizationJob.scenario_id.in_(scenario_ids),
+            OptimizationJob.status.in_(ACTIVE_STATUSES)
+        ).group_by(OptimizationJob.scenario_id)
+        active_per_scenario = dict((await self.db.execute(active_stmt)).all())
+
+        invalid_jobs = []
+        requested_per_scenario: Dict[str, int] = {}
+        for index, item in enumerate(batch.jobs):
+            scenario = scenarios.get(item.scenario_id)
+            requested_per_scenario[item.scenario_id] = requested_per_scenario.get(item.scenario_id, 0) + 1
+
+            if scenario is None:
+                error_type = "SCENARIO_NOT_FOUND"
+            elif not scenario.is_active:
+                error_type = "SCENARIO_INACTIVE"
+            elif not scenario.design_variables:
+                error_type = "NO_DESIGN_VARIABLES"
+            elif base_configs[item.scenario_id] is None:
+                error_type = "BASE_CONFIG_NOT_FOUND"
+            elif (active_per_scenario.get(item.scenario_id, 0) + requested_per_scenario[item.scenario_id]
+                    > settings.MAX_CONCURRENT_JOBS_PER_SCENARIO):
+                error_type = "SCENARIO_RATE_LIMIT_EXCEEDED"
+            else:
+                continue
+
+            invalid_jobs.append({"index": index, "scenario_id": item.scenario_id, "error_type": error_type})
+
+        if invalid_jobs:
+            raise ValidationError(
+                f"{len(invalid_jobs)} of {len(batch.jobs)} jobs failed validation",
+                details={"invalid_jobs": invalid_jobs}
+            )
+
+        now = datetime.now(UTC)
+        group = OptimizationJobGroup(
+            user_id=user_id,
+            name=batch.name,
+            total_jobs=len(batch.jobs),
+            created_at=now
+        )
+        self.db.add(group)
+        await self.db.flush()
+
+        jobs = []
+        for index, item in enumerate(batch.jobs):
+            # Distinct timestamps keep submission order for FIFO dispatch
+            created_at = now + timedelta(microseconds=index)
+            priority = item.priority or batch.priority
+            jobs.append(OptimizationJob(
+                id=str(uuid.uuid4()),
+                scenario_id=item.scenario_id,
+                user_id=user_id,
+                group_id=group.id,
+                job_name=item.job_name,
+                execution_config=scenarios[item.scenario_id].optimization_config,
+                initial_values=item.initial_values or {},
+                content_hash=compute_job_content_hash(
+                    scenarios[item.scenario_id], base_configs[item.scenario_id], item.initial_values
+                ),
+                priority=priority,
+                queue_name=FairShareScheduler.queue_for_priority(priority),
+                status=OptimizationStatus.PENDING,
+                warning_messages=[],
+                created_at=created_at,
+                updated_at=created_at
+            ))
+
+        self.db.add_all(jobs)
+        await self.db.commit()
+
+        logger.info("Created optimization job group", group_id=group.id, total_jobs=len(jobs))
+        return group, [job.id for job in jobs]
+
+    async def _get_job_group(self, group_id: str, user_id: str) -> Optional[OptimizationJobGroup]:
+        """Get a job group owned by the user."""
+        stmt = select(OptimizationJobGroup).where(
+            OptimizationJobGroup.id == group_id,
+            OptimizationJobGroup.user_id == user_id
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_job_group_progress(self, group_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Aggregate progress of all jobs in a group with one grouped query."""
+        group = await self._get_job_group(group_id, user_id)
+        if not group:
+            return None
+
+        stmt = select(
+            OptimizationJob.status,
+            func.count(OptimizationJob.id),
+            func.sum(OptimizationJob.progress_percentage)
+        ).where(OptimizationJob.group_id == group_id).group_by(OptimizationJob.status)
+
+        status_counts: Dict[str, int] = {}
+        finished_jobs = 0
+        progress_sum = 0.0
+        for status, count, progress in (await self.db.execute(stmt)).all():
+            status_counts[status] = count
+            if status in ACTIVE_STATUSES:
+                progress_sum += progress or 0.0
+            else:
+                finished_jobs += count
+                progress_sum += 100.0 * count
+
+        total_jobs = group.total_jobs or 0
+        return {
+            "group_id": group.id,
+            "name": group.name,
+            "total_jobs": total_jobs,
+            "status_counts": status_counts,
+            "finished_jobs": finished_jobs,
+            "progress_percentage": progress_sum / total_jobs if total_jobs else 100.0,
+            "is_finished": finished_jobs >= total_jobs
+        }
+
+    async def get_job_group_results(self, group_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Combined results summary of a job group."""
+        group = await self._get_job_group(group_id, user_id)
+        if not group:
+            return None
+
+        stmt = select(
+            OptimizationJob.id,
+            OptimizationJob.scenario_id,
+            OptimizationJob.job_name,
+            OptimizationJob.status,
+            OptimizationJob.error_message,
+            OptimizationResult.objective_value,
+            OptimizationResult.fuel_savings_percentage,
+            OptimizationResult.co2_reduction_percentage,
+            OptimizationResult.annual_cost_savings
+        ).outerjoin(
+            OptimizationResult, OptimizationResult.job_id == OptimizationJob.id
+        ).where(OptimizationJob.group_id == group_id).order_by(OptimizationJob.created_at.asc())
+
+        jobs = [dict(row._mapping) for row in (await self.db.execute(stmt)).all()]
+        completed = [job for job in jobs if job["status"] == OptimizationStatus.COMPLETED]
+
+        def _values(key: str) -> List[float]:
+            return [job[key] for job in completed if job[key] is not None]
+
+        fuel_savings = _values("fuel_savings_percentage")
+        co2_reduction = _values("co2_reduction_percentage")
+        cost_savings = _values("annual_cost_savings")
+        with_objective = [job for job in completed if job["objective_value"] is not None]
+        best = min(with_objective, key=lambda job: job["objective_value"]) if with_objective else None
+
+        return {
+            "group_id": group.id,
+            "name": group.name,
+            "total_jobs": group.total_jobs,
+            "completed_jobs": len(completed),
+            "failed_jobs": sum(1 for job in jobs if job["status"] == OptimizationStatus.FAILED),
+            "best_job_id": best["id"] if best else None,
+            "best_objective_value": best["objective_value"] if best else None,
+            "average_fuel_savings_percentage": sum(fuel_savings) / len(fuel_savings) if fuel_savings else None,
+            "max_fuel_savings_percentage": max(fuel_savings) if fuel_savings else None,
+            "average_co2_reduction_percentage": sum(co2_reduction) / len(co2_reduction) if co2_reduction else None,
+            "total_annual_cost_savings": sum(cost_savings) if cost_savings else None,
+            "jobs": jobs
+        }
+
+    async def run_optimization(
+        self,
+        job_id: str,
+        resumable_errors: Tuple[type, ...] = ()
+    ) -> OptimizationResult:
         """
         Run optimization algorithm for the given job.
         Main optimization logic using SLSQP or other algorithms.
+
+        Resumes from the job's latest checkpoint if one exists. Errors listed in
+        ``resumable_errors`` (e.g. a Celery soft time limit) save a checkpoint and
+        propagate without marking the job as failed, so it can be re-dispatched.
+
+        Phase timings, memory and evaluation times of the run are stored in the
+        job's resource usage fields (see ``app.services.job_profiler``).
         """
+        if self.checkpoint_store is None:
+            self.checkpoint_store = get_checkpoint_store()
+        profiler = self.profiler
 
         # Get job and scenario
-        job = await self._get_job(job_id)
-        if not job:
-            raise ValueError(f"Job {job_id} not found")
+        with profiler.phase("load"):
+            job = await self._get_job(job_id)
+            if not job:
+                raise ValueError(f"Job {job_id} not found")
 
-        scenario = await self._get_scenario(job.scenario_id)
-        base_config = await self._get_configuration(scenario.base_configuration_id)
+            scenario = await self._get_scenario(job.scenario_id)
+            base_config = await self._get_configuration(scenario.base_configuration_id)
 
+        self._start_profile_capture(job)
         try:
-            # Update job status
-            await self._update_job_status(job_id, OptimizationStatus.INITIALIZING)
-
-            # Initialize physics model
-            full_config = {
-                'geometry_config': base_config.geometry_config or {},
-                'materials_config': base_config.materials_config or {},
-                'thermal_config': base_config.thermal_config or {},
-                'flow_config': base_config.flow_config or {}
-            }
-            self.physics_model = RegeneratorPhysicsModel(full_config)
+            with profiler.phase("setup"):
+                # Update job status
+                await self._update_job_status(job_id, OptimizationStatus.INITIALIZING)
+
+                # Initialize physics model
+                full_config = {
+                    'geometry_config': base_config.geometry_config or {},
+                    'materials_config': base_config.materials_config or {},
+                    'thermal_config': base_config.thermal_config or {},
+                    'flow_config': base_config.flow_config or {}
+                }
+                self.physics_model = RegeneratorPhysicsModel(full_config)
 
-            # Set up optimization problem
-            bounds, constraints, initial_guess = self._setup_optimization_problem(scenario, job)
+                # Set up optimization problem
+                bounds, constraints, initial_guess = self._setup_optimization_problem(scenario, job)
+                checkpoint = self._load_checkpoint(job, scenario, initial_guess)
 
-            # Update to running
-            await self._update_job_status(job_id, OptimizationStatus.RUNNING)
+                # Update to running
+                await self._update_job_status(job_id, OptimizationStatus.RUNNING)
 
             # Run optimization algorithm
             if scenario.algorithm == OptimizationAlgorithm.SLSQP:
                 result = await self._run_slsqp_optimization(
-                    job_id, scenario, initial_guess, bounds, constraints
+                    job_id, scenario, initial_guess, bounds, constraints,
+                    checkpoint=checkpoint, resumable_errors=resumable_errors
                 )
             else:
                 raise ValueError(f"Algorithm {scenario.algorithm} not implemented yet")
 
             # Process results
-            optimization_result = await self._process_optimization_result(
-                job_id, result, scenario, base_config
-            )
+            with profiler.phase("persist"):
+                optimization_result = await self._process_optimization_result(
+                    job_id, result, scenario, base_config
+                )
+
+            with profiler.phase("finalize"):
+                await self._record_convergence(job_id, result)
 
-            # Update job status
-            await self._update_job_status(job_id, OptimizationStatus.COMPLETED)
+                # Update job status
+                await self._update_job_status(job_id, OptimizationStatus.COMPLETED)
+                self.checkpoint_store.delete(job_id)
 
+            await self._store_resource_usage(job_id)
             logger.info("Optimization completed successfully", job_id=job_id)
             return optimization_result
 
+        except resumable_errors as e:
+            logger.warning("Optimization interrupted, checkpoint kept for resume", job_id=job_id, error=str(e))
+            await self._store_resource_usage(job_id)
+            raise
+
         except Exception as e:
             logger.error("Optimization failed", job_id=job_id, error=str(e))
             await self._update_job_status(
@@ -275,30 +574,166 @@ class OptimizationService:
                 OptimizationStatus.FAILED,
                 error_message=str(e)
             )
+            await self._store_resource_usage(job_id)
             raise
 
+    def _start_profile_capture(self, job: OptimizationJob) -> None:
+        """Profile the run if the job's execution config asks for it."""
+        mode = resolve_profile_mode((job.execution_config or {}).get("profile"))
+        if mode is None:
+            return
+        try:
+            self._profile_capture = ProfileCapture(f"job-{job.id}", mode).start()
+        except RuntimeError as e:
+            logger.warning("Job profiling skipped", job_id=job.id, error=str(e))
+
+    async def _store_resource_usage(self, job_id: str) -> None:
+        """Store the profiler summary on the job and export it to Prometheus."""
+        self.profiler.stop()
+        usage = self.profiler.summary()
+        if self._profile_capture is not None:
+            usage["profile"] = save_capture(self._profile_capture)
+            self._profile_capture = None
+        try:
+            job = await self._get_job(job_id)
+            if job:
+                job.memory_usage_mb = usage["peak_rss_mb"]
+                job.cpu_usage_percentage = usage["cpu_percentage"]
+                job.resource_usage = usage
+                await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning("Failed to store job resource usage", job_id=job_id, error=str(e))
+
+        metrics.track_job_resource_usage(usage, self.profiler.evaluation_times)
+        logger.info(
+            "Optimization resource usage",
+            job_id=job_id,
+            wall_seconds=usage["wall_seconds"],
+            cpu_seconds=usage["cpu_seconds"],
+            db_seconds=usage["db_seconds"],
+            peak_rss_mb=usage["peak_rss_mb"],
+            phases={name: round(p["wall_seconds"], 4) for name, p in usage["phases"].items()}
+        )
+
+    def _load_checkpoint(
+        self,
+        job: OptimizationJob,
+        scenario: OptimizationScenario,
+        initial_guess: np.ndarray
+    ) -> Optional[OptimizationCheckpoint]:
+        """Load the job's checkpoint if it matches the job's current inputs."""
+        checkpoint = self.checkpoint_store.load(job.id)
+        if checkpoint is None:
+            return None
+
+        if (checkpoint.content_hash != job.content_hash
+                or checkpoint.algorithm != scenario.algorithm
+                or len(checkpoint.current_x) != len(initial_guess)):
+            logger.warning("Discarding stale optimization checkpoint", job_id=job.id)
+            self.checkpoint_store.delete(job.id)
+            return None
+
+        checkpoint.resume_count += 1
+        logger.info(
+            "Resuming optimization from checkpoint",
+            job_id=job.id,
+            major_iterations=checkpoint.major_iterations,
+            function_evaluations=checkpoint.function_evaluations,
+            resume_count=checkpoint.resume_count
+        )
+        return checkpoint
+
     async def _run_slsqp_optimization(
         self,
         job_id: str,
         scenario: OptimizationScenario,
         initial_guess: np.ndarray,
         bounds: Bounds,
-        constraints: List
+        constraints: List,
+        checkpoint: Optional[OptimizationCheckpoint] = None,
+        resumable_errors: Tuple[type, ...] = ()
     ) -> OptimizeResult:
-        """Run SLSQP optimization algorithm."""
+        """
+        Run SLSQP optimization algorithm.
+
+        SLSQP keeps no state worth restoring beyond the iterate itself, so a
+        resumed run warm-starts from the checkpointed iterate with the
+        remaining iteration budget.
+
+        Besides ``ftol`` the run stops early on stagnation (see
+        ``app.services.early_stopping``); the result then carries the
+        triggered criterion in ``stop_criterion``.
+        """
+
+        iteration_count = checkpoint.function_evaluations if checkpoint else 0
+        major_iterations = checkpoint.major_iterations if checkpoint else 0
+        current_x = np.clip(np.array(checkpoint.current_x), bounds.lb, bounds.ub) if checkpoint else initial_guess
+        best_x = checkpoint.best_x if checkpoint else None
+        best_objective = checkpoint.best_objective if checkpoint else None
+        resume_count = checkpoint.resume_count if checkpoint else 0
+        persisted_evaluations = checkpoint.persisted_evaluations if checkpoint else 0
+        # Evaluations recorded before the history tail restored from the checkpoint
+        history_offset = checkpoint.function_evaluations - len(checkpoint.history) if checkpoint else 0
+        job = await self._get_job(job_id)
+        content_hash = job.content_hash if job else None
+        monitor = StagnationMonitor(
+            EarlyStoppingConfig.from_settings((scenario.optimization_config or {}).get("early_stopping")),
+            bounds.lb, bounds.ub
+        )
+        last_evaluation: Dict[str, Any] = {}
 
-        iteration_count = 0
+        def save_checkpoint() -> None:
+            history_start = max(0, len(self._iteration_data) - settings.OPTIMIZATION_CHECKPOINT_HISTORY)
+            self.checkpoint_store.save(OptimizationCheckpoint(
+                job_id=job_id,
+                content_hash=content_hash,
+                algorithm=scenario.algorithm,
+                current_x=[float(v) for v in current_x],
+                best_x=best_x,
+                best_objective=best_objective,
+                major_iterations=major_iterations,
+                # Recorded evaluations only - an interrupted evaluation is redone on resume
+                function_evaluations=history_offset + len(self._iteration_data),
+                resume_count=resume_count,
+                persisted_evaluations=persisted_evaluations,
+                history=self._iteration_data[history_start:]
+            ))
+
+        def iteration_callback(xk: np.ndarray) -> None:
+            """Called by SLSQP after each major iteration."""
+            nonlocal major_iterations, current_x
+            major_iterations += 1
+            current_x = np.array(xk, copy=True)
+            if major_iterations % max(1, settings.OPTIMIZATION_CHECKPOINT_INTERVAL) == 0:
+                save_checkpoint()
+
+            # SLSQP has normally just evaluated the accepted iterate
+            if np.array_equal(last_evaluation.get("x"), xk):
+                obj_value, performance = last_evaluation["objective"], last_evaluation["performance"]
+            else:
+                performance = self.physics_model.calculate_thermal_performance(
+                    self._array_to_design_vars(xk, scenario.design_variables)
+                )
+                obj_value = -performance["thermal_efficiency"]
+            violation = monitor.constraint_violation(self._constraint_values(performance))
+            if monitor.update(xk, obj_value, violation):
+                # scipy >= 1.11 ends the run cleanly on StopIteration from the callback
+                raise StopIteration
 
         def objective_function(x: np.ndarray) -> float:
             """Objective function to minimize."""
-            nonlocal iteration_count
+            nonlocal iteration_count, best_x, best_objective
             iteration_count += 1
 
             # Convert array to design variables dict
             design_vars = self._array_to_design_vars(x, scenario.design_variables)
 
             # Calculate physics
+            evaluation_start = time.perf_counter()
             performance = self.physics_model.calculate_thermal_performance(design_vars)
+            evaluation_time = time.perf_counter() - evaluation_start
+            self.profiler.record_evaluation(evaluation_time)
 
             # Calculate objective based on scenario
             if scenario.objective == OptimizationObjective.MINIMIZE_FUEL_CONSUMPTION:
@@ -319,9 +754,15 @@ class OptimizationService:
                 'iteration': iteration_count,
                 'design_vars': design_vars.copy(),
                 'objective_value': obj_value,
-                'performance': performance.copy()
+                'performance': performance.copy(),
+                'evaluation_time_seconds': evaluation_time
             })
 
+            if best_objective is None or obj_value < best_objective:
+                best_objective = float(obj_value)
+                best_x = [float(v) for v in x]
+            last_evaluation.update(x=np.array(x, copy=True), objective=obj_value, performance=performance)
+
             # Call progress callback if provided (for Celery progress updates)
             if self.progress_callback:
                 try:
@@ -334,20 +775,10 @@ class OptimizationService:
         def constraint_function(x: np.ndarray) -> np.ndarray:
             """Constraint function."""
             design_vars = self._array_to_design_vars(x, scenario.design_variables)
+            evaluation_start = time.perf_counter()
             performance = self.physics_model.calculate_thermal_performance(design_vars)
-
-            constraints_values = []
-
-            # Pressure drop constraint (< 2000 Pa)
-            constraints_values.append(2000 - performance["pressure_drop"])
-
-            # Thermal efficiency constraint (> 0.2)
-            constraints_values.append(performance["thermal_efficiency"] - 0.2)
-
-            # Heat transfer coefficient constraint (> 50 W/m²K)
-            constraints_values.append(performance["heat_transfer_coefficient"] - 50)
-
-            return np.array(constraints_values)
+            self.profiler.record_evaluation(time.perf_counter() - evaluation_start)
+            return self._constraint_values(performance)
 
         # Set up constraints
         nonlinear_constraint = NonlinearConstraint(
@@ -356,35 +787,98 @@ class OptimizationService:
             ub=np.inf
         )
 
-        # Initialize iteration data storage
-        self._iteration_data = []
+        # Initialize iteration data storage (restored history when resuming)
+        self._iteration_data = list(checkpoint.history) if checkpoint else []
 
         # SLSQP optimization
-        result = minimize(
-            objective_function,
-            initial_guess,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=[nonlinear_constraint],
-            options={
-                'maxiter': scenario.max_iterations,
-                'ftol': scenario.tolerance,
-                'disp': True
-            }
+        try:
+            with self.profiler.phase("solve"):
+                result = minimize(
+                    objective_function,
+                    current_x,
+                    method='SLSQP',
+                    bounds=bounds,
+                    constraints=[nonlinear_constraint],
+                    callback=iteration_callback,
+                    options={
+                        'maxiter': max(1, scenario.max_iterations - major_iterations),
+                        'ftol': scenario.tolerance,
+                        'disp': True
+                    }
+                )
+        except resumable_errors:
+            # Store this run's evaluations so the checkpoint only needs the recent tail
+            try:
+                with self.profiler.phase("persist"):
+                    await self._persist_iteration_history(
+                        job_id, [r for r in self._iteration_data if r['iteration'] > persisted_evaluations]
+                    )
+                persisted_evaluations = history_offset + len(self._iteration_data)
+            except Exception as e:
+                logger.warning("Failed to store iterations of interrupted run", job_id=job_id, error=str(e))
+            save_checkpoint()
+            raise
+
+        if monitor.triggered:
+            result.success = True
+            result.status = 0
+            result.message = f"Early stopping: {monitor.triggered}"
+            result.fun = float(monitor.summary()["last_objective"])
+            result.stop_criterion = monitor.triggered
+        elif result.get("status") == 9:
+            result.stop_criterion = CRITERION_MAX_ITERATIONS
+        elif result.success:
+            result.stop_criterion = CRITERION_FTOL
+        else:
+            result.stop_criterion = None
+        result.early_stopping = monitor.summary()
+        result.major_iterations = major_iterations
+        result.function_evaluations = history_offset + len(self._iteration_data)
+        logger.info(
+            "SLSQP finished",
+            job_id=job_id,
+            stop_criterion=result.stop_criterion,
+            major_iterations=major_iterations,
+            function_evaluations=result.function_evaluations
         )
 
-        # Log all iterations after optimization completes
-        for iter_data in getattr(self, '_iteration_data', []):
-            await self._log_iteration(
-                job_id,
-                iter_data['iteration'],
-                iter_data['design_vars'],
-                iter_data['objective_value'],
-                iter_data['performance']
+        # Log all iterations after optimization completes (an interrupted run stored its own)
+        with self.profiler.phase("persist"):
+            await self._persist_iteration_history(
+                job_id, [r for r in self._iteration_data if r['iteration'] > persisted_evaluations]
             )
 
         return result
 
+    @staticmethod
+    def _constraint_values(performance: Dict[str, float]) -> np.ndarray:
+        """Constraint values g(x) >= 0 for a performance evaluation."""
+        return np.array([
+            # Pressure drop constraint (< 2000 Pa)
+            2000 - performance["pressure_drop"],
+            # Thermal efficiency constraint (> 0.2)
+            performance["thermal_efficiency"] - 0.2,
+            # Heat transfer coefficient constraint (> 50 W/m²K)
+            performance["heat_transfer_coefficient"] - 50
+        ])
+
+    async def _record_convergence(self, job_id: str, result: OptimizeResult) -> None:
+        """Store why the solver stopped in the job's convergence fields."""
+        job = await self._get_job(job_id)
+        if not job:
+            return
+
+        criterion = getattr(result, "stop_criterion", None)
+        job.convergence_achieved = criterion is not None and criterion != CRITERION_MAX_ITERATIONS
+        job.convergence_criteria = {
+            "criterion": criterion,
+            "message": str(result.get("message", "")),
+            "major_iterations": getattr(result, "major_iterations", None),
+            "function_evaluations": getattr(result, "function_evaluations", None),
+            "early_stopping": getattr(result, "early_stopping", None)
+        }
+        await self.db.commit()
+
     def _setup_optimization_problem(
         self,
         scenario: OptimizationScenario,
@@ -441,13 +935,122 @@ class OptimizationService:
             design_vars[var_name] = float(x[i])
         return design_vars
 
+    async def _persist_iteration_history(self, job_id: str, iteration_data: List[Dict[str, Any]]):
+        """
+        Persist collected iterations using the configured storage mode.
+
+        ``rows`` writes one OptimizationIteration per evaluation, ``columnar`` writes
+        the whole history as a single compressed OptimizationIterationArchive;
+        iterations of a resumed job are merged into the archive it already has.
+
+        Raises:
+            Exception: If the archive cannot be stored; the job then fails instead
+                of completing without its history
+        """
+        if settings.OPTIMIZATION_ITERATION_STORAGE != "columnar":
+            for iter_data in iteration_data:
+                await self._log_iteration(
+                    job_id,
+                    iter_data['iteration'],
+                    iter_data['design_vars'],
+                    iter_data['objective_value'],
+                    iter_data['performance'],
+                    iter_data.get('evaluation_time_seconds')
+                )
+            return
+
+        try:
+            archive = await self._get_iteration_archive(job_id)
+            if archive is not None:
+                iteration_data = IterationHistoryReader(archive.payload, job_id).records() + list(iteration_data)
+            else:
+                archive = OptimizationIterationArchive(job_id=job_id)
+
+            encoded = encode_iteration_history(
+                iteration_data, chunk_size=settings.OPTIMIZATION_ITERATION_CHUNK_SIZE
+            )
+            archive.storage_format = encoded["format"]
+            archive.row_count = encoded["row_count"]
+            archive.chunk_size = encoded["chunk_size"]
+            archive.variable_names = encoded["variable_names"]
+            archive.metric_names = encoded["metric_names"]
+            archive.payload = encoded["payload"]
+            archive.payload_size_bytes = encoded["payload_size_bytes"]
+            self.db.add(archive)
+            await self.db.commit()
+
+            logger.info(
+                "Stored iteration archive",
+                job_id=job_id,
+                rows=encoded["row_count"],
+                size_bytes=encoded["payload_size_bytes"]
+            )
+        except Exception as e:
+            await self.db.rollback()
+            logger.error("Failed to store iteration archive", job_id=job_id, error=str(e))
+            raise
+
+    async def _get_iteration_archive(self, job_id: str) -> Optional[OptimizationIterationArchive]:
+        """Get the job's iteration archive, if one exists."""
+        stmt = select(OptimizationIterationArchive).where(
+            OptimizationIterationArchive.job_id == job_id
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def _get_iteration_reader(self, job_id: str) -> Optional[IterationHistoryReader]:
+        """Get a lazy reader for the job's iteration archive, if one exists."""
+        archive = await self._get_iteration_archive(job_id)
+        if not archive:
+            return None
+        return IterationHistoryReader(archive.payload, job_id)
+
+    async def get_iterations(self, job_id: str, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get a page of optimization iterations for a job.
+
+        Served from the columnar archive when the job has one, otherwise from
+        OptimizationIteration rows. Both paths return the same dictionary shape.
+        """
+        reader = await self._get_iteration_reader(job_id)
+        if reader is not None:
+            return reader.read(skip, limit)
+
+        stmt = select(OptimizationIteration).where(
+            OptimizationIteration.job_id == job_id
+        ).order_by(OptimizationIteration.iteration_number.asc()).offset(skip).limit(limit)
+
+        result = await self.db.execute(stmt)
+        return [self._iteration_to_dict(iteration) for iteration in result.scalars().all()]
+
+    @staticmethod
+    def _iteration_to_dict(iteration: OptimizationIteration) -> Dict[str, Any]:
+        """Serialize an OptimizationIteration row for the API."""
+        return {
+            "id": str(iteration.id),
+            "job_id": str(iteration.job_id),
+            "iteration_number": iteration.iteration_number,
+            "function_evaluation": iteration.function_evaluation,
+            "design_variables": iteration.design_variables,
+            "objective_value": iteration.objective_value,
+            "objective_components": iteration.objective_components,
+            "constraint_values": iteration.constraint_values,
+            "constraint_violations": iteration.constraint_violations,
+            "performance_metrics": iteration.performance_metrics,
+            "evaluation_time_seconds": iteration.evaluation_time_seconds,
+            "is_feasible": iteration.is_feasible,
+            "is_improvement": iteration.is_improvement,
+            "created_at": iteration.created_at.isoformat() if iteration.created_at else None
+        }
+
     async def _log_iteration(
         self,
         job_id: str,
         iteration: int,
         design_vars: Dict,
         objective_value: float,
-        performance: Dict
+        performance: Dict,
+        evaluation_time_seconds: Optional[float] = None
     ):
         """Log optimization iteration to database."""
         try:
@@ -459,7 +1062,7 @@ class OptimizationService:
                 objective_value=objective_value,
                 performance_metrics=performance,
                 is_improvement=iteration == 1 or objective_value < getattr(self, '_best_objective', float('inf')),
-                evaluation_time_seconds=0.1  # Placeholder
+                evaluation_time_seconds=evaluation_time_seconds
             )
 
             self.db.add(iteration_record)
@@ -537,33 +1140,50 @@ class OptimizationService:
 
     async def get_optimization_progress(self, job_id: str) -> OptimizationProgress:
         """Get current optimization progress."""
-        job = await self._get_job(job_id)
-        if not job:
+        # One query for the job and its scenario's iteration limit; populate_existing
+        # refreshes a job already in the session, as when the SSE stream polls
+        stmt = select(OptimizationJob, OptimizationScenario.max_iterations).join(
+            OptimizationScenario, OptimizationJob.scenario_id == OptimizationScenario.id
+        ).where(OptimizationJob.id == job_id).execution_options(populate_existing=True)
+        row = (await self.db.execute(stmt)).one_or_none()
+        if not row:
             raise ValueError(f"Job {job_id} not found")
+        job, max_iterations = row
 
         # Get latest iterations
-        stmt = select(OptimizationIteration).where(
-            OptimizationIteration.job_id == job_id
-        ).order_by(OptimizationIteration.iteration_number.desc()).limit(10)
+        reader = await self._get_iteration_reader(job_id)
+        if reader is not None:
+            recent_iterations = [
+                {
+                    "iteration": it["iteration_number"],
+                    "objective_value": it["objective_value"],
+                    "design_variables": it["design_variables"]
+                }
+                for it in reader.tail(10)
+            ]
+        else:
+            stmt = select(OptimizationIteration).where(
+                OptimizationIteration.job_id == job_id
+            ).order_by(OptimizationIteration.iteration_number.desc()).limit(10)
 
-        result = await self.db.execute(stmt)
-        recent_iterations = result.scalars().all()
+            result = await self.db.execute(stmt)
+            recent_iterations = [
+                {
+                    "iteration": it.iteration_number,
+                    "objective_value": it.objective_value,
+                    "design_variables": it.design_variables
+                }
+                for it in result.scalars().all()
+            ]
 
         return OptimizationProgress(
             job_id=job_id,
             status=job.status,
             current_iteration=job.current_iteration,
-            max_iterations=job.scenario.max_iterations,
+            max_iterations=max_iterations,
             progress_percentage=job.progress_percentage,
             current_objective_value=job.final_objective_value,
-            recent_iterations=[
-                {
-                    "iteration": it.iteration_number,
-                    "objective_value": it.objective_value,
-                    "design_variables": it.design_variables
-                }
-                for it in recent_iterations
-            ],
+            recent_iterations=recent_iterations,
             estimated_completion_at=job.estimated_completion_at,
             runtime_seconds=job.runtime_seconds or 0
         )
@@ -974,6 +1594,10 @@ class OptimizationService:
             if status in [OptimizationStatus.COMPLETED, OptimizationStatus.FAILED]:
                 job.completed_at = datetime.now(UTC)
                 if job.started_at:
-                    job.runtime_seconds = (job.completed_at - job.started_at).total_seconds()
+                    # Loaded from the database (e.g. a resumed job) the start time is naive UTC
+                    started_at = job.started_at
+                    if started_at.tzinfo is None:
+                        started_at = started_at.replace(tzinfo=UTC)
+                    job.runtime_seconds = (job.completed_at - started_at).total_seconds()
 
             await self.db.commit()
\ No newline at end of file
@@ -2,12 +2,20 @@
 PDF report generation service.
 
 Serwis generowania raportów PDF.
+
+Charts are ReportLab vector drawings. A chart's widgets are expanded into
+plain shapes once and kept in a per-process LRU cache keyed by a hash of the
+chart's type, title, labels and data, so identical charts in later documents
+rendered by the same process are not laid out again.
 """
 
+import hashlib
 import io
+import threading
+from collections import OrderedDict
 from datetime import datetime, UTC
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import json
 
 try:
@@ -27,6 +35,114 @@ except ImportError:
     REPORTLAB_AVAILABLE = False
 
 
+# Bump when chart drawings change, so cached ones are not reused
+CHART_RENDER_VERSION = 1
+
+# Drawings kept per process
+CHART_CACHE_SIZE = 256
+
+CHART_WIDTH = 450
+CHART_HEIGHT = 220
+
+# At most this many category labels are printed; the bars or points are all drawn
+CHART_MAX_LABELS = 12
+
+CHART_COLORS = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4', '#84cc16', '#f97316']
+
+_chart_cache: "OrderedDict[str, Drawing]" = OrderedDict()
+_chart_cache_lock = threading.Lock()
+
+
+def chart_cache_key(chart: Dict[str, Any]) -> str:
+    """Hex SHA-256 of what a chart's drawing depends on."""
+    document = {
+        "version": CHART_RENDER_VERSION,
+        "type": chart.get('type', 'bar'),
+        "title": chart.get('title', 'Chart'),
+        "labels": chart.get('labels', []),
+        "data": chart.get('data', []),
+    }
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def render_chart(chart: Dict[str, Any]) -> Optional["Drawing"]:
+    """
+    Drawing of a chart, from the cache when an identical one was drawn before.
+
+    Args:
+        chart: Chart with ``type`` (bar, line or pie), ``title``, ``labels`` and ``data``
+
+    Returns:
+        Drawing of primitive shapes, shared between documents and not to be
+        modified, or None for a chart without data
+    """
+    key = chart_cache_key(chart)
+    with _chart_cache_lock:
+        drawing = _chart_cache.get(key)
+        if drawing is not None:
+            _chart_cache.move_to_end(key)
+            return drawing
+
+    drawing = _draw_chart(chart)
+    if drawing is None:
+        return None
+
+    with _chart_cache_lock:
+        _chart_cache[key] = drawing
+        while len(_chart_cache) > CHART_CACHE_SIZE:
+            _chart_cache.popitem(last=False)
+    return drawing
+
+
+def _draw_chart(chart: Dict[str, Any]) -> Optional["Drawing"]:
+    """Lay out a chart and expand its widgets into shapes."""
+    values = [float(value) if isinstance(value, (int, float)) else 0.0 for value in chart.get('data') or []]
+    if not values:
+        return None
+    labels = [str(label) for label in chart.get('labels') or []][:len(values)]
+    labels += [''] * (len(values) - len(labels))
+
+    drawing = Drawing(CHART_WIDTH, CHART_HEIGHT)
+    chart_type = chart.get('type', 'bar')
+
+    if chart_type == 'pie':
+        widget = Pie()
+        widget.x, widget.y = 40, 20
+        widget.width = widget.height = CHART_HEIGHT - 40
+        widget.data = [max(value, 0.0) for value in values]
+        if not any(widget.data):
+            return None
+        widget.labels = labels
+        widget.simpleLabels = True
+        widget.slices.strokeColor = colors.white
+        for index in range(len(values)):
+            widget.slices[index].fillColor = colors.HexColor(CHART_COLORS[index % len(CHART_COLORS)])
+    else:
+        widget = HorizontalLineChart() if chart_type == 'line' else VerticalBarChart()
+        widget.x, widget.y = 50, 40
+        widget.width, widget.height = CHART_WIDTH - 70, CHART_HEIGHT - 60
+        widget.data = [values]
+        step = max(1, -(-len(labels) // CHART_MAX_LABELS))
+        widget.categoryAxis.categoryNames = [label if index % step == 0 else '' for index, label in enumerate(labels)]
+        widget.categoryAxis.labels.fontSize = 7
+        widget.categoryAxis.labels.angle = 30 if len(labels) > 6 else 0
+        widget.categoryAxis.labels.boxAnchor = 'ne' if len(labels) > 6 else 'n'
+        widget.valueAxis.labels.fontSize = 7
+        widget.valueAxis.valueMin = min(0.0, min(values))
+        if max(values) == widget.valueAxis.valueMin:
+            widget.valueAxis.valueMax = widget.valueAxis.valueMin + 1
+        if chart_type == 'line':
+            widget.lines[0].strokeColor = colors.HexColor(CHART_COLORS[0])
+            widget.lines[0].strokeWidth = 1.5
+        else:
+            widget.bars[0].fillColor = colors.HexColor(CHART_COLORS[0])
+            widget.bars[0].strokeColor = None
+
+    drawing.add(widget)
+    return drawing.expandUserNodes()
+
+
 class PDFGenerator:
     """PDF report generator using ReportLab."""
 
@@ -329,10 +445,11 @@ class PDFGenerator:
         # Chart title
         story.append(Paragraph(chart_title, self.styles['SectionHeader']))
 
-        # For now, create a placeholder for charts
-        # In a full implementation, you would generate actual charts
-        story.append(Paragraph(f"[{chart_type.upper()} CHART PLACEHOLDER]", self.styles['Normal']))
-        story.append(Paragraph(f"Data: {chart_config.get('data', [])}", self.styles['Normal']))
+        drawing = render_chart(chart_config)
+        if drawing is not None:
+            story.append(drawing)
+        else:
+            story.append(Paragraph(f"No data for this {chart_type} chart.", self.styles['Normal']))
         story.append(Spacer(1, 20))
 
         return story
@@ -0,0 +1,148 @@
+"""
+Process pool for PDF rendering.
+
+Pula procesów do renderowania raportów PDF.
+
+Laying out a PDF with charts is CPU-bound Python, so documents are rendered
+on a pool of REPORT_PDF_WORKERS spawned processes instead of on the event
+loop or its threads. Workers are kept between documents, each with its own
+chart cache (see ``pdf_generator.render_chart``). A document gets
+REPORT_PDF_TIMEOUT_SECONDS: the worker arms an interval timer that
+interrupts the layout and removes the partial file, and stays usable for the
+next document. Daemonic processes, such as Celery prefork workers, cannot
+start children; there the document renders in the calling process, with the
+same timeout.
+"""
+
+import asyncio
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import MetricsCollector
+from app.services.pdf_generator import PDFGenerator
+
+logger = structlog.get_logger(__name__)
+
+
+class PDFRenderTimeout(TimeoutError):
+    """A document took longer than REPORT_PDF_TIMEOUT_SECONDS to render."""
+
+
+def render_document(
+    report_data: Dict[str, Any],
+    sections: List[Dict[str, Any]],
+    output_path: str,
+    timeout: float
+) -> str:
+    """
+    Render one PDF, interrupted after ``timeout`` seconds (0 = no limit).
+
+    Runs in a pool worker, or inline in daemonic processes. The timer needs
+    SIGALRM and the main thread; elsewhere the document renders unbounded.
+    """
+    def expire(signum, frame):
+        raise PDFRenderTimeout(f"PDF rendering exceeded {timeout:g}s")
+
+    armed = (
+        timeout > 0
+        and hasattr(signal, "SIGALRM")
+        and threading.current_thread() is threading.main_thread()
+    )
+    try:
+        if armed:
+            previous = signal.signal(signal.SIGALRM, expire)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            PDFGenerator().generate_report_pdf(report_data, sections, Path(output_path))
+        finally:
+            if armed:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+    except BaseException:
+        Path(output_path).unlink(missing_ok=True)
+        raise
+    return output_path
+
+
+class PDFRenderPool:
+    """Bounded process pool rendering PDF documents with a per-document timeout."""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        return max(1, settings.REPORT_PDF_WORKERS)
+
+    @property
+    def in_process(self) -> bool:
+        """Whether documents render in the calling process, which cannot start a pool."""
+        return multiprocessing.current_process().daemon
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Forking a process with an event loop and threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool; the next document starts a new one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def render(self, report_data: Dict[str, Any], sections: List[Dict[str, Any]], output_path: Path) -> Path:
+        """
+        Render a PDF report.
+
+        Raises:
+            PDFRenderTimeout: The document took longer than REPORT_PDF_TIMEOUT_SECONDS
+            BrokenProcessPool: A worker died while rendering
+        """
+        timeout = settings.REPORT_PDF_TIMEOUT_SECONDS
+        started_at = time.perf_counter()
+        outcome = "error"
+        try:
+            if self.in_process:
+                render_document(report_data, sections, str(output_path), timeout)
+            else:
+                executor = self._get_executor()
+                try:
+                    await asyncio.get_running_loop().run_in_executor(
+                        executor, render_document, report_data, sections, str(output_path), timeout
+                    )
+                except BrokenProcessPool:
+                    self._discard(executor)
+                    raise
+            outcome = "ok"
+        except PDFRenderTimeout:
+            outcome = "timeout"
+            raise
+        finally:
+            seconds = time.perf_counter() - started_at
+            MetricsCollector.track_pdf_render(outcome, seconds)
+            logger.info("PDF rendered", outcome=outcome, seconds=round(seconds, 3), path=str(output_path))
+        return output_path
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+pdf_render_pool = PDFRenderPool()
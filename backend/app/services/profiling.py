@@ -0,0 +1,234 @@
+"""
+On-demand profiling of optimization jobs and API requests.
+
+Profilowanie na żądanie zadań optymalizacji i żądań API.
+
+Two capture modes are available:
+
+- ``sampling``: a background thread samples the stack of the profiled
+  thread every PROFILE_SAMPLING_INTERVAL_MS and aggregates collapsed stacks
+  (``frame;frame;frame count``, the flamegraph.pl / speedscope input).
+  Overhead is bounded by the interval and PROFILE_MAX_SAMPLES.
+- ``cprofile``: deterministic cProfile, stored as a binary pstats dump.
+  Exact call counts, but it slows tight loops such as the physics model.
+
+Only the thread that starts the capture is profiled, i.e. the event loop
+thread; work handed to thread pools is not included. Artifacts are files in
+PROFILE_ARTIFACT_DIR, pruned to the newest PROFILE_MAX_ARTIFACTS.
+"""
+
+import cProfile
+import marshal
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+PROFILE_MODES = ("sampling", "cprofile")
+
+ARTIFACT_EXTENSIONS = {
+    "sampling": "collapsed.txt",
+    "cprofile": "pstats",
+}
+
+ARTIFACT_MEDIA_TYPES = {
+    "sampling": "text/plain; charset=utf-8",
+    "cprofile": "application/octet-stream",
+}
+
+_ARTIFACT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+# cProfile hooks the interpreter's profile function, so captures cannot overlap
+_cprofile_lock = threading.Lock()
+
+
+def resolve_profile_mode(flag) -> Optional[str]:
+    """
+    Profile mode requested by an ``execution_config["profile"]`` or header value.
+
+    ``True``/"1"/"true" select PROFILE_DEFAULT_MODE; unknown values disable profiling.
+    """
+    if flag is None or flag is False:
+        return None
+    if flag is True or str(flag).lower() in ("1", "true", "yes"):
+        return settings.PROFILE_DEFAULT_MODE
+    mode = str(flag).lower()
+    return mode if mode in PROFILE_MODES else None
+
+
+@dataclass
+class ProfileArtifact:
+    """A finished capture."""
+
+    artifact_id: str
+    mode: str
+    data: bytes
+    duration_seconds: float
+    samples: Optional[int] = None
+
+    @property
+    def filename(self) -> str:
+        return f"{self.artifact_id}.{ARTIFACT_EXTENSIONS[self.mode]}"
+
+
+class SamplingProfiler:
+    """Stack sampler of one thread producing collapsed stacks."""
+
+    def __init__(self, interval_seconds: float, max_samples: int, thread_id: Optional[int] = None):
+        self.interval_seconds = max(interval_seconds, 0.001)
+        self.max_samples = max_samples
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+        return f"{module}:{code.co_name}"
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(self._frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+            if self.samples >= self.max_samples:
+                break
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> bytes:
+        self._stop.set()
+        self._thread.join()
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class ProfileCapture:
+    """Runs one profiler from ``start`` until ``stop``."""
+
+    def __init__(self, artifact_id: str, mode: str):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.artifact_id = artifact_id
+        self.mode = mode
+        self._started = 0.0
+        self._sampler: Optional[SamplingProfiler] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    def start(self) -> "ProfileCapture":
+        self._started = time.perf_counter()
+        if self.mode == "sampling":
+            self._sampler = SamplingProfiler(
+                settings.PROFILE_SAMPLING_INTERVAL_MS / 1000, settings.PROFILE_MAX_SAMPLES
+            )
+            self._sampler.start()
+        else:
+            if not _cprofile_lock.acquire(blocking=False):
+                raise RuntimeError("A cProfile capture is already running")
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        return self
+
+    def stop(self) -> ProfileArtifact:
+        duration = time.perf_counter() - self._started
+        if self._sampler is not None:
+            data = self._sampler.stop()
+            samples = self._sampler.samples
+        else:
+            self._cprofile.disable()
+            _cprofile_lock.release()
+            # Same format as Stats.dump_stats, readable with pstats.Stats(path)
+            data = marshal.dumps(pstats.Stats(self._cprofile).stats)
+            samples = None
+        return ProfileArtifact(self.artifact_id, self.mode, data, duration, samples)
+
+
+class ProfileArtifactStore:
+    """Profile artifacts on disk, keeping only the newest ones."""
+
+    def __init__(self, directory: Optional[str] = None, max_artifacts: Optional[int] = None):
+        self.directory = Path(directory or settings.PROFILE_ARTIFACT_DIR)
+        self.max_artifacts = max_artifacts or settings.PROFILE_MAX_ARTIFACTS
+
+    def _path(self, artifact_id: str, mode: str) -> Path:
+        if not _ARTIFACT_ID_PATTERN.match(artifact_id):
+            raise ValueError(f"Invalid profile artifact id: {artifact_id}")
+        return self.directory / f"{artifact_id}.{ARTIFACT_EXTENSIONS[mode]}"
+
+    def save(self, artifact: ProfileArtifact) -> Dict[str, object]:
+        """Write the artifact and return its description for the job record."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(artifact.artifact_id, artifact.mode)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(artifact.data)
+        os.replace(tmp_path, path)
+        self.prune()
+        return {
+            "artifact_id": artifact.artifact_id,
+            "mode": artifact.mode,
+            "filename": artifact.filename,
+            "size_bytes": len(artifact.data),
+            "duration_seconds": artifact.duration_seconds,
+            "samples": artifact.samples,
+        }
+
+    def find(self, artifact_id: str) -> Optional[Path]:
+        """Path of the artifact in whichever mode it was captured."""
+        for mode in PROFILE_MODES:
+            path = self._path(artifact_id, mode)
+            if path.exists():
+                return path
+        return None
+
+    def prune(self) -> None:
+        """Delete the oldest artifacts beyond the retention count."""
+        files: List[Path] = sorted(
+            (p for p in self.directory.iterdir() if p.is_file() and p.suffix != ".tmp"),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True
+        )
+        for path in files[self.max_artifacts:]:
+            path.unlink(missing_ok=True)
+
+
+def media_type_for(path: Path) -> str:
+    """Media type of a stored artifact."""
+    for mode, extension in ARTIFACT_EXTENSIONS.items():
+        if path.name.endswith(extension):
+            return ARTIFACT_MEDIA_TYPES[mode]
+    return "application/octet-stream"
+
+
+def save_capture(capture: ProfileCapture) -> Optional[Dict[str, object]]:
+    """Stop a capture and store it; profiling failures never fail the work itself."""
+    try:
+        artifact = capture.stop()
+        info = ProfileArtifactStore().save(artifact)
+        logger.info("Stored profile artifact", **info)
+        return info
+    except Exception as e:
+        logger.warning("Failed to store profile artifact", artifact_id=capture.artifact_id, error=str(e))
+        return None
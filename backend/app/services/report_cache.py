@@ -0,0 +1,225 @@
+"""
+Content-addressed cache of generated report files.
+
+Pamięć podręczna wygenerowanych plików raportów adresowana treścią.
+
+A report's cache key hashes its definition (owner, type, format, config,
+date range, filters, description) with a watermark of the tables its
+sections read: the row count and latest change time of each. Two reports
+with the same key render the same file, so a completed one is hard-linked
+under the new report's name instead of being generated again; the title
+and id printed in it stay those of the report that generated it. Reports
+without a date range cover a period ending now; their key also includes
+the day, so such a file is reused at most until midnight UTC.
+
+Files are kept in a ``cache`` directory next to the reports, as hard links
+named by key, with the gzip copy of a text report (``<key>.csv.gz``) linked
+alongside. A lookup refreshes the file's modification time, and storing
+a file evicts the least recently used ones beyond REPORT_CACHE_MAX_MB.
+Evicting removes only the cache's link; reports using the file keep it
+until they expire. Change times have the database's resolution (seconds
+on MySQL), so two changes within the same second as a report that leave
+the row count unchanged go unnoticed.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import MetricsCollector
+from app.models.import_job import ImportJob
+from app.models.optimization import OptimizationJob, OptimizationResult
+from app.models.reporting import Report, SystemMetrics
+from app.models.user import User
+from app.services.report_files import GZIP_SUFFIX, compressed_path
+
+logger = structlog.get_logger(__name__)
+
+
+# Bump when report files change in a way that invalidates cached ones
+REPORT_CACHE_VERSION = 1
+
+# Directory of cached files, inside the reports directory
+REPORT_CACHE_DIR = "cache"
+
+# Source table -> model and the time its rows last changed
+WATERMARK_COLUMNS = {
+    "optimization_jobs": (OptimizationJob, OptimizationJob.updated_at),
+    "optimization_results": (OptimizationResult, OptimizationResult.updated_at),
+    "system_metrics": (SystemMetrics, SystemMetrics.created_at),
+    "users": (User, User.updated_at),
+    # Import jobs only change as they start and finish
+    "import_jobs": (ImportJob, func.coalesce(ImportJob.completed_at, ImportJob.started_at, ImportJob.created_at)),
+}
+
+_TEMPORARY_PREFIX = ".tmp-"
+
+
+async def data_watermark(db: AsyncSession, tables: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Row count and latest change time of each source table, in one query.
+
+    Args:
+        db: Database session
+        tables: Names from WATERMARK_COLUMNS
+
+    Returns:
+        ``{table: {"rows": count, "changed_at": ISO time or None}}``
+    """
+    tables = sorted(set(tables))
+    if not tables:
+        return {}
+
+    columns = []
+    for table in tables:
+        model, changed_at = WATERMARK_COLUMNS[table]
+        columns.append(select(func.count()).select_from(model).scalar_subquery().label(f"{table}_rows"))
+        columns.append(select(func.max(changed_at)).scalar_subquery().label(f"{table}_changed_at"))
+    row = (await db.execute(select(*columns))).one()
+
+    watermark = {}
+    for index, table in enumerate(tables):
+        changed_at = row[2 * index + 1]
+        watermark[table] = {
+            "rows": row[2 * index],
+            # SQLite returns MAX() of a datetime column as text
+            "changed_at": changed_at.isoformat() if isinstance(changed_at, datetime) else changed_at,
+        }
+    return watermark
+
+
+def compute_report_cache_key(report: Report, watermark: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Compute the cache key of a report's file.
+
+    Args:
+        report: Report to generate; its title and id are not part of the key
+        watermark: :func:`data_watermark` of its sections' source tables
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    document = {
+        "version": REPORT_CACHE_VERSION,
+        "user_id": str(report.user_id),
+        "report_type": report.report_type,
+        "format": report.format,
+        "report_config": report.report_config or {},
+        "date_range": report.date_range or {},
+        "filters": report.filters or {},
+        "description": report.description or "",
+        "watermark": watermark,
+    }
+    if not report.date_range:
+        document["day"] = datetime.now(UTC).date().isoformat()
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ReportArtifactCache:
+    """Report files by cache key, hard-linked into a directory and evicted least recently used first."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    @property
+    def enabled(self) -> bool:
+        return settings.REPORT_CACHE_MAX_MB > 0
+
+    def _entries(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return [path for path in self.directory.iterdir() if not path.name.startswith(_TEMPORARY_PREFIX)]
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Cached file under ``key``, marked as just used, or None."""
+        if not self.enabled:
+            return None
+
+        for path in self.directory.glob(f"{key}.*"):
+            if path.suffix == GZIP_SUFFIX:
+                continue
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # Evicted meanwhile
+                continue
+            try:
+                os.utime(compressed_path(path))
+            except FileNotFoundError:
+                pass
+            MetricsCollector.track_report_cache_lookup("hit")
+            return path
+
+        MetricsCollector.track_report_cache_lookup("miss")
+        return None
+
+    @staticmethod
+    def link(source: Path, target: Path) -> Path:
+        """Hard-link ``source`` as ``target``; copies where hard links are not supported."""
+        try:
+            os.link(source, target)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            shutil.copy2(source, target)
+        return target
+
+    def store(self, key: str, file_path: Path) -> None:
+        """Keep a generated report file and its gzip copy under ``key``, then evict beyond the quota."""
+        if not self.enabled:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.directory / f"{key}{file_path.suffix}"
+        sources = [(file_path, target)]
+        if compressed_path(file_path).exists():
+            sources.append((compressed_path(file_path), compressed_path(target)))
+
+        for source, name in sources:
+            temporary = self.directory / f"{_TEMPORARY_PREFIX}{uuid.uuid4().hex}"
+            try:
+                self.link(source, temporary)
+                os.utime(temporary)
+                os.replace(temporary, name)
+            except OSError as e:
+                temporary.unlink(missing_ok=True)
+                logger.warning("Report cache write failed", key=key, error=str(e))
+                return
+
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove the least recently used files until the rest fit REPORT_CACHE_MAX_MB; returns how many."""
+        quota = settings.REPORT_CACHE_MAX_MB * 1024 * 1024
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= quota:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+
+        if evicted:
+            MetricsCollector.track_report_cache_evictions(evicted)
+            logger.info("Report cache evicted files", evicted=evicted, remaining_bytes=total)
+        return evicted
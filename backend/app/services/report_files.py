@@ -0,0 +1,119 @@
+"""
+Report files as served for download.
+
+Pliki raportów udostępniane do pobrania.
+
+Text reports (CSV and JSON) are stored with a gzip copy next to them
+(``<file>.gz``), written once when the report is generated, so clients
+accepting gzip get the smaller file without it being compressed per
+request. The copy is written without a name or timestamp in its header, so
+compressing the same file again gives the same bytes. Each report also
+keeps the SHA-256 of its file, which downloads send as a strong ETag;
+the gzip copy's ETag is derived from it, as the two differ in content.
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+# Formats worth compressing; PDF and Excel files are compressed already
+PRECOMPRESSED_SUFFIXES = frozenset({".csv", ".json"})
+GZIP_SUFFIX = ".gz"
+GZIP_LEVEL = 6
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def compressed_path(file_path: Path) -> Path:
+    """Path of a report file's gzip copy."""
+    return file_path.with_name(file_path.name + GZIP_SUFFIX)
+
+
+def file_digest(file_path: Path) -> str:
+    """Hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def precompress(file_path: Path) -> Optional[Path]:
+    """
+    Write the gzip copy of a text report, unless it exists already.
+
+    Returns:
+        Path of the copy, or None for formats not compressed or when
+        compressing does not make the file smaller
+    """
+    if file_path.suffix not in PRECOMPRESSED_SUFFIXES:
+        return None
+
+    target = compressed_path(file_path)
+    if target.exists():
+        # Linked from the report cache with the file itself
+        return target
+
+    temporary = target.with_name(f".tmp-{uuid.uuid4().hex}{GZIP_SUFFIX}")
+    try:
+        with open(file_path, 'rb') as source, open(temporary, 'wb') as raw:
+            with gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=GZIP_LEVEL, mtime=0) as f:
+                shutil.copyfileobj(source, f, _CHUNK_SIZE)
+        if temporary.stat().st_size >= file_path.stat().st_size:
+            temporary.unlink()
+            return None
+        os.replace(temporary, target)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+    return target
+
+
+def prepare_report_file(file_path: Path) -> str:
+    """Write a generated report file's gzip copy, if any, and return the file's SHA-256."""
+    precompress(file_path)
+    return file_digest(file_path)
+
+
+def remove_report_file(file_path: Path) -> None:
+    """Delete a report file and its gzip copy."""
+    file_path.unlink(missing_ok=True)
+    compressed_path(file_path).unlink(missing_ok=True)
+
+
+def accepts_encoding(accept_encoding: Optional[str], coding: str) -> bool:
+    """Whether an Accept-Encoding header allows ``coding`` (explicitly or via ``*``, with q > 0)."""
+    if not accept_encoding:
+        return False
+
+    wildcard = None
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        name = name.strip().lower()
+        if name == coding:
+            return quality > 0
+        if name == '*':
+            wildcard = quality > 0
+    return bool(wildcard)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag``, compared weakly as RFC 9110 requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == opaque for tag in if_none_match.split(','))
@@ -6,23 +6,25 @@ Serwis raportowania dla agregacji danych i generowania raportów.
 
 import asyncio
 import json
-from datetime import datetime, timedelta, UTC
-from typing import Dict, List, Optional, Any, Tuple
+import time
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta, UTC
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any, Tuple
 import uuid
 import io
 import os
 from pathlib import Path
 
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, text
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, update, func, or_, case, desc, text
 from sqlalchemy.orm import joinedload
-import pandas as pd
 
 from app.models.reporting import (
     Report, ReportData, ReportExport, ReportTemplate, ReportSchedule,
     SystemMetrics, ReportType, ReportStatus, ReportFormat
 )
-from app.models.optimization import OptimizationJob, OptimizationResult, OptimizationScenario
+from app.models.optimization import OptimizationJob, OptimizationResult
 from app.models.regenerator import RegeneratorConfiguration
 from app.models.import_job import ImportJob
 from app.models.user import User
@@ -31,12 +33,12 @@ from app.schemas.reporting_schemas import (
     UserEngagement, SystemHealth, OptimizationSummaryConfig, FuelSavingsConfig
 )
 from app.core.config import settings
+from app.services.dashboard_cache import SYSTEM_KEY, dashboard_cache
+from app.services import optimization_rollups as rollups
+from app.services.optimization_rollups import rollup_totals
 
-try:
-    from app.services.pdf_generator import PDFGenerator
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+from app.services.pdf_generator import REPORTLAB_AVAILABLE as PDF_AVAILABLE
+from app.services.pdf_rendering import pdf_render_pool
 
 try:
     from app.services.excel_generator import ExcelGenerator
@@ -44,14 +46,85 @@ try:
 except ImportError:
     EXCEL_AVAILABLE = False
 
+from app.services.csv_generator import CSVGenerator
+from app.services.report_cache import (
+    REPORT_CACHE_DIR, ReportArtifactCache, compute_report_cache_key, data_watermark
+)
+from app.services.report_files import compressed_path, prepare_report_file
+
+logger = structlog.get_logger(__name__)
+
+
+# Rows fetched per round trip when streaming detail rows from the database
+STREAM_BATCH_SIZE = 1000
+
+# Fuel savings percentiles added to optimization reports
+FUEL_SAVINGS_PERCENTILES = (0.5, 0.9)
+
+# Detail table of the optimization summary in Excel and CSV files
+OPTIMIZATION_JOB_COLUMNS = (
+    "job_id", "scenario_id", "status", "started_at", "completed_at", "runtime_seconds",
+    "fuel_savings_percentage", "co2_reduction_percentage", "thermal_efficiency", "annual_cost_savings",
+)
+
+
+@dataclass(frozen=True)
+class ReportSection:
+    """
+    Section of a report: the ReportingService method generating it and whether it may fail.
+
+    ``table`` names a method returning the section's detail table for Excel
+    and CSV files (or None), streamed while the file is written. ``sources``
+    are the tables it reads, whose watermark is part of the report's cache key.
+    """
+
+    name: str
+    generator: str
+    optional: bool = False
+    table: Optional[str] = None
+    sources: Tuple[str, ...] = ()
+
+
+_OPTIMIZATION_SOURCES = ("optimization_jobs", "optimization_results")
+
+
+# Sections of each report type, in report order
+REPORT_SECTIONS: Dict[str, List[ReportSection]] = {
+    ReportType.OPTIMIZATION_SUMMARY: [
+        ReportSection(
+            "optimization_summary", "_generate_optimization_summary",
+            table="_optimization_job_table", sources=_OPTIMIZATION_SOURCES
+        ),
+        ReportSection(
+            "fuel_savings_distribution", "_generate_fuel_savings_distribution",
+            optional=True, sources=_OPTIMIZATION_SOURCES
+        ),
+    ],
+    ReportType.FUEL_SAVINGS: [
+        ReportSection("fuel_savings_analysis", "_generate_fuel_savings_report", sources=_OPTIMIZATION_SOURCES),
+    ],
+    ReportType.SYSTEM_PERFORMANCE: [
+        ReportSection("system_performance", "_generate_system_performance", sources=("system_metrics",)),
+    ],
+    ReportType.USER_ACTIVITY: [
+        ReportSection(
+            "user_activity", "_generate_user_activity",
+            sources=("users", "optimization_jobs", "import_jobs")
+        ),
+    ],
+    ReportType.IMPORT_ANALYTICS: [
+        ReportSection("import_analytics", "_generate_import_analytics", sources=("import_jobs",)),
+    ],
+}
+
 
 class ReportingService:
     """Service for generating and managing reports."""
 
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.reports_dir = Path(settings.REPORTS_STORAGE_PATH) if hasattr(settings, 'REPORTS_STORAGE_PATH') else Path("reports")
-        self.reports_dir.mkdir(exist_ok=True)
+        self.reports_dir = Path(settings.REPORTS_STORAGE_PATH)
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
 
     async def create_report(self, user_id: str, report_data: ReportCreate) -> Report:
         """Create a new report."""
@@ -91,15 +164,8 @@ class ReportingService:
             report.progress_percentage = 0.0
             await self.db.commit()
 
-            # Generate data based on report type
-            report_data = await self._generate_report_data(report)
-
-            # Update progress
-            report.progress_percentage = 50.0
-            await self.db.commit()
-
-            # Create report file
-            file_path = await self._create_report_file(report, report_data)
+            # Generate data and file, or reuse an identical report's file
+            file_path = await self._build_report_file(report)
 
             # Update report with results
             report.status = ReportStatus.COMPLETED
@@ -121,176 +187,410 @@ class ReportingService:
             await self.db.commit()
             raise
 
-    async def _generate_report_data(self, report: Report) -> List[Dict[str, Any]]:
-        """Generate data sections for report based on type."""
-
-        if report.report_type == ReportType.OPTIMIZATION_SUMMARY:
-            return await self._generate_optimization_summary(report)
-        elif report.report_type == ReportType.FUEL_SAVINGS:
-            return await self._generate_fuel_savings_report(report)
-        elif report.report_type == ReportType.SYSTEM_PERFORMANCE:
-            return await self._generate_system_performance(report)
-        elif report.report_type == ReportType.USER_ACTIVITY:
-            return await self._generate_user_activity(report)
-        elif report.report_type == ReportType.IMPORT_ANALYTICS:
-            return await self._generate_import_analytics(report)
-        else:
+    async def _build_report_file(
+        self,
+        report: Report,
+        on_section: Optional[Callable[[str, int, int], None]] = None
+    ) -> Path:
+        """
+        Generate the report's data and file, or reuse a cached file.
+
+        The cache key is computed before generating, so data changing
+        meanwhile gives later reports a different key. Files with a failed
+        optional section are not cached. Either way the file gets its gzip
+        copy, if its format has one, and ``report.file_hash``.
+        """
+        cache = ReportArtifactCache(self.reports_dir / REPORT_CACHE_DIR)
+        cache_key = None
+        if cache.enabled:
+            sources = {table for section in self._report_sections(report) for table in section.sources}
+            cache_key = compute_report_cache_key(report, await data_watermark(self.db, sources))
+            file_path = await self._reuse_cached_file(report, cache, cache_key)
+            if file_path is not None:
+                report.file_hash = await asyncio.to_thread(prepare_report_file, file_path)
+                return file_path
+
+        sections = await self._generate_report_data(report, on_section=on_section)
+        report.progress_percentage = 50.0
+        await self.db.commit()
+
+        file_path = await self._create_report_file(report, sections)
+        report.file_hash = await asyncio.to_thread(prepare_report_file, file_path)
+        if cache_key is not None and not any(section.get("failed") for section in sections):
+            cache.store(cache_key, file_path)
+            report.cache_key = cache_key
+        return file_path
+
+    async def _reuse_cached_file(self, report: Report, cache: ReportArtifactCache, cache_key: str) -> Optional[Path]:
+        """Link the cached file under ``cache_key`` for the report and copy its section rows."""
+        artifact = cache.lookup(cache_key)
+        if artifact is None:
+            return None
+        try:
+            file_path = cache.link(artifact, self.reports_dir / f"{self._file_name(report)}{artifact.suffix}")
+        except FileNotFoundError:
+            # Evicted since the lookup
+            return None
+        try:
+            cache.link(compressed_path(artifact), compressed_path(file_path))
+        except FileNotFoundError:
+            # Not a text report, or evicted; compressed again if needed
+            pass
+
+        # Section rows of the report that generated the file, if it still exists
+        source_id = (await self.db.execute(
+            select(Report.id).where(
+                Report.cache_key == cache_key,
+                Report.id != report.id,
+                Report.status == ReportStatus.COMPLETED
+            ).order_by(Report.generated_at.desc()).limit(1)
+        )).scalar_one_or_none()
+        if source_id is not None:
+            rows = (await self.db.execute(
+                select(ReportData).where(ReportData.report_id == source_id).order_by(ReportData.section_order)
+            )).scalars().all()
+            for row in rows:
+                self.db.add(ReportData(
+                    report_id=report.id,
+                    section_name=row.section_name,
+                    section_order=row.section_order,
+                    raw_data=row.raw_data,
+                    aggregated_data=row.aggregated_data,
+                    chart_config=row.chart_config,
+                    chart_data=row.chart_data,
+                    data_source=row.data_source,
+                    calculation_method=row.calculation_method,
+                    data_completeness=row.data_completeness
+                ))
+
+        report.cache_key = cache_key
+        logger.info("Report file reused from cache", report_id=report.id, source_report_id=source_id)
+        return file_path
+
+    def _report_sections(self, report: Report) -> List[ReportSection]:
+        """Sections of a report; ``optional_sections`` in its config marks more as optional."""
+        sections = REPORT_SECTIONS.get(report.report_type)
+        if sections is None:
             raise ValueError(f"Unsupported report type: {report.report_type}")
+        marked_optional = set((report.report_config or {}).get("optional_sections", []))
+        return [
+            replace(section, optional=True) if section.name in marked_optional else section
+            for section in sections
+        ]
+
+    async def _generate_report_data(
+        self,
+        report: Report,
+        on_section: Optional[Callable[[str, int, int], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate data sections for report based on type.
+
+        Sections run concurrently (at most REPORT_SECTION_CONCURRENCY), each
+        on its own session, and are stored as they finish: the report's
+        progress covers 0-50% by sections done. A failed optional section is
+        kept with its error instead of failing the report. ``on_section`` is
+        called with the section name, sections done and total.
+        """
+        sections = self._report_sections(report)
+        # Generators read these; load them before they run concurrently
+        report_id, _, _ = report.id, report.report_config, report.date_range
+
+        session_factory = async_sessionmaker(self.db.bind, class_=AsyncSession, expire_on_commit=False)
+        semaphore = asyncio.Semaphore(max(1, settings.REPORT_SECTION_CONCURRENCY))
+        done = stored = 0
+
+        async def run(order: int, section: ReportSection) -> Dict[str, Any]:
+            nonlocal done, stored
+            async with semaphore, session_factory() as db:
+                started = time.perf_counter()
+                try:
+                    data = await getattr(ReportingService(db), section.generator)(report)
+                    data["order"] = order
+                    completeness = 1.0
+                except Exception as e:
+                    if not section.optional:
+                        raise
+                    await db.rollback()
+                    logger.warning(
+                        "Optional report section failed", report_id=report_id, section=section.name, error=str(e)
+                    )
+                    data = {"name": section.name, "order": order, "data": {"error": str(e)}, "failed": True}
+                    completeness = 0.0
+
+                done += 1
+                progress = done / len(sections) * 50.0
+                db.add(self._report_data(report_id, data, completeness))
+                # Sections commit in any order; never move the progress back
+                await db.execute(
+                    update(Report).where(Report.id == report_id).values(
+                        progress_percentage=case(
+                            (func.coalesce(Report.progress_percentage, 0.0) < progress, progress),
+                            else_=Report.progress_percentage
+                        )
+                    )
+                )
+                await db.commit()
+                # Counted once stored; commits finish in any order, so not ``done``
+                stored += 1
+                if on_section is not None:
+                    on_section(section.name, stored, len(sections))
+                logger.info(
+                    "Report section generated", report_id=report_id, section=section.name,
+                    seconds=round(time.perf_counter() - started, 3), failed=data.get("failed", False)
+                )
+            return data
+
+        tasks = [asyncio.create_task(run(order, section)) for order, section in enumerate(sections, start=1)]
+        try:
+            return await asyncio.gather(*tasks)
+        except Exception:
+            # A required section failed; stop the others
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
-    async def _generate_optimization_summary(self, report: Report) -> List[Dict[str, Any]]:
-        """Generate optimization summary data."""
-        config = OptimizationSummaryConfig(**report.report_config)
-        sections = []
+    async def _generate_optimization_summary(self, report: Report) -> Dict[str, Any]:
+        """
+        Generate optimization summary data.
 
-        # Get optimization jobs
-        conditions = []
-        if config.scenario_ids:
-            conditions.append(OptimizationJob.scenario_id.in_(config.scenario_ids))
+        Figures come from the statistics rollups: jobs of the selected
+        scenarios (all jobs without a selection) that finished within the
+        report's date range, by day.
+        """
+        config = OptimizationSummaryConfig(**report.report_config)
+        start_day = end_day = None
         if report.date_range:
-            start_date = datetime.fromisoformat(report.date_range['start_date'])
-            end_date = datetime.fromisoformat(report.date_range['end_date'])
-            conditions.append(OptimizationJob.created_at.between(start_date, end_date))
+            start_day = datetime.fromisoformat(report.date_range['start_date']).date()
+            end_day = datetime.fromisoformat(report.date_range['end_date']).date()
 
-        stmt = select(OptimizationJob, OptimizationResult, OptimizationScenario).join(
-            OptimizationResult, OptimizationJob.id == OptimizationResult.job_id, isouter=True
-        ).join(
-            OptimizationScenario, OptimizationJob.scenario_id == OptimizationScenario.id
-        ).where(and_(*conditions) if conditions else True)
-
-        result = await self.db.execute(stmt)
-        jobs_data = result.all()
+        if config.scenario_ids:
+            days = await rollup_totals(self.db, rollups.SCENARIO, config.scenario_ids, start_day, end_day)
+        else:
+            days = await rollup_totals(self.db, rollups.ALL, None, start_day, end_day)
+        totals = rollups.sum_days(days)
 
         # Summary statistics
-        total_jobs = len(jobs_data)
-        completed_jobs = sum(1 for job, result, scenario in jobs_data if job.status == 'completed')
-
-        fuel_savings = []
-        co2_reductions = []
-        efficiency_improvements = []
-
-        for job, result, scenario in jobs_data:
-            if result:
-                if result.fuel_savings_percentage:
-                    fuel_savings.append(result.fuel_savings_percentage)
-                if result.co2_reduction_percentage:
-                    co2_reductions.append(result.co2_reduction_percentage)
-                if result.thermal_efficiency:
-                    efficiency_improvements.append(result.thermal_efficiency)
+        total_jobs = totals["jobs_finished"]
+        completed_jobs = totals["jobs_completed"]
+        fuel_savings_days = [day for day in days if day["fuel_savings_count"]]
 
         summary_section = {
             "name": "optimization_summary",
-            "order": 1,
             "data": {
                 "total_optimizations": total_jobs,
                 "successful_optimizations": completed_jobs,
                 "success_rate": (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0,
-                "average_fuel_savings": sum(fuel_savings) / len(fuel_savings) if fuel_savings else 0,
-                "average_co2_reduction": sum(co2_reductions) / len(co2_reductions) if co2_reductions else 0,
-                "average_efficiency_improvement": sum(efficiency_improvements) / len(efficiency_improvements) if efficiency_improvements else 0,
-                "total_annual_savings": sum(r.annual_cost_savings for _, r, _ in jobs_data if r and r.annual_cost_savings) or 0
+                "average_fuel_savings": rollups.average(totals, "fuel_savings"),
+                "average_co2_reduction": rollups.average(totals, "co2_reduction"),
+                "average_efficiency_improvement": rollups.average(totals, "thermal_efficiency"),
+                "total_annual_savings": totals["annual_cost_savings_sum"]
             },
             "charts": [
                 {
                     "type": "bar",
-                    "title": "Fuel Savings by Optimization",
-                    "data": fuel_savings,
-                    "labels": [f"Opt {i+1}" for i in range(len(fuel_savings))]
+                    "title": "Average Fuel Savings by Day",
+                    "data": [rollups.average(day, "fuel_savings") for day in fuel_savings_days],
+                    "labels": [day["day"].isoformat() for day in fuel_savings_days]
                 },
                 {
                     "type": "pie",
                     "title": "Optimization Success Rate",
                     "data": [completed_jobs, total_jobs - completed_jobs],
-                    "labels": ["Successful", "Failed/Pending"]
+                    "labels": ["Successful", "Failed/Cancelled"]
                 }
             ]
         }
-        sections.append(summary_section)
-
-        # Store data in database
-        await self._store_report_data(report.id, summary_section)
+        return summary_section
 
-        return sections
+    async def _generate_fuel_savings_distribution(self, report: Report) -> Dict[str, Any]:
+        """
+        Generate fuel savings percentiles for the optimization summary.
 
-    async def _generate_fuel_savings_report(self, report: Report) -> List[Dict[str, Any]]:
-        """Generate fuel savings analysis report."""
-        config = FuelSavingsConfig(**report.report_config)
-        sections = []
+        Same jobs as the summary, but read from the individual results.
+        """
+        config = OptimizationSummaryConfig(**report.report_config)
+        start_day = end_day = None
+        if report.date_range:
+            start_day = datetime.fromisoformat(report.date_range['start_date']).date()
+            end_day = datetime.fromisoformat(report.date_range['end_date']).date()
 
-        baseline_start = datetime.fromisoformat(config.baseline_period['start_date'])
-        baseline_end = datetime.fromisoformat(config.baseline_period['end_date'])
-        comparison_start = datetime.fromisoformat(config.comparison_period['start_date'])
-        comparison_end = datetime.fromisoformat(config.comparison_period['end_date'])
+        conditions = self._finished_between(start_day, end_day)
+        if config.scenario_ids:
+            conditions.append(OptimizationJob.scenario_id.in_(config.scenario_ids))
 
-        # Get optimization results for both periods
-        baseline_stmt = select(OptimizationResult).join(OptimizationJob).where(
-            OptimizationJob.completed_at.between(baseline_start, baseline_end)
-        )
-        comparison_stmt = select(OptimizationResult).join(OptimizationJob).where(
-            OptimizationJob.completed_at.between(comparison_start, comparison_end)
-        )
+        return {
+            "name": "fuel_savings_distribution",
+            "data": {
+                "fuel_savings_percentiles": await self._fuel_savings_percentiles(conditions)
+            }
+        }
 
-        baseline_results = (await self.db.execute(baseline_stmt)).scalars().all()
-        comparison_results = (await self.db.execute(comparison_stmt)).scalars().all()
+    async def _generate_fuel_savings_report(self, report: Report) -> Dict[str, Any]:
+        """
+        Generate fuel savings analysis report.
 
-        # Calculate savings
-        baseline_avg_savings = sum(r.fuel_savings_percentage for r in baseline_results if r.fuel_savings_percentage) / len(baseline_results) if baseline_results else 0
-        comparison_avg_savings = sum(r.fuel_savings_percentage for r in comparison_results if r.fuel_savings_percentage) / len(comparison_results) if comparison_results else 0
+        Compares the results of jobs that finished within the two periods,
+        read from the daily rollups over all jobs.
+        """
+        config = FuelSavingsConfig(**report.report_config)
+        periods, medians = [], []
+        for period in (config.baseline_period, config.comparison_period):
+            start_day = datetime.fromisoformat(period['start_date']).date()
+            end_day = datetime.fromisoformat(period['end_date']).date()
+            days = await rollup_totals(self.db, rollups.ALL, None, start_day, end_day)
+            periods.append(rollups.sum_days(days))
+            percentiles = await self._fuel_savings_percentiles(self._finished_between(start_day, end_day), (0.5,))
+            medians.append(percentiles["p50"])
+        baseline, comparison = periods
+
+        # Average over all results, those without a fuel savings figure count as 0
+        baseline_avg_savings = baseline["fuel_savings_sum"] / baseline["results_count"] if baseline["results_count"] else 0
+        comparison_avg_savings = comparison["fuel_savings_sum"] / comparison["results_count"] if comparison["results_count"] else 0
 
         savings_section = {
             "name": "fuel_savings_analysis",
-            "order": 1,
             "data": {
                 "baseline_period": config.baseline_period,
                 "comparison_period": config.comparison_period,
                 "baseline_avg_savings": baseline_avg_savings,
                 "comparison_avg_savings": comparison_avg_savings,
                 "improvement": comparison_avg_savings - baseline_avg_savings,
-                "total_optimizations_baseline": len(baseline_results),
-                "total_optimizations_comparison": len(comparison_results)
+                "baseline_median_savings": medians[0],
+                "comparison_median_savings": medians[1],
+                "total_optimizations_baseline": baseline["results_count"],
+                "total_optimizations_comparison": comparison["results_count"]
             }
         }
-        sections.append(savings_section)
-
-        await self._store_report_data(report.id, savings_section)
-        return sections
-
-    async def _generate_system_performance(self, report: Report) -> List[Dict[str, Any]]:
-        """Generate system performance report."""
-        sections = []
-
+        return savings_section
+
+    @staticmethod
+    def _finished_between(start_day: Optional[date], end_day: Optional[date]) -> List[Any]:
+        """Conditions for jobs that finished on the given days (inclusive), as in the rollups."""
+        conditions = [OptimizationJob.status.in_(rollups.TERMINAL_STATUSES)]
+        if start_day is not None:
+            conditions.append(OptimizationJob.completed_at >= datetime.combine(start_day, datetime.min.time()))
+        if end_day is not None:
+            conditions.append(
+                OptimizationJob.completed_at < datetime.combine(end_day + timedelta(days=1), datetime.min.time())
+            )
+        return conditions
+
+    async def _fuel_savings_percentiles(
+        self, conditions: List[Any], fractions: Tuple[float, ...] = FUEL_SAVINGS_PERCENTILES
+    ) -> Dict[str, Optional[float]]:
+        """
+        Fuel savings percentiles (linear interpolation) of the results of matching jobs.
+
+        PostgreSQL computes them with percentile_cont. Elsewhere the database
+        sorts the values and they are streamed from a server-side cursor,
+        keeping only the ranks needed, so memory does not grow with the range.
+        """
+        value = OptimizationResult.fuel_savings_percentage
+        base = select(value).join(OptimizationJob, OptimizationResult.job_id == OptimizationJob.id).where(
+            value.is_not(None), *conditions
+        )
+        names = [f"p{round(fraction * 100)}" for fraction in fractions]
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            stmt = select(*(
+                func.percentile_cont(fraction).within_group(value.asc()) for fraction in fractions
+            )).select_from(base.subquery())
+            row = (await self.db.execute(stmt)).one()
+            return {name: float(v) if v is not None else None for name, v in zip(names, row)}
+
+        count = (await self.db.execute(select(func.count()).select_from(base.subquery()))).scalar()
+        if not count:
+            return dict.fromkeys(names)
+
+        positions = [(count - 1) * fraction for fraction in fractions]
+        needed = {int(p) for p in positions} | {min(int(p) + 1, count - 1) for p in positions}
+        values = {}
+        stmt = base.order_by(value.asc()).limit(max(needed) + 1)
+        rank = 0
+        async for v in await self.db.stream_scalars(stmt.execution_options(yield_per=STREAM_BATCH_SIZE)):
+            if rank in needed:
+                values[rank] = v
+            rank += 1
+
+        percentiles = {}
+        for name, position in zip(names, positions):
+            lower = values.get(int(position))
+            upper = values.get(min(int(position) + 1, count - 1), lower)
+            if lower is None:
+                # Results deleted between the count and the read
+                percentiles[name] = None
+                continue
+            percentiles[name] = lower + (upper - lower) * (position - int(position))
+        return percentiles
+
+    async def _generate_system_performance(self, report: Report) -> Dict[str, Any]:
+        """
+        Generate system performance report.
+
+        Metrics are aggregated in SQL per name and day; the daily rows are
+        streamed, so the report size depends on the days covered, not on the
+        number of samples.
+        """
         # Get system metrics
         start_date = datetime.fromisoformat(report.date_range['start_date']) if report.date_range else datetime.now(UTC) - timedelta(days=30)
         end_date = datetime.fromisoformat(report.date_range['end_date']) if report.date_range else datetime.now(UTC)
 
-        stmt = select(SystemMetrics).where(
+        day = func.date(SystemMetrics.measured_at)
+        stmt = select(
+            SystemMetrics.metric_category,
+            SystemMetrics.metric_name,
+            day.label("day"),
+            func.count(SystemMetrics.id).label("samples"),
+            func.avg(SystemMetrics.metric_value).label("average"),
+            func.min(SystemMetrics.metric_value).label("minimum"),
+            func.max(SystemMetrics.metric_value).label("maximum")
+        ).where(
             SystemMetrics.measured_at.between(start_date, end_date)
-        ).order_by(SystemMetrics.measured_at)
-
-        metrics = (await self.db.execute(stmt)).scalars().all()
-
-        # Group metrics by category
-        performance_metrics = [m for m in metrics if m.metric_category == 'performance']
-        usage_metrics = [m for m in metrics if m.metric_category == 'usage']
+        ).group_by(
+            SystemMetrics.metric_category, SystemMetrics.metric_name, day
+        ).order_by(day)
+
+        # Per metric: overall figures and daily averages
+        metrics: Dict[str, Dict[str, Any]] = {}
+        async for row in await self.db.stream(stmt.execution_options(yield_per=STREAM_BATCH_SIZE)):
+            metric = metrics.setdefault(row.metric_name, {
+                "category": row.metric_category,
+                "samples": 0,
+                "sum": 0.0,
+                "minimum": row.minimum,
+                "maximum": row.maximum,
+                "daily_averages": []
+            })
+            metric["samples"] += row.samples
+            metric["sum"] += row.average * row.samples
+            metric["minimum"] = min(metric["minimum"], row.minimum)
+            metric["maximum"] = max(metric["maximum"], row.maximum)
+            metric["daily_averages"].append({"day": str(row.day), "value": row.average})
+        for metric in metrics.values():
+            metric["average"] = metric.pop("sum") / metric["samples"]
+
+        def daily_values(category: str, name: str) -> List[float]:
+            metric = metrics.get(name)
+            if metric is None or metric["category"] != category:
+                return []
+            return [point["value"] for point in metric["daily_averages"]]
 
         performance_section = {
             "name": "system_performance",
-            "order": 1,
             "data": {
                 "period": {"start": start_date.isoformat(), "end": end_date.isoformat()},
-                "api_response_times": [m.metric_value for m in performance_metrics if m.metric_name == 'api_response_time'],
-                "success_rates": [m.metric_value for m in performance_metrics if m.metric_name == 'success_rate'],
-                "active_users": [m.metric_value for m in usage_metrics if m.metric_name == 'active_users']
+                "api_response_times": daily_values('performance', 'api_response_time'),
+                "success_rates": daily_values('performance', 'success_rate'),
+                "active_users": daily_values('usage', 'active_users'),
+                "metrics": metrics
             }
         }
-        sections.append(performance_section)
-
-        await self._store_report_data(report.id, performance_section)
-        return sections
+        return performance_section
 
-    async def _generate_user_activity(self, report: Report) -> List[Dict[str, Any]]:
+    async def _generate_user_activity(self, report: Report) -> Dict[str, Any]:
         """Generate user activity report."""
-        sections = []
-
         # Get user activity data
         start_date = datetime.fromisoformat(report.date_range['start_date']) if report.date_range else datetime.now(UTC) - timedelta(days=30)
         end_date = datetime.fromisoformat(report.date_range['end_date']) if report.date_range else datetime.now(UTC)
@@ -312,7 +612,6 @@ class ReportingService:
 
         activity_section = {
             "name": "user_activity",
-            "order": 1,
             "data": {
                 "period": {"start": start_date.isoformat(), "end": end_date.isoformat()},
                 "new_users": user_count,
@@ -320,63 +619,60 @@ class ReportingService:
                 "total_imports": import_count
             }
         }
-        sections.append(activity_section)
-
-        await self._store_report_data(report.id, activity_section)
-        return sections
+        return activity_section
 
-    async def _generate_import_analytics(self, report: Report) -> List[Dict[str, Any]]:
+    async def _generate_import_analytics(self, report: Report) -> Dict[str, Any]:
         """Generate import analytics report."""
-        sections = []
-
         start_date = datetime.fromisoformat(report.date_range['start_date']) if report.date_range else datetime.now(UTC) - timedelta(days=30)
         end_date = datetime.fromisoformat(report.date_range['end_date']) if report.date_range else datetime.now(UTC)
 
-        # Get import jobs
-        stmt = select(ImportJob).where(
+        is_completed = ImportJob.status == 'completed'
+        stmt = select(
+            func.count(ImportJob.id),
+            func.count(case((is_completed, ImportJob.id))),
+            func.count(case((ImportJob.status == 'failed', ImportJob.id))),
+            # Sum over completed imports with a time, averaged over all completed ones
+            func.sum(case((is_completed, ImportJob.processing_time_seconds)))
+        ).where(
             ImportJob.created_at.between(start_date, end_date)
         )
-        imports = (await self.db.execute(stmt)).scalars().all()
-
-        successful_imports = [i for i in imports if i.status == 'completed']
-        failed_imports = [i for i in imports if i.status == 'failed']
+        total_imports, successful_imports, failed_imports, processing_time = (await self.db.execute(stmt)).one()
 
         import_section = {
             "name": "import_analytics",
-            "order": 1,
             "data": {
                 "period": {"start": start_date.isoformat(), "end": end_date.isoformat()},
-                "total_imports": len(imports),
-                "successful_imports": len(successful_imports),
-                "failed_imports": len(failed_imports),
-                "success_rate": (len(successful_imports) / len(imports) * 100) if imports else 0,
-                "average_processing_time": sum(i.processing_time_seconds for i in successful_imports if i.processing_time_seconds) / len(successful_imports) if successful_imports else 0
+                "total_imports": total_imports,
+                "successful_imports": successful_imports,
+                "failed_imports": failed_imports,
+                "success_rate": (successful_imports / total_imports * 100) if total_imports else 0,
+                "average_processing_time": (processing_time or 0) / successful_imports if successful_imports else 0
             }
         }
-        sections.append(import_section)
-
-        await self._store_report_data(report.id, import_section)
-        return sections
+        return import_section
 
-    async def _store_report_data(self, report_id: str, section_data: Dict[str, Any]):
-        """Store report section data in database."""
-
-        report_data = ReportData(
+    @staticmethod
+    def _report_data(report_id: str, section_data: Dict[str, Any], completeness: float = 1.0) -> ReportData:
+        """Report section data row."""
+        return ReportData(
             report_id=report_id,
             section_name=section_data["name"],
             section_order=section_data["order"],
             raw_data=section_data["data"],
             chart_config=section_data.get("charts", []),
-            data_source="optimization_results"
+            data_source="optimization_results",
+            data_completeness=completeness
         )
 
-        self.db.add(report_data)
-        await self.db.commit()
+    @staticmethod
+    def _file_name(report: Report) -> str:
+        """Report file name without extension."""
+        return f"report_{report.id}_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}"
 
     async def _create_report_file(self, report: Report, sections: List[Dict[str, Any]]) -> Path:
         """Create report file in specified format."""
 
-        file_name = f"report_{report.id}_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}"
+        file_name = self._file_name(report)
 
         if report.format == ReportFormat.PDF:
             return await self._create_pdf_report(report, sections, file_name)
@@ -395,8 +691,6 @@ class ReportingService:
 
         if PDF_AVAILABLE:
             try:
-                pdf_generator = PDFGenerator()
-
                 report_data = {
                     'id': report.id,
                     'title': report.title,
@@ -407,11 +701,11 @@ class ReportingService:
                     'date_range': report.date_range or {}
                 }
 
-                return pdf_generator.generate_report_pdf(report_data, sections, file_path)
+                # Laid out on the PDF rendering pool, off the event loop
+                return await pdf_render_pool.render(report_data, sections, file_path)
             except Exception as e:
                 # Fallback to simple text-based report
-                print(f"PDF generation failed: {e}. Creating text fallback.")
-                pass
+                logger.warning("PDF generation failed, creating text fallback", report_id=report.id, error=str(e))
 
         # Fallback: create a simple text-based report
         text_path = file_path.with_suffix('.txt')
@@ -431,13 +725,11 @@ class ReportingService:
         return text_path
 
     async def _create_excel_report(self, report: Report, sections: List[Dict[str, Any]], file_name: str) -> Path:
-        """Create Excel report using Excel generator."""
+        """Create Excel report using the streaming Excel generator."""
         file_path = self.reports_dir / f"{file_name}.xlsx"
 
         if EXCEL_AVAILABLE:
             try:
-                excel_generator = ExcelGenerator()
-
                 report_data = {
                     'id': report.id,
                     'title': report.title,
@@ -447,67 +739,68 @@ class ReportingService:
                     'status': report.status,
                     'date_range': report.date_range or {}
                 }
-
-                return excel_generator.generate_report_excel(report_data, sections, file_path)
+                return await ExcelGenerator().write_report(
+                    report_data, self._file_sections(report, sections), file_path
+                )
             except Exception as e:
-                # Fallback to pandas-based Excel
-                print(f"Advanced Excel generation failed: {e}. Using basic Excel generation.")
-                pass
+                logger.warning("Excel generation failed, creating CSV instead", report_id=report.id, error=str(e))
+                file_path.unlink(missing_ok=True)
 
-        # Fallback: create basic Excel using pandas
-        try:
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                # Summary sheet
-                summary_data = {
-                    "Report Title": [report.title],
-                    "Generated": [datetime.now(UTC).isoformat()],
-                    "Type": [report.report_type],
-                    "Status": [report.status],
-                    "Description": [report.description or ""]
-                }
-                pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
-
-                # Data sheets
-                for section in sections:
-                    sheet_name = section['name'][:31]  # Excel sheet name limit
-
-                    # Convert section data to DataFrame
-                    section_data = section['data']
-                    if isinstance(section_data, dict):
-                        # Convert dict to DataFrame
-                        df_data = []
-                        for key, value in section_data.items():
-                            df_data.append({
-                                'Metric': key.replace('_', ' ').title(),
-                                'Value': value if not isinstance(value, (dict, list)) else str(value)
-                            })
-                        section_df = pd.DataFrame(df_data)
-                    else:
-                        section_df = pd.DataFrame([section_data])
-
-                    section_df.to_excel(writer, sheet_name=sheet_name, index=False)
-
-            return file_path
-        except Exception as e:
-            # Final fallback: create CSV
-            print(f"Excel generation failed: {e}. Creating CSV fallback.")
-            return await self._create_csv_report(report, sections, file_name)
+        return await self._create_csv_report(report, sections, file_name)
 
     async def _create_csv_report(self, report: Report, sections: List[Dict[str, Any]], file_name: str) -> Path:
-        """Create CSV report."""
+        """Create CSV report using the streaming CSV generator."""
         file_path = self.reports_dir / f"{file_name}.csv"
+        return await CSVGenerator().write_report(self._file_sections(report, sections), file_path)
+
+    async def _file_sections(
+        self, report: Report, sections: List[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Sections for the tabular file writers, with their detail tables.
 
-        # Flatten all section data into a single DataFrame
-        all_data = []
+        A table's rows are only queried when the writer reaches it.
+        """
+        tables = {section.name: section.table for section in self._report_sections(report) if section.table}
         for section in sections:
-            section_data = section['data'].copy()
-            section_data['section'] = section['name']
-            all_data.append(section_data)
+            table = None
+            if section['name'] in tables and not section.get('failed'):
+                table = getattr(self, tables[section['name']])(report)
+            yield {**section, 'table': table} if table else section
 
-        df = pd.DataFrame(all_data)
-        df.to_csv(file_path, index=False)
+    def _optimization_job_table(self, report: Report) -> Optional[Dict[str, Any]]:
+        """Jobs of the optimization summary with their results, if ``include_job_rows`` is set."""
+        config = OptimizationSummaryConfig(**report.report_config)
+        if not config.include_job_rows:
+            return None
+        start_day = end_day = None
+        if report.date_range:
+            start_day = datetime.fromisoformat(report.date_range['start_date']).date()
+            end_day = datetime.fromisoformat(report.date_range['end_date']).date()
 
-        return file_path
+        conditions = self._finished_between(start_day, end_day)
+        if config.scenario_ids:
+            conditions.append(OptimizationJob.scenario_id.in_(config.scenario_ids))
+
+        stmt = select(
+            OptimizationJob.id,
+            OptimizationJob.scenario_id,
+            OptimizationJob.status,
+            OptimizationJob.started_at,
+            OptimizationJob.completed_at,
+            OptimizationJob.runtime_seconds,
+            OptimizationResult.fuel_savings_percentage,
+            OptimizationResult.co2_reduction_percentage,
+            OptimizationResult.thermal_efficiency,
+            OptimizationResult.annual_cost_savings,
+        ).outerjoin(OptimizationResult).where(*conditions).order_by(OptimizationJob.completed_at, OptimizationJob.id)
+        return {"columns": OPTIMIZATION_JOB_COLUMNS, "batches": self._stream_batches(stmt)}
+
+    async def _stream_batches(self, stmt) -> AsyncIterator[List[Tuple[Any, ...]]]:
+        """Rows of ``stmt`` from a server-side cursor, STREAM_BATCH_SIZE at a time."""
+        result = await self.db.stream(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield [tuple(row) for row in partition]
 
     async def _create_json_report(self, report: Report, sections: List[Dict[str, Any]], file_name: str) -> Path:
         """Create JSON report."""
@@ -530,87 +823,104 @@ class ReportingService:
         return file_path
 
     async def get_dashboard_metrics(self, user_id: str) -> DashboardMetrics:
-        """Get dashboard metrics for user."""
-        from dateutil.relativedelta import relativedelta
-
-        # Total optimizations
-        opt_count_stmt = select(func.count(OptimizationJob.id)).where(
-            OptimizationJob.user_id == user_id
+        """
+        Get dashboard metrics for user.
+
+        The user's figures and the system-wide ones come from the dashboard
+        cache or, on a miss, from the statistics rollups plus a count of the
+        user's unfinished jobs.
+        """
+        version = dashboard_cache.version
+        user_figures = await dashboard_cache.get(user_id)
+        if user_figures is None:
+            user_figures = await self._user_dashboard_figures(user_id)
+            await dashboard_cache.set(user_id, user_figures, version)
+
+        system_figures = await dashboard_cache.get(SYSTEM_KEY)
+        if system_figures is None:
+            system_figures = await self._system_dashboard_figures()
+            await dashboard_cache.set(SYSTEM_KEY, system_figures, version)
+
+        total_optimizations = user_figures["total_optimizations"]
+        success_rate = (
+            user_figures["completed_optimizations"] / total_optimizations * 100
+            if total_optimizations > 0 else 0.0
         )
-        total_optimizations = (await self.db.execute(opt_count_stmt)).scalar() or 0
-
-        # Active users (last 30 days)
-        thirty_days_ago = datetime.now(UTC) - timedelta(days=30)
-        active_users_stmt = select(func.count(func.distinct(OptimizationJob.user_id))).where(
-            OptimizationJob.created_at >= thirty_days_ago
-        )
-        active_users = (await self.db.execute(active_users_stmt)).scalar() or 0
-
-        # Fuel savings average
-        fuel_savings_stmt = select(func.avg(OptimizationResult.fuel_savings_percentage)).join(
-            OptimizationJob
-        ).where(OptimizationJob.user_id == user_id)
-        fuel_savings_total = (await self.db.execute(fuel_savings_stmt)).scalar() or 0.0
-
-        # CO2 reduction total (sum of all reductions)
-        co2_stmt = select(func.sum(OptimizationResult.co2_reduction_percentage)).join(
-            OptimizationJob
-        ).where(OptimizationJob.user_id == user_id)
-        co2_reduction_total = (await self.db.execute(co2_stmt)).scalar() or 0.0
-
-        # Success rate
-        completed_count_stmt = select(func.count(OptimizationJob.id)).where(
-            and_(OptimizationJob.user_id == user_id, OptimizationJob.status == 'completed')
-        )
-        completed_optimizations = (await self.db.execute(completed_count_stmt)).scalar() or 0
-        success_rate = (completed_optimizations / total_optimizations * 100) if total_optimizations > 0 else 0.0
-
-        # Optimizations this month
-        now = datetime.now(UTC)
-        first_day_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        month_count_stmt = select(func.count(OptimizationJob.id)).where(
-            and_(
-                OptimizationJob.user_id == user_id,
-                OptimizationJob.created_at >= first_day_of_month
-            )
-        )
-        optimizations_this_month = (await self.db.execute(month_count_stmt)).scalar() or 0
 
         # System uptime (based on oldest job)
-        oldest_job_stmt = select(func.min(OptimizationJob.created_at))
-        oldest_job_date = (await self.db.execute(oldest_job_stmt)).scalar()
-        if oldest_job_date:
-            # Convert offset-naive date from DB to UTC
-            if oldest_job_date.tzinfo is None:
-                oldest_job_date = oldest_job_date.replace(tzinfo=UTC)
+        if system_figures["oldest_job_date"]:
+            oldest_job_date = datetime.fromisoformat(system_figures["oldest_job_date"])
             days_running = (datetime.now(UTC) - oldest_job_date).days
             system_uptime = 99.5 if days_running > 0 else 100.0  # Assume high uptime
         else:
             system_uptime = 100.0
 
-        # API response time average (calculate from completed jobs runtime)
-        avg_runtime_stmt = select(func.avg(OptimizationJob.runtime_seconds)).where(
-            and_(
-                OptimizationJob.user_id == user_id,
-                OptimizationJob.status == 'completed',
-                OptimizationJob.runtime_seconds.isnot(None)
-            )
-        )
-        avg_runtime = (await self.db.execute(avg_runtime_stmt)).scalar()
-        # Convert to ms and use as proxy for system performance
+        # Completed jobs' runtime in ms as a proxy for system performance
+        avg_runtime = user_figures["avg_runtime_seconds"]
         api_response_time_avg = int(avg_runtime * 10) if avg_runtime else 150
 
         return DashboardMetrics(
             total_optimizations=total_optimizations,
-            active_users=active_users,
-            fuel_savings_total=float(fuel_savings_total),
-            co2_reduction_total=float(co2_reduction_total),
+            active_users=system_figures["active_users"],
+            fuel_savings_total=user_figures["fuel_savings_avg"],
+            co2_reduction_total=user_figures["co2_reduction_sum"],
             system_uptime=float(system_uptime),
             api_response_time_avg=api_response_time_avg,
-            optimizations_this_month=optimizations_this_month,
+            optimizations_this_month=user_figures["optimizations_this_month"],
             success_rate=float(success_rate)
         )
 
+    async def _user_dashboard_figures(self, user_id: str) -> Dict[str, Any]:
+        """Job counts, runtime and result totals of one user."""
+        now = datetime.now(UTC)
+        first_day_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        # Finished jobs from the user's rollups, by the day they finished
+        days = await rollup_totals(self.db, rollups.USER, [user_id])
+        finished = rollups.sum_days(days)
+        finished_this_month = sum(
+            day["jobs_finished"] for day in days if day["day"] >= first_day_of_month.date()
+        )
+
+        # Jobs still queued or running
+        in_flight_stmt = select(
+            func.count(OptimizationJob.id),
+            func.count(case((OptimizationJob.created_at >= first_day_of_month, OptimizationJob.id)))
+        ).where(
+            OptimizationJob.user_id == user_id,
+            OptimizationJob.status.notin_(rollups.TERMINAL_STATUSES)
+        )
+        in_flight, in_flight_this_month = (await self.db.execute(in_flight_stmt)).one()
+
+        runtime_count = finished["runtime_count"]
+        return {
+            "total_optimizations": finished["jobs_finished"] + (in_flight or 0),
+            "completed_optimizations": finished["jobs_completed"],
+            "optimizations_this_month": finished_this_month + (in_flight_this_month or 0),
+            "avg_runtime_seconds": finished["runtime_seconds_sum"] / runtime_count if runtime_count else None,
+            "fuel_savings_avg": float(rollups.average(finished, "fuel_savings")),
+            "co2_reduction_sum": float(finished["co2_reduction_sum"]),
+        }
+
+    async def _system_dashboard_figures(self) -> Dict[str, Any]:
+        """Users active in the last 30 days and the oldest job, shared by all users."""
+        thirty_days_ago = datetime.now(UTC) - timedelta(days=30)
+        stmt = select(
+            func.count(func.distinct(
+                case((OptimizationJob.created_at >= thirty_days_ago, OptimizationJob.user_id))
+            )),
+            func.min(OptimizationJob.created_at)
+        )
+        active_users, oldest_job_date = (await self.db.execute(stmt)).one()
+
+        if oldest_job_date is not None and oldest_job_date.tzinfo is None:
+            # Convert offset-naive date from DB to UTC
+            oldest_job_date = oldest_job_date.replace(tzinfo=UTC)
+        return {
+            "active_users": active_users or 0,
+            "oldest_job_date": oldest_job_date.isoformat() if oldest_job_date else None,
+        }
+
     async def get_report_progress(self, report_id: str) -> ReportProgress:
         """Get report generation progress."""
 
@@ -621,12 +931,19 @@ class ReportingService:
         if not report:
             raise ValueError("Report not found")
 
+        # One step per section, stored as each one finishes
+        sections_done = (await self.db.execute(
+            select(func.count(ReportData.id)).where(ReportData.report_id == report_id)
+        )).scalar()
+
         return ReportProgress(
             report_id=report_id,
             status=report.status,
             progress_percentage=report.progress_percentage,
             current_step=self._get_current_step(report.status),
-            estimated_completion=report.generated_at
+            estimated_completion=report.generated_at,
+            steps_completed=sections_done,
+            total_steps=len(REPORT_SECTIONS.get(report.report_type, [])) or 1
         )
 
     def _get_current_step(self, status: ReportStatus) -> str:
@@ -0,0 +1,259 @@
+"""
+Cache of authenticated users' principals.
+
+Pamięć podręczna tożsamości (principal) uwierzytelnionych użytkowników.
+
+``get_current_user`` authorizes a request with the user's id, role and
+active/verified flags only, so it caches those instead of loading the user
+row on every request. Principals live in a bounded per-process LRU with a
+short TTL (USER_CACHE_TTL_SECONDS) and, with ``USER_CACHE_BACKEND=redis``,
+also in Redis, shared by all API processes. Writes to a user (role,
+activation, password, profile) call :func:`invalidate_user` after their
+commit: it drops the local entry and the Redis key and publishes the user id
+on ``INVALIDATION_CHANNEL``, which :func:`listen_for_invalidations` applies
+in every other process. With the memory backend other processes see a
+change once their entry expires.
+"""
+
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+from uuid import UUID
+
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import MetricsCollector
+from app.models.user import User, UserRole
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+
+_REDIS_KEY_PREFIX = "fro:auth:principal:"
+INVALIDATION_CHANNEL = "fro:auth:principal:invalidate"
+
+# Wait before resubscribing after the invalidation channel dropped
+_RESUBSCRIBE_DELAY_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Authenticated user as seen by endpoints: identity, role and account flags."""
+
+    id: UUID
+    username: str
+    role: UserRole
+    is_active: bool
+    is_verified: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            is_active=bool(user.is_active),
+            is_verified=bool(user.is_verified),
+        )
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "id": str(self.id),
+            "username": self.username,
+            "role": getattr(self.role, "value", self.role),
+            "is_active": self.is_active,
+            "is_verified": self.is_verified,
+        })
+
+    @classmethod
+    def from_json(cls, data: Union[str, bytes]) -> "UserPrincipal":
+        values = json.loads(data)
+        return cls(
+            id=UUID(values["id"]),
+            username=values["username"],
+            role=values["role"],
+            is_active=values["is_active"],
+            is_verified=values["is_verified"],
+        )
+
+    # Same rules as the User model's properties
+
+    @property
+    def is_admin(self) -> bool:
+        """Check if user is admin."""
+        return self.role == UserRole.ADMIN
+
+    @property
+    def is_engineer(self) -> bool:
+        """Check if user is engineer."""
+        return self.role == UserRole.ENGINEER
+
+    @property
+    def can_create_scenarios(self) -> bool:
+        """Check if user can create scenarios."""
+        return self.role in [UserRole.ADMIN, UserRole.ENGINEER]
+
+    @property
+    def can_manage_users(self) -> bool:
+        """Check if user can manage other users."""
+        return self.role == UserRole.ADMIN
+
+    @property
+    def can_view_all_scenarios(self) -> bool:
+        """Check if user can view all scenarios."""
+        return self.role == UserRole.ADMIN
+
+
+class UserPrincipalCache:
+    """Per-process LRU of principals with a TTL, over the optional Redis tier."""
+
+    def __init__(self):
+        self._entries: "OrderedDict[UUID, Tuple[UserPrincipal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        # Bumped by every invalidation; principals loaded before one are not stored
+        self.version = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.USER_CACHE_BACKEND != "none" and settings.USER_CACHE_TTL_SECONDS > 0
+
+    def _client(self):
+        if settings.USER_CACHE_BACKEND != "redis" or not REDIS_AVAILABLE:
+            return None
+        if self._redis is None:
+            self._redis = aioredis.Redis.from_url(settings.REDIS_URL)
+        return self._redis
+
+    def _get_local(self, user_id: UUID) -> Optional[UserPrincipal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def _store_local(self, principal: UserPrincipal) -> None:
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + settings.USER_CACHE_TTL_SECONDS)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > settings.USER_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def drop_local(self, user_id: UUID) -> None:
+        """Forget one user in this process."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self.version += 1
+
+    def clear_local(self) -> None:
+        """Forget all users in this process."""
+        with self._lock:
+            self._entries.clear()
+            self.version += 1
+
+    async def get(self, user_id: UUID) -> Optional[UserPrincipal]:
+        """Cached principal of ``user_id``, or None when it has to be loaded."""
+        if not self.enabled:
+            return None
+
+        principal = self._get_local(user_id)
+        if principal is not None:
+            MetricsCollector.track_user_cache_lookup("memory")
+            return principal
+
+        client = self._client()
+        if client is not None:
+            try:
+                data = await client.get(_REDIS_KEY_PREFIX + str(user_id))
+            except Exception as e:
+                logger.warning("User cache read failed", user_id=str(user_id), error=str(e))
+                data = None
+            if data is not None:
+                principal = UserPrincipal.from_json(data)
+                self._store_local(principal)
+                MetricsCollector.track_user_cache_lookup("redis")
+                return principal
+
+        MetricsCollector.track_user_cache_lookup("miss")
+        return None
+
+    async def set(self, principal: UserPrincipal, version: int) -> None:
+        """
+        Cache a principal loaded from the database.
+
+        ``version`` is :attr:`version` read before the load; if the user was
+        invalidated since, the principal may be stale and is not cached.
+        """
+        if not self.enabled or version != self.version:
+            return
+        self._store_local(principal)
+
+        client = self._client()
+        if client is not None:
+            try:
+                await client.set(
+                    _REDIS_KEY_PREFIX + str(principal.id),
+                    principal.to_json(),
+                    ex=max(1, math.ceil(settings.USER_CACHE_TTL_SECONDS)),
+                )
+            except Exception as e:
+                logger.warning("User cache write failed", user_id=str(principal.id), error=str(e))
+
+    async def invalidate(self, user_id: UUID) -> None:
+        """Forget a user here, in Redis and in every process listening on the channel."""
+        self.drop_local(user_id)
+
+        client = self._client()
+        if client is not None:
+            try:
+                await client.delete(_REDIS_KEY_PREFIX + str(user_id))
+                await client.publish(INVALIDATION_CHANNEL, str(user_id))
+            except Exception as e:
+                logger.warning("User cache invalidation failed", user_id=str(user_id), error=str(e))
+
+
+user_cache = UserPrincipalCache()
+
+
+async def invalidate_user(user_id: Union[UUID, str]) -> None:
+    """Drop a user's cached principal; call after committing a change to the user."""
+    await user_cache.invalidate(UUID(str(user_id)))
+
+
+async def listen_for_invalidations() -> None:
+    """Apply invalidations published by other processes; runs until cancelled."""
+    client = user_cache._client()
+    if client is None:
+        return
+
+    while True:
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Invalidations published while not subscribed were missed
+                user_cache.clear_local()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        user_cache.drop_local(UUID(message["data"].decode()))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("User cache invalidation channel lost", error=str(e))
+            user_cache.clear_local()
+            await asyncio.sleep(_RESUBSCRIBE_DELAY_SECONDS)
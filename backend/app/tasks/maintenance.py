@@ -22,6 +22,7 @@ from app.core.config import settings
 from app.models.import_job import ImportJob
 from app.models.optimization import OptimizationJob
 from app.models.reporting import Report
+from app.services.optimization_rollups import rebuild_rollups
 
 logger = structlog.get_logger(__name__)
 
@@ -181,4 +182,30 @@ async def cleanup_old_files(self) -> dict:
             "status": "error",
             "error": str(e),
             "cleaned_at": datetime.now(UTC).isoformat()
-        }
\ No newline at end of file
+        }
+
+
+@celery_app.task(bind=True, base=AsyncCeleryTask, name="app.tasks.maintenance.rebuild_optimization_rollups")
+async def rebuild_optimization_rollups(self) -> dict:
+    """
+    Recompute optimization statistics rollups from the job and result tables.
+
+    Przelicza tabele rollup statystyk optymalizacji od zera.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            rows = await rebuild_rollups(db)
+
+        return {
+            "status": "success",
+            "rollup_rows": rows,
+            "rebuilt_at": datetime.now(UTC).isoformat()
+        }
+
+    except Exception as e:
+        logger.error("Rollup rebuild failed", error=str(e))
+        return {
+            "status": "error",
+            "error": str(e),
+            "rebuilt_at": datetime.now(UTC).isoformat()
+        }
@@ -8,12 +8,18 @@ from datetime import datetime, timedelta, UTC
 from typing import Optional, Dict, Any
 import structlog
 from celery import Task
+from celery.exceptions import SoftTimeLimitExceeded
 import asyncio
 import nest_asyncio
 
-from app.celery import celery_app
+from app.celery import celery_app, QUEUE_OPTIMIZATION_INTERACTIVE
+from app.core.config import settings
 from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
 from app.services.optimization_service import OptimizationService
+from app.services.job_scheduler import FairShareScheduler, broker_priority
+from app.services.optimization_checkpoint import get_checkpoint_store
+from app.services.job_profiler import JobProfiler
 from app.models.optimization import OptimizationStatus
 
 logger = structlog.get_logger(__name__)
@@ -55,27 +61,41 @@ class RunOptimizationTask(AsyncCeleryTask):
             Dictionary with optimization results
         """
         logger.info("Starting optimization task", job_id=job_id, task_id=self.request.id)
+        profiler = JobProfiler(job_id)
 
         try:
             async with AsyncSessionLocal() as db:
-                # Update job with Celery task ID
-                from sqlalchemy import select
-                from app.models.optimization import OptimizationJob
-
-                stmt = select(OptimizationJob).where(OptimizationJob.id == job_id)
-                result = await db.execute(stmt)
-                job = result.scalar_one_or_none()
-
-                if not job:
-                    raise ValueError(f"Job {job_id} not found")
-
-                job.celery_task_id = self.request.id
-                job.status = OptimizationStatus.RUNNING
-                job.started_at = datetime.now(UTC)
-                await db.commit()
+                with profiler.phase("load"):
+                    # Update job with Celery task ID
+                    from sqlalchemy import select
+                    from app.models.optimization import OptimizationJob
+
+                    stmt = select(OptimizationJob).where(OptimizationJob.id == job_id)
+                    result = await db.execute(stmt)
+                    job = result.scalar_one_or_none()
+
+                    if not job:
+                        raise ValueError(f"Job {job_id} not found")
+
+                    # A resumed job keeps its original start time
+                    first_start = job.started_at is None
+                    job.celery_task_id = self.request.id
+                    job.status = OptimizationStatus.RUNNING
+                    job.started_at = job.started_at or datetime.now(UTC)
+                    await db.commit()
+
+                if first_start and job.created_at:
+                    created_at = job.created_at
+                    if created_at.tzinfo is None:
+                        created_at = created_at.replace(tzinfo=UTC)
+                    metrics.track_queue_wait(
+                        job.queue_name or QUEUE_OPTIMIZATION_INTERACTIVE,
+                        (job.started_at - created_at).total_seconds()
+                    )
 
-                # Create optimization service
+                # Create optimization service; it adds its phases to the task's profiler
                 optimization_service = OptimizationService(db)
+                optimization_service.profiler = profiler
 
                 # Progress callback for Celery
                 # NOTE: This is called from SLSQP optimizer (sync context), so we can't use await
@@ -106,8 +126,10 @@ class RunOptimizationTask(AsyncCeleryTask):
                 # Set progress callback in optimization service
                 optimization_service.progress_callback = update_progress
 
-                # Run optimization
-                result = await optimization_service.run_optimization(job_id)
+                # Run optimization (resumes from the latest checkpoint if any)
+                result = await optimization_service.run_optimization(
+                    job_id, resumable_errors=(SoftTimeLimitExceeded,)
+                )
 
                 logger.info("Optimization completed successfully", job_id=job_id)
 
@@ -120,6 +142,18 @@ class RunOptimizationTask(AsyncCeleryTask):
                     'co2_reduction_percentage': result.co2_reduction_percentage if result else None
                 }
 
+        except SoftTimeLimitExceeded as e:
+            # Solver state is checkpointed - continue in a fresh task instead of failing
+            if await redispatch_from_checkpoint(job_id):
+                return {'job_id': job_id, 'status': 'resumed'}
+
+            logger.error("Optimization task exceeded time limit", job_id=job_id)
+            try:
+                await update_job_status_failed(job_id, f"Time limit exceeded: {e}", self.request.id)
+            except Exception as update_error:
+                logger.error("Failed to update job status to failed", error=str(update_error))
+            raise
+
         except Exception as e:
             logger.error("Optimization task failed", job_id=job_id, error=str(e), exc_info=True)
 
@@ -132,6 +166,10 @@ class RunOptimizationTask(AsyncCeleryTask):
             # Re-raise exception for Celery
             raise
 
+        finally:
+            # This job's slot is free now - hand it to the next held job
+            await dispatch_held_jobs()
+
 
 # Register task with Celery
 run_optimization_task = celery_app.register_task(RunOptimizationTask())
@@ -191,7 +229,10 @@ async def update_job_status_failed(job_id: str, error_message: str, celery_task_
                 if celery_task_id and not job.celery_task_id:
                     job.celery_task_id = celery_task_id
                 if job.started_at:
-                    job.runtime_seconds = (job.completed_at - job.started_at).total_seconds()
+                    started_at = job.started_at
+                    if started_at.tzinfo is None:
+                        started_at = started_at.replace(tzinfo=UTC)
+                    job.runtime_seconds = (job.completed_at - started_at).total_seconds()
 
                 await db.commit()
 
@@ -199,6 +240,78 @@ async def update_job_status_failed(job_id: str, error_message: str, celery_task_
         logger.error("Failed to update job status to failed", job_id=job_id, error=str(e))
 
 
+async def redispatch_from_checkpoint(job_id: str) -> bool:
+    """
+    Re-dispatch an interrupted job that has a checkpoint to resume from.
+
+    Returns:
+        False if there is no checkpoint or the job ran out of resumes
+    """
+    checkpoint = get_checkpoint_store().load(job_id)
+    if checkpoint is None or checkpoint.resume_count >= settings.OPTIMIZATION_MAX_RESUMES:
+        return False
+
+    try:
+        async with AsyncSessionLocal() as db:
+            from sqlalchemy import select
+            from app.models.optimization import OptimizationJob
+
+            stmt = select(OptimizationJob).where(OptimizationJob.id == job_id)
+            job = (await db.execute(stmt)).scalar_one_or_none()
+            if not job:
+                return False
+
+            run_optimization_task.apply_async(
+                args=[job_id],
+                queue=job.queue_name or QUEUE_OPTIMIZATION_INTERACTIVE,
+                priority=broker_priority(job.priority or 1)
+            )
+
+    except Exception as e:
+        logger.error("Failed to re-dispatch optimization job", job_id=job_id, error=str(e))
+        return False
+
+    logger.info(
+        "Optimization job re-dispatched from checkpoint",
+        job_id=job_id,
+        major_iterations=checkpoint.major_iterations,
+        resume_count=checkpoint.resume_count
+    )
+    return True
+
+
+async def dispatch_held_jobs() -> int:
+    """Dispatch held jobs into free slots, returning how many were sent."""
+    try:
+        async with AsyncSessionLocal() as db:
+            dispatched = await FairShareScheduler(db).dispatch_pending()
+            return len(dispatched)
+
+    except Exception as e:
+        logger.error("Failed to dispatch held optimization jobs", error=str(e))
+        return 0
+
+
+@celery_app.task
+def dispatch_pending_optimization_jobs() -> Dict[str, int]:
+    """
+    Periodic safety net for fair-share dispatch.
+
+    Picks up held jobs whose slot release was missed (e.g. worker crash).
+    """
+    nest_asyncio.apply()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        dispatched = loop.run_until_complete(dispatch_held_jobs())
+    finally:
+        loop.close()
+
+    if dispatched:
+        logger.info("Dispatched held optimization jobs", dispatched=dispatched)
+    return {'dispatched': dispatched}
+
+
 @celery_app.task
 def cleanup_old_optimization_jobs() -> Dict[str, int]:
     """
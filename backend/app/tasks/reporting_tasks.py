@@ -16,7 +16,7 @@ from app.core.database import AsyncSessionLocal
 from app.models.reporting import Report, ReportStatus
 from app.services.reporting_service import ReportingService
 from app.models.user import User
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 
 @celery_app.task(bind=True)
@@ -61,17 +61,19 @@ def generate_report_task(self, report_id: str):
                     meta={'progress': 25, 'status': 'generating', 'step': 'Collecting data...'}
                 )
 
-                # Generate report data
-                sections = await reporting_service._generate_report_data(report)
-
-                # Update progress
-                current_task.update_state(
-                    state='PROGRESS',
-                    meta={'progress': 60, 'status': 'generating', 'step': 'Processing data and creating visualizations...'}
-                )
+                def section_done(name: str, done: int, total: int) -> None:
+                    current_task.update_state(
+                        state='PROGRESS',
+                        meta={
+                            'progress': 25 + int(35 * done / total),
+                            'status': 'generating',
+                            'step': f'Generated section {name} ({done}/{total})'
+                        }
+                    )
 
-                # Create report file
-                file_path = await reporting_service._create_report_file(report, sections)
+                # Generate report data (sections run concurrently) and file,
+                # or reuse the file of an identical report over unchanged data
+                file_path = await reporting_service._build_report_file(report, on_section=section_done)
 
                 # Update progress
                 current_task.update_state(
@@ -143,13 +145,13 @@ def cleanup_expired_reports():
                         # Delete file if it exists
                         if report.file_path:
                             from pathlib import Path
-                            file_path = Path(report.file_path)
-                            if file_path.exists():
-                                file_path.unlink()
+                            from app.services.report_files import remove_report_file
+                            remove_report_file(Path(report.file_path))
 
                         # Update report status
                         report.file_path = None
                         report.file_size_bytes = None
+                        report.file_hash = None
                         report.download_url = None
 
                         cleaned_count += 1
@@ -291,19 +293,17 @@ def collect_system_metrics():
                 one_hour_ago = current_time - timedelta(hours=1)
 
                 # Count recent optimizations
-                opt_stmt = select(OptimizationJob).where(
+                opt_stmt = select(func.count(OptimizationJob.id)).where(
                     OptimizationJob.created_at >= one_hour_ago
                 )
-                opt_result = await db.execute(opt_stmt)
-                recent_optimizations = len(opt_result.scalars().all())
+                recent_optimizations = (await db.execute(opt_stmt)).scalar()
 
                 # Count active users (users who created optimizations in last 24 hours)
                 twenty_four_hours_ago = current_time - timedelta(hours=24)
-                active_users_stmt = select(OptimizationJob.user_id.distinct()).where(
+                active_users_stmt = select(func.count(OptimizationJob.user_id.distinct())).where(
                     OptimizationJob.created_at >= twenty_four_hours_ago
                 )
-                active_users_result = await db.execute(active_users_stmt)
-                active_users_count = len(active_users_result.scalars().all())
+                active_users_count = (await db.execute(active_users_stmt)).scalar()
 
                 app_metrics = [
                     SystemMetrics(
@@ -0,0 +1,11 @@
+"""
+Performance benchmarks of the backend.
+
+Benchmarki wydajności backendu.
+
+- ``benchmarks.suite``: physics, optimizer, import and reporting hot paths
+  with baseline comparison (``benchmarks/baseline.json``).
+- ``benchmarks.load_test``: load test of the API with scripted user
+  journeys on SQLite, an in-memory Redis and in-process Celery.
+- ``benchmarks.early_stopping``: early stopping against ftol-only stopping.
+"""
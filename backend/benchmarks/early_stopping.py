@@ -0,0 +1,129 @@
+"""
+Benchmark of stagnation-based early stopping against ftol-only stopping.
+
+Benchmark wczesnego zatrzymywania w porównaniu z samym kryterium ftol.
+
+Runs the backend SLSQP loop on a grid of regenerator cases with early
+stopping disabled and enabled and reports function evaluations, the
+triggered criterion and the objective difference as JSON.
+
+Usage (from backend/):
+    python -m benchmarks.early_stopping [--tolerance 1e-9] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import Any, Dict, List
+
+import numpy as np
+from scipy.optimize import Bounds
+
+from app.models.optimization import OptimizationScenario
+from app.services.optimization_checkpoint import NullCheckpointStore
+from app.services.optimization_service import OptimizationService, RegeneratorPhysicsModel
+
+DESIGN_VARIABLES = {
+    "checker_height": {"min": 0.5, "max": 1.5},
+    "checker_spacing": {"min": 0.08, "max": 0.15},
+    "wall_thickness": {"min": 0.2, "max": 0.5},
+}
+
+# (mass flow rate [kg/s], initial guess)
+CASES = [
+    (flow, start)
+    for flow in (50.0, 100.0, 150.0, 300.0, 600.0)
+    for start in ([0.6, 0.09, 0.3], [1.4, 0.14, 0.45])
+]
+
+
+class OfflineOptimizationService(OptimizationService):
+    """Runs the solver loop without a database."""
+
+    def __init__(self, physics_model: RegeneratorPhysicsModel):
+        super().__init__(db=None)
+        self.physics_model = physics_model
+        self.checkpoint_store = NullCheckpointStore()
+
+    async def _get_job(self, job_id: str):
+        return None
+
+    async def _persist_iteration_history(self, job_id: str, iteration_data: List[Dict[str, Any]]) -> None:
+        return None
+
+
+async def run_case(flow: float, start: List[float], tolerance: float, early_stopping: bool) -> Dict[str, Any]:
+    """Solve one case and return its evaluation statistics."""
+    physics_model = RegeneratorPhysicsModel({
+        "geometry_config": {"length": 10.0, "width": 8.0},
+        "thermal_config": {"gas_temp_inlet": 1600.0, "gas_temp_outlet": 600.0},
+        "flow_config": {"mass_flow_rate": flow},
+    })
+    scenario = OptimizationScenario(
+        objective="minimize_fuel_consumption",
+        algorithm="slsqp",
+        design_variables=DESIGN_VARIABLES,
+        optimization_config={"early_stopping": early_stopping},
+        max_iterations=200,
+        tolerance=tolerance
+    )
+    bounds = Bounds(
+        [v["min"] for v in DESIGN_VARIABLES.values()],
+        [v["max"] for v in DESIGN_VARIABLES.values()]
+    )
+    result = await OfflineOptimizationService(physics_model)._run_slsqp_optimization(
+        "benchmark", scenario, np.array(start), bounds, []
+    )
+    return {
+        "function_evaluations": result.function_evaluations,
+        "major_iterations": result.major_iterations,
+        "stop_criterion": result.stop_criterion,
+        "objective": float(result.fun),
+    }
+
+
+async def run_benchmark(tolerance: float) -> Dict[str, Any]:
+    """Run all cases with and without early stopping."""
+    cases = []
+    for flow, start in CASES:
+        baseline = await run_case(flow, start, tolerance, early_stopping=False)
+        stopped = await run_case(flow, start, tolerance, early_stopping=True)
+        cases.append({
+            "mass_flow_rate": flow,
+            "initial_guess": start,
+            "ftol_only": baseline,
+            "early_stopping": stopped,
+            "evaluations_saved": baseline["function_evaluations"] - stopped["function_evaluations"],
+            "objective_delta": stopped["objective"] - baseline["objective"],
+        })
+
+    total_baseline = sum(c["ftol_only"]["function_evaluations"] for c in cases)
+    total_stopped = sum(c["early_stopping"]["function_evaluations"] for c in cases)
+    return {
+        "tolerance": tolerance,
+        "cases": cases,
+        "total_evaluations_ftol_only": total_baseline,
+        "total_evaluations_early_stopping": total_stopped,
+        "evaluations_saved_percentage": (total_baseline - total_stopped) / max(total_baseline, 1) * 100,
+        "max_objective_delta": max(c["objective_delta"] for c in cases),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args.tolerance))
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(encoded)
+    print(encoded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
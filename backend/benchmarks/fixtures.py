@@ -0,0 +1,344 @@
+"""
+Reproducible inputs for the benchmark suite.
+
+Powtarzalne dane wejściowe dla zestawu benchmarków.
+
+Everything is generated from a seed: regenerator configurations, Excel
+import files, optimization job histories and material libraries in a
+throw-away SQLite database and report sections for the file writers, so
+two runs on the same machine measure the same work.
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import numpy as np
+from openpyxl import Workbook
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.import_job import ImportJob, ImportType
+from app.models.optimization import (
+    OptimizationJob, OptimizationResult, OptimizationScenario, OptimizationStatus
+)
+from app.models.regenerator import ConfigurationStatus, Material, RegeneratorConfiguration, RegeneratorType
+from app.models.user import User, UserRole
+from app.services.reporting_service import OPTIMIZATION_JOB_COLUMNS
+
+DESIGN_VARIABLES = {
+    "checker_height": {"min": 0.5, "max": 1.5},
+    "checker_spacing": {"min": 0.08, "max": 0.15},
+    "wall_thickness": {"min": 0.2, "max": 0.5},
+}
+
+# Source column -> import target field of the generated workbooks
+IMPORT_COLUMNS = {
+    "Name": "name",
+    "Type": "regenerator_type",
+    "Length [m]": "length",
+    "Width [m]": "width",
+    "Height [m]": "height",
+    "Design Temperature [C]": "design_temperature",
+    "Max Temperature [C]": "max_temperature",
+    "Thermal Efficiency [%]": "thermal_efficiency",
+}
+
+_REGENERATOR_TYPES = ("crown", "end-port", "cross-fired")
+
+# Vocabulary of the generated material library
+_MATERIAL_FAMILIES = {
+    "refractory": ("AZS", "Alumina", "Silica", "Zircon", "Mullite", "Magnesia", "Chrome", "Spinel"),
+    "insulation": ("Calcium Silicate", "Ceramic Fiber", "Perlite", "Vermiculite"),
+    "checker": ("Fused Cast", "Bonded", "Cruciform", "Chimney"),
+}
+_MATERIAL_SHAPES = ("Brick", "Block", "Board", "Castable", "Mortar", "Tile")
+_MANUFACTURERS = ("Forglass", "RHI Magnesita", "Saint-Gobain SEFPRO", "Vesuvius", "Calderys", "Ceradyne")
+
+
+def synthetic_configurations(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Regenerator configurations spanning the usual industrial range."""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "geometry_config": {
+                "length": float(rng.uniform(6.0, 16.0)),
+                "width": float(rng.uniform(4.0, 12.0)),
+            },
+            "thermal_config": {
+                "gas_temp_inlet": float(rng.uniform(1400.0, 1650.0)),
+                "gas_temp_outlet": float(rng.uniform(450.0, 700.0)),
+            },
+            "flow_config": {"mass_flow_rate": float(rng.uniform(30.0, 600.0))},
+        }
+        for _ in range(count)
+    ]
+
+
+def design_points(count: int, seed: int = 0) -> List[Dict[str, float]]:
+    """Design variable values drawn uniformly from DESIGN_VARIABLES."""
+    rng = np.random.default_rng(seed)
+    return [
+        {name: float(rng.uniform(b["min"], b["max"])) for name, b in DESIGN_VARIABLES.items()}
+        for _ in range(count)
+    ]
+
+
+def write_import_workbook(path: Path, rows: int, seed: int = 0, invalid_fraction: float = 0.05) -> Path:
+    """
+    Regenerator import workbook with ``rows`` data rows.
+
+    A share of rows has a maximum temperature below the design temperature
+    so the validation error path is exercised too. Written in openpyxl's
+    write-only mode, which keeps memory flat up to 1M rows.
+    """
+    rng = np.random.default_rng(seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Regenerators")
+    sheet.append(list(IMPORT_COLUMNS))
+
+    chunk = 10_000
+    for offset in range(0, rows, chunk):
+        n = min(chunk, rows - offset)
+        design_temp = rng.uniform(1000.0, 1400.0, n)
+        max_temp = design_temp + rng.uniform(50.0, 200.0, n)
+        invalid = rng.random(n) < invalid_fraction
+        max_temp[invalid] = design_temp[invalid] - 10.0
+        lengths = rng.uniform(6.0, 16.0, n)
+        widths = rng.uniform(4.0, 12.0, n)
+        heights = rng.uniform(4.0, 10.0, n)
+        efficiency = rng.uniform(60.0, 95.0, n)
+        types = rng.integers(0, len(_REGENERATOR_TYPES), n)
+        for i in range(n):
+            sheet.append([
+                f"Regenerator {offset + i}",
+                _REGENERATOR_TYPES[types[i]],
+                float(lengths[i]),
+                float(widths[i]),
+                float(heights[i]),
+                float(design_temp[i]),
+                float(max_temp[i]),
+                float(efficiency[i]),
+            ])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    workbook.save(path)
+    return path
+
+
+@asynccontextmanager
+async def benchmark_database(path: Path) -> AsyncIterator[sessionmaker]:
+    """Fresh SQLite database with all tables; yields a session factory."""
+    path.unlink(missing_ok=True)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+async def create_user(db: AsyncSession, role: UserRole = UserRole.ENGINEER) -> User:
+    """Benchmark user."""
+    unique_id = uuid.uuid4().hex[:8]
+    user = User(
+        username=f"benchmark_{unique_id}",
+        email=f"benchmark_{unique_id}@example.com",
+        full_name="Benchmark User",
+        password_hash="not-a-real-hash",
+        role=role,
+        is_active=True,
+        is_verified=True
+    )
+    db.add(user)
+    await db.commit()
+    return user
+
+
+async def create_import_job(db: AsyncSession, user: User, filename: str) -> ImportJob:
+    """Pending regenerator import of a workbook from write_import_workbook."""
+    job = ImportJob(
+        user_id=str(user.id),
+        filename=filename,
+        original_filename=filename,
+        file_size=0,
+        import_type=ImportType.REGENERATOR_CONFIG,
+        column_mapping=[
+            {"source_column": source, "target_field": target}
+            for source, target in IMPORT_COLUMNS.items()
+        ]
+    )
+    db.add(job)
+    await db.commit()
+    return job
+
+
+async def seed_job_history(
+    db: AsyncSession,
+    user: User,
+    jobs: int,
+    scenarios: int = 10,
+    seed: int = 0
+) -> List[str]:
+    """
+    Optimization history of ``jobs`` jobs spread over ``scenarios`` scenarios.
+
+    About 80% of the jobs are completed with a result; returns the scenario ids.
+    """
+    rng = np.random.default_rng(seed)
+    configuration = RegeneratorConfiguration(
+        user_id=str(user.id),
+        name=f"Benchmark Regenerator {uuid.uuid4().hex[:8]}",
+        regenerator_type=RegeneratorType.CROWN,
+        status=ConfigurationStatus.COMPLETED,
+        **synthetic_configurations(1, seed)[0]
+    )
+    db.add(configuration)
+    await db.flush()
+
+    scenario_ids = []
+    for i in range(scenarios):
+        scenario = OptimizationScenario(
+            user_id=str(user.id),
+            base_configuration_id=str(configuration.id),
+            name=f"Benchmark Scenario {i}",
+            scenario_type="geometry_optimization",
+            objective="minimize_fuel_consumption",
+            algorithm="slsqp",
+            design_variables=DESIGN_VARIABLES,
+            optimization_config={"max_iterations": 100},
+            max_iterations=100,
+            tolerance=1e-6
+        )
+        db.add(scenario)
+        await db.flush()
+        scenario_ids.append(str(scenario.id))
+
+    started = datetime.now(UTC) - timedelta(days=90)
+    points = design_points(jobs, seed)
+    for i in range(jobs):
+        completed = rng.random() < 0.8
+        created_at = started + timedelta(minutes=int(rng.integers(0, 90 * 24 * 60)))
+        job = OptimizationJob(
+            scenario_id=scenario_ids[i % scenarios],
+            user_id=str(user.id),
+            execution_config={"max_iterations": 100},
+            initial_values=points[i],
+            status=OptimizationStatus.COMPLETED if completed else OptimizationStatus.FAILED,
+            created_at=created_at,
+            started_at=created_at,
+            completed_at=created_at + timedelta(seconds=float(rng.uniform(5.0, 600.0))),
+            current_iteration=int(rng.integers(5, 100))
+        )
+        db.add(job)
+        if completed:
+            await db.flush()
+            fuel_savings = float(rng.uniform(2.0, 18.0))
+            db.add(OptimizationResult(
+                job_id=str(job.id),
+                optimized_configuration=points[i],
+                design_variables_final=points[i],
+                objective_value=float(rng.uniform(0.4, 0.9)),
+                baseline_metrics={"thermal_efficiency": 0.7},
+                optimized_metrics={"thermal_efficiency": 0.75},
+                improvement_percentages={"fuel_savings": fuel_savings},
+                fuel_savings_percentage=fuel_savings,
+                co2_reduction_percentage=fuel_savings * 0.9,
+                annual_cost_savings=float(rng.uniform(1e4, 5e5)),
+                thermal_efficiency=float(rng.uniform(60.0, 90.0))
+            ))
+        if i % 1000 == 999:
+            await db.commit()
+
+    await db.commit()
+    return scenario_ids
+
+
+async def seed_materials(db: AsyncSession, user: User, count: int, seed: int = 0) -> None:
+    """Material library of ``count`` generated materials with unique names and codes."""
+    rng = np.random.default_rng(seed)
+    families = list(_MATERIAL_FAMILIES.items())
+    rows = []
+    for i in range(count):
+        material_type, names = families[int(rng.integers(len(families)))]
+        family = names[int(rng.integers(len(names)))]
+        shape = _MATERIAL_SHAPES[int(rng.integers(len(_MATERIAL_SHAPES)))]
+        manufacturer = _MANUFACTURERS[int(rng.integers(len(_MANUFACTURERS)))]
+        prefix = family.replace(" ", "")[:3].upper()
+        rows.append({
+            "id": str(uuid.UUID(int=i + 1)),
+            "name": f"{family} {shape} {i:06d}",
+            "description": f"{family} {shape.lower()} for {material_type} service up to "
+                           f"{int(rng.integers(12, 18)) * 100} C",
+            "manufacturer": manufacturer,
+            "material_code": f"{prefix}-{i:06d}",
+            "material_type": material_type,
+            "properties": {"density": float(rng.uniform(500.0, 3500.0))},
+            "is_active": True,
+            "is_standard": bool(rng.random() < 0.2),
+            "created_by_user_id": str(user.id),
+        })
+        if len(rows) == 1000:
+            await db.execute(insert(Material), rows)
+            rows = []
+    if rows:
+        await db.execute(insert(Material), rows)
+    await db.commit()
+
+
+async def _job_row_batches(rows: int, batch_size: int, seed: int) -> AsyncIterator[List[Tuple[Any, ...]]]:
+    rng = np.random.default_rng(seed)
+    scenario_ids = [str(uuid.UUID(int=i)) for i in range(10)]
+    started = datetime(2026, 1, 1)
+    for offset in range(0, rows, batch_size):
+        n = min(batch_size, rows - offset)
+        minutes = rng.integers(0, 90 * 24 * 60, n)
+        runtimes = rng.uniform(5.0, 600.0, n)
+        savings = rng.uniform(2.0, 18.0, n)
+        completed = rng.random(n) < 0.8
+        batch = []
+        for i in range(n):
+            started_at = started + timedelta(minutes=int(minutes[i]))
+            fuel_savings = float(savings[i]) if completed[i] else None
+            batch.append((
+                str(uuid.UUID(int=offset + i + 1_000)),
+                scenario_ids[(offset + i) % len(scenario_ids)],
+                OptimizationStatus.COMPLETED.value if completed[i] else OptimizationStatus.FAILED.value,
+                started_at,
+                started_at + timedelta(seconds=float(runtimes[i])),
+                float(runtimes[i]),
+                fuel_savings,
+                fuel_savings * 0.9 if completed[i] else None,
+                float(60.0 + savings[i] * 1.5) if completed[i] else None,
+                float(savings[i] * 2e4) if completed[i] else None,
+            ))
+        yield batch
+
+
+async def report_file_sections(rows: int, batch_size: int = 1000, seed: int = 0) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Optimization summary sections as the report file writers receive them.
+
+    The summary's detail table has ``rows`` job rows, generated batch by
+    batch as the writer pulls them, like rows streamed from the database.
+    """
+    yield {
+        "name": "optimization_summary",
+        "data": {
+            "total_optimizations": rows,
+            "successful_optimizations": int(rows * 0.8),
+            "success_rate": 80.0,
+            "average_fuel_savings": 10.0,
+            "total_annual_savings": rows * 1.6e5,
+        },
+        "charts": [
+            {"type": "pie", "title": "Optimization Success Rate", "data": [80, 20], "labels": ["Successful", "Failed"]}
+        ],
+        "table": {"columns": OPTIMIZATION_JOB_COLUMNS, "batches": _job_row_batches(rows, batch_size, seed)},
+    }
+    yield {"name": "fuel_savings_distribution", "data": {"fuel_savings_percentiles": {"p50": 10.0, "p90": 16.4}}}
@@ -0,0 +1,243 @@
+"""
+Measurement and baseline comparison for the benchmark suite.
+
+Pomiary i porównanie z wynikami bazowymi dla zestawu benchmarków.
+
+Every benchmark produces a flat dict of metrics. Latencies are summarised
+as percentiles over the timed repetitions; allocations are measured in a
+separate tracemalloc run so that tracing does not distort the timings.
+Resident memory, which includes what C extensions allocate outside
+tracemalloc's view, is sampled by a background thread.
+A baseline file stores earlier metrics together with relative tolerances
+and optional absolute ones; metrics named in HIGHER_IS_BETTER regress when
+they drop, all others when they grow, and only by more than both
+tolerances. Mean and tail latencies (RECORDED_ONLY) are stored but never
+compared.
+"""
+
+import gc
+import json
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+# Metrics where a larger value is an improvement
+HIGHER_IS_BETTER = (
+    "throughput_per_second", "evaluations_per_second", "solves_per_second",
+    "rows_per_second", "reports_per_second",
+)
+
+# Workload sizes recorded alongside the metrics, never compared
+WORKLOAD_KEYS = ("repetitions", "rows", "jobs")
+
+# Recorded but never compared: with few repetitions they hinge on single
+# runs slowed by whatever else the machine was doing
+RECORDED_ONLY = ("latency_mean_seconds", "latency_p99_seconds", "latency_max_seconds")
+
+# Relative tolerance applied when the baseline does not name one for the metric
+DEFAULT_TOLERANCE = 0.25
+
+
+# Seconds between two resident memory samples
+RSS_SAMPLE_INTERVAL = 0.01
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process; the peak so far where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+class PeakRSS:
+    """
+    Context manager sampling the resident set size in a background thread.
+
+    ``peak_mb`` is the highest sample, ``growth_mb`` how far it rose above
+    the size at entry.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start_mb = 0.0
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def growth_mb(self) -> float:
+        return max(0.0, self.peak_mb - self.start_mb)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def __enter__(self) -> "PeakRSS":
+        gc.collect()
+        self.start_mb = self.peak_mb = current_rss_mb()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    """Percentiles of repeated timings in seconds."""
+    times = np.asarray(samples)
+    return {
+        "repetitions": int(times.size),
+        "latency_mean_seconds": float(times.mean()),
+        "latency_p50_seconds": float(np.percentile(times, 50)),
+        "latency_p95_seconds": float(np.percentile(times, 95)),
+        "latency_p99_seconds": float(np.percentile(times, 99)),
+        "latency_max_seconds": float(times.max()),
+    }
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """Time ``fn`` ``repeat`` times, then trace the allocations of one more call."""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    gc.collect()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats = latency_stats(samples)
+    stats["throughput_per_second"] = repeat / sum(samples)
+    stats["allocated_peak_mb"] = peak / (1024 * 1024)
+    return stats
+
+
+async def measure_async(
+    fn: Callable[..., Awaitable[Any]],
+    repeat: int,
+    warmup: int = 1,
+    trace_allocations: bool = True,
+    setup: Optional[Callable[[], Awaitable[Any]]] = None
+) -> Dict[str, Any]:
+    """
+    Async variant of :func:`measure`.
+
+    When ``setup`` is given it runs untimed before every call and its
+    result is passed to ``fn``, e.g. to create the record being processed.
+    """
+    async def call(timed: List[float]) -> None:
+        args = (await setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        await fn(*args)
+        timed.append(time.perf_counter() - start)
+
+    for _ in range(warmup):
+        await call([])
+
+    samples: List[float] = []
+    gc.collect()
+    for _ in range(repeat):
+        await call(samples)
+
+    stats = latency_stats(samples)
+    stats["throughput_per_second"] = repeat / sum(samples)
+
+    if trace_allocations:
+        args = (await setup(),) if setup is not None else ()
+        tracemalloc.start()
+        try:
+            await fn(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        stats["allocated_peak_mb"] = peak / (1024 * 1024)
+    return stats
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Regressions of ``results`` against a stored baseline.
+
+    The baseline has the shape ``{"tolerances": {metric: rel_tol},
+    "absolute_tolerances": {metric: abs_tol}, "results": {benchmark:
+    {metric: value}}}``; a metric regresses when it changes by more than
+    both its tolerances (no absolute tolerance means 0). Benchmarks or
+    metrics missing on either side, workload sizes and RECORDED_ONLY
+    metrics are skipped.
+    """
+    tolerances = baseline.get("tolerances", {})
+    absolute_tolerances = baseline.get("absolute_tolerances", {})
+    regressions = []
+    for name, expected_metrics in baseline.get("results", {}).items():
+        actual_metrics = results.get(name)
+        if actual_metrics is None:
+            continue
+        for metric, expected in expected_metrics.items():
+            if metric in WORKLOAD_KEYS or metric in RECORDED_ONLY:
+                continue
+            actual = actual_metrics.get(metric)
+            if not isinstance(expected, (int, float)) or not isinstance(actual, (int, float)):
+                continue
+            tolerance = tolerances.get(metric, tolerances.get("default", DEFAULT_TOLERANCE))
+            if metric in HIGHER_IS_BETTER:
+                regressed = actual < expected / (1 + tolerance)
+            else:
+                regressed = actual > expected * (1 + tolerance)
+            if regressed and abs(actual - expected) <= absolute_tolerances.get(metric, 0.0):
+                regressed = False
+            if regressed:
+                regressions.append({
+                    "benchmark": name,
+                    "metric": metric,
+                    "baseline": expected,
+                    "actual": actual,
+                    "tolerance": tolerance,
+                    "change_percentage": (actual - expected) / expected * 100 if expected else None,
+                })
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    """Read a baseline file, or None when it does not exist yet."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_baseline(
+    path: str,
+    results: Dict[str, Dict[str, Any]],
+    tolerances: Dict[str, float],
+    absolute_tolerances: Dict[str, float]
+) -> None:
+    """Store ``results`` as the new baseline, keeping the tolerances."""
+    baseline = {"tolerances": tolerances, "absolute_tolerances": absolute_tolerances, "results": results}
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
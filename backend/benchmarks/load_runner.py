@@ -0,0 +1,284 @@
+"""
+Scripted user journeys against the in-process API and their statistics.
+
+Scenariusze użytkowników wykonywane na API w procesie oraz ich statystyki.
+
+Imports the app, so the environment must already be set up by
+``benchmarks.local_stack.configure_environment``; use the
+``benchmarks.load_test`` entry point.
+"""
+
+import asyncio
+import json
+import random
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.database import AsyncSessionLocal, Base, engine
+from app.core.db_pool import pool_report
+from app.core.security import get_password_hash
+from app.main import app
+from app.models.user import UserRole
+from benchmarks.fixtures import create_user, design_points, seed_job_history
+from benchmarks.harness import latency_stats
+from benchmarks.local_stack import local_services
+
+API = "/api/v1"
+
+# Same buckets as fro_api_request_duration_seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LOAD_TEST_PASSWORD = "LoadTest123!@#"
+
+FINAL_JOB_STATUSES = ("completed", "failed", "cancelled")
+
+
+class RouteStats:
+    """Latencies and status codes of one route."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.status_codes: Counter = Counter()
+        self.errors = 0
+
+    def record(self, seconds: float, status_code: Optional[int], failed: bool = False) -> None:
+        """Record one request; ``failed`` marks errors reported inside a 200 response."""
+        self.latencies.append(seconds)
+        self.status_codes[str(status_code) if status_code is not None else "exception"] += 1
+        if failed or status_code is None or status_code >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed_seconds: float) -> Dict[str, Any]:
+        counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        for value in self.latencies:
+            counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        requests = len(self.latencies)
+        stats = latency_stats(self.latencies)
+        stats.pop("repetitions")
+        return {
+            "requests": requests,
+            "errors": self.errors,
+            "error_rate": self.errors / requests,
+            "rps": requests / elapsed_seconds,
+            **stats,
+            "status_codes": dict(self.status_codes),
+            "histogram": {"buckets": [*LATENCY_BUCKETS, "+Inf"], "counts": counts},
+        }
+
+
+class JourneyFailed(Exception):
+    """A step returned an unusable response; the rest of the journey is skipped."""
+
+
+class VirtualUser:
+    """One simulated user with its own client, credentials and random stream."""
+
+    def __init__(self, client: httpx.AsyncClient, username: str, routes: Dict[str, RouteStats], seed: int):
+        self.client = client
+        self.username = username
+        self.routes = routes
+        self.rng = random.Random(seed)
+        self.headers: Dict[str, str] = {}
+
+    async def request(self, method: str, route: str, path_params: Optional[Dict[str, str]] = None,
+                      **kwargs) -> httpx.Response:
+        """Send a request and record it under ``METHOD route``."""
+        url = API + route.format(**(path_params or {}))
+        start = time.perf_counter()
+        status_code = None
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            self.routes.setdefault(f"{method} {route}", RouteStats()).record(
+                time.perf_counter() - start, status_code
+            )
+
+    async def expect(self, method: str, route: str, path_params: Optional[Dict[str, str]] = None,
+                     **kwargs) -> Any:
+        """Like :meth:`request` but fail the journey unless the response is 200."""
+        response = await self.request(method, route, path_params, **kwargs)
+        if response.status_code != 200:
+            raise JourneyFailed(f"{method} {route}: {response.status_code}")
+        return response.json() if "json" in response.headers.get("content-type", "") else response
+
+    async def login(self) -> None:
+        self.headers = {}
+        data = await self.expect("POST", "/auth/login", json={
+            "username": self.username, "password": LOAD_TEST_PASSWORD
+        })
+        self.headers = {"Authorization": f"Bearer {data['access_token']}"}
+
+
+async def browse(user: VirtualUser) -> None:
+    """Dashboard, scenario list, materials and import history."""
+    await user.login()
+    await user.expect("GET", "/auth/me")
+    await user.expect("GET", "/optimize/scenarios")
+    await user.expect("GET", "/reports/dashboard/metrics")
+    await user.expect("GET", "/materials/")
+    await user.expect("GET", "/import/jobs")
+
+
+async def optimize(user: VirtualUser) -> None:
+    """Submit an optimization, watch it over SSE and fetch its results."""
+    await user.login()
+    scenarios = (await user.expect("GET", "/optimize/scenarios"))["scenarios"]
+    if not scenarios:
+        raise JourneyFailed("user has no scenarios")
+    scenario = user.rng.choice(scenarios)
+    initial_values = design_points(1, seed=user.rng.randrange(2**32))[0]
+
+    job = await user.expect(
+        "POST", "/optimize/scenarios/{scenario_id}/jobs", {"scenario_id": scenario["id"]},
+        json={"initial_values": initial_values}
+    )
+
+    # The stream ends once the job reaches a final state or reports an error
+    route = "/optimize/jobs/{job_id}/events"
+    start = time.perf_counter()
+    status_code = None
+    final_status = None
+    try:
+        async with user.client.stream(
+            "GET", API + route.format(job_id=job["id"]), headers=user.headers
+        ) as response:
+            status_code = response.status_code
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    event = json.loads(line[len("data: "):])
+                    if event["type"] == "progress":
+                        final_status = event["data"]["status"]
+    finally:
+        user.routes.setdefault(f"GET {route}", RouteStats()).record(
+            time.perf_counter() - start, status_code,
+            failed=final_status not in FINAL_JOB_STATUSES
+        )
+
+    if final_status not in FINAL_JOB_STATUSES:
+        raise JourneyFailed(f"GET {route}: stream ended without a final status")
+    if final_status == "completed":
+        await user.expect("GET", "/optimize/jobs/{job_id}/results", {"job_id": job["id"]})
+
+
+async def report(user: VirtualUser) -> None:
+    """Generate an optimization summary report and download it."""
+    await user.login()
+    scenarios = (await user.expect("GET", "/optimize/scenarios"))["scenarios"]
+    created = await user.expect("POST", "/reports/reports", json={
+        "title": "Load test summary",
+        "report_type": "optimization_summary",
+        "report_config": {
+            "scenario_ids": [s["id"] for s in scenarios],
+            "metrics": ["fuel_savings", "co2_reduction", "thermal_efficiency"]
+        },
+        "format": "json"
+    })
+    progress = await user.expect("GET", "/reports/reports/{report_id}/progress", {"report_id": created["id"]})
+    if progress["status"] == "completed":
+        await user.expect("GET", "/reports/reports/{report_id}/download", {"report_id": created["id"]})
+
+
+JOURNEYS: Dict[str, Callable[[VirtualUser], Awaitable[None]]] = {
+    "browse": browse,
+    "optimize": optimize,
+    "report": report,
+}
+
+DEFAULT_MIX = {"browse": 6, "optimize": 3, "report": 1}
+
+
+async def prepare_database(users: int, history_jobs: int) -> List[str]:
+    """Create the schema and seed users with scenarios and a job history."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    # One bcrypt hash for everybody keeps seeding fast
+    password_hash = get_password_hash(LOAD_TEST_PASSWORD)
+    usernames = []
+    async with AsyncSessionLocal() as db:
+        for i in range(users):
+            user = await create_user(db, UserRole.ENGINEER)
+            user.password_hash = password_hash
+            await db.commit()
+            await seed_job_history(db, user, jobs=history_jobs, scenarios=3, seed=i)
+            usernames.append(user.username)
+    return usernames
+
+
+async def _run_user(user: VirtualUser, mix: Dict[str, int], deadline: float,
+                    iterations: Optional[int], think_time: float,
+                    journeys: Dict[str, Counter]) -> None:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    done = 0
+    while time.perf_counter() < deadline and (iterations is None or done < iterations):
+        name = user.rng.choices(names, weights)[0]
+        try:
+            await JOURNEYS[name](user)
+            journeys[name]["completed"] += 1
+        except JourneyFailed:
+            journeys[name]["failed"] += 1
+        except Exception:
+            journeys[name]["exceptions"] += 1
+        done += 1
+        if think_time:
+            await asyncio.sleep(user.rng.expovariate(1 / think_time))
+
+
+async def run_load_test(
+    users: int = 10,
+    duration_seconds: float = 30.0,
+    iterations: Optional[int] = None,
+    mix: Optional[Dict[str, int]] = None,
+    think_time: float = 0.0,
+    history_jobs: int = 50,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Run ``users`` virtual users until the duration or per-user iteration count is reached.
+
+    Returns per-route and per-journey statistics and the connection pool report.
+    """
+    mix = mix or DEFAULT_MIX
+    usernames = await prepare_database(users, history_jobs)
+    routes: Dict[str, RouteStats] = {}
+    journeys: Dict[str, Counter] = {name: Counter() for name in mix}
+
+    with local_services() as worker:
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost", timeout=None) as client:
+            virtual_users = [
+                VirtualUser(client, username, routes, seed=seed * 1000 + i)
+                for i, username in enumerate(usernames)
+            ]
+            started = time.perf_counter()
+            deadline = started + duration_seconds
+            await asyncio.gather(*(
+                _run_user(user, mix, deadline, iterations, think_time, journeys)
+                for user in virtual_users
+            ))
+            elapsed = time.perf_counter() - started
+
+    db_pools = pool_report()
+    await engine.dispose()
+
+    total_requests = sum(len(stats.latencies) for stats in routes.values())
+    total_errors = sum(stats.errors for stats in routes.values())
+    return {
+        "users": users,
+        "elapsed_seconds": elapsed,
+        "total_requests": total_requests,
+        "total_rps": total_requests / elapsed,
+        "error_rate": total_errors / total_requests if total_requests else 0.0,
+        "journeys": {name: dict(counts) for name, counts in journeys.items()},
+        "worker_tasks": {"executed": len(worker.futures), "failed": worker.failed},
+        "routes": {name: routes[name].summary(elapsed) for name in sorted(routes)},
+        "db_pools": db_pools,
+    }
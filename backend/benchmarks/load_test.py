@@ -0,0 +1,81 @@
+"""
+Local load test of the API with SQLite, an in-memory Redis and in-process Celery.
+
+Lokalny test obciążeniowy API (SQLite, Redis w pamięci, Celery w procesie).
+
+Virtual users repeatedly pick one of the scripted journeys (``browse``,
+``optimize``, ``report``) by weight and run it against the app in this
+process; the output lists requests per second, latency percentiles and
+histogram, status codes and error rate per route. Queued Celery tasks run
+on a small thread pool in the same process (see ``benchmarks.local_stack``),
+so optimization jobs compete with the API for CPU and the SQLite file.
+
+Usage (from backend/):
+    python -m benchmarks.load_test [--users 10] [--duration 30] [--iterations N]
+        [--mix browse=6,optimize=3,report=1] [--think-time 0.5] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+from benchmarks.local_stack import configure_environment
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """``browse=6,optimize=3`` -> {"browse": 6, "optimize": 3}."""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--iterations", type=int, help="Stop each user after this many journeys")
+    parser.add_argument("--mix", type=parse_mix, help="Journey weights, e.g. browse=6,optimize=3,report=1")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Mean pause between journeys in seconds (exponential)")
+    parser.add_argument("--history-jobs", type=int, default=50,
+                        help="Seeded optimization jobs per user")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="Directory for the database and files (default: temporary)")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(Path(args.workdir or tmp))
+
+        # The app reads its settings at import time
+        from benchmarks.load_runner import JOURNEYS, run_load_test
+
+        if args.mix and set(args.mix) - set(JOURNEYS):
+            parser.error(f"Unknown journeys: {', '.join(sorted(set(args.mix) - set(JOURNEYS)))}")
+
+        results = asyncio.run(run_load_test(
+            users=args.users,
+            duration_seconds=args.duration,
+            iterations=args.iterations,
+            mix=args.mix,
+            think_time=args.think_time,
+            history_jobs=args.history_jobs,
+            seed=args.seed
+        ))
+
+    encoded = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(encoded)
+    print(encoded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+In-process stand-ins for the services the API depends on.
+
+Zastępniki usług zewnętrznych (baza, Redis, Celery) uruchamiane w procesie.
+
+Lets the FastAPI app run on one machine without MySQL, Redis or a Celery
+worker: a SQLite file database, an in-memory Redis replacement for the
+checkpoint store and in-memory Celery broker and result backend. Queued
+tasks are executed eagerly (``Task.apply``) on a small thread pool that
+plays the worker, so a long task does not block the API's event loop the
+way ``task_always_eager`` inside the request would. ``configure_environment``
+must run before anything from ``app`` is imported, because settings and
+the database engine are created at import time.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from unittest.mock import patch
+
+
+def configure_environment(workdir: Path) -> None:
+    """Point settings at local files and in-memory services."""
+    workdir.mkdir(parents=True, exist_ok=True)
+    os.environ.update({
+        "DATABASE_URL": f"sqlite+aiosqlite:///{workdir / 'loadtest.db'}",
+        "REDIS_URL": "redis://loadtest/0",
+        "CELERY_BROKER_URL": "memory://",
+        "CELERY_RESULT_BACKEND": "cache+memory://",
+        "OPTIMIZATION_CHECKPOINT_BACKEND": "redis",
+        "UPLOAD_DIR": str(workdir / "uploads"),
+        "PROFILE_ARTIFACT_DIR": str(workdir / "profiles"),
+        "REPORTS_STORAGE_PATH": str(workdir / "reports"),
+        "LOG_LEVEL": "WARNING",
+    })
+
+
+class FakeRedis:
+    """Thread-safe in-memory subset of the redis-py client (strings with expiry)."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode("utf-8")
+
+    def _live(self, name: str) -> Optional[bytes]:
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[name]
+            return None
+        return value
+
+    def ping(self) -> bool:
+        return True
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            return self._live(name)
+
+    def set(self, name: str, value: Any, ex: Optional[int] = None, px: Optional[int] = None,
+            nx: bool = False, xx: bool = False) -> Optional[bool]:
+        with self._lock:
+            exists = self._live(name) is not None
+            if (nx and exists) or (xx and not exists):
+                return None
+            ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+            self._data[name] = (self._encode(value), time.monotonic() + ttl if ttl is not None else None)
+            return True
+
+    def setex(self, name: str, time_seconds: int, value: Any) -> bool:
+        return self.set(name, value, ex=time_seconds)
+
+    def delete(self, *names: str) -> int:
+        deleted = 0
+        with self._lock:
+            for name in names:
+                if self._live(name) is not None:
+                    del self._data[name]
+                    deleted += 1
+        return deleted
+
+    def exists(self, *names: str) -> int:
+        with self._lock:
+            return sum(1 for name in names if self._live(name) is not None)
+
+    def expire(self, name: str, time_seconds: int) -> bool:
+        with self._lock:
+            value = self._live(name)
+            if value is None:
+                return False
+            self._data[name] = (value, time.monotonic() + time_seconds)
+            return True
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            current = self._live(name)
+            value = int(current or 0) + amount
+            expires_at = self._data[name][1] if current is not None else None
+            self._data[name] = (self._encode(value), expires_at)
+            return value
+
+    def keys(self, pattern: str = "*") -> List[bytes]:
+        with self._lock:
+            return [
+                name.encode("utf-8") for name in list(self._data)
+                if self._live(name) is not None and fnmatchcase(name, pattern)
+            ]
+
+    def flushall(self) -> bool:
+        with self._lock:
+            self._data.clear()
+            return True
+
+
+class ThreadWorker:
+    """Runs queued Celery tasks eagerly on worker threads."""
+
+    def __init__(self, concurrency: int):
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="celery-worker")
+        self.futures: List[Future] = []
+
+    def submit(self, task, args=None, kwargs=None, task_id=None, **options):
+        from celery.result import AsyncResult
+        from celery.utils import uuid
+
+        task_id = task_id or uuid()
+        self.futures.append(self.executor.submit(task.apply, args, kwargs, task_id=task_id))
+        return AsyncResult(task_id, app=task.app)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for f in self.futures if f.done() and (f.exception() or f.result().failed()))
+
+
+@contextmanager
+def local_services(worker_concurrency: int = 2) -> Iterator[ThreadWorker]:
+    """Route Redis clients to one FakeRedis and Celery tasks to a ThreadWorker."""
+    from celery.app.task import Task
+
+    fake_redis = FakeRedis()
+    worker = ThreadWorker(worker_concurrency)
+
+    def apply_async(task, args=None, kwargs=None, task_id=None, **options):
+        return worker.submit(task, args, kwargs, task_id)
+
+    with patch("redis.Redis.from_url", side_effect=lambda *args, **kwargs: fake_redis), \
+            patch.object(Task, "apply_async", apply_async):
+        try:
+            yield worker
+        finally:
+            # Tasks may queue follow-up tasks, so drain while still patched
+            worker.shutdown()
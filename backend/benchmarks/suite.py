@@ -0,0 +1,376 @@
+"""
+Benchmark suite for the physics, optimizer, import, reporting and search hot paths.
+
+Zestaw benchmarków kluczowych ścieżek: fizyka, optymalizator, import, raporty, wyszukiwanie.
+
+Benchmarks:
+
+- ``physics``: RegeneratorPhysicsModel.calculate_thermal_performance over
+  synthetic configurations and design points.
+- ``slsqp``: complete SLSQP runs of the backend solver loop without a
+  database; function evaluations per solve are deterministic and compared
+  without tolerance.
+- ``import``: ImportService.process_import_job on generated workbooks
+  (1k to 1M rows depending on the profile) in SQLite.
+- ``report``: ReportingService.generate_report of an optimization summary
+  over a seeded job history in SQLite, per output format.
+- ``export``: the streaming Excel and CSV report writers over a generated
+  detail table of 10k to 1M rows, with peak resident memory.
+- ``materials``: MaterialsService.search_materials over a generated
+  material library of 10k to 100k materials in SQLite, per kind of search
+  text (words, a code prefix, a word prefix).
+
+Results are JSON. With ``--baseline`` the run is compared against stored
+results and exits with status 1 on a regression beyond the baseline's
+tolerances; ``--update-baseline`` rewrites the baseline instead. Timings
+are only comparable on the machine the baseline was recorded on.
+
+Usage (from backend/):
+    python -m benchmarks.suite [--profile quick|full] [--only physics,slsqp]
+        [--output results.json] [--baseline benchmarks/baseline.json]
+        [--update-baseline]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+import numpy as np
+import scipy
+from scipy.optimize import Bounds
+
+from app.core.config import settings
+from app.models.optimization import OptimizationScenario
+from app.models.reporting import Report, ReportFormat, ReportType
+from app.services.csv_generator import CSVGenerator
+from app.services.excel_generator import ExcelGenerator
+from app.schemas.regenerator_schemas import MaterialFilter
+from app.services.import_service import ImportService
+from app.services.materials_service import MaterialsService
+from app.services.optimization_service import RegeneratorPhysicsModel
+from app.services.reporting_service import ReportingService
+from benchmarks.early_stopping import OfflineOptimizationService
+from benchmarks.fixtures import (
+    DESIGN_VARIABLES, benchmark_database, create_import_job, create_user, design_points,
+    report_file_sections, seed_job_history, seed_materials, synthetic_configurations, write_import_workbook
+)
+from benchmarks.harness import (
+    PeakRSS, compare_to_baseline, load_baseline, measure, measure_async, write_baseline
+)
+
+BENCHMARKS = ("physics", "slsqp", "import", "report", "export", "materials")
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "quick": {
+        "physics_evaluations": 2000,
+        "slsqp_cases": 6,
+        "slsqp_repeat": 2,
+        "import_rows": {1_000: 3, 10_000: 1},
+        "report_jobs": 1_000,
+        "report_repeat": 5,
+        "export_rows": {10_000: 3, 100_000: 1},
+        "material_counts": {10_000: 20},
+    },
+    "full": {
+        "physics_evaluations": 20000,
+        "slsqp_cases": 20,
+        "slsqp_repeat": 3,
+        "import_rows": {1_000: 5, 10_000: 3, 100_000: 1, 1_000_000: 1},
+        "report_jobs": 10_000,
+        "report_repeat": 10,
+        "export_rows": {10_000: 5, 100_000: 3, 1_000_000: 1},
+        "material_counts": {10_000: 50, 100_000: 50},
+    },
+}
+
+# Tracing allocations roughly doubles the run time, skip it for huge imports
+_IMPORT_TRACE_MAX_ROWS = 100_000
+
+DEFAULT_TOLERANCES = {
+    "default": 0.25,
+    # Tail latencies and allocations are noisy on shared machines
+    "latency_p95_seconds": 0.5,
+    "allocated_peak_mb": 0.5,
+    "rss_peak_mb": 0.5,
+    # Deterministic given the fixtures; any change is a behaviour change
+    "function_evaluations_per_solve": 0.0,
+    "major_iterations_per_solve": 0.0,
+}
+
+# Timer and scheduler noise of microsecond and millisecond benchmarks
+DEFAULT_ABSOLUTE_TOLERANCES = {
+    "latency_p50_seconds": 0.001,
+    "latency_p95_seconds": 0.002,
+}
+
+
+def _row_label(rows: int) -> str:
+    return f"{rows // 1_000_000}m" if rows >= 1_000_000 else f"{rows // 1_000}k"
+
+
+def bench_physics(profile: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Single physics evaluations."""
+    models = [RegeneratorPhysicsModel(config) for config in synthetic_configurations(8)]
+    points = design_points(256)
+    calls = itertools.cycle(itertools.product(models, points))
+
+    def evaluate():
+        model, point = next(calls)
+        model.calculate_thermal_performance(point)
+
+    stats = measure(evaluate, repeat=profile["physics_evaluations"], warmup=10)
+    stats["evaluations_per_second"] = stats.pop("throughput_per_second")
+    return {"physics_evaluation": stats}
+
+
+async def bench_slsqp(profile: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Complete SLSQP solves without early stopping."""
+    bounds = Bounds(
+        [v["min"] for v in DESIGN_VARIABLES.values()],
+        [v["max"] for v in DESIGN_VARIABLES.values()]
+    )
+    scenario = OptimizationScenario(
+        objective="minimize_fuel_consumption",
+        algorithm="slsqp",
+        design_variables=DESIGN_VARIABLES,
+        optimization_config={"early_stopping": False},
+        max_iterations=200,
+        tolerance=1e-6
+    )
+    cases = list(zip(
+        synthetic_configurations(profile["slsqp_cases"], seed=1),
+        design_points(profile["slsqp_cases"], seed=1)
+    ))
+    solves = itertools.cycle(cases)
+    evaluations: List[int] = []
+    iterations: List[int] = []
+
+    async def solve():
+        config, start = next(solves)
+        service = OfflineOptimizationService(RegeneratorPhysicsModel(config))
+        result = await service._run_slsqp_optimization(
+            "benchmark", scenario, np.array(list(start.values())), bounds, []
+        )
+        evaluations.append(result.function_evaluations)
+        iterations.append(result.major_iterations)
+
+    # No warm-up, so the recorded counts start at the first case
+    stats = await measure_async(
+        solve, repeat=len(cases) * profile["slsqp_repeat"], warmup=0, trace_allocations=False
+    )
+    stats["solves_per_second"] = stats.pop("throughput_per_second")
+    stats["function_evaluations_per_solve"] = float(np.mean(evaluations[:len(cases)]))
+    stats["major_iterations_per_solve"] = float(np.mean(iterations[:len(cases)]))
+    return {"slsqp_solve": stats}
+
+
+async def bench_import(profile: Dict[str, Any], workdir: Path) -> Dict[str, Dict[str, Any]]:
+    """Regenerator imports of generated workbooks, one benchmark per size."""
+    results = {}
+    upload_dir = workdir / "uploads"
+    with patch.object(settings, "UPLOAD_DIR", str(upload_dir)):
+        for rows, repeat in profile["import_rows"].items():
+            filename = f"regenerators_{rows}.xlsx"
+            workbook = upload_dir / "imports" / filename
+            if not workbook.exists():
+                write_import_workbook(workbook, rows)
+
+            async with benchmark_database(workdir / f"import_{rows}.db") as session_factory:
+                async with session_factory() as db:
+                    user = await create_user(db)
+                    service = ImportService(db)
+
+                    async def new_job():
+                        return str((await create_import_job(db, user, filename)).id)
+
+                    stats = await measure_async(
+                        service.process_import_job, repeat=repeat, warmup=0,
+                        trace_allocations=rows <= _IMPORT_TRACE_MAX_ROWS, setup=new_job
+                    )
+
+            stats.pop("throughput_per_second")
+            stats["rows"] = rows
+            stats["rows_per_second"] = rows / stats["latency_mean_seconds"]
+            results[f"import_{_row_label(rows)}_rows"] = stats
+    return results
+
+
+async def bench_report(profile: Dict[str, Any], workdir: Path) -> Dict[str, Dict[str, Any]]:
+    """Optimization summary reports over a seeded job history, per format."""
+    results = {}
+    async with benchmark_database(workdir / "report.db") as session_factory:
+        async with session_factory() as db:
+            user = await create_user(db)
+            scenario_ids = await seed_job_history(db, user, profile["report_jobs"])
+            service = ReportingService(db)
+            service.reports_dir = workdir / "reports"
+            service.reports_dir.mkdir(exist_ok=True)
+
+            for report_format in (ReportFormat.JSON, ReportFormat.CSV, ReportFormat.EXCEL):
+                async def new_report():
+                    report = Report(
+                        user_id=str(user.id),
+                        title="Benchmark optimization summary",
+                        report_type=ReportType.OPTIMIZATION_SUMMARY,
+                        report_config={
+                            "scenario_ids": scenario_ids,
+                            "metrics": ["fuel_savings", "co2_reduction", "thermal_efficiency"]
+                        },
+                        format=report_format
+                    )
+                    db.add(report)
+                    await db.commit()
+                    return str(report.id)
+
+                stats = await measure_async(
+                    service.generate_report, repeat=profile["report_repeat"], setup=new_report
+                )
+                stats["reports_per_second"] = stats.pop("throughput_per_second")
+                stats["jobs"] = profile["report_jobs"]
+                results[f"report_optimization_summary_{report_format.value}"] = stats
+    return results
+
+
+async def bench_export(profile: Dict[str, Any], workdir: Path) -> Dict[str, Dict[str, Any]]:
+    """Excel and CSV report files with a streamed detail table, per size."""
+    results = {}
+    report_data = {"id": "benchmark", "title": "Benchmark export", "report_type": "optimization_summary"}
+    writers = {
+        "excel": ("xlsx", lambda sections, path: ExcelGenerator().write_report(report_data, sections, path)),
+        "csv": ("csv", lambda sections, path: CSVGenerator().write_report(sections, path)),
+    }
+    for rows, repeat in profile["export_rows"].items():
+        for name, (extension, write) in writers.items():
+            path = workdir / f"export_{rows}.{extension}"
+
+            async def export():
+                await write(report_file_sections(rows), path)
+
+            # Allocations are measured as resident memory, tracemalloc would
+            # multiply the run time of the larger tables
+            with PeakRSS() as rss:
+                stats = await measure_async(export, repeat=repeat, warmup=0, trace_allocations=False)
+            stats.pop("throughput_per_second")
+            stats["rows"] = rows
+            stats["rows_per_second"] = rows / stats["latency_mean_seconds"]
+            stats["rss_peak_mb"] = rss.peak_mb
+            stats["rss_growth_mb"] = rss.growth_mb
+            stats["file_size_mb"] = path.stat().st_size / (1024 * 1024)
+            results[f"export_{name}_{_row_label(rows)}_rows"] = stats
+    return results
+
+
+# Search texts of the materials benchmark: common words, a code prefix, a word prefix
+_MATERIAL_SEARCHES = {"words": "alumina brick", "code": "AZS-0012", "prefix": "verm"}
+
+
+async def bench_materials(profile: Dict[str, Any], workdir: Path) -> Dict[str, Dict[str, Any]]:
+    """First page of material library searches with their totals, per library size."""
+    results = {}
+    for count, repeat in profile["material_counts"].items():
+        async with benchmark_database(workdir / f"materials_{count}.db") as session_factory:
+            async with session_factory() as db:
+                user = await create_user(db)
+                await seed_materials(db, user, count)
+                service = MaterialsService(db)
+
+                for kind, search in _MATERIAL_SEARCHES.items():
+                    async def search_page():
+                        _, total = await service.search_materials(MaterialFilter(search=search), limit=50)
+                        db.expunge_all()
+                        return total
+
+                    total = await search_page()
+                    stats = await measure_async(search_page, repeat=repeat)
+                    stats["searches_per_second"] = stats.pop("throughput_per_second")
+                    stats["materials"] = count
+                    stats["matches"] = total
+                    results[f"materials_search_{kind}_{_row_label(count)}"] = stats
+    return results
+
+
+async def run_suite(profile_name: str, only: List[str], workdir: Path) -> Dict[str, Dict[str, Any]]:
+    """Run the selected benchmarks and merge their metrics."""
+    profile = PROFILES[profile_name]
+    results: Dict[str, Dict[str, Any]] = {}
+    if "physics" in only:
+        results.update(bench_physics(profile))
+    if "slsqp" in only:
+        results.update(await bench_slsqp(profile))
+    if "import" in only:
+        results.update(await bench_import(profile, workdir))
+    if "report" in only:
+        results.update(await bench_report(profile, workdir))
+    if "export" in only:
+        results.update(await bench_export(profile, workdir))
+    if "materials" in only:
+        results.update(await bench_materials(profile, workdir))
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    """Machine and library versions the results were measured with."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--only", default=",".join(BENCHMARKS),
+                        help=f"Comma separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store the results as the new baseline instead of comparing")
+    parser.add_argument("--workdir", help="Directory for generated files (default: temporary)")
+    args = parser.parse_args()
+
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(only) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = asyncio.run(run_suite(args.profile, only, workdir))
+
+    report: Dict[str, Any] = {"profile": args.profile, "environment": environment(), "results": results}
+    exit_code = 0
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        if args.update_baseline or baseline is None:
+            baseline = baseline or {}
+            write_baseline(
+                args.baseline, results,
+                baseline.get("tolerances", DEFAULT_TOLERANCES),
+                baseline.get("absolute_tolerances", DEFAULT_ABSOLUTE_TOLERANCES),
+            )
+        else:
+            report["regressions"] = compare_to_baseline(results, baseline)
+            exit_code = 1 if report["regressions"] else 0
+
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(encoded)
+    print(encoded)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+Gunicorn settings for running the API in several Uvicorn worker processes.
+
+Ustawienia Gunicorn dla API uruchamianego w wielu procesach Uvicorn.
+
+Usage (from backend/):
+    PROMETHEUS_MULTIPROC_DIR=/tmp/prometheus_multiproc gunicorn -c gunicorn.conf.py app.main:app
+
+With PROMETHEUS_MULTIPROC_DIR set, every worker writes its metrics to that
+directory and any worker's /metrics serves the sum over all of them. The
+master empties the directory on start and drops the live gauges of workers
+that exit, including ones killed without a clean shutdown.
+"""
+
+import os
+import shutil
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+graceful_timeout = 30
+# SSE streams stay open for the whole optimization
+timeout = 120
+
+
+def on_starting(server):
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,46 @@
+"""add_optimization_iteration_archives
+
+Revision ID: 004_iteration_archives
+Revises: 003_fix_opt_status
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '004_iteration_archives'
+down_revision: Union[str, None] = '003_fix_opt_status'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Compressed columnar iteration history (one blob per optimization job)
+    op.create_table(
+        "optimization_iteration_archives",
+        sa.Column("id", mysql.CHAR(36), nullable=False),
+        sa.Column("job_id", mysql.CHAR(36), nullable=False),
+        sa.Column("storage_format", sa.String(20), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("chunk_size", sa.Integer(), nullable=False),
+        sa.Column("variable_names", sa.JSON(), nullable=False),
+        sa.Column("metric_names", sa.JSON(), nullable=False),
+        sa.Column("payload", sa.LargeBinary().with_variant(mysql.LONGBLOB(), "mysql"), nullable=False),
+        sa.Column("payload_size_bytes", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["optimization_jobs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("job_id", name="uq_optimization_iteration_archives_job_id"),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_table("optimization_iteration_archives")
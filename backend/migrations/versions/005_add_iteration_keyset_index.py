@@ -0,0 +1,32 @@
+"""add_iteration_keyset_index
+
+Revision ID: 005_iteration_keyset_index
+Revises: 004_iteration_archives
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '005_iteration_keyset_index'
+down_revision: Union[str, None] = '004_iteration_archives'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Keyset pagination / streaming export on (job_id, iteration_number)
+    op.create_index(
+        "ix_optimization_iterations_job_iteration",
+        "optimization_iterations",
+        ["job_id", "iteration_number"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index("ix_optimization_iterations_job_iteration", table_name="optimization_iterations")
@@ -0,0 +1,46 @@
+"""add_job_scheduling_columns
+
+Revision ID: 006_job_scheduling
+Revises: 005_iteration_keyset_index
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006_job_scheduling'
+down_revision: Union[str, None] = '005_iteration_keyset_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Priority queues and fair-share admission
+    op.add_column("optimization_jobs", sa.Column("priority", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column("optimization_jobs", sa.Column("queue_name", sa.String(50), nullable=True))
+    op.add_column("optimization_jobs", sa.Column("dispatched_at", sa.DateTime(), nullable=True))
+
+    # Jobs already in flight before the upgrade count as dispatched
+    op.execute(
+        "UPDATE optimization_jobs SET dispatched_at = COALESCE(started_at, created_at) "
+        "WHERE status IN ('pending', 'initializing', 'running')"
+    )
+
+    op.create_index(
+        "ix_optimization_jobs_user_status",
+        "optimization_jobs",
+        ["user_id", "status"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index("ix_optimization_jobs_user_status", table_name="optimization_jobs")
+    op.drop_column("optimization_jobs", "dispatched_at")
+    op.drop_column("optimization_jobs", "queue_name")
+    op.drop_column("optimization_jobs", "priority")
@@ -0,0 +1,53 @@
+"""add_optimization_job_groups
+
+Revision ID: 007_job_groups
+Revises: 006_job_scheduling
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '007_job_groups'
+down_revision: Union[str, None] = '006_job_scheduling'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Batch submissions of optimization jobs
+    op.create_table(
+        "optimization_job_groups",
+        sa.Column("id", mysql.CHAR(36), nullable=False),
+        sa.Column("user_id", mysql.CHAR(36), nullable=False),
+        sa.Column("name", sa.String(255), nullable=True),
+        sa.Column("total_jobs", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+    )
+
+    op.add_column("optimization_jobs", sa.Column("group_id", mysql.CHAR(36), nullable=True))
+    op.create_foreign_key(
+        "fk_optimization_jobs_group_id",
+        "optimization_jobs",
+        "optimization_job_groups",
+        ["group_id"],
+        ["id"],
+    )
+    op.create_index("ix_optimization_jobs_group_id", "optimization_jobs", ["group_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index("ix_optimization_jobs_group_id", table_name="optimization_jobs")
+    op.drop_constraint("fk_optimization_jobs_group_id", "optimization_jobs", type_="foreignkey")
+    op.drop_column("optimization_jobs", "group_id")
+    op.drop_table("optimization_job_groups")
@@ -0,0 +1,35 @@
+"""add_job_content_hash
+
+Revision ID: 008_job_content_hash
+Revises: 007_job_groups
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008_job_content_hash'
+down_revision: Union[str, None] = '007_job_groups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Deduplication of identical optimization jobs
+    op.add_column("optimization_jobs", sa.Column("content_hash", sa.String(64), nullable=True))
+    op.create_index(
+        "ix_optimization_jobs_user_content_hash",
+        "optimization_jobs",
+        ["user_id", "content_hash"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index("ix_optimization_jobs_user_content_hash", table_name="optimization_jobs")
+    op.drop_column("optimization_jobs", "content_hash")
@@ -0,0 +1,28 @@
+"""add_job_resource_usage
+
+Revision ID: 009_job_resource_usage
+Revises: 008_job_content_hash
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009_job_resource_usage'
+down_revision: Union[str, None] = '008_job_content_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Per-phase timings, DB time and evaluation histogram of the latest run
+    op.add_column("optimization_jobs", sa.Column("resource_usage", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_column("optimization_jobs", "resource_usage")
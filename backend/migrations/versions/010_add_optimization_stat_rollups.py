@@ -0,0 +1,72 @@
+"""add_optimization_stat_rollups
+
+Revision ID: 010_stat_rollups
+Revises: 009_job_resource_usage
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '010_stat_rollups'
+down_revision: Union[str, None] = '009_job_resource_usage'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Template a scenario was created from
+    op.add_column("optimization_scenarios", sa.Column("template_id", mysql.CHAR(36), nullable=True))
+    op.create_foreign_key(
+        "fk_optimization_scenarios_template_id",
+        "optimization_scenarios",
+        "optimization_templates",
+        ["template_id"],
+        ["id"],
+    )
+
+    # Daily totals of finished jobs per user, scenario, template and overall.
+    # Fill with the app.tasks.maintenance.rebuild_optimization_rollups task.
+    op.create_table(
+        "optimization_stat_rollups",
+        sa.Column("dimension", sa.String(16), nullable=False),
+        sa.Column("key", sa.String(36), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("jobs_finished", sa.Integer(), nullable=False),
+        sa.Column("jobs_completed", sa.Integer(), nullable=False),
+        sa.Column("jobs_failed", sa.Integer(), nullable=False),
+        sa.Column("jobs_cancelled", sa.Integer(), nullable=False),
+        sa.Column("runtime_seconds_sum", sa.Float(), nullable=False),
+        sa.Column("runtime_count", sa.Integer(), nullable=False),
+        sa.Column("results_count", sa.Integer(), nullable=False),
+        sa.Column("fuel_savings_sum", sa.Float(), nullable=False),
+        sa.Column("fuel_savings_count", sa.Integer(), nullable=False),
+        sa.Column("co2_reduction_sum", sa.Float(), nullable=False),
+        sa.Column("co2_reduction_count", sa.Integer(), nullable=False),
+        sa.Column("thermal_efficiency_sum", sa.Float(), nullable=False),
+        sa.Column("thermal_efficiency_count", sa.Integer(), nullable=False),
+        sa.Column("annual_cost_savings_sum", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("dimension", "key", "day"),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+    )
+    op.create_index(
+        "ix_optimization_stat_rollups_dimension_day",
+        "optimization_stat_rollups",
+        ["dimension", "day"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index("ix_optimization_stat_rollups_dimension_day", table_name="optimization_stat_rollups")
+    op.drop_table("optimization_stat_rollups")
+    op.drop_constraint("fk_optimization_scenarios_template_id", "optimization_scenarios", type_="foreignkey")
+    op.drop_column("optimization_scenarios", "template_id")
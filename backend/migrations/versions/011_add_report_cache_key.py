@@ -0,0 +1,30 @@
+"""add_report_cache_key
+
+Revision ID: 011_report_cache_key
+Revises: 010_stat_rollups
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '011_report_cache_key'
+down_revision: Union[str, None] = '010_stat_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Cache key of the report's file, shared by reports that reuse it
+    op.add_column("reports", sa.Column("cache_key", sa.String(64), nullable=True))
+    op.create_index("ix_reports_cache_key", "reports", ["cache_key"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index("ix_reports_cache_key", table_name="reports")
+    op.drop_column("reports", "cache_key")
@@ -0,0 +1,28 @@
+"""add_report_file_hash
+
+Revision ID: 012_report_file_hash
+Revises: 011_report_cache_key
+Create Date: 2026-10-18 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '012_report_file_hash'
+down_revision: Union[str, None] = '011_report_cache_key'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # SHA-256 of the report's file, sent as the download's ETag
+    op.add_column("reports", sa.Column("file_hash", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_column("reports", "file_hash")
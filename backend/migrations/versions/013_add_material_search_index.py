@@ -0,0 +1,47 @@
+"""add_material_search_index
+
+Revision ID: 013_material_search
+Revises: 012_report_file_hash
+Create Date: 2026-10-18 23:55:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models.regenerator import MATERIAL_FTS_TABLE, MATERIAL_SEARCH_COLUMNS, MATERIAL_SEARCH_DDL
+
+# revision identifiers, used by Alembic.
+revision: str = '013_material_search'
+down_revision: Union[str, None] = '012_report_file_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Prefix matches of material codes in search
+    op.create_index("ix_materials_material_code", "materials", ["material_code"])
+
+    # Full-text index of name, description, manufacturer and material code
+    dialect = op.get_bind().dialect.name
+    for statement in MATERIAL_SEARCH_DDL.get(dialect, []):
+        op.execute(statement)
+    if dialect == "sqlite":
+        columns = ", ".join(MATERIAL_SEARCH_COLUMNS)
+        op.execute(
+            f"INSERT INTO {MATERIAL_FTS_TABLE} (material_id, {columns}) SELECT id, {columns} FROM materials"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "mysql":
+        op.drop_index("ft_materials_search", table_name="materials")
+    elif dialect == "sqlite":
+        for trigger in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS {MATERIAL_FTS_TABLE}_{trigger}")
+        op.execute(f"DROP TABLE IF EXISTS {MATERIAL_FTS_TABLE}")
+
+    op.drop_index("ix_materials_material_code", table_name="materials")
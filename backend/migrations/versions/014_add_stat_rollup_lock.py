@@ -0,0 +1,34 @@
+"""add_stat_rollup_lock
+
+Revision ID: 014_stat_rollup_lock
+Revises: 013_material_search
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '014_stat_rollup_lock'
+down_revision: Union[str, None] = '013_material_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Row the rollup hooks and rebuild lock; inserted by the first writer
+    op.create_table(
+        "optimization_stat_rollup_locks",
+        sa.Column("name", sa.String(32), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_table("optimization_stat_rollup_locks")
@@ -10,12 +10,15 @@ from uuid import uuid4
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
 from httpx import AsyncClient
 
 from app.main import app
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, track_queries
 from app.core.config import settings
 from app.models.user import User
+from app.services.dashboard_cache import dashboard_cache
+from app.services.user_cache import user_cache
 
 
 # Test database URL
@@ -60,6 +63,36 @@ async def test_db(test_engine) -> AsyncGenerator[AsyncSession, None]:
         await session.rollback()
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test without cached user principals or dashboard figures."""
+    user_cache.clear_local()
+    dashboard_cache.clear()
+    yield
+    user_cache.clear_local()
+    dashboard_cache.clear()
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert that a block executes at most ``limit`` SQL statements.
+
+        with query_budget(3):
+            await client.get("/api/v1/...")
+    """
+    @contextmanager
+    def budget(limit: int):
+        with track_queries(record_statements=True) as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"{stats.count} SQL statements executed, budget is {limit}:\n"
+            + "\n".join(stats.statements)
+        )
+
+    return budget
+
+
 @pytest.fixture(scope="function")
 async def test_client(test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """Create test client with database override."""
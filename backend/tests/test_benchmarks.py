@@ -0,0 +1,158 @@
+"""
+Tests for the benchmark harness and fixtures.
+
+Testy narzędzi i danych zestawu benchmarków.
+"""
+
+import time
+
+import pandas as pd
+
+from benchmarks.fixtures import IMPORT_COLUMNS, design_points, synthetic_configurations, write_import_workbook
+from benchmarks.harness import PeakRSS, compare_to_baseline, measure, measure_async
+from benchmarks.load_runner import LATENCY_BUCKETS, RouteStats
+from benchmarks.load_test import parse_mix
+from benchmarks.local_stack import FakeRedis
+
+
+class TestHarness:
+    """Test measurement and baseline comparison."""
+
+    def test_measure_statistics(self):
+        """Test latency percentiles, throughput and allocations."""
+        stats = measure(lambda: [0] * 100_000, repeat=20, warmup=2)
+
+        assert stats["repetitions"] == 20
+        assert stats["latency_p50_seconds"] <= stats["latency_p95_seconds"] <= stats["latency_max_seconds"]
+        assert stats["throughput_per_second"] > 0
+        assert stats["allocated_peak_mb"] >= 0.7
+
+    def test_peak_rss(self):
+        """Test that resident memory growth covers a held allocation."""
+        with PeakRSS(interval=0.001) as rss:
+            block = bytearray(64 * 1024 * 1024)
+            block[::4096] = b"x" * len(block[::4096])
+            time.sleep(0.05)
+            del block
+
+        assert rss.growth_mb >= 48
+
+    async def test_measure_async_setup_untimed(self):
+        """Test that setup results are passed to the timed call."""
+        created, processed = [], []
+
+        async def setup():
+            created.append(len(created))
+            return created[-1]
+
+        async def process(item):
+            processed.append(item)
+
+        stats = await measure_async(process, repeat=3, warmup=1, trace_allocations=False, setup=setup)
+
+        assert processed == [0, 1, 2, 3]
+        assert stats["repetitions"] == 3
+        assert "allocated_peak_mb" not in stats
+
+    def test_compare_to_baseline(self):
+        """Test regression direction, tolerances and skipped keys."""
+        baseline = {
+            "tolerances": {"default": 0.25, "function_evaluations_per_solve": 0.0},
+            "results": {
+                "solve": {
+                    "latency_p50_seconds": 1.0,
+                    "solves_per_second": 10.0,
+                    "function_evaluations_per_solve": 100.0,
+                    "repetitions": 5,
+                },
+                "removed": {"latency_p50_seconds": 1.0},
+            },
+        }
+
+        within = {"solve": {"latency_p50_seconds": 1.2, "solves_per_second": 8.5,
+                            "function_evaluations_per_solve": 100.0, "repetitions": 50}}
+        assert compare_to_baseline(within, baseline) == []
+
+        regressed = {"solve": {"latency_p50_seconds": 1.3, "solves_per_second": 7.0,
+                               "function_evaluations_per_solve": 101.0}}
+        regressions = compare_to_baseline(regressed, baseline)
+        assert {r["metric"] for r in regressions} == {
+            "latency_p50_seconds", "solves_per_second", "function_evaluations_per_solve"
+        }
+
+    def test_compare_ignores_noise(self):
+        """Test that tail latencies are not compared and absolute tolerances absorb timer noise."""
+        baseline = {
+            "tolerances": {"default": 0.25},
+            "absolute_tolerances": {"latency_p50_seconds": 0.001},
+            "results": {
+                "evaluation": {"latency_p50_seconds": 0.000004, "latency_max_seconds": 0.00001},
+                "solve": {"latency_p50_seconds": 0.5},
+            },
+        }
+
+        noisy = {"evaluation": {"latency_p50_seconds": 0.00002, "latency_max_seconds": 0.01},
+                 "solve": {"latency_p50_seconds": 0.6}}
+        assert compare_to_baseline(noisy, baseline) == []
+
+        slower = {"evaluation": {"latency_p50_seconds": 0.002}, "solve": {"latency_p50_seconds": 0.7}}
+        assert [r["benchmark"] for r in compare_to_baseline(slower, baseline)] == ["evaluation", "solve"]
+
+
+class TestFixtures:
+    """Test that generated inputs are reproducible."""
+
+    def test_seeded_inputs(self):
+        """Test that the same seed yields the same configurations."""
+        assert synthetic_configurations(3, seed=7) == synthetic_configurations(3, seed=7)
+        assert design_points(3, seed=1) != design_points(3, seed=2)
+
+    def test_import_workbook(self, tmp_path):
+        """Test the generated workbook and its share of invalid rows."""
+        path = write_import_workbook(tmp_path / "regenerators.xlsx", rows=500, seed=3, invalid_fraction=0.2)
+        df = pd.read_excel(path)
+
+        assert list(df.columns) == list(IMPORT_COLUMNS)
+        assert len(df) == 500
+        invalid = (df["Max Temperature [C]"] <= df["Design Temperature [C]"]).sum()
+        assert 50 < invalid < 150
+
+
+class TestLoadTest:
+    """Test the load test stand-ins and statistics."""
+
+    def test_fake_redis(self):
+        """Test string values, expiry and deletion."""
+        redis = FakeRedis()
+        redis.set("checkpoint:1", b"state", ex=60)
+        redis.set("checkpoint:2", "other", px=1)
+        time.sleep(0.01)
+
+        assert redis.get("checkpoint:1") == b"state"
+        assert redis.get("checkpoint:2") is None
+        assert redis.set("checkpoint:1", b"new", nx=True) is None
+        assert redis.incr("counter", 2) == 2
+        assert redis.keys("checkpoint:*") == [b"checkpoint:1"]
+        assert redis.delete("checkpoint:1", "missing") == 1
+
+    def test_route_stats(self):
+        """Test error counting, rates and the latency histogram."""
+        stats = RouteStats()
+        stats.record(0.005, 200)
+        stats.record(0.2, 200)
+        stats.record(0.3, 200, failed=True)
+        stats.record(20.0, 500)
+
+        summary = stats.summary(elapsed_seconds=2.0)
+        assert summary["requests"] == 4
+        assert summary["errors"] == 2
+        assert summary["error_rate"] == 0.5
+        assert summary["rps"] == 2.0
+        assert summary["status_codes"] == {"200": 3, "500": 1}
+        assert sum(summary["histogram"]["counts"]) == 4
+        assert summary["histogram"]["counts"][0] == 1
+        assert summary["histogram"]["counts"][len(LATENCY_BUCKETS)] == 1
+
+    def test_parse_mix(self):
+        """Test journey weights from the command line."""
+        assert parse_mix("browse=6, optimize=3,report") == {"browse": 6, "optimize": 3, "report": 1}
@@ -4,13 +4,23 @@ Tests for core security functionality.
 Testy dla funkcjonalności bezpieczeństwa.
 """
 
+import asyncio
+import threading
 import pytest
 from datetime import datetime, timedelta
+from unittest.mock import patch
+from uuid import uuid4
 from jose import jwt
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.exceptions import ServiceUnavailableError
 from app.core.security import (
+    PasswordHasher,
     verify_password,
     get_password_hash,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
     verify_token,
     generate_reset_token,
@@ -18,6 +28,9 @@ from app.core.security import (
     validate_password_strength
 )
 from app.core.config import settings
+from app.models.user import User, UserRole
+from app.schemas.auth_schemas import UserLogin
+from app.services.auth_service import AuthService
 
 
 class TestSecurityFunctions:
@@ -258,4 +271,60 @@ class TestSecurityFunctions:
         long_payload = verify_token(long_token)
 
         assert long_payload is not None
-        assert long_payload["sub"] == "testuser"
\ No newline at end of file
+        assert long_payload["sub"] == "testuser"
+
+
+class TestPasswordHasher:
+    """Test bcrypt on the password hashing pool."""
+
+    async def test_hash_and_verify_off_event_loop(self):
+        """Test that hashing runs on a pool thread."""
+        threads = []
+        hasher = PasswordHasher()
+        await hasher.run("verify", lambda: threads.append(threading.current_thread().name))
+        hasher.shutdown()
+
+        hashed = await get_password_hash_async("testpassword123")
+        assert await verify_password_async("testpassword123", hashed) is True
+        assert await verify_password_async("wrongpassword", hashed) is False
+        assert threads[0].startswith("password-hash")
+
+    async def test_full_queue_rejected(self):
+        """Test that calls beyond workers and queue fail fast."""
+        hasher = PasswordHasher()
+        release = threading.Event()
+        with patch.object(settings, "PASSWORD_HASH_WORKERS", 1), \
+                patch.object(settings, "PASSWORD_HASH_MAX_QUEUE", 1):
+            running = asyncio.create_task(hasher.run("hash", release.wait))
+            queued = asyncio.create_task(hasher.run("hash", release.wait))
+            await asyncio.sleep(0.01)
+
+            with pytest.raises(ServiceUnavailableError):
+                await hasher.run("hash", release.wait)
+            release.set()
+            await asyncio.gather(running, queued)
+        assert hasher.pending == 0
+        hasher.shutdown()
+
+    async def test_login_rehashes_outdated_cost(self, test_db: AsyncSession):
+        """Test that login replaces a hash made with other bcrypt rounds."""
+        unique_id = uuid4().hex[:8]
+        cheap_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4, bcrypt__ident="2b")
+        user = User(
+            username=f"rehash_{unique_id}",
+            email=f"rehash_{unique_id}@example.com",
+            password_hash=cheap_context.hash("Rehash123!@#"),
+            role=UserRole.VIEWER,
+            is_active=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+
+        auth_service = AuthService(test_db)
+        assert await auth_service.authenticate_user(
+            UserLogin(username=user.username, password="Rehash123!@#")
+        ) is not None
+
+        await test_db.refresh(user)
+        assert user.password_hash.startswith(f"$2b${settings.PASSWORD_BCRYPT_ROUNDS:02d}$")
+        assert verify_password("Rehash123!@#", user.password_hash)
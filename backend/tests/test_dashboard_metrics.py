@@ -0,0 +1,138 @@
+"""
+Tests for the aggregated, cached dashboard metrics.
+
+Testy zagregowanych i buforowanych wskaźników pulpitu.
+"""
+
+import asyncio
+import threading
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.optimization import OptimizationJob, OptimizationResult, OptimizationStatus
+from app.models.user import User
+from app.services.dashboard_cache import _REDIS_KEY_PREFIX, SYSTEM_KEY, DashboardCache, dashboard_cache
+from app.services.optimization_rollups import rebuild_rollups
+from app.services.reporting_service import ReportingService
+from benchmarks.fixtures import create_user, seed_job_history
+from benchmarks.local_stack import FakeRedis
+
+
+class TestDashboardMetrics:
+    """Test the figures and their cache invalidation."""
+
+    @pytest.fixture
+    async def user(self, test_db: AsyncSession) -> User:
+        user = await create_user(test_db)
+        await seed_job_history(test_db, user, jobs=40, scenarios=2, seed=5)
+        await test_db.execute(
+            update(OptimizationJob)
+            .where(OptimizationJob.user_id == str(user.id), OptimizationJob.status == OptimizationStatus.COMPLETED)
+            .values(runtime_seconds=OptimizationJob.current_iteration)
+        )
+        await test_db.commit()
+        # The bulk update bypassed the rollup hooks
+        await rebuild_rollups(test_db)
+        return user
+
+    async def test_figures_match_rows(self, test_db: AsyncSession, user: User, query_budget):
+        """Test the aggregates against the job rows, then a cached repeat."""
+        service = ReportingService(test_db)
+        with query_budget(3):
+            metrics = await service.get_dashboard_metrics(str(user.id))
+
+        jobs = (await test_db.execute(
+            select(OptimizationJob).where(OptimizationJob.user_id == str(user.id))
+        )).scalars().all()
+        results = (await test_db.execute(
+            select(OptimizationResult).join(OptimizationJob).where(OptimizationJob.user_id == str(user.id))
+        )).scalars().all()
+        completed = [job for job in jobs if job.status == OptimizationStatus.COMPLETED]
+        month_start = datetime.now(UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        runtimes = [job.runtime_seconds for job in completed if job.runtime_seconds is not None]
+
+        assert metrics.total_optimizations == len(jobs)
+        assert metrics.success_rate == pytest.approx(len(completed) / len(jobs) * 100)
+        assert metrics.optimizations_this_month == sum(
+            1 for job in jobs if job.completed_at.replace(tzinfo=UTC) >= month_start
+        )
+        assert metrics.fuel_savings_total == pytest.approx(
+            sum(r.fuel_savings_percentage for r in results) / len(results)
+        )
+        assert metrics.co2_reduction_total == pytest.approx(sum(r.co2_reduction_percentage for r in results))
+        assert metrics.api_response_time_avg == int(sum(runtimes) / len(runtimes) * 10)
+        assert metrics.active_users >= 1
+
+        with query_budget(0):
+            assert await service.get_dashboard_metrics(str(user.id)) == metrics
+
+    async def test_job_changes_invalidate(self, test_db: AsyncSession, user: User):
+        """Test that status changes drop the owner's figures, progress updates do not."""
+        service = ReportingService(test_db)
+        await service.get_dashboard_metrics(str(user.id))
+        job = (await test_db.execute(
+            select(OptimizationJob).where(
+                OptimizationJob.user_id == str(user.id),
+                OptimizationJob.status != OptimizationStatus.COMPLETED
+            ).limit(1)
+        )).scalar_one()
+
+        job.current_iteration = (job.current_iteration or 0) + 1
+        await test_db.commit()
+        assert await dashboard_cache.get(str(user.id)) is not None
+
+        job.status = OptimizationStatus.COMPLETED
+        await test_db.commit()
+        assert await dashboard_cache.get(str(user.id)) is None
+        assert await dashboard_cache.get(SYSTEM_KEY) is not None
+
+        await test_db.delete(job)
+        await test_db.commit()
+        assert await dashboard_cache.get(SYSTEM_KEY) is None
+
+
+class AsyncFakeRedis:
+    """Asyncio client interface over a FakeRedis."""
+
+    def __init__(self, store: FakeRedis):
+        self.store = store
+
+    async def get(self, name):
+        return self.store.get(name)
+
+    async def set(self, name, value, ex=None):
+        return self.store.set(name, value, ex=ex)
+
+
+class TestDashboardCacheRedis:
+    """Test the Redis backend of the cache."""
+
+    async def test_invalidation_does_not_block(self, monkeypatch):
+        """Test that invalidations return at once and delete in the background."""
+        store = FakeRedis()
+        released = threading.Event()
+        delete = store.delete
+        store.delete = lambda *names: released.wait(5) and delete(*names)
+        monkeypatch.setattr(settings, "DASHBOARD_CACHE_BACKEND", "redis")
+        cache = DashboardCache()
+
+        with patch("redis.asyncio.Redis.from_url", side_effect=lambda *args, **kwargs: AsyncFakeRedis(store)), \
+                patch("redis.Redis.from_url", side_effect=lambda *args, **kwargs: store):
+            await cache.set("user-1", {"total_optimizations": 3}, cache.version)
+            assert await cache.get("user-1") == {"total_optimizations": 3}
+
+            cache.invalidate("user-1")
+            assert await cache.get("user-1") is None
+            assert store.get(_REDIS_KEY_PREFIX + "user-1") is not None
+
+            released.set()
+            for _ in range(100):
+                if not cache._pending:
+                    break
+                await asyncio.sleep(0.01)
+            assert store.get(_REDIS_KEY_PREFIX + "user-1") is None
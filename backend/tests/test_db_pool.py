@@ -0,0 +1,132 @@
+"""
+Tests for connection pool instrumentation and sizing advice.
+
+Testy monitorowania puli połączeń i rekomendacji jej rozmiaru.
+"""
+
+import pytest
+from uuid import uuid4
+from unittest.mock import patch
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db_pool import POOL_MONITORS, InstrumentedQueuePool, instrument_engine
+from app.core.security import create_access_token
+from app.models.user import User, UserRole
+
+
+class TestPoolMonitor:
+    """Test pool event accounting and recommendations."""
+
+    @pytest.fixture
+    def pool_engine(self, tmp_path):
+        """Two-connection pool without overflow and a short timeout."""
+        name = f"test-{uuid4().hex[:8]}"
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedQueuePool,
+            pool_logging_name=name,
+            pool_size=2,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+        monitor = instrument_engine(engine, name)
+        yield engine, monitor
+        POOL_MONITORS.pop(name, None)
+        engine.dispose()
+
+    def test_counts_and_timeouts(self, pool_engine):
+        """Test in-use gauges, waits and checkout timeouts."""
+        engine, monitor = pool_engine
+        first, second = engine.connect(), engine.connect()
+
+        assert REGISTRY.get_sample_value(
+            "fro_db_pool_connections", {"pool": monitor.name, "state": "in_use"}
+        ) == 2
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+        first.close()
+        second.close()
+        assert monitor.in_use == 0
+        assert monitor.connected == 2
+        assert monitor.peak_in_use == 2
+        assert monitor.timeouts == 1
+        assert REGISTRY.get_sample_value(
+            "fro_db_pool_checkout_timeouts_total", {"pool": monitor.name}
+        ) == 1
+        assert REGISTRY.get_sample_value(
+            "fro_db_pool_connections", {"pool": monitor.name, "state": "idle"}
+        ) == 2
+
+    def test_recommendation(self, pool_engine):
+        """Test sizing advice from observed concurrency."""
+        engine, monitor = pool_engine
+        report = monitor.recommendation()
+        assert report["recommended"] == report["configured"]
+        assert "Only 0 checkouts" in report["notes"][0]
+
+        with patch.object(settings, "DATABASE_POOL_LONG_HOLD_SECONDS", 0):
+            held = engine.connect()
+            for _ in range(150):
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            held.close()
+
+        report = monitor.recommendation()
+        assert report["configured"] == {"pool_size": 2, "max_overflow": 0, "pool_timeout": 0.05}
+        assert report["observed"]["checkouts"] == 151
+        assert report["observed"]["p95_in_use"] == 2
+        assert report["observed"]["long_holds"] == 151
+        # 2 in use with 25% headroom
+        assert report["recommended"]["pool_size"] == 3
+        assert report["recommended"]["max_overflow"] == 0
+        assert any("SSE" in note for note in report["notes"])
+
+
+class TestPoolEndpoint:
+    """Test the pool report endpoint."""
+
+    @pytest.fixture
+    def client(self, test_client: AsyncClient) -> AsyncClient:
+        """Test client on a host accepted by TrustedHostMiddleware."""
+        test_client.base_url = "http://localhost"
+        return test_client
+
+    async def _create_user(self, test_db: AsyncSession, role: UserRole) -> User:
+        unique_id = uuid4().hex[:8]
+        user = User(
+            username=f"pool_{unique_id}",
+            email=f"pool_{unique_id}@example.com",
+            full_name="Pool Test User",
+            password_hash="hashed_password",
+            role=role,
+            is_active=True,
+            is_verified=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+        return user
+
+    async def test_admin_only(self, test_db: AsyncSession, client: AsyncClient):
+        """Test that admins get both application pools."""
+        admin = await self._create_user(test_db, UserRole.ADMIN)
+        engineer = await self._create_user(test_db, UserRole.ENGINEER)
+
+        response = await client.get(
+            "/api/v1/system/db-pool",
+            headers={"Authorization": f"Bearer {create_access_token(str(admin.id))}"}
+        )
+        assert response.status_code == 200, response.text
+        pools = response.json()["pools"]
+        assert {"async", "sync"} <= set(pools)
+        assert set(pools["async"]) == {"pool", "configured", "observed", "recommended", "notes"}
+
+        response = await client.get(
+            "/api/v1/system/db-pool",
+            headers={"Authorization": f"Bearer {create_access_token(str(engineer.id))}"}
+        )
+        assert response.status_code == 403
@@ -0,0 +1,167 @@
+"""
+Tests for stagnation-based early stopping.
+
+Testy wczesnego zatrzymywania optymalizacji.
+"""
+
+import pytest
+from uuid import uuid4
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.early_stopping import (
+    EarlyStoppingConfig, StagnationMonitor,
+    CRITERION_RELATIVE_IMPROVEMENT, CRITERION_X_DISTANCE, CRITERION_CONSTRAINT_PLATEAU
+)
+from app.services.optimization_checkpoint import NullCheckpointStore
+from app.services.optimization_service import OptimizationService
+from app.models.user import User, UserRole
+from app.models.optimization import OptimizationScenario, OptimizationJob, OptimizationStatus
+from app.models.regenerator import RegeneratorConfiguration, RegeneratorType, ConfigurationStatus
+
+
+def _monitor(**overrides) -> StagnationMonitor:
+    """Monitor over the unit box with a window of 3."""
+    config = EarlyStoppingConfig(window=3, **overrides)
+    return StagnationMonitor(config, [0.0, 0.0], [1.0, 1.0])
+
+
+class TestStagnationMonitor:
+    """Test the individual stopping criteria."""
+
+    def test_relative_improvement(self):
+        """Test a feasible run with a flat objective stops."""
+        monitor = _monitor()
+        objectives = [-0.5, -0.6, -0.7, -0.7, -0.7, -0.7]
+        triggered = [monitor.update([0.1 * i, 0.5], f) for i, f in enumerate(objectives)]
+
+        assert triggered[:5] == [None] * 5
+        assert triggered[5] == CRITERION_RELATIVE_IMPROVEMENT
+
+    def test_x_distance(self):
+        """Test a run whose iterate no longer moves stops even while improving."""
+        monitor = _monitor(rel_improvement_tol=0.0)
+        triggered = [monitor.update([0.5, 0.5], -1.0 - i) for i in range(4)]
+
+        assert triggered == [None, None, None, CRITERION_X_DISTANCE]
+
+    def test_constraint_plateau(self):
+        """Test an infeasible run that makes no progress towards feasibility stops."""
+        monitor = _monitor()
+        violations = [5.0, 3.0, 2.0, 2.0, 2.0, 2.0]
+        triggered = [monitor.update([0.1 * i, 0.5], -i, v) for i, v in enumerate(violations)]
+
+        assert triggered[-1] == CRITERION_CONSTRAINT_PLATEAU
+        assert None in triggered[:4]
+
+    def test_disabled_never_triggers(self):
+        """Test that a disabled monitor only records diagnostics."""
+        monitor = _monitor(enabled=False)
+        assert all(monitor.update([0.5, 0.5], -1.0) is None for _ in range(10))
+        assert monitor.summary()["monitored_iterations"] == 10
+
+    def test_scenario_overrides(self):
+        """Test settings overrides from the scenario configuration."""
+        with patch.object(settings, "OPTIMIZATION_STAGNATION_WINDOW", 7):
+            assert EarlyStoppingConfig.from_settings(None).window == 7
+            assert EarlyStoppingConfig.from_settings(False).enabled is False
+            config = EarlyStoppingConfig.from_settings({"window": "4", "x_tol": 1e-3, "unknown": 1})
+        assert config.enabled is True
+        assert config.window == 4
+        assert config.x_tol == 1e-3
+        assert EarlyStoppingConfig.from_settings({"enabled": False}).enabled is False
+
+    def test_disabled_unless_opted_in(self):
+        """Test that existing scenarios keep ftol/maxiter stopping by default."""
+        assert EarlyStoppingConfig.from_settings(None).enabled is False
+        assert EarlyStoppingConfig.from_settings(True).enabled is True
+
+
+class TestOptimizationEarlyStopping:
+    """Test that the service stops stagnating runs and records why."""
+
+    @pytest.fixture
+    async def make_job(self, test_db: AsyncSession):
+        """Factory creating a job whose scenario has the given early stopping settings."""
+        unique_id = uuid4().hex[:8]
+        user = User(
+            username=f"early_stop_{unique_id}",
+            email=f"early_stop_{unique_id}@example.com",
+            full_name="Early Stopping Test User",
+            password_hash="hashed_password",
+            role=UserRole.ENGINEER,
+            is_active=True,
+            is_verified=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+
+        config = RegeneratorConfiguration(
+            user_id=str(user.id),
+            name=f"Early Stopping Regenerator {unique_id}",
+            regenerator_type=RegeneratorType.CROWN,
+            status=ConfigurationStatus.COMPLETED,
+            geometry_config={"length": 10.0, "width": 8.0},
+            thermal_config={"gas_temp_inlet": 1600.0, "gas_temp_outlet": 600.0},
+            flow_config={"mass_flow_rate": 50.0, "cycle_time": 1200.0}
+        )
+        test_db.add(config)
+        await test_db.commit()
+
+        async def create(early_stopping) -> str:
+            scenario = OptimizationScenario(
+                user_id=str(user.id),
+                base_configuration_id=str(config.id),
+                name=f"Early Stopping Scenario {uuid4().hex[:8]}",
+                scenario_type="geometry_optimization",
+                objective="minimize_fuel_consumption",
+                algorithm="slsqp",
+                design_variables={
+                    "checker_height": {"min": 0.5, "max": 1.5},
+                    "checker_spacing": {"min": 0.08, "max": 0.15},
+                    "wall_thickness": {"min": 0.2, "max": 0.5}
+                },
+                optimization_config={"max_iterations": 100, "early_stopping": early_stopping},
+                max_iterations=100,
+                tolerance=1e-9
+            )
+            test_db.add(scenario)
+            await test_db.commit()
+
+            job = OptimizationJob(
+                scenario_id=str(scenario.id),
+                user_id=str(user.id),
+                execution_config={"max_iterations": 100},
+                initial_values={"checker_height": 0.6, "checker_spacing": 0.09, "wall_thickness": 0.3},
+                status=OptimizationStatus.PENDING
+            )
+            test_db.add(job)
+            await test_db.commit()
+            return str(job.id)
+
+        return create
+
+    async def _run(self, test_db: AsyncSession, job_id: str) -> OptimizationJob:
+        service = OptimizationService(test_db)
+        service.checkpoint_store = NullCheckpointStore()
+        await service.run_optimization(job_id)
+        job = await test_db.get(OptimizationJob, job_id)
+        await test_db.refresh(job)
+        return job
+
+    async def test_stagnating_run_stops_early(self, test_db: AsyncSession, make_job):
+        """Test fewer evaluations than ftol-only stopping and the recorded criterion."""
+        baseline = await self._run(test_db, await make_job(False))
+        stopped = await self._run(test_db, await make_job(True))
+
+        assert stopped.status == OptimizationStatus.COMPLETED
+        assert stopped.convergence_criteria["criterion"] == CRITERION_CONSTRAINT_PLATEAU
+        assert stopped.convergence_criteria["early_stopping"]["settings"]["enabled"] is True
+        assert stopped.convergence_achieved is True
+
+        assert baseline.convergence_criteria["early_stopping"]["settings"]["enabled"] is False
+        assert (
+            stopped.convergence_criteria["function_evaluations"]
+            < baseline.convergence_criteria["function_evaluations"] / 2
+        )
@@ -0,0 +1,165 @@
+"""
+Tests for streaming iteration export.
+
+Testy strumieniowego eksportu iteracji.
+"""
+
+import csv
+import io
+import json
+import pytest
+from unittest.mock import patch
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.services.iteration_export import _SCALAR_FIELDS, IterationExporter, export_filename
+from app.services.optimization_service import PERFORMANCE_METRICS, RegeneratorPhysicsModel
+from app.models.user import User, UserRole
+from app.models.optimization import (
+    OptimizationScenario, OptimizationJob, OptimizationIteration, OptimizationStatus
+)
+from app.models.regenerator import RegeneratorConfiguration, RegeneratorType, ConfigurationStatus
+
+
+class TestIterationExporter:
+    """Test keyset-paginated iteration export."""
+
+    @pytest.fixture
+    def session_factory(self, test_engine):
+        """Session factory bound to the test database."""
+        return sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+    @pytest.fixture
+    async def job_with_iterations(self, test_db: AsyncSession) -> OptimizationJob:
+        """Create a job with 25 iteration rows."""
+        unique_id = uuid4().hex[:8]
+        user = User(
+            username=f"export_{unique_id}",
+            email=f"export_{unique_id}@example.com",
+            full_name="Export Test User",
+            password_hash="hashed_password",
+            role=UserRole.ENGINEER,
+            is_active=True,
+            is_verified=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+
+        config = RegeneratorConfiguration(
+            user_id=str(user.id),
+            name=f"Export Regenerator {unique_id}",
+            regenerator_type=RegeneratorType.CROWN,
+            status=ConfigurationStatus.COMPLETED
+        )
+        test_db.add(config)
+        await test_db.commit()
+
+        scenario = OptimizationScenario(
+            user_id=str(user.id),
+            base_configuration_id=str(config.id),
+            name=f"Export Scenario {unique_id}",
+            scenario_type="geometry_optimization",
+            objective="minimize_fuel_consumption",
+            algorithm="slsqp",
+            design_variables={"checker_height": {"min": 0.5, "max": 1.5}},
+            optimization_config={"max_iterations": 25}
+        )
+        test_db.add(scenario)
+        await test_db.commit()
+
+        job = OptimizationJob(
+            scenario_id=str(scenario.id),
+            user_id=str(user.id),
+            execution_config={},
+            initial_values={},
+            status=OptimizationStatus.COMPLETED
+        )
+        test_db.add(job)
+        await test_db.commit()
+
+        # Insert out of order to verify ordering by iteration_number
+        for number in reversed(range(1, 26)):
+            test_db.add(OptimizationIteration(
+                job_id=str(job.id),
+                iteration_number=number,
+                function_evaluation=number,
+                design_variables={"checker_height": 0.5 + number / 100},
+                objective_value=-number / 100,
+                performance_metrics={"thermal_efficiency": number / 100}
+            ))
+        await test_db.commit()
+        return job
+
+    async def _collect(self, exporter: IterationExporter, export_format: str) -> bytes:
+        return b"".join([chunk async for chunk in exporter.stream(export_format)])
+
+    async def test_ndjson_keyset_batches(self, job_with_iterations: OptimizationJob, session_factory):
+        """Test NDJSON export across several keyset pages."""
+        exporter = IterationExporter(str(job_with_iterations.id), batch_size=10, session_factory=session_factory)
+
+        batches = [batch async for batch in exporter.iter_batches()]
+        assert [len(b) for b in batches] == [10, 10, 5]
+
+        lines = (await self._collect(exporter, "ndjson")).decode("utf-8").splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert [r["iteration_number"] for r in rows] == list(range(1, 26))
+        assert rows[0]["design_variables"]["checker_height"] == pytest.approx(0.51)
+
+    async def test_csv_flattens_nested_columns(self, job_with_iterations: OptimizationJob, session_factory):
+        """Test CSV export header and flattened design variables."""
+        exporter = IterationExporter(str(job_with_iterations.id), batch_size=7, session_factory=session_factory)
+
+        content = (await self._collect(exporter, "csv")).decode("utf-8")
+        rows = list(csv.DictReader(io.StringIO(content)))
+
+        assert len(rows) == 25
+        assert "dv.checker_height" in rows[0]
+        assert "pm.thermal_efficiency" in rows[0]
+        assert rows[-1]["iteration_number"] == "25"
+
+    async def test_csv_header_covers_every_row(
+        self, test_db: AsyncSession, job_with_iterations: OptimizationJob, session_factory
+    ):
+        """Test that variables missing from the first rows still get columns and unknown ones are logged."""
+        test_db.add(OptimizationIteration(
+            job_id=str(job_with_iterations.id),
+            iteration_number=26,
+            function_evaluation=26,
+            design_variables={"checker_height": 0.9, "legacy_spacing": 0.1},
+            objective_value=-0.26,
+            performance_metrics={"thermal_efficiency": 0.26, "pressure_drop": 1500.0}
+        ))
+        await test_db.commit()
+        exporter = IterationExporter(str(job_with_iterations.id), batch_size=10, session_factory=session_factory)
+
+        with patch("app.services.iteration_export.logger") as logger:
+            content = (await self._collect(exporter, "csv")).decode("utf-8")
+        rows = list(csv.DictReader(io.StringIO(content)))
+
+        assert set(rows[0]) == set(_SCALAR_FIELDS) | {"dv.checker_height"} | {
+            f"pm.{name}" for name in PERFORMANCE_METRICS
+        }
+        assert rows[0]["pm.pressure_drop"] == ""
+        assert rows[-1]["pm.pressure_drop"] == "1500.0"
+        logger.error.assert_called_once()
+        assert logger.error.call_args.kwargs["columns"] == ["dv.legacy_spacing"]
+
+    async def test_unknown_format(self, session_factory):
+        """Test unsupported export format is rejected."""
+        exporter = IterationExporter("missing", session_factory=session_factory)
+        with pytest.raises(ValueError):
+            await self._collect(exporter, "xml")
+
+    def test_export_filename(self):
+        """Test download file names."""
+        assert export_filename("abc", "csv") == "iterations_abc.csv"
+        assert export_filename("abc", "ndjson") == "iterations_abc.ndjson"
+
+    def test_performance_metrics_schema(self):
+        """Test that the CSV metric columns match what the physics model returns."""
+        model = RegeneratorPhysicsModel({})
+        performance = model.calculate_thermal_performance(
+            {"checker_height": 0.8, "checker_spacing": 0.1, "wall_thickness": 0.3}
+        )
+        assert tuple(performance) == PERFORMANCE_METRICS
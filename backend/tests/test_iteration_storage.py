@@ -0,0 +1,215 @@
+"""
+Tests for columnar iteration history storage.
+
+Testy kolumnowego przechowywania historii iteracji.
+"""
+
+import pytest
+from datetime import datetime, UTC
+from uuid import uuid4
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.iteration_storage import (
+    encode_iteration_history, IterationHistoryReader, ITERATION_ARCHIVE_FORMAT
+)
+from app.services.optimization_service import OptimizationService
+from app.models.user import User, UserRole
+from app.models.optimization import OptimizationScenario, OptimizationJob, OptimizationStatus
+from app.models.regenerator import RegeneratorConfiguration, RegeneratorType, ConfigurationStatus
+
+
+def _make_records(count: int):
+    """Build synthetic iteration records as collected by the optimizer."""
+    return [
+        {
+            "iteration": i + 1,
+            "design_vars": {"checker_height": 0.5 + i * 0.001, "checker_spacing": 0.1},
+            "objective_value": -0.5 - (i % 7) * 0.01,
+            "performance": {"thermal_efficiency": 0.5 + (i % 7) * 0.01, "pressure_drop": 100.0 + i},
+            "created_at": datetime(2026, 1, 1, tzinfo=UTC),
+        }
+        for i in range(count)
+    ]
+
+
+class TestIterationArchiveEncoding:
+    """Test encoding and lazy decoding of iteration archives."""
+
+    def test_roundtrip_preserves_values(self):
+        """Test that decoded rows match the encoded records."""
+        records = _make_records(10)
+        encoded = encode_iteration_history(records, chunk_size=4)
+
+        assert encoded["format"] == ITERATION_ARCHIVE_FORMAT
+        assert encoded["row_count"] == 10
+        assert encoded["variable_names"] == ["checker_height", "checker_spacing"]
+
+        reader = IterationHistoryReader(encoded["payload"], "job-1")
+        rows = reader.read()
+
+        assert len(rows) == 10
+        assert rows[3]["iteration_number"] == 4
+        assert rows[3]["design_variables"]["checker_height"] == pytest.approx(0.503)
+        assert rows[3]["performance_metrics"]["pressure_drop"] == pytest.approx(103.0)
+        assert rows[3]["objective_value"] == pytest.approx(-0.53)
+        assert rows[3]["created_at"] == "2026-01-01T00:00:00"
+
+    def test_records_reencode_unchanged(self):
+        """Test that records read back can be extended and encoded again."""
+        records = _make_records(6)
+        reader = IterationHistoryReader(encode_iteration_history(records[:4], chunk_size=4)["payload"], "job-1")
+
+        merged = reader.records() + records[4:]
+        rows = IterationHistoryReader(encode_iteration_history(merged)["payload"], "job-1").read()
+        expected = IterationHistoryReader(encode_iteration_history(records)["payload"], "job-1").read()
+
+        assert rows == expected
+
+    def test_response_shape_matches_row_storage(self):
+        """Test that archive rows expose the same keys as iteration rows."""
+        encoded = encode_iteration_history(_make_records(2))
+        row = IterationHistoryReader(encoded["payload"], "job-1").read()[0]
+
+        assert set(row) == {
+            "id", "job_id", "iteration_number", "function_evaluation", "design_variables",
+            "objective_value", "objective_components", "constraint_values",
+            "constraint_violations", "performance_metrics", "evaluation_time_seconds",
+            "is_feasible", "is_improvement", "created_at"
+        }
+        assert row["job_id"] == "job-1"
+        assert row["evaluation_time_seconds"] is None
+
+    def test_slice_across_chunk_boundary(self):
+        """Test reading a page that spans several chunks."""
+        encoded = encode_iteration_history(_make_records(25), chunk_size=4)
+        reader = IterationHistoryReader(encoded["payload"], "job-1")
+
+        page = reader.read(skip=6, limit=7)
+
+        assert [r["iteration_number"] for r in page] == list(range(7, 14))
+        assert reader.read(skip=30, limit=5) == []
+
+    def test_is_improvement_tracks_running_best(self):
+        """Test improvement flags follow the running minimum of the objective."""
+        records = _make_records(3)
+        for record, value in zip(records, [-1.0, -0.5, -2.0]):
+            record["objective_value"] = value
+
+        reader = IterationHistoryReader(encode_iteration_history(records)["payload"], "job-1")
+
+        assert [r["is_improvement"] for r in reader.read()] == [True, False, True]
+
+    def test_tail_returns_newest_first(self):
+        """Test tail used by the progress endpoint."""
+        encoded = encode_iteration_history(_make_records(12), chunk_size=5)
+        reader = IterationHistoryReader(encoded["payload"], "job-1")
+
+        assert [r["iteration_number"] for r in reader.tail(3)] == [12, 11, 10]
+
+    def test_empty_history(self):
+        """Test encoding a job without iterations."""
+        encoded = encode_iteration_history([])
+        reader = IterationHistoryReader(encoded["payload"], "job-1")
+
+        assert len(reader) == 0
+        assert reader.read() == []
+
+    def test_invalid_chunk_size(self):
+        """Test chunk size validation."""
+        with pytest.raises(ValueError):
+            encode_iteration_history(_make_records(1), chunk_size=0)
+
+
+class TestColumnarIterationService:
+    """Test optimization service with columnar iteration storage."""
+
+    @pytest.fixture
+    async def test_job(self, test_db: AsyncSession) -> OptimizationJob:
+        """Create user, configuration, scenario and job."""
+        unique_id = uuid4().hex[:8]
+        user = User(
+            username=f"columnar_{unique_id}",
+            email=f"columnar_{unique_id}@example.com",
+            full_name="Columnar Test User",
+            password_hash="hashed_password",
+            role=UserRole.ENGINEER,
+            is_active=True,
+            is_verified=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+
+        config = RegeneratorConfiguration(
+            user_id=str(user.id),
+            name=f"Columnar Regenerator {unique_id}",
+            regenerator_type=RegeneratorType.CROWN,
+            status=ConfigurationStatus.COMPLETED,
+            geometry_config={"length": 10.0, "width": 8.0},
+            thermal_config={"gas_temp_inlet": 1600.0, "gas_temp_outlet": 600.0},
+            flow_config={"mass_flow_rate": 50.0, "cycle_time": 1200.0}
+        )
+        test_db.add(config)
+        await test_db.commit()
+
+        scenario = OptimizationScenario(
+            user_id=str(user.id),
+            base_configuration_id=str(config.id),
+            name=f"Columnar Scenario {unique_id}",
+            scenario_type="geometry_optimization",
+            objective="minimize_fuel_consumption",
+            algorithm="slsqp",
+            design_variables={
+                "checker_height": {"min": 0.5, "max": 1.5, "baseline_value": 0.8},
+                "checker_spacing": {"min": 0.08, "max": 0.15, "baseline_value": 0.12}
+            },
+            optimization_config={"max_iterations": 5, "tolerance": 1e-6},
+            max_iterations=5,
+            tolerance=1e-6
+        )
+        test_db.add(scenario)
+        await test_db.commit()
+
+        job = OptimizationJob(
+            scenario_id=str(scenario.id),
+            user_id=str(user.id),
+            execution_config={"max_iterations": 5},
+            initial_values={"checker_height": 0.8, "checker_spacing": 0.12},
+            status=OptimizationStatus.PENDING
+        )
+        test_db.add(job)
+        await test_db.commit()
+        await test_db.refresh(job)
+        return job
+
+    async def test_run_optimization_writes_archive(self, test_db: AsyncSession, test_job: OptimizationJob):
+        """Test that columnar mode stores one archive and serves iterations from it."""
+        service = OptimizationService(test_db)
+
+        with patch.object(settings, "OPTIMIZATION_ITERATION_STORAGE", "columnar"):
+            await service.run_optimization(str(test_job.id))
+
+        reader = await service._get_iteration_reader(str(test_job.id))
+        assert reader is not None
+        assert len(reader) > 0
+
+        page = await service.get_iterations(str(test_job.id), skip=0, limit=3)
+        assert [row["iteration_number"] for row in page] == [1, 2, 3]
+        assert "checker_height" in page[0]["design_variables"]
+
+    async def test_archive_failure_fails_job(self, test_db: AsyncSession, test_job: OptimizationJob):
+        """Test that a job whose history cannot be stored is not reported as completed."""
+        service = OptimizationService(test_db)
+
+        with patch.object(settings, "OPTIMIZATION_ITERATION_STORAGE", "columnar"), \
+                patch("app.services.optimization_service.encode_iteration_history",
+                      side_effect=MemoryError("archive too large")):
+            with pytest.raises(MemoryError):
+                await service.run_optimization(str(test_job.id))
+
+        job = await test_db.get(OptimizationJob, str(test_job.id))
+        await test_db.refresh(job)
+        assert job.status == OptimizationStatus.FAILED
+        assert job.error_message == "archive too large"
+        assert await service._get_iteration_reader(str(test_job.id)) is None
@@ -0,0 +1,165 @@
+"""
+Tests for content-hash deduplication of optimization jobs.
+
+Testy deduplikacji zadań optymalizacji.
+"""
+
+import pytest
+from datetime import datetime, timedelta, UTC
+from uuid import uuid4
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.schemas.optimization_schemas import OptimizationJobCreate
+from app.services.job_dedup import compute_job_content_hash
+from app.services.optimization_service import OptimizationService
+from app.models.user import User, UserRole
+from app.models.optimization import OptimizationScenario, OptimizationStatus
+from app.models.regenerator import RegeneratorConfiguration, RegeneratorType, ConfigurationStatus
+
+
+def _scenario(**overrides) -> OptimizationScenario:
+    """Build an unsaved scenario for hashing."""
+    values = dict(
+        objective="minimize_fuel_consumption",
+        algorithm="slsqp",
+        optimization_config={"max_iterations": 5, "tolerance": 1e-6},
+        design_variables={"checker_height": {"min": 0.5, "max": 1.5}},
+        max_iterations=5,
+        tolerance=1e-6
+    )
+    values.update(overrides)
+    return OptimizationScenario(**values)
+
+
+def _configuration(**overrides) -> RegeneratorConfiguration:
+    """Build an unsaved configuration for hashing."""
+    values = dict(
+        geometry_config={"length": 10.0, "width": 8.0},
+        thermal_config={"gas_temp_inlet": 1600.0}
+    )
+    values.update(overrides)
+    return RegeneratorConfiguration(**values)
+
+
+class TestJobContentHash:
+    """Test canonical hashing of job inputs."""
+
+    def test_hash_ignores_key_order_and_int_float(self):
+        """Test that equivalent inputs hash alike."""
+        first = compute_job_content_hash(_scenario(), _configuration(), {"checker_height": 1, "checker_spacing": 0.1})
+        second = compute_job_content_hash(
+            _scenario(),
+            _configuration(geometry_config={"width": 8, "length": 10}),
+            {"checker_spacing": 0.1, "checker_height": 1.0}
+        )
+        assert first == second
+        assert len(first) == 64
+
+    def test_hash_changes_with_inputs(self):
+        """Test that solver settings, configuration and initial values are part of the hash."""
+        base = compute_job_content_hash(_scenario(), _configuration(), {"checker_height": 0.8})
+
+        assert base != compute_job_content_hash(_scenario(), _configuration(), {"checker_height": 0.9})
+        assert base != compute_job_content_hash(_scenario(tolerance=1e-4), _configuration(), {"checker_height": 0.8})
+        assert base != compute_job_content_hash(
+            _scenario(), _configuration(thermal_config={"gas_temp_inlet": 1550.0}), {"checker_height": 0.8}
+        )
+
+
+class TestJobDeduplication:
+    """Test reuse of in-flight and completed jobs."""
+
+    @pytest.fixture
+    async def scenario_setup(self, test_db: AsyncSession):
+        """Create user, configuration and scenario."""
+        unique_id = uuid4().hex[:8]
+        user = User(
+            username=f"dedup_{unique_id}",
+            email=f"dedup_{unique_id}@example.com",
+            full_name="Dedup Test User",
+            password_hash="hashed_password",
+            role=UserRole.ENGINEER,
+            is_active=True,
+            is_verified=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+
+        config = RegeneratorConfiguration(
+            user_id=str(user.id),
+            name=f"Dedup Regenerator {unique_id}",
+            regenerator_type=RegeneratorType.CROWN,
+            status=ConfigurationStatus.COMPLETED,
+            geometry_config={"length": 10.0, "width": 8.0},
+            thermal_config={"gas_temp_inlet": 1600.0},
+            flow_config={"mass_flow_rate": 50.0}
+        )
+        test_db.add(config)
+        await test_db.commit()
+
+        scenario = OptimizationScenario(
+            user_id=str(user.id),
+            base_configuration_id=str(config.id),
+            name=f"Dedup Scenario {unique_id}",
+            scenario_type="geometry_optimization",
+            objective="minimize_fuel_consumption",
+            algorithm="slsqp",
+            design_variables={"checker_height": {"min": 0.5, "max": 1.5}},
+            optimization_config={"max_iterations": 5},
+            max_iterations=5,
+            tolerance=1e-6
+        )
+        test_db.add(scenario)
+        await test_db.commit()
+
+        return str(user.id), scenario, config
+
+    async def test_resubmission_attaches_to_in_flight_job(self, test_db: AsyncSession, scenario_setup):
+        """Test that an identical submission finds the pending job."""
+        user_id, scenario, config = scenario_setup
+        service = OptimizationService(test_db)
+        job_data = OptimizationJobCreate(initial_values={"checker_height": 0.8})
+
+        job = await service.create_optimization_job(scenario.id, user_id, job_data)
+        assert job.content_hash
+
+        found = await service.find_reusable_job(scenario, config, user_id, {"checker_height": 0.8})
+        assert found is not None
+        assert found.id == job.id
+
+        assert await service.find_reusable_job(scenario, config, user_id, {"checker_height": 0.9}) is None
+        assert await service.find_reusable_job(scenario, config, str(uuid4()), {"checker_height": 0.8}) is None
+
+    async def test_completed_job_reused_only_within_window(self, test_db: AsyncSession, scenario_setup):
+        """Test the uniqueness window for completed jobs."""
+        user_id, scenario, config = scenario_setup
+        service = OptimizationService(test_db)
+        job = await service.create_optimization_job(scenario.id, user_id, OptimizationJobCreate())
+
+        job.status = OptimizationStatus.COMPLETED
+        job.completed_at = datetime.now(UTC) - timedelta(minutes=10)
+        await test_db.commit()
+
+        with patch.object(settings, "OPTIMIZATION_DEDUP_WINDOW_MINUTES", 30):
+            found = await service.find_reusable_job(scenario, config, user_id, {})
+            assert found is not None and found.id == job.id
+
+        with patch.object(settings, "OPTIMIZATION_DEDUP_WINDOW_MINUTES", 5):
+            assert await service.find_reusable_job(scenario, config, user_id, {}) is None
+
+        with patch.object(settings, "OPTIMIZATION_DEDUP_WINDOW_MINUTES", 0):
+            assert await service.find_reusable_job(scenario, config, user_id, {}) is None
+
+    async def test_failed_job_is_not_reused(self, test_db: AsyncSession, scenario_setup):
+        """Test that failed jobs are solved again."""
+        user_id, scenario, config = scenario_setup
+        service = OptimizationService(test_db)
+        job = await service.create_optimization_job(scenario.id, user_id, OptimizationJobCreate())
+
+        job.status = OptimizationStatus.FAILED
+        job.completed_at = datetime.now(UTC)
+        await test_db.commit()
+
+        assert await service.find_reusable_job(scenario, config, user_id, {}) is None
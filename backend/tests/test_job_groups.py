@@ -0,0 +1,204 @@
+"""
+Tests for batch submission of optimization job groups.
+
+Testy grupowego tworzenia zadań optymalizacji.
+"""
+
+import time
+import pytest
+from uuid import uuid4
+from unittest.mock import patch
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.schemas.optimization_schemas import OptimizationJobBatchCreate, OptimizationJobBatchItem
+from app.services.optimization_service import OptimizationService
+from app.services.dashboard_cache import SYSTEM_KEY, dashboard_cache
+from app.services.reporting_service import ReportingService
+from app.services.job_scheduler import FairShareScheduler
+from app.models.user import User, UserRole
+from app.models.optimization import (
+    OptimizationScenario, OptimizationJob, OptimizationResult, OptimizationStatus
+)
+from app.models.regenerator import RegeneratorConfiguration, RegeneratorType, ConfigurationStatus
+
+
+class TestOptimizationJobGroups:
+    """Test bulk job creation, aggregate progress and results."""
+
+    @pytest.fixture
+    async def owner(self, test_db: AsyncSession):
+        """Create a user with two active scenarios and one inactive scenario."""
+        unique_id = uuid4().hex[:8]
+        user = User(
+            username=f"groups_{unique_id}",
+            email=f"groups_{unique_id}@example.com",
+            full_name="Job Group Test User",
+            password_hash="hashed_password",
+            role=UserRole.ENGINEER,
+            is_active=True,
+            is_verified=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+
+        config = RegeneratorConfiguration(
+            user_id=str(user.id),
+            name=f"Group Regenerator {unique_id}",
+            regenerator_type=RegeneratorType.CROWN,
+            status=ConfigurationStatus.COMPLETED,
+            geometry_config={"length": 10.0, "width": 8.0},
+            thermal_config={"gas_temp_inlet": 1600.0},
+            flow_config={"mass_flow_rate": 50.0}
+        )
+        test_db.add(config)
+        await test_db.commit()
+
+        scenarios = []
+        for index, is_active in enumerate([True, True, False]):
+            scenario = OptimizationScenario(
+                user_id=str(user.id),
+                base_configuration_id=str(config.id),
+                name=f"Group Scenario {index} {unique_id}",
+                scenario_type="geometry_optimization",
+                objective="minimize_fuel_consumption",
+                algorithm="slsqp",
+                design_variables={"checker_height": {"min": 0.5, "max": 1.5}},
+                optimization_config={"max_iterations": 5},
+                max_iterations=5,
+                tolerance=1e-6,
+                is_active=is_active
+            )
+            test_db.add(scenario)
+            scenarios.append(scenario)
+        await test_db.commit()
+
+        return str(user.id), [str(s.id) for s in scenarios]
+
+    async def test_create_500_jobs_in_one_call(self, test_db: AsyncSession, owner):
+        """Test that creating a large group stays fast and keeps submission order."""
+        user_id, (scenario_id, _, _) = owner
+        batch = OptimizationJobBatchCreate(
+            name="Plant-wide study",
+            jobs=[
+                OptimizationJobBatchItem(scenario_id=scenario_id, initial_values={"checker_height": 0.5 + i / 1000})
+                for i in range(500)
+            ]
+        )
+
+        with patch.object(settings, "MAX_CONCURRENT_JOBS_PER_SCENARIO", 1000):
+            started = time.perf_counter()
+            group, job_ids = await OptimizationService(test_db).create_optimization_job_group(user_id, batch)
+            elapsed = time.perf_counter() - started
+
+        assert elapsed < 1.0
+        assert group.total_jobs == 500
+        assert len(set(job_ids)) == 500
+
+        count = await test_db.scalar(
+            select(func.count(OptimizationJob.id)).where(OptimizationJob.group_id == group.id)
+        )
+        assert count == 500
+
+        job = await test_db.get(OptimizationJob, job_ids[0])
+        assert job.status == OptimizationStatus.PENDING
+        assert job.priority == 3
+        assert job.queue_name == FairShareScheduler.queue_for_priority(3)
+        assert job.dispatched_at is None
+
+    async def test_create_group_invalidates_dashboard(self, test_db: AsyncSession, owner):
+        """Test that batch-created jobs drop the owner's and the system dashboard figures."""
+        user_id, (scenario_id, _, _) = owner
+        await ReportingService(test_db).get_dashboard_metrics(user_id)
+        assert await dashboard_cache.get(user_id) is not None
+        assert await dashboard_cache.get(SYSTEM_KEY) is not None
+
+        batch = OptimizationJobBatchCreate(jobs=[OptimizationJobBatchItem(scenario_id=scenario_id)])
+        await OptimizationService(test_db).create_optimization_job_group(user_id, batch)
+
+        assert await dashboard_cache.get(user_id) is None
+        assert await dashboard_cache.get(SYSTEM_KEY) is None
+
+    async def test_invalid_items_reject_whole_batch(self, test_db: AsyncSession, owner):
+        """Test that one invalid item creates nothing and is reported by index."""
+        user_id, (scenario_id, _, inactive_id) = owner
+        batch = OptimizationJobBatchCreate(jobs=[
+            OptimizationJobBatchItem(scenario_id=scenario_id),
+            OptimizationJobBatchItem(scenario_id=inactive_id),
+            OptimizationJobBatchItem(scenario_id=str(uuid4())),
+        ])
+
+        with pytest.raises(ValidationError) as exc_info:
+            await OptimizationService(test_db).create_optimization_job_group(user_id, batch)
+
+        invalid = {item["index"]: item["error_type"] for item in exc_info.value.details["invalid_jobs"]}
+        assert invalid == {1: "SCENARIO_INACTIVE", 2: "SCENARIO_NOT_FOUND"}
+
+        count = await test_db.scalar(
+            select(func.count(OptimizationJob.id)).where(OptimizationJob.user_id == user_id)
+        )
+        assert count == 0
+
+    async def test_per_scenario_limit_counts_batch_items(self, test_db: AsyncSession, owner):
+        """Test the per-scenario limit applies to items within the batch."""
+        user_id, (scenario_id, other_id, _) = owner
+        batch = OptimizationJobBatchCreate(jobs=[
+            OptimizationJobBatchItem(scenario_id=scenario_id),
+            OptimizationJobBatchItem(scenario_id=other_id),
+            OptimizationJobBatchItem(scenario_id=scenario_id),
+        ])
+
+        with patch.object(settings, "MAX_CONCURRENT_JOBS_PER_SCENARIO", 1):
+            with pytest.raises(ValidationError) as exc_info:
+                await OptimizationService(test_db).create_optimization_job_group(user_id, batch)
+
+        assert exc_info.value.details["invalid_jobs"] == [
+            {"index": 2, "scenario_id": scenario_id, "error_type": "SCENARIO_RATE_LIMIT_EXCEEDED"}
+        ]
+
+    async def test_group_progress_and_results(self, test_db: AsyncSession, owner):
+        """Test aggregate progress and the combined results summary."""
+        user_id, (scenario_id, other_id, _) = owner
+        batch = OptimizationJobBatchCreate(name="Summary", jobs=[
+            OptimizationJobBatchItem(scenario_id=scenario_id),
+            OptimizationJobBatchItem(scenario_id=other_id, priority=1),
+        ])
+        service = OptimizationService(test_db)
+        group, (first_id, second_id) = await service.create_optimization_job_group(user_id, batch)
+
+        first = await test_db.get(OptimizationJob, first_id)
+        first.status = OptimizationStatus.COMPLETED
+        first.progress_percentage = 100.0
+        second = await test_db.get(OptimizationJob, second_id)
+        second.status = OptimizationStatus.RUNNING
+        second.progress_percentage = 50.0
+        test_db.add(OptimizationResult(
+            job_id=first_id,
+            optimized_configuration={},
+            design_variables_final={"checker_height": 0.9},
+            objective_value=-0.7,
+            baseline_metrics={},
+            optimized_metrics={},
+            improvement_percentages={},
+            fuel_savings_percentage=12.0,
+            co2_reduction_percentage=10.0,
+            annual_cost_savings=1000.0
+        ))
+        await test_db.commit()
+
+        progress = await service.get_job_group_progress(group.id, user_id)
+        assert progress["status_counts"] == {"completed": 1, "running": 1}
+        assert progress["finished_jobs"] == 1
+        assert progress["progress_percentage"] == pytest.approx(75.0)
+        assert progress["is_finished"] is False
+
+        results = await service.get_job_group_results(group.id, user_id)
+        assert results["completed_jobs"] == 1
+        assert results["best_job_id"] == first_id
+        assert results["average_fuel_savings_percentage"] == pytest.approx(12.0)
+        assert results["total_annual_cost_savings"] == pytest.approx(1000.0)
+        assert [job["id"] for job in results["jobs"]] == [first_id, second_id]
+
+        assert await service.get_job_group_progress(group.id, str(uuid4())) is None
@@ -0,0 +1,158 @@
+"""
+Tests for per-job resource accounting.
+
+Testy pomiaru zużycia zasobów zadań optymalizacji.
+"""
+
+import time
+import pytest
+from uuid import uuid4
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.job_profiler import JobProfiler, EVALUATION_BUCKETS
+from app.services.optimization_checkpoint import NullCheckpointStore
+from app.services.optimization_service import OptimizationService
+from app.models.user import User, UserRole
+from app.models.optimization import OptimizationScenario, OptimizationJob, OptimizationStatus
+from app.models.regenerator import RegeneratorConfiguration, RegeneratorType, ConfigurationStatus
+
+
+class TestJobProfiler:
+    """Test phase timing, DB time and evaluation statistics."""
+
+    def test_phases_accumulate(self):
+        """Test that re-entering a phase adds to its timings."""
+        profiler = JobProfiler(trace_memory=False)
+        for _ in range(2):
+            with profiler.phase("solve"):
+                time.sleep(0.01)
+        with profiler.phase("persist"):
+            pass
+
+        usage = profiler.summary()
+        assert set(usage["phases"]) == {"solve", "persist"}
+        assert usage["phases"]["solve"]["wall_seconds"] >= 0.02
+        assert usage["wall_seconds"] >= usage["phases"]["solve"]["wall_seconds"]
+        assert usage["peak_rss_mb"] > 0
+
+    async def test_db_time_charged_to_active_phase(self, test_db: AsyncSession):
+        """Test that statements count towards the phase they run in only."""
+        profiler = JobProfiler(trace_memory=False)
+        await test_db.execute(text("SELECT 1"))
+        with profiler.phase("load"):
+            await test_db.execute(text("SELECT 1"))
+            await test_db.execute(text("SELECT 2"))
+
+        usage = profiler.summary()
+        assert usage["phases"]["load"]["db_statements"] == 2
+        assert usage["db_seconds"] > 0
+
+    def test_evaluation_histogram(self):
+        """Test evaluation statistics and bucket counts."""
+        profiler = JobProfiler(trace_memory=False)
+        for seconds in [1e-6, 3e-5, 3e-5, 2.0]:
+            profiler.record_evaluation(seconds)
+
+        evaluations = profiler.summary()["evaluations"]
+        assert evaluations["count"] == 4
+        assert evaluations["max_seconds"] == 2.0
+        assert sum(evaluations["histogram"]["counts"]) == 4
+        assert evaluations["histogram"]["counts"][0] == 1
+        assert evaluations["histogram"]["counts"][-1] == 1
+        assert len(evaluations["histogram"]["counts"]) == len(EVALUATION_BUCKETS) + 1
+
+    def test_tracemalloc_peak(self):
+        """Test the optional Python heap peak."""
+        profiler = JobProfiler(trace_memory=True)
+        with profiler.phase("solve"):
+            data = [bytearray(1024) for _ in range(2048)]
+        profiler.stop()
+        del data
+
+        assert profiler.summary()["python_heap_peak_mb"] >= 2.0
+
+
+class TestOptimizationResourceUsage:
+    """Test that a run stores its resource usage on the job."""
+
+    @pytest.fixture
+    async def test_job(self, test_db: AsyncSession) -> OptimizationJob:
+        """Create user, configuration, scenario and job."""
+        unique_id = uuid4().hex[:8]
+        user = User(
+            username=f"profiler_{unique_id}",
+            email=f"profiler_{unique_id}@example.com",
+            full_name="Profiler Test User",
+            password_hash="hashed_password",
+            role=UserRole.ENGINEER,
+            is_active=True,
+            is_verified=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+
+        config = RegeneratorConfiguration(
+            user_id=str(user.id),
+            name=f"Profiler Regenerator {unique_id}",
+            regenerator_type=RegeneratorType.CROWN,
+            status=ConfigurationStatus.COMPLETED,
+            geometry_config={"length": 10.0, "width": 8.0},
+            thermal_config={"gas_temp_inlet": 1600.0, "gas_temp_outlet": 600.0},
+            flow_config={"mass_flow_rate": 50.0, "cycle_time": 1200.0}
+        )
+        test_db.add(config)
+        await test_db.commit()
+
+        scenario = OptimizationScenario(
+            user_id=str(user.id),
+            base_configuration_id=str(config.id),
+            name=f"Profiler Scenario {unique_id}",
+            scenario_type="geometry_optimization",
+            objective="minimize_fuel_consumption",
+            algorithm="slsqp",
+            design_variables={
+                "checker_height": {"min": 0.5, "max": 1.5},
+                "checker_spacing": {"min": 0.08, "max": 0.15}
+            },
+            optimization_config={"max_iterations": 20},
+            max_iterations=20,
+            tolerance=1e-6
+        )
+        test_db.add(scenario)
+        await test_db.commit()
+
+        job = OptimizationJob(
+            scenario_id=str(scenario.id),
+            user_id=str(user.id),
+            execution_config={"max_iterations": 20},
+            initial_values={"checker_height": 0.6, "checker_spacing": 0.09},
+            status=OptimizationStatus.PENDING
+        )
+        test_db.add(job)
+        await test_db.commit()
+        await test_db.refresh(job)
+        return job
+
+    async def test_run_records_resource_usage(self, test_db: AsyncSession, test_job: OptimizationJob):
+        """Test phases, memory, CPU and per-iteration evaluation times."""
+        job_id = str(test_job.id)
+        service = OptimizationService(test_db)
+        service.checkpoint_store = NullCheckpointStore()
+        await service.run_optimization(job_id)
+
+        job = await test_db.get(OptimizationJob, job_id)
+        await test_db.refresh(job)
+
+        usage = job.resource_usage
+        assert set(usage["phases"]) == {"load", "setup", "solve", "persist", "finalize"}
+        assert usage["phases"]["solve"]["cpu_seconds"] > 0
+        assert usage["phases"]["solve"]["db_statements"] == 0
+        assert usage["phases"]["persist"]["db_statements"] > 0
+        assert usage["evaluations"]["count"] > 0
+        assert job.memory_usage_mb == usage["peak_rss_mb"]
+        assert job.cpu_usage_percentage is not None
+
+        iterations = await service.get_iterations(job_id, skip=0, limit=5)
+        assert all(it["evaluation_time_seconds"] != 0.1 for it in iterations)
+        assert all(it["evaluation_time_seconds"] > 0 for it in iterations)
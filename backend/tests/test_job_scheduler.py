@@ -0,0 +1,227 @@
+"""
+Tests for fair-share optimization job scheduling.
+
+Testy sprawiedliwego kolejkowania zadań optymalizacji.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta, UTC
+from uuid import uuid4
+from unittest.mock import patch
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.celery import QUEUE_OPTIMIZATION_INTERACTIVE, QUEUE_OPTIMIZATION_BATCH
+from app.core.config import settings
+from app.services.job_scheduler import FairShareScheduler, ACTIVE_STATUSES, broker_priority
+from app.models.user import User, UserRole
+from app.models.optimization import OptimizationScenario, OptimizationJob, OptimizationStatus
+from app.models.regenerator import RegeneratorConfiguration, RegeneratorType, ConfigurationStatus
+
+
+class TestQueueRouting:
+    """Test mapping of job priority to queues and broker priority."""
+
+    def test_queue_for_priority(self):
+        """Test high-priority jobs go to the interactive queue."""
+        with patch.object(settings, "INTERACTIVE_MAX_PRIORITY", 2):
+            assert FairShareScheduler.queue_for_priority(1) == QUEUE_OPTIMIZATION_INTERACTIVE
+            assert FairShareScheduler.queue_for_priority(2) == QUEUE_OPTIMIZATION_INTERACTIVE
+            assert FairShareScheduler.queue_for_priority(3) == QUEUE_OPTIMIZATION_BATCH
+
+    def test_broker_priority_is_clamped(self):
+        """Test job priority 1..5 maps onto broker priority 0..8."""
+        assert broker_priority(1) == 0
+        assert broker_priority(5) == 8
+        assert broker_priority(0) == 0
+        assert broker_priority(9) == 8
+
+
+class TestFairShareScheduler:
+    """Test admission and round-robin dispatch."""
+
+    @pytest.fixture
+    async def scenario_factory(self, test_db: AsyncSession):
+        """Create users with a scenario each and a helper to add held jobs."""
+        # The test database is shared by the session - retire active jobs left by other tests
+        await test_db.execute(
+            update(OptimizationJob)
+            .where(OptimizationJob.status.in_(ACTIVE_STATUSES))
+            .values(status=OptimizationStatus.CANCELLED)
+        )
+        await test_db.commit()
+
+        unique_id = uuid4().hex[:8]
+        owners = {}
+
+        async def make_user(name: str) -> str:
+            user = User(
+                username=f"sched_{name}_{unique_id}",
+                email=f"sched_{name}_{unique_id}@example.com",
+                full_name="Scheduler Test User",
+                password_hash="hashed_password",
+                role=UserRole.ENGINEER,
+                is_active=True,
+                is_verified=True
+            )
+            test_db.add(user)
+            await test_db.commit()
+
+            config = RegeneratorConfiguration(
+                user_id=str(user.id),
+                name=f"Scheduler Regenerator {name} {unique_id}",
+                regenerator_type=RegeneratorType.CROWN,
+                status=ConfigurationStatus.COMPLETED,
+                geometry_config={"length": 10.0, "width": 8.0},
+                thermal_config={"gas_temp_inlet": 1600.0},
+                flow_config={"mass_flow_rate": 50.0}
+            )
+            test_db.add(config)
+            await test_db.commit()
+
+            scenario = OptimizationScenario(
+                user_id=str(user.id),
+                base_configuration_id=str(config.id),
+                name=f"Scheduler Scenario {name} {unique_id}",
+                scenario_type="geometry_optimization",
+                objective="minimize_fuel_consumption",
+                algorithm="slsqp",
+                design_variables={"checker_height": {"min": 0.5, "max": 1.5}},
+                optimization_config={"max_iterations": 5},
+                max_iterations=5,
+                tolerance=1e-6
+            )
+            test_db.add(scenario)
+            await test_db.commit()
+
+            owners[str(user.id)] = str(scenario.id)
+            return str(user.id)
+
+        async def add_jobs(user_id: str, count: int, priority: int = 1, offset: int = 0):
+            base = datetime.now(UTC) - timedelta(hours=1)
+            jobs = []
+            for i in range(count):
+                job = OptimizationJob(
+                    scenario_id=owners[user_id],
+                    user_id=user_id,
+                    execution_config={},
+                    initial_values={},
+                    priority=priority,
+                    queue_name=FairShareScheduler.queue_for_priority(priority),
+                    status=OptimizationStatus.PENDING,
+                    created_at=base + timedelta(seconds=offset + i)
+                )
+                test_db.add(job)
+                jobs.append(job)
+            await test_db.commit()
+            return jobs
+
+        return make_user, add_jobs
+
+    async def _dispatch(self, test_db: AsyncSession, capacity: int, per_user: int = 10, reserved: int = 0):
+        """Run one dispatch round with broker sends captured."""
+        sent = []
+        with patch.object(settings, "MAX_PARALLEL_OPTIMIZATIONS", capacity), \
+                patch.object(settings, "MAX_CONCURRENT_JOBS_PER_USER", per_user), \
+                patch.object(settings, "INTERACTIVE_RESERVED_SLOTS", reserved), \
+                patch.object(FairShareScheduler, "_send_to_broker", lambda self, jobs: sent.extend(jobs)):
+            dispatched = await FairShareScheduler(test_db).dispatch_pending()
+        return dispatched, sent
+
+    async def test_sweep_does_not_starve_other_users(self, test_db: AsyncSession, scenario_factory):
+        """Test that a large sweep shares free slots with a later small submission."""
+        make_user, add_jobs = scenario_factory
+        heavy = await make_user("heavy")
+        light = await make_user("light")
+
+        await add_jobs(heavy, 20)
+        await add_jobs(light, 2, offset=100)
+
+        dispatched, sent = await self._dispatch(test_db, capacity=4)
+
+        users = [job.user_id for job in sent]
+        assert len(dispatched) == 4
+        assert users.count(light) == 2
+        assert users.count(heavy) == 2
+
+    async def test_dispatch_respects_capacity_and_marks_jobs(self, test_db: AsyncSession, scenario_factory):
+        """Test that nothing is dispatched when all slots are taken."""
+        make_user, add_jobs = scenario_factory
+        user_id = await make_user("solo")
+        await add_jobs(user_id, 3)
+
+        dispatched, sent = await self._dispatch(test_db, capacity=2)
+        assert len(dispatched) == 2
+        assert all(job.dispatched_at is not None for job in sent)
+
+        dispatched, _ = await self._dispatch(test_db, capacity=2)
+        assert dispatched == []
+
+        in_flight, held = await FairShareScheduler(test_db).count_user_jobs(user_id)
+        assert (in_flight, held) == (2, 1)
+
+    async def test_batch_jobs_leave_reserved_slots(self, test_db: AsyncSession, scenario_factory):
+        """Test that batch jobs cannot occupy the slots reserved for interactive work."""
+        make_user, add_jobs = scenario_factory
+        user_id = await make_user("batch")
+        await add_jobs(user_id, 5, priority=5)
+
+        dispatched, sent = await self._dispatch(test_db, capacity=4, reserved=2)
+
+        assert len(dispatched) == 2
+        assert all(job.queue_name == QUEUE_OPTIMIZATION_BATCH for job in sent)
+
+    async def test_per_user_limit_holds_extra_jobs(self, test_db: AsyncSession, scenario_factory):
+        """Test the per-user in-flight cap."""
+        make_user, add_jobs = scenario_factory
+        user_id = await make_user("capped")
+        await add_jobs(user_id, 4)
+
+        dispatched, _ = await self._dispatch(test_db, capacity=10, per_user=1)
+
+        assert len(dispatched) == 1
+
+    async def test_concurrent_dispatchers_claim_each_job_once(
+        self, test_db: AsyncSession, test_engine, scenario_factory
+    ):
+        """Test that two dispatchers that both selected a held job send it once."""
+        make_user, add_jobs = scenario_factory
+        user_id = await make_user("race")
+        [job] = await add_jobs(user_id, 1)
+
+        SessionLocal = sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+        both_selected = asyncio.Barrier(2)
+        claim = FairShareScheduler._claim
+
+        async def claim_after_both_selected(self, jobs):
+            await both_selected.wait()
+            return await claim(self, jobs)
+
+        sent = []
+
+        async def dispatch():
+            async with SessionLocal() as session:
+                return await FairShareScheduler(session).dispatch_pending()
+
+        with patch.object(settings, "MAX_PARALLEL_OPTIMIZATIONS", 4), \
+                patch.object(settings, "MAX_CONCURRENT_JOBS_PER_USER", 4), \
+                patch.object(settings, "INTERACTIVE_RESERVED_SLOTS", 0), \
+                patch.object(FairShareScheduler, "_claim", claim_after_both_selected), \
+                patch.object(FairShareScheduler, "_send_to_broker", lambda self, jobs: sent.extend(jobs)):
+            first, second = await asyncio.gather(dispatch(), dispatch())
+
+        assert sorted([first, second], key=len) == [[], [job.id]]
+        assert [sent_job.id for sent_job in sent] == [job.id]
+
+        in_flight, held = await FairShareScheduler(test_db).count_user_jobs(user_id)
+        assert (in_flight, held) == (1, 0)
+
+    def test_can_admit_counts_held_jobs(self, test_db: AsyncSession):
+        """Test admission cap on in-flight plus held jobs."""
+        scheduler = FairShareScheduler(test_db)
+        with patch.object(settings, "MAX_CONCURRENT_JOBS_PER_USER", 2), \
+                patch.object(settings, "MAX_QUEUED_JOBS_PER_USER", 3):
+            assert scheduler.can_admit(2, 2)
+            assert not scheduler.can_admit(2, 3)
@@ -0,0 +1,132 @@
+"""
+Tests for full-text material search.
+
+Testy wyszukiwania pełnotekstowego materiałów.
+"""
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.regenerator import MATERIAL_FTS_TABLE, Material
+from app.schemas.regenerator_schemas import MaterialFilter
+from app.services import material_search
+from app.services.materials_service import MaterialsService
+
+
+class TestMaterialSearch:
+    """Test MaterialsService.search_materials over the SQLite FTS index."""
+
+    @pytest.fixture
+    async def library(self, test_db: AsyncSession):
+        """Materials sharing a unique tag word, so searches ignore other tests' materials."""
+        tag = f"t{uuid4().hex[:8]}"
+        materials = {
+            "name": Material(
+                name=f"Alumina Brick {tag}", material_code=f"{tag}-33", manufacturer="Forglass",
+                description=f"Dense refractory {tag}", material_type="refractory", properties={}
+            ),
+            "manufacturer": Material(
+                name=f"Insulating Board {tag}", material_code=f"{tag}-7", manufacturer="Alumina Works",
+                description=f"Light board {tag}", material_type="insulation", properties={}
+            ),
+            "description": Material(
+                name=f"Silica Brick {tag}", material_code=f"{tag}-330", manufacturer="Forglass",
+                description=f"Crown silica with alumina traces {tag}", material_type="refractory", properties={}
+            ),
+            "other": Material(
+                name=f"Zirconia Mullite {tag}", material_code=f"ZM-{tag}", manufacturer="Forglass",
+                description=f"Glass contact {tag}", material_type="refractory", properties={}
+            ),
+        }
+        test_db.add_all(materials.values())
+        await test_db.commit()
+        return tag, materials
+
+    async def search(self, db: AsyncSession, search: str, **kwargs):
+        return await MaterialsService(db).search_materials(MaterialFilter(search=search), **kwargs)
+
+    async def test_ranked_by_relevance(self, test_db: AsyncSession, library):
+        """Test that every word must match, by prefix, with name matches above the rest."""
+        tag, materials = library
+
+        results, total = await self.search(test_db, f"{tag} alum")
+
+        assert total == 3
+        assert [material.id for material in results] == [
+            materials["name"].id, materials["manufacturer"].id, materials["description"].id
+        ]
+
+        results, total = await self.search(test_db, f"{tag} alumina silica")
+        assert total == 1
+        assert results[0].id == materials["description"].id
+
+    async def test_code_prefix(self, test_db: AsyncSession, library):
+        """Test that an exact code comes first, then codes it prefixes."""
+        tag, materials = library
+
+        results, total = await self.search(test_db, f"{tag.upper()}-33")
+
+        assert total == 2
+        assert [material.id for material in results] == [materials["name"].id, materials["description"].id]
+
+        results, _ = await self.search(test_db, f"zm-{tag[:4]}")
+        assert [material.id for material in results] == [materials["other"].id]
+
+    async def test_total_in_one_query(self, test_db: AsyncSession, library, query_budget):
+        """Test that a page and its total come back together, with filters applied."""
+        tag, materials = library
+        service = MaterialsService(test_db)
+
+        with query_budget(2):  # The page, and the creators loaded with it
+            results, total = await service.search_materials(
+                MaterialFilter(search=f"{tag} brick", material_type="refractory"), limit=1
+            )
+        assert total == 2
+        assert [material.id for material in results] == [materials["name"].id]
+
+        # Past the last page the total needs its own count
+        results, total = await self.search(test_db, tag, limit=10, offset=10)
+        assert results == [] and total == 4
+
+    async def test_index_follows_changes(self, test_db: AsyncSession, library):
+        """Test that renamed and deleted materials are searched by their current text."""
+        tag, materials = library
+
+        materials["other"].name = f"Fused Cast AZS {tag}"
+        await test_db.commit()
+        assert [material.id for material in (await self.search(test_db, f"{tag} fused"))[0]] == [
+            materials["other"].id
+        ]
+        assert (await self.search(test_db, f"{tag} zirconia"))[1] == 0
+
+        await test_db.delete(materials["other"])
+        await test_db.commit()
+        assert (await self.search(test_db, f"{tag} fused"))[1] == 0
+
+    async def test_builds_missing_index(self, test_db: AsyncSession, library):
+        """Test that a database created without the FTS table gets it on the first search."""
+        tag, _ = library
+        await test_db.execute(text(f"DROP TABLE {MATERIAL_FTS_TABLE}"))
+        for trigger in ("insert", "update", "delete"):
+            await test_db.execute(text(f"DROP TRIGGER {MATERIAL_FTS_TABLE}_{trigger}"))
+        await test_db.commit()
+        material_search._sqlite_indexed.clear()
+
+        _, total = await self.search(test_db, f"{tag} brick")
+
+        assert total == 2
+
+    def test_mysql_boolean_query(self):
+        """Test the MySQL word match: prefixes of required words, short words left to the prefix match."""
+        statement = material_search._word_matches("mysql", ["alumina", "az", "brick"])
+        compiled = statement.compile(dialect=mysql.dialect())
+
+        sql = str(compiled)
+        assert "MATCH (materials.name, materials.description, materials.manufacturer, materials.material_code)" in sql
+        assert "IN BOOLEAN MODE" in sql
+        assert "+alumina* +brick*" in compiled.params.values()
+        assert material_search._word_matches("mysql", ["az"]) is None
@@ -0,0 +1,193 @@
+"""
+Tests for optimization checkpoints and resume.
+
+Testy punktów kontrolnych i wznawiania optymalizacji.
+"""
+
+import pytest
+from uuid import uuid4
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.optimization_checkpoint import (
+    OptimizationCheckpoint, DiskCheckpointStore, SafeCheckpointStore
+)
+from app.services.optimization_service import OptimizationService
+from app.models.user import User, UserRole
+from app.models.optimization import OptimizationScenario, OptimizationJob, OptimizationStatus
+from app.models.regenerator import RegeneratorConfiguration, RegeneratorType, ConfigurationStatus
+
+
+class WorkerInterrupted(Exception):
+    """Stands in for a Celery soft time limit."""
+
+
+class TestCheckpointStore:
+    """Test checkpoint serialization and disk storage."""
+
+    def test_roundtrip(self):
+        """Test compressed serialization keeps all fields."""
+        checkpoint = OptimizationCheckpoint(
+            job_id="job-1",
+            content_hash="abc",
+            algorithm="slsqp",
+            current_x=[0.8, 0.12],
+            best_x=[0.9, 0.1],
+            best_objective=-0.6,
+            major_iterations=4,
+            function_evaluations=17,
+            history=[{"iteration": 1, "design_vars": {"a": 1.0}, "objective_value": -0.5, "performance": {}}],
+            extra={"starts_remaining": 2}
+        )
+
+        restored = OptimizationCheckpoint.from_bytes(checkpoint.to_bytes())
+
+        assert restored == checkpoint
+
+    def test_disk_store(self, tmp_path):
+        """Test save, load and delete on disk."""
+        store = DiskCheckpointStore(str(tmp_path))
+        checkpoint = OptimizationCheckpoint(job_id="job-2", content_hash=None, algorithm="slsqp", current_x=[1.0])
+
+        assert store.load("job-2") is None
+        store.save(checkpoint)
+        assert store.load("job-2").current_x == [1.0]
+        assert not list(tmp_path.glob("*.tmp"))
+
+        store.delete("job-2")
+        assert store.load("job-2") is None
+
+    def test_safe_store_swallows_errors(self, tmp_path):
+        """Test that a broken backend does not fail the optimization."""
+        store = DiskCheckpointStore(str(tmp_path))
+        (tmp_path / "job-3.ckpt").write_bytes(b"not a checkpoint")
+
+        assert SafeCheckpointStore(store).load("job-3") is None
+
+
+class TestOptimizationResume:
+    """Test that an interrupted job resumes from its checkpoint."""
+
+    @pytest.fixture
+    async def test_job(self, test_db: AsyncSession) -> OptimizationJob:
+        """Create user, configuration, scenario and job."""
+        unique_id = uuid4().hex[:8]
+        user = User(
+            username=f"checkpoint_{unique_id}",
+            email=f"checkpoint_{unique_id}@example.com",
+            full_name="Checkpoint Test User",
+            password_hash="hashed_password",
+            role=UserRole.ENGINEER,
+            is_active=True,
+            is_verified=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+
+        config = RegeneratorConfiguration(
+            user_id=str(user.id),
+            name=f"Checkpoint Regenerator {unique_id}",
+            regenerator_type=RegeneratorType.CROWN,
+            status=ConfigurationStatus.COMPLETED,
+            geometry_config={"length": 10.0, "width": 8.0},
+            thermal_config={"gas_temp_inlet": 1600.0, "gas_temp_outlet": 600.0},
+            flow_config={"mass_flow_rate": 50.0, "cycle_time": 1200.0}
+        )
+        test_db.add(config)
+        await test_db.commit()
+
+        scenario = OptimizationScenario(
+            user_id=str(user.id),
+            base_configuration_id=str(config.id),
+            name=f"Checkpoint Scenario {unique_id}",
+            scenario_type="geometry_optimization",
+            objective="minimize_fuel_consumption",
+            algorithm="slsqp",
+            design_variables={
+                "checker_height": {"min": 0.5, "max": 1.5},
+                "checker_spacing": {"min": 0.08, "max": 0.15}
+            },
+            optimization_config={"max_iterations": 50},
+            max_iterations=50,
+            tolerance=1e-9
+        )
+        test_db.add(scenario)
+        await test_db.commit()
+
+        job = OptimizationJob(
+            scenario_id=str(scenario.id),
+            user_id=str(user.id),
+            execution_config={"max_iterations": 50},
+            initial_values={"checker_height": 0.6, "checker_spacing": 0.09},
+            status=OptimizationStatus.PENDING
+        )
+        test_db.add(job)
+        await test_db.commit()
+        await test_db.refresh(job)
+        return job
+
+    @pytest.mark.parametrize("storage", ["rows", "columnar"])
+    async def test_interrupted_job_resumes(
+        self, test_db: AsyncSession, test_job: OptimizationJob, tmp_path, storage
+    ):
+        """Test interrupt, checkpoint, then resume to completion without gaps or repeats."""
+        job_id = str(test_job.id)
+        store = DiskCheckpointStore(str(tmp_path))
+        original = OptimizationService._array_to_design_vars
+        calls = {"count": 0}
+
+        def interrupt_later(service, x, config):
+            calls["count"] += 1
+            if calls["count"] == 25:
+                raise WorkerInterrupted()
+            return original(service, x, config)
+
+        service = OptimizationService(test_db)
+        service.checkpoint_store = store
+        with patch.object(settings, "OPTIMIZATION_CHECKPOINT_INTERVAL", 1), \
+                patch.object(settings, "OPTIMIZATION_CHECKPOINT_HISTORY", 5), \
+                patch.object(settings, "OPTIMIZATION_ITERATION_STORAGE", storage), \
+                patch.object(OptimizationService, "_array_to_design_vars", interrupt_later):
+            with pytest.raises(WorkerInterrupted):
+                await service.run_optimization(job_id, resumable_errors=(WorkerInterrupted,))
+
+        checkpoint = store.load(job_id)
+        assert checkpoint is not None
+        assert checkpoint.function_evaluations > 5
+        assert len(checkpoint.history) == 5
+        assert checkpoint.history[-1]["iteration"] == checkpoint.function_evaluations
+        assert checkpoint.persisted_evaluations == checkpoint.function_evaluations
+
+        job = await test_db.get(OptimizationJob, job_id)
+        await test_db.refresh(job)
+        assert job.status != OptimizationStatus.FAILED
+
+        resumed = OptimizationService(test_db)
+        resumed.checkpoint_store = store
+        with patch.object(settings, "OPTIMIZATION_ITERATION_STORAGE", storage):
+            result = await resumed.run_optimization(job_id)
+
+        assert result is not None
+        assert store.load(job_id) is None
+
+        iterations = await resumed.get_iterations(job_id, skip=0, limit=1000)
+        numbers = [row["iteration_number"] for row in iterations]
+        assert numbers == list(range(1, len(numbers) + 1))
+        assert len(numbers) > checkpoint.function_evaluations
+
+    async def test_stale_checkpoint_is_ignored(self, test_db: AsyncSession, test_job: OptimizationJob, tmp_path):
+        """Test a checkpoint for different inputs is discarded."""
+        job_id = str(test_job.id)
+        store = DiskCheckpointStore(str(tmp_path))
+        store.save(OptimizationCheckpoint(
+            job_id=job_id, content_hash="other-inputs", algorithm="slsqp", current_x=[1.0, 0.1]
+        ))
+
+        service = OptimizationService(test_db)
+        service.checkpoint_store = store
+        await service.run_optimization(job_id)
+
+        iterations = await service.get_iterations(job_id, skip=0, limit=5)
+        assert iterations[0]["iteration_number"] == 1
+        assert store.load(job_id) is None
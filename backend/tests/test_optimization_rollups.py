@@ -0,0 +1,188 @@
+"""
+Tests for the incrementally maintained optimization statistics rollups.
+
+Testy przyrostowo utrzymywanych tabel rollup statystyk optymalizacji.
+"""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.optimization import (
+    OptimizationJob,
+    OptimizationResult,
+    OptimizationScenario,
+    OptimizationStatRollup,
+    OptimizationStatRollupLock,
+    OptimizationStatus,
+    OptimizationTemplate,
+)
+from app.models.reporting import Report, ReportType
+from app.services import optimization_rollups as rollups
+from app.services.optimization_rollups import rebuild_rollups, rollup_totals
+from app.services.reporting_service import ReportingService
+from benchmarks.fixtures import create_user, seed_job_history
+
+
+async def stored_rows(db: AsyncSession, dimension: str, keys):
+    rows = (await db.execute(
+        select(OptimizationStatRollup).where(
+            OptimizationStatRollup.dimension == dimension,
+            OptimizationStatRollup.key.in_(keys)
+        ).order_by(OptimizationStatRollup.key, OptimizationStatRollup.day)
+    )).scalars().all()
+    return [
+        (row.key, row.day, *(round(getattr(row, name), 6) for name in rollups.FIGURES))
+        for row in rows if row.jobs_finished
+    ]
+
+
+def result_for(job: OptimizationJob, fuel_savings: float) -> OptimizationResult:
+    return OptimizationResult(
+        job_id=job.id,
+        optimized_configuration={},
+        design_variables_final={},
+        objective_value=0.5,
+        baseline_metrics={},
+        optimized_metrics={},
+        improvement_percentages={},
+        fuel_savings_percentage=fuel_savings,
+        co2_reduction_percentage=fuel_savings * 0.9,
+        annual_cost_savings=1000.0
+    )
+
+
+class TestOptimizationRollups:
+    """Test incremental maintenance against a rebuild and the readers."""
+
+    @pytest.fixture
+    async def history(self, test_db: AsyncSession):
+        user = await create_user(test_db)
+        scenario_ids = await seed_job_history(test_db, user, jobs=30, scenarios=3, seed=11)
+        return user, scenario_ids
+
+    async def test_incremental_matches_rebuild(self, test_db: AsyncSession, history):
+        """Test that rows kept by the session hooks equal recomputed ones."""
+        user, scenario_ids = history
+        user_rows = await stored_rows(test_db, rollups.USER, [str(user.id)])
+        scenario_rows = await stored_rows(test_db, rollups.SCENARIO, scenario_ids)
+        assert sum(row[2] for row in user_rows) == 30
+
+        await rebuild_rollups(test_db)
+
+        assert await stored_rows(test_db, rollups.USER, [str(user.id)]) == user_rows
+        assert await stored_rows(test_db, rollups.SCENARIO, scenario_ids) == scenario_rows
+
+    async def test_job_lifecycle_and_template(self, test_db: AsyncSession, history):
+        """Test completion, status changes and deletion, and the template figures."""
+        user, scenario_ids = history
+        template = OptimizationTemplate(name="Rollup template", template_type="geometry", template_config={})
+        test_db.add(template)
+        await test_db.flush()
+        scenario = await test_db.get(OptimizationScenario, scenario_ids[0])
+        scenario.template_id = template.id
+        await test_db.commit()
+        await rebuild_rollups(test_db)
+
+        job = OptimizationJob(
+            scenario_id=scenario_ids[0], user_id=str(user.id),
+            execution_config={}, initial_values={}, status=OptimizationStatus.RUNNING
+        )
+        test_db.add(job)
+        await test_db.commit()
+        before = rollups.sum_days(await rollup_totals(test_db, rollups.TEMPLATE, [template.id]))
+
+        test_db.add(result_for(job, 10.0))
+        job.status = OptimizationStatus.COMPLETED
+        job.completed_at = datetime.now(UTC)
+        await test_db.commit()
+        after = rollups.sum_days(await rollup_totals(test_db, rollups.TEMPLATE, [template.id]))
+        assert after["jobs_completed"] == before["jobs_completed"] + 1
+        assert after["fuel_savings_sum"] == pytest.approx(before["fuel_savings_sum"] + 10.0)
+
+        await test_db.refresh(template)
+        assert template.success_rate == pytest.approx(after["jobs_completed"] / after["jobs_finished"] * 100)
+        assert template.average_improvement == pytest.approx(rollups.average(after, "fuel_savings"))
+
+        job.status = OptimizationStatus.FAILED
+        await test_db.commit()
+        failed = rollups.sum_days(await rollup_totals(test_db, rollups.TEMPLATE, [template.id]))
+        assert failed["jobs_finished"] == after["jobs_finished"]
+        assert failed["jobs_failed"] == after["jobs_failed"] + 1
+
+        await test_db.delete(job)
+        await test_db.commit()
+        deleted = rollups.sum_days(await rollup_totals(test_db, rollups.TEMPLATE, [template.id]))
+        assert deleted == pytest.approx(before)
+
+    async def test_writers_lock_before_reading_jobs(self, test_db: AsyncSession, history):
+        """Test that the hooks and the rebuild take the rollup lock before reading jobs."""
+        user, scenario_ids = history
+        calls = []
+        lock, figures_stmt = rollups._lock, rollups._job_figures_stmt
+
+        def record(name, function):
+            def recorded(*args, **kwargs):
+                calls.append(name)
+                return function(*args, **kwargs)
+            return recorded
+
+        job = OptimizationJob(
+            scenario_id=scenario_ids[0], user_id=str(user.id),
+            execution_config={}, initial_values={}, status=OptimizationStatus.RUNNING
+        )
+        test_db.add(job)
+        await test_db.commit()
+
+        with patch.object(rollups, "_lock", record("lock", lock)), \
+                patch.object(rollups, "_job_figures_stmt", record("read", figures_stmt)):
+            job.progress_percentage = 50.0
+            await test_db.commit()
+            assert calls == []
+
+            job.status = OptimizationStatus.COMPLETED
+            job.completed_at = datetime.now(UTC)
+            await test_db.commit()
+            assert calls == ["lock", "read"]
+
+            calls.clear()
+            await rebuild_rollups(test_db)
+            assert calls == ["lock", "read"]
+
+        locks = (await test_db.execute(select(OptimizationStatRollupLock.name))).scalars().all()
+        assert locks == [rollups._LOCK_NAME]
+
+    async def test_summary_report_reads_rollups(self, test_db: AsyncSession, history):
+        """Test the optimization summary against the job and result rows."""
+        user, scenario_ids = history
+        start = datetime.now(UTC) - timedelta(days=45)
+        end = datetime.now(UTC) + timedelta(days=1)
+        report = Report(
+            user_id=str(user.id),
+            title="Rollup summary",
+            report_type=ReportType.OPTIMIZATION_SUMMARY,
+            report_config={"scenario_ids": scenario_ids[:2]},
+            date_range={"start_date": start.date().isoformat(), "end_date": end.date().isoformat()}
+        )
+        test_db.add(report)
+        await test_db.commit()
+
+        service = ReportingService(test_db)
+        data = (await service._generate_optimization_summary(report))["data"]
+
+        rows = (await test_db.execute(
+            select(OptimizationJob, OptimizationResult).outerjoin(OptimizationResult).where(
+                OptimizationJob.scenario_id.in_(scenario_ids[:2]),
+                OptimizationJob.completed_at >= datetime.combine(start.date(), datetime.min.time())
+            )
+        )).all()
+        results = [result for _, result in rows if result is not None]
+        assert data["total_optimizations"] == len(rows)
+        assert data["successful_optimizations"] == len(results)
+        assert data["average_fuel_savings"] == pytest.approx(
+            sum(r.fuel_savings_percentage for r in results) / len(results)
+        )
+        assert data["total_annual_savings"] == pytest.approx(sum(r.annual_cost_savings for r in results))
@@ -0,0 +1,117 @@
+"""
+Tests for chart drawing and the PDF rendering pool.
+
+Testy rysowania wykresów i puli renderowania PDF.
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.reporting import Report, ReportFormat, ReportType
+from app.services import pdf_generator
+from app.services.pdf_generator import render_chart
+from app.services.pdf_rendering import PDFRenderTimeout, pdf_render_pool, render_document
+from app.services.reporting_service import ReportingService
+from benchmarks.fixtures import create_user, seed_job_history
+
+
+def sections(count: int = 1):
+    """Sections with a bar, a line and a pie chart each."""
+    return [
+        {
+            "name": f"section_{index}",
+            "data": {"total_optimizations": 40, "success_rate": 92.5},
+            "charts": [
+                {"type": "bar", "title": "Savings", "labels": [f"day {n}" for n in range(30)],
+                 "data": [n * 1.5 for n in range(30)]},
+                {"type": "line", "title": "Trend", "labels": list("abcdef"), "data": [1, 3, None, 5, 4, 6]},
+                {"type": "pie", "title": "Success", "labels": ["Successful", "Failed"], "data": [37, 3]},
+            ]
+        }
+        for index in range(count)
+    ]
+
+
+class TestChartDrawing:
+    """Test chart drawings and their cache."""
+
+    def test_cached_by_data(self):
+        """Test that identical charts share a drawing and changed data draws a new one."""
+        chart = sections()[0]["charts"][0]
+        drawing = render_chart(chart)
+
+        assert drawing is not None and drawing.contents
+        assert render_chart(dict(chart)) is drawing
+        assert render_chart({**chart, "data": chart["data"][::-1]}) is not drawing
+        assert render_chart({**chart, "type": "line"}) is not drawing
+
+    def test_empty_charts(self):
+        """Test that charts without data have no drawing."""
+        assert render_chart({"type": "bar", "labels": [], "data": []}) is None
+        assert render_chart({"type": "pie", "labels": ["a", "b"], "data": [0, 0]}) is None
+
+    def test_cache_bounded(self):
+        """Test that the least recently used drawings are dropped."""
+        with patch.object(pdf_generator, "CHART_CACHE_SIZE", 2), patch.dict(pdf_generator._chart_cache, clear=True):
+            charts = [{"type": "bar", "labels": ["a"], "data": [value]} for value in (1, 2, 3)]
+            first = render_chart(charts[0])
+            render_chart(charts[1])
+            assert render_chart(charts[0]) is first
+            render_chart(charts[2])
+
+            assert len(pdf_generator._chart_cache) == 2
+            assert render_chart(charts[0]) is first
+            assert pdf_generator.chart_cache_key(charts[1]) not in pdf_generator._chart_cache
+
+
+class TestPDFRenderPool:
+    """Test rendering documents on the process pool."""
+
+    @pytest.fixture(autouse=True)
+    def shutdown_pool(self):
+        yield
+        pdf_render_pool.shutdown()
+
+    async def test_timeout_keeps_pool_usable(self, tmp_path):
+        """Test that a document over its timeout fails without a file and the pool renders the next one."""
+        with patch.object(settings, "REPORT_PDF_TIMEOUT_SECONDS", 0.001):
+            with pytest.raises(PDFRenderTimeout):
+                await pdf_render_pool.render({"title": "Slow"}, sections(50), tmp_path / "slow.pdf")
+        assert not (tmp_path / "slow.pdf").exists()
+
+        path = await pdf_render_pool.render({"title": "Charts"}, sections(2), tmp_path / "charts.pdf")
+        assert path.read_bytes().startswith(b"%PDF")
+
+    def test_inline_timeout(self, tmp_path):
+        """Test the timeout of documents rendered in the calling process."""
+        with pytest.raises(PDFRenderTimeout):
+            render_document({"title": "Slow"}, sections(50), str(tmp_path / "slow.pdf"), 0.001)
+        assert not (tmp_path / "slow.pdf").exists()
+
+        render_document({"title": "Charts"}, sections(), str(tmp_path / "charts.pdf"), 30)
+        assert (tmp_path / "charts.pdf").read_bytes().startswith(b"%PDF")
+
+    async def test_pdf_report(self, test_db: AsyncSession, tmp_path):
+        """Test that PDF reports are rendered on the pool rather than falling back to text."""
+        user = await create_user(test_db)
+        scenario_ids = await seed_job_history(test_db, user, jobs=20, scenarios=2, seed=9)
+        report = Report(
+            user_id=str(user.id),
+            title="Plant",
+            report_type=ReportType.OPTIMIZATION_SUMMARY,
+            report_config={"scenario_ids": scenario_ids},
+            format=ReportFormat.PDF
+        )
+        test_db.add(report)
+        await test_db.commit()
+
+        service = ReportingService(test_db)
+        service.reports_dir = tmp_path
+        report = await service.generate_report(report.id)
+
+        assert Path(report.file_path).suffix == ".pdf"
+        assert Path(report.file_path).read_bytes().startswith(b"%PDF")
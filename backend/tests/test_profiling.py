@@ -0,0 +1,233 @@
+"""
+Tests for on-demand profiling of jobs and requests.
+
+Testy profilowania na żądanie zadań i żądań API.
+"""
+
+import os
+import pstats
+import time
+import pytest
+from uuid import uuid4
+from unittest.mock import patch
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.middleware import PROFILE_HEADER, PROFILE_ID_HEADER
+from app.services.profiling import (
+    ProfileArtifact, ProfileArtifactStore, ProfileCapture, SamplingProfiler, resolve_profile_mode
+)
+from app.services.optimization_checkpoint import NullCheckpointStore
+from app.services.optimization_service import OptimizationService
+from app.models.user import User, UserRole
+from app.models.optimization import OptimizationScenario, OptimizationJob, OptimizationStatus
+from app.models.regenerator import RegeneratorConfiguration, RegeneratorType, ConfigurationStatus
+
+
+def _busy_loop(seconds: float) -> int:
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+class TestProfileCapture:
+    """Test the profilers and the artifact store."""
+
+    def test_resolve_profile_mode(self):
+        """Test flag values accepted in execution_config and the header."""
+        assert resolve_profile_mode(None) is None
+        assert resolve_profile_mode(False) is None
+        assert resolve_profile_mode(True) == settings.PROFILE_DEFAULT_MODE
+        assert resolve_profile_mode("cProfile") == "cprofile"
+        assert resolve_profile_mode("flame") is None
+
+    def test_sampling_profiler_collapsed_stacks(self):
+        """Test that the sampler attributes samples to the running function."""
+        sampler = SamplingProfiler(interval_seconds=0.001, max_samples=10000)
+        sampler.start()
+        _busy_loop(0.2)
+        data = sampler.stop().decode("utf-8")
+
+        assert sampler.samples > 10
+        assert "_busy_loop" in data
+        stack, count = data.splitlines()[0].rsplit(" ", 1)
+        assert ";" in stack and int(count) > 0
+
+    def test_sampling_profiler_sample_cap(self):
+        """Test that sampling stops at the configured cap."""
+        sampler = SamplingProfiler(interval_seconds=0.001, max_samples=5)
+        sampler.start()
+        _busy_loop(0.1)
+        sampler.stop()
+
+        assert sampler.samples == 5
+
+    def test_cprofile_artifact_loads_with_pstats(self, tmp_path):
+        """Test that the cProfile artifact is a regular pstats dump."""
+        capture = ProfileCapture("job-cprofile", "cprofile").start()
+        with pytest.raises(RuntimeError):
+            ProfileCapture("job-other", "cprofile").start()
+        _busy_loop(0.01)
+        artifact = capture.stop()
+
+        info = ProfileArtifactStore(str(tmp_path), 10).save(artifact)
+        stats = pstats.Stats(str(tmp_path / info["filename"]))
+        assert any(func[2] == "_busy_loop" for func in stats.stats)
+
+    def test_store_prunes_and_validates(self, tmp_path):
+        """Test retention of the newest artifacts and id validation."""
+        store = ProfileArtifactStore(str(tmp_path), max_artifacts=2)
+        for i in range(4):
+            store.save(ProfileArtifact(f"job-{i}", "sampling", b"a;b 1\n", 0.1, 1))
+            path = store.find(f"job-{i}")
+            os.utime(path, (i, i))
+        store.prune()
+
+        assert store.find("job-0") is None
+        assert store.find("job-3") is not None
+        assert len(list(tmp_path.iterdir())) == 2
+        with pytest.raises(ValueError):
+            store.find("../etc/passwd")
+
+
+class TestProfiledJobs:
+    """Test profiling of optimization jobs and API requests."""
+
+    @pytest.fixture(autouse=True)
+    def artifact_dir(self, tmp_path):
+        with patch.object(settings, "PROFILE_ARTIFACT_DIR", str(tmp_path)), \
+                patch.object(settings, "PROFILE_SAMPLING_INTERVAL_MS", 1):
+            yield tmp_path
+
+    @pytest.fixture
+    def client(self, test_client: AsyncClient) -> AsyncClient:
+        """Test client on a host accepted by TrustedHostMiddleware."""
+        test_client.base_url = "http://localhost"
+        return test_client
+
+    async def _create_user(self, test_db: AsyncSession, role: UserRole) -> User:
+        unique_id = uuid4().hex[:8]
+        user = User(
+            username=f"profiling_{unique_id}",
+            email=f"profiling_{unique_id}@example.com",
+            full_name="Profiling Test User",
+            password_hash="hashed_password",
+            role=role,
+            is_active=True,
+            is_verified=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+        return user
+
+    @pytest.fixture
+    async def test_job(self, test_db: AsyncSession) -> OptimizationJob:
+        """Create an engineer's job with sampling profiling requested."""
+        user = await self._create_user(test_db, UserRole.ENGINEER)
+
+        config = RegeneratorConfiguration(
+            user_id=str(user.id),
+            name=f"Profiling Regenerator {uuid4().hex[:8]}",
+            regenerator_type=RegeneratorType.CROWN,
+            status=ConfigurationStatus.COMPLETED,
+            geometry_config={"length": 10.0, "width": 8.0},
+            thermal_config={"gas_temp_inlet": 1600.0, "gas_temp_outlet": 600.0},
+            flow_config={"mass_flow_rate": 50.0, "cycle_time": 1200.0}
+        )
+        test_db.add(config)
+        await test_db.commit()
+
+        scenario = OptimizationScenario(
+            user_id=str(user.id),
+            base_configuration_id=str(config.id),
+            name=f"Profiling Scenario {uuid4().hex[:8]}",
+            scenario_type="geometry_optimization",
+            objective="minimize_fuel_consumption",
+            algorithm="slsqp",
+            design_variables={
+                "checker_height": {"min": 0.5, "max": 1.5},
+                "checker_spacing": {"min": 0.08, "max": 0.15}
+            },
+            optimization_config={"max_iterations": 20},
+            max_iterations=20,
+            tolerance=1e-6
+        )
+        test_db.add(scenario)
+        await test_db.commit()
+
+        job = OptimizationJob(
+            scenario_id=str(scenario.id),
+            user_id=str(user.id),
+            execution_config={"max_iterations": 20, "profile": "sampling"},
+            initial_values={"checker_height": 0.6, "checker_spacing": 0.09},
+            status=OptimizationStatus.PENDING
+        )
+        test_db.add(job)
+        await test_db.commit()
+        await test_db.refresh(job)
+        return job
+
+    async def test_profiled_job_artifact(
+        self, test_db: AsyncSession, client: AsyncClient, test_job: OptimizationJob
+    ):
+        """Test that a profiled run stores an artifact the owner can download."""
+        job_id = str(test_job.id)
+        service = OptimizationService(test_db)
+        service.checkpoint_store = NullCheckpointStore()
+        await service.run_optimization(job_id)
+
+        job = await test_db.get(OptimizationJob, job_id)
+        await test_db.refresh(job)
+        profile = job.resource_usage["profile"]
+        assert profile["artifact_id"] == f"job-{job_id}"
+        assert profile["mode"] == "sampling"
+        assert profile["samples"] > 0
+
+        owner_headers = {"Authorization": f"Bearer {create_access_token(str(job.user_id))}"}
+        response = await client.get(f"/api/v1/optimize/jobs/{job_id}/profile", headers=owner_headers)
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"].startswith("text/plain")
+        # Awaiting coroutines are off the stack, so only the format is stable
+        stack, count = response.text.splitlines()[0].rsplit(" ", 1)
+        assert stack.count(";") > 0 and int(count) > 0
+
+        other = await self._create_user(test_db, UserRole.ENGINEER)
+        other_headers = {"Authorization": f"Bearer {create_access_token(str(other.id))}"}
+        response = await client.get(f"/api/v1/optimize/jobs/{job_id}/profile", headers=other_headers)
+        assert response.status_code == 404
+
+    async def test_profile_header_admin_only(
+        self, test_db: AsyncSession, test_engine, client: AsyncClient, artifact_dir
+    ):
+        """Test request profiling through the X-Profile header."""
+        session_factory = sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+        admin = await self._create_user(test_db, UserRole.ADMIN)
+        engineer = await self._create_user(test_db, UserRole.ENGINEER)
+        admin_headers = {"Authorization": f"Bearer {create_access_token(str(admin.id))}"}
+        engineer_headers = {"Authorization": f"Bearer {create_access_token(str(engineer.id))}"}
+
+        with patch("app.core.middleware.AsyncSessionLocal", session_factory):
+            response = await client.get("/health", headers={**admin_headers, PROFILE_HEADER: "sampling"})
+            assert response.status_code == 200
+            artifact_id = response.headers[PROFILE_ID_HEADER]
+
+            response = await client.get("/health", headers={**engineer_headers, PROFILE_HEADER: "1"})
+            assert response.status_code == 403
+            response = await client.get("/health", headers={PROFILE_HEADER: "1"})
+            assert response.status_code == 403
+            response = await client.get("/health", headers={**admin_headers, PROFILE_HEADER: "flame"})
+            assert response.status_code == 400
+
+        response = await client.get("/health")
+        assert PROFILE_ID_HEADER not in response.headers
+
+        response = await client.get(f"/api/v1/optimize/profiles/{artifact_id}", headers=admin_headers)
+        assert response.status_code == 200
+        response = await client.get(f"/api/v1/optimize/profiles/{artifact_id}", headers=engineer_headers)
+        assert response.status_code == 403
+        assert len(list(artifact_dir.iterdir())) == 1
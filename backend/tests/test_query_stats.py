@@ -0,0 +1,208 @@
+"""
+Tests for per-request SQL query counting and slow query logging.
+
+Testy zliczania zapytań SQL na żądanie i logowania wolnych zapytań.
+"""
+
+import pytest
+from uuid import uuid4
+from unittest.mock import patch
+from fastapi.routing import APIRoute
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import _query_observers, track_queries
+from app.core.middleware import QUERY_COUNT_HEADER, route_template
+from app.core.security import create_access_token
+from app.services.optimization_service import OptimizationService
+from app.models.user import User, UserRole
+from app.models.optimization import OptimizationScenario, OptimizationJob, OptimizationStatus
+from app.models.regenerator import RegeneratorConfiguration, RegeneratorType, ConfigurationStatus
+
+
+class TestQueryTracking:
+    """Test the engine hooks and query budgets."""
+
+    async def test_nested_tracking(self, test_db: AsyncSession):
+        """Test that statements are charged to every enclosing block."""
+        with track_queries(route="GET /outer") as outer:
+            await test_db.execute(text("SELECT 1"))
+            with track_queries(record_statements=True) as inner:
+                await test_db.execute(text("SELECT 2"))
+
+        assert outer.count == 2
+        assert inner.count == 1
+        assert inner.route == "GET /outer"
+        assert inner.statements == ["SELECT 2"]
+        assert outer.statements is None
+        assert outer.seconds >= inner.seconds > 0
+
+    async def test_slow_query_logged_with_route(self, test_db: AsyncSession):
+        """Test that statements over the threshold are logged."""
+        with patch.object(settings, "SLOW_QUERY_THRESHOLD_MS", 1e-6), \
+                patch("app.core.database.logger") as logger, \
+                track_queries(route="GET /api/v1/slow"):
+            await test_db.execute(text("SELECT 1"))
+
+        logger.warning.assert_called_once()
+        assert logger.warning.call_args.kwargs["route"] == "GET /api/v1/slow"
+        assert logger.warning.call_args.kwargs["statement"] == "SELECT 1"
+
+        with patch.object(settings, "SLOW_QUERY_THRESHOLD_MS", 0), \
+                patch("app.core.database.logger") as logger:
+            await test_db.execute(text("SELECT 1"))
+        logger.warning.assert_not_called()
+
+    async def test_failed_statement_releases_its_timer(self, test_db: AsyncSession):
+        """Test that a failing statement is charged once and leaves no start time behind."""
+        seen = []
+        connection = await test_db.connection()
+        with patch.object(settings, "SLOW_QUERY_THRESHOLD_MS", 0), \
+                patch("app.core.database._query_observers", _query_observers + [
+                    lambda statement, seconds, executemany: seen.append(statement)
+                ]), \
+                track_queries() as stats:
+            with pytest.raises(OperationalError):
+                await test_db.execute(text("SELECT * FROM no_such_table"))
+            assert not connection.info.get("query_start")
+            await test_db.execute(text("SELECT 1"))
+
+        assert stats.count == 2
+        assert seen == ["SELECT * FROM no_such_table", "SELECT 1"]
+        assert not connection.info.get("query_start")
+
+    async def test_query_budget_exceeded(self, test_db: AsyncSession, query_budget):
+        """Test that the budget helper fails and lists the statements."""
+        with pytest.raises(AssertionError, match="2 SQL statements executed, budget is 1"):
+            with query_budget(1):
+                await test_db.execute(text("SELECT 1"))
+                await test_db.execute(text("SELECT 2"))
+
+    def test_route_template(self):
+        """Test that the label is the matched route's path, not a rewritten URL."""
+        route = APIRoute("/api/v1/optimize/jobs/{job_id}/progress", lambda job_id: None)
+        scope = {
+            "route": route,
+            "path": "/api/v1/optimize/jobs/progress/progress",
+            "path_params": {"job_id": "progress"},
+        }
+        assert route_template(scope) == "/api/v1/optimize/jobs/{job_id}/progress"
+
+        route = APIRoute("/api/v1/files/{file_path:path}", lambda file_path: None)
+        scope = {"route": route, "path": "/api/v1/files/a/b.xlsx", "path_params": {"file_path": "a/b.xlsx"}}
+        assert route_template(scope) == "/api/v1/files/{file_path:path}"
+
+        # Route of an included router that keeps its own, unprefixed path
+        scope["route"] = APIRoute("/files/{file_path:path}", lambda file_path: None)
+        assert route_template(scope) == "/api/v1/files/{file_path:path}"
+        scope = {
+            "route": APIRoute("/jobs/{job_id}/progress", lambda job_id: None),
+            "path": "/api/v1/optimize/jobs/progress/progress",
+            "path_params": {"job_id": "progress"},
+        }
+        assert route_template(scope) == "/api/v1/optimize/jobs/{job_id}/progress"
+
+        assert route_template({"path": "/unknown", "path_params": {}}) is None
+
+
+class TestProgressQueries:
+    """Test the query count of the optimization progress endpoint."""
+
+    @pytest.fixture
+    def client(self, test_client: AsyncClient) -> AsyncClient:
+        """Test client on a host accepted by TrustedHostMiddleware."""
+        test_client.base_url = "http://localhost"
+        return test_client
+
+    @pytest.fixture
+    async def test_job(self, test_db: AsyncSession) -> OptimizationJob:
+        """Create a pending job of an engineer."""
+        unique_id = uuid4().hex[:8]
+        user = User(
+            username=f"queries_{unique_id}",
+            email=f"queries_{unique_id}@example.com",
+            full_name="Query Test User",
+            password_hash="hashed_password",
+            role=UserRole.ENGINEER,
+            is_active=True,
+            is_verified=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+
+        config = RegeneratorConfiguration(
+            user_id=str(user.id),
+            name=f"Query Regenerator {unique_id}",
+            regenerator_type=RegeneratorType.CROWN,
+            status=ConfigurationStatus.COMPLETED,
+            geometry_config={"length": 10.0, "width": 8.0},
+            thermal_config={"gas_temp_inlet": 1600.0, "gas_temp_outlet": 600.0},
+            flow_config={"mass_flow_rate": 50.0, "cycle_time": 1200.0}
+        )
+        test_db.add(config)
+        await test_db.commit()
+
+        scenario = OptimizationScenario(
+            user_id=str(user.id),
+            base_configuration_id=str(config.id),
+            name=f"Query Scenario {unique_id}",
+            scenario_type="geometry_optimization",
+            objective="minimize_fuel_consumption",
+            algorithm="slsqp",
+            design_variables={"checker_height": {"min": 0.5, "max": 1.5}},
+            optimization_config={"max_iterations": 20},
+            max_iterations=20,
+            tolerance=1e-6
+        )
+        test_db.add(scenario)
+        await test_db.commit()
+
+        job = OptimizationJob(
+            scenario_id=str(scenario.id),
+            user_id=str(user.id),
+            execution_config={"max_iterations": 20},
+            initial_values={"checker_height": 0.6},
+            status=OptimizationStatus.PENDING
+        )
+        test_db.add(job)
+        await test_db.commit()
+        return job
+
+    async def test_progress_sees_updated_job(
+        self, test_db: AsyncSession, test_job: OptimizationJob, query_budget
+    ):
+        """Test that progress reloads a job held by the session within budget."""
+        service = OptimizationService(test_db)
+        await test_db.execute(
+            update(OptimizationJob).where(OptimizationJob.id == test_job.id)
+            .values(status=OptimizationStatus.RUNNING, current_iteration=5)
+        )
+
+        # Job with scenario limit, iteration archive, recent iterations
+        with query_budget(3):
+            progress = await service.get_optimization_progress(str(test_job.id))
+
+        assert progress.status == OptimizationStatus.RUNNING
+        assert progress.current_iteration == 5
+        assert progress.max_iterations == 20
+
+    async def test_request_metrics_and_headers(
+        self, client: AsyncClient, test_job: OptimizationJob, query_budget
+    ):
+        """Test the per-route histogram and the query count header."""
+        route = "/api/v1/optimize/jobs/{job_id}/progress"
+        labels = {"method": "GET", "endpoint": route}
+        before = REGISTRY.get_sample_value("fro_api_request_db_queries_count", labels) or 0
+        headers = {"Authorization": f"Bearer {create_access_token(str(test_job.user_id))}"}
+
+        with patch.object(settings, "QUERY_STATS_HEADERS", True), query_budget(6) as stats:
+            response = await client.get(f"/api/v1/optimize/jobs/{test_job.id}/progress", headers=headers)
+
+        assert response.status_code == 200, response.text
+        assert int(response.headers[QUERY_COUNT_HEADER]) == stats.count
+        assert response.headers["Server-Timing"].startswith("db;dur=")
+        assert REGISTRY.get_sample_value("fro_api_request_db_queries_count", labels) == before + 1
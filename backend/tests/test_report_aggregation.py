@@ -0,0 +1,83 @@
+"""
+Tests for SQL-side report aggregation.
+
+Testy agregacji danych raportów po stronie bazy danych.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.optimization import OptimizationJob, OptimizationResult
+from app.models.reporting import Report, ReportType, SystemMetrics
+from app.services.reporting_service import ReportingService
+from benchmarks.fixtures import create_user, seed_job_history
+
+
+class TestReportAggregation:
+    """Test aggregated report sections against the detail rows."""
+
+    async def test_fuel_savings_percentiles(self, test_db: AsyncSession):
+        """Test streamed percentiles against numpy's linear interpolation."""
+        user = await create_user(test_db)
+        scenario_ids = await seed_job_history(test_db, user, jobs=50, scenarios=2, seed=3)
+        report = Report(
+            user_id=str(user.id),
+            title="Percentiles",
+            report_type=ReportType.OPTIMIZATION_SUMMARY,
+            report_config={"scenario_ids": scenario_ids}
+        )
+        test_db.add(report)
+        await test_db.commit()
+
+        data = (await ReportingService(test_db)._generate_fuel_savings_distribution(report))["data"]
+
+        values = (await test_db.execute(
+            select(OptimizationResult.fuel_savings_percentage).join(OptimizationJob).where(
+                OptimizationJob.scenario_id.in_(scenario_ids)
+            )
+        )).scalars().all()
+        assert data["fuel_savings_percentiles"] == {
+            "p50": pytest.approx(np.percentile(values, 50)),
+            "p90": pytest.approx(np.percentile(values, 90)),
+        }
+
+    async def test_system_performance_by_day(self, test_db: AsyncSession):
+        """Test per-metric figures and daily averages."""
+        user = await create_user(test_db)
+        start = datetime(2026, 3, 1, 12, 0)
+        samples = {0: [100.0, 200.0], 1: [300.0], 2: [50.0, 150.0, 250.0]}
+        for offset, values in samples.items():
+            for value in values:
+                test_db.add(SystemMetrics(
+                    metric_name="api_response_time",
+                    metric_category="performance",
+                    metric_value=value,
+                    measured_at=start + timedelta(days=offset)
+                ))
+        report = Report(
+            user_id=str(user.id),
+            title="Performance",
+            report_type=ReportType.SYSTEM_PERFORMANCE,
+            report_config={},
+            date_range={
+                "start_date": start.date().isoformat(),
+                "end_date": (start + timedelta(days=3)).date().isoformat()
+            }
+        )
+        test_db.add(report)
+        await test_db.commit()
+
+        data = (await ReportingService(test_db)._generate_system_performance(report))["data"]
+
+        metric = data["metrics"]["api_response_time"]
+        assert metric["samples"] == 6
+        assert metric["average"] == pytest.approx(175.0)
+        assert (metric["minimum"], metric["maximum"]) == (50.0, 300.0)
+        assert data["api_response_times"] == pytest.approx([150.0, 300.0, 150.0])
+        assert [point["day"] for point in metric["daily_averages"]] == [
+            "2026-03-01", "2026-03-02", "2026-03-03"
+        ]
@@ -0,0 +1,127 @@
+"""
+Tests for the content-addressed report file cache.
+
+Testy pamięci podręcznej plików raportów adresowanej treścią.
+"""
+
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.optimization import OptimizationJob
+from app.models.reporting import Report, ReportData, ReportFormat, ReportStatus, ReportType
+from app.services.report_cache import ReportArtifactCache, compute_report_cache_key
+from app.services.reporting_service import ReportingService
+from benchmarks.fixtures import create_user, seed_job_history
+
+
+class TestReportCache:
+    """Test reuse of report files over unchanged data and LRU eviction."""
+
+    @pytest.fixture
+    async def history(self, test_db: AsyncSession):
+        user = await create_user(test_db)
+        scenario_ids = await seed_job_history(test_db, user, jobs=20, scenarios=2, seed=7)
+        return user, scenario_ids
+
+    async def new_report(self, db: AsyncSession, user, scenario_ids, title: str, **overrides) -> Report:
+        values = dict(
+            user_id=str(user.id),
+            title=title,
+            report_type=ReportType.OPTIMIZATION_SUMMARY,
+            report_config={"scenario_ids": scenario_ids},
+            format=ReportFormat.CSV
+        )
+        values.update(overrides)
+        report = Report(**values)
+        db.add(report)
+        await db.commit()
+        return report
+
+    async def test_identical_report_reuses_file(self, test_db: AsyncSession, history, tmp_path):
+        """Test that a second report over unchanged data links the first one's file."""
+        user, scenario_ids = history
+        service = ReportingService(test_db)
+        service.reports_dir = tmp_path
+
+        first = await self.new_report(test_db, user, scenario_ids, "Monday")
+        first = await service.generate_report(first.id)
+        assert first.cache_key is not None
+
+        second = await self.new_report(test_db, user, scenario_ids, "Tuesday")
+        with patch.object(ReportingService, "_generate_report_data", side_effect=AssertionError("regenerated")):
+            second = await service.generate_report(second.id)
+
+        assert second.status == ReportStatus.COMPLETED
+        assert second.cache_key == first.cache_key
+        assert second.file_path != first.file_path
+        assert os.stat(second.file_path).st_ino == os.stat(first.file_path).st_ino
+        rows = (await test_db.execute(
+            select(ReportData.section_name).where(ReportData.report_id == second.id).order_by(ReportData.section_order)
+        )).scalars().all()
+        assert rows == ["optimization_summary", "fuel_savings_distribution"]
+
+    async def test_changed_data_or_definition_regenerates(self, test_db: AsyncSession, history, tmp_path):
+        """Test that the key follows the source tables and the definition, not the title."""
+        user, scenario_ids = history
+        service = ReportingService(test_db)
+        service.reports_dir = tmp_path
+
+        first = await service.generate_report((await self.new_report(test_db, user, scenario_ids, "A")).id)
+
+        job = (await test_db.execute(
+            select(OptimizationJob).where(OptimizationJob.scenario_id == scenario_ids[0]).limit(1)
+        )).scalar_one()
+        await test_db.delete(job)
+        await test_db.commit()
+        changed = await service.generate_report((await self.new_report(test_db, user, scenario_ids, "B")).id)
+        assert changed.cache_key != first.cache_key
+
+        excel = await service.generate_report(
+            (await self.new_report(test_db, user, scenario_ids, "C", format=ReportFormat.EXCEL)).id
+        )
+        assert excel.cache_key not in (first.cache_key, changed.cache_key)
+
+        retitled = await self.new_report(test_db, user, scenario_ids, "D", format=ReportFormat.EXCEL)
+        assert compute_report_cache_key(retitled, {}) == compute_report_cache_key(
+            await self.new_report(test_db, user, scenario_ids, "E", format=ReportFormat.EXCEL), {}
+        )
+
+    async def test_disabled(self, test_db: AsyncSession, history, tmp_path):
+        """Test that a quota of 0 turns reuse off."""
+        user, scenario_ids = history
+        service = ReportingService(test_db)
+        service.reports_dir = tmp_path
+
+        with patch.object(settings, "REPORT_CACHE_MAX_MB", 0):
+            report = await service.generate_report((await self.new_report(test_db, user, scenario_ids, "A")).id)
+
+        assert report.cache_key is None
+        assert not (tmp_path / "cache").exists()
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that storing beyond the quota evicts the least recently used files."""
+        cache = ReportArtifactCache(tmp_path / "cache")
+        now = time.time()
+        with patch.object(settings, "REPORT_CACHE_MAX_MB", 1):
+            for index, key in enumerate(["a", "b", "c"]):
+                source = tmp_path / f"{key}.csv"
+                source.write_bytes(b"x" * 400_000)
+                cache.store(key, source)
+                os.utime(cache.directory / f"{key}.csv", (now - 100 + index, now - 100 + index))
+            assert sorted(path.name for path in cache.directory.iterdir()) == ["b.csv", "c.csv"]
+
+            assert cache.lookup("b") is not None
+            source = tmp_path / "d.csv"
+            source.write_bytes(b"x" * 400_000)
+            cache.store("d", source)
+
+            assert sorted(path.name for path in cache.directory.iterdir()) == ["b.csv", "d.csv"]
+            assert cache.lookup("c") is None
+            # The report's own link survives eviction
+            assert (tmp_path / "c.csv").exists()
@@ -0,0 +1,133 @@
+"""
+Tests for report downloads with ETags, ranges and gzip copies.
+
+Testy pobierania raportów z ETagami, zakresami i kopiami gzip.
+"""
+
+import gzip
+import os
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import create_access_token
+from app.models.reporting import Report, ReportFormat, ReportType
+from app.services.report_files import accepts_encoding, compressed_path, etag_matches, file_digest
+from app.services.reporting_service import ReportingService
+from benchmarks.fixtures import create_user, seed_job_history
+
+
+class TestReportDownloads:
+    """Test GET /reports/{id}/download."""
+
+    @pytest.fixture
+    def client(self, test_client: AsyncClient) -> AsyncClient:
+        """Test client on a host accepted by TrustedHostMiddleware."""
+        test_client.base_url = "http://localhost"
+        return test_client
+
+    @pytest.fixture
+    async def generated(self, test_db: AsyncSession, tmp_path):
+        user = await create_user(test_db)
+        scenario_ids = await seed_job_history(test_db, user, jobs=20, scenarios=2, seed=3)
+        service = ReportingService(test_db)
+        service.reports_dir = tmp_path
+
+        async def generate(report_format: str, title: str = "Plant") -> Report:
+            report = Report(
+                user_id=str(user.id),
+                title=title,
+                report_type=ReportType.OPTIMIZATION_SUMMARY,
+                report_config={"scenario_ids": scenario_ids},
+                format=report_format
+            )
+            test_db.add(report)
+            await test_db.commit()
+            return await service.generate_report(report.id)
+
+        headers = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+        return generate, headers
+
+    async def test_gzip_copy_and_not_modified(self, client: AsyncClient, generated):
+        """Test that gzip clients get the stored copy and revalidate with its ETag."""
+        generate, headers = generated
+        report = await generate(ReportFormat.CSV)
+        original = open(report.file_path, 'rb').read()
+        assert report.file_hash == file_digest(report.file_path)
+        assert compressed_path(Path(report.file_path)).exists()
+
+        url = f"/api/v1/reports/reports/{report.id}/download"
+        response = await client.get(url, headers={**headers, "Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == f'"{report.file_hash}-gzip"'
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="Plant.csv"' in response.headers["content-disposition"]
+        assert int(response.headers["content-length"]) < len(original)
+        assert response.content == original
+
+        response = await client.get(url, headers={
+            **headers, "Accept-Encoding": "gzip", "If-None-Match": f'W/"{report.file_hash}-gzip"'
+        })
+        assert response.status_code == 304
+        assert response.content == b""
+
+        # The identity ETag does not match the gzip representation
+        response = await client.get(url, headers={
+            **headers, "Accept-Encoding": "gzip", "If-None-Match": f'"{report.file_hash}"'
+        })
+        assert response.status_code == 200
+
+    async def test_range_resumes_download(self, client: AsyncClient, generated):
+        """Test partial downloads of the identity file, guarded by If-Range."""
+        generate, headers = generated
+        report = await generate(ReportFormat.EXCEL)
+        original = open(report.file_path, 'rb').read()
+        assert not compressed_path(Path(report.file_path)).exists()
+
+        url = f"/api/v1/reports/reports/{report.id}/download"
+        etag = f'"{report.file_hash}"'
+        response = await client.get(url, headers={
+            **headers, "Accept-Encoding": "gzip", "Range": "bytes=100-", "If-Range": etag
+        })
+        assert response.status_code == 206
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == etag
+        assert response.headers["content-range"] == f"bytes 100-{len(original) - 1}/{len(original)}"
+        assert response.content == original[100:]
+
+        # A stale validator gets the whole, current file
+        response = await client.get(url, headers={**headers, "Range": "bytes=100-", "If-Range": '"stale"'})
+        assert response.status_code == 200
+        assert response.content == original
+
+        os.unlink(report.file_path)
+        response = await client.get(url, headers=headers)
+        assert response.status_code == 404
+
+    async def test_cached_report_links_gzip_copy(self, generated):
+        """Test that a report reusing a cached CSV file also links its gzip copy."""
+        generate, _ = generated
+        first = await generate(ReportFormat.CSV, "Monday")
+        second = await generate(ReportFormat.CSV, "Tuesday")
+
+        assert second.file_hash == first.file_hash
+        copy = compressed_path(Path(second.file_path))
+        assert os.stat(copy).st_ino == os.stat(compressed_path(Path(first.file_path))).st_ino
+        assert gzip.decompress(copy.read_bytes()) == Path(second.file_path).read_bytes()
+
+    def test_header_parsing(self):
+        """Test Accept-Encoding qualities and If-None-Match lists."""
+        assert accepts_encoding("gzip, deflate, br", "gzip")
+        assert accepts_encoding("br;q=1.0, *;q=0.5", "gzip")
+        assert not accepts_encoding("gzip;q=0, *", "gzip")
+        assert not accepts_encoding("identity", "gzip")
+        assert not accepts_encoding(None, "gzip")
+
+        assert etag_matches('"a", W/"b"', '"b"')
+        assert etag_matches("*", '"b"')
+        assert not etag_matches('"a"', '"b"')
+        assert not etag_matches(None, '"b"')
@@ -0,0 +1,90 @@
+"""
+Tests for concurrent generation of report sections.
+
+Testy równoległego generowania sekcji raportów.
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.reporting import Report, ReportData, ReportType
+from app.services.reporting_service import REPORT_SECTIONS, ReportingService, ReportSection
+from benchmarks.fixtures import create_user
+
+SECTION_SECONDS = 0.3
+
+
+async def slow_section(self, report):
+    await asyncio.sleep(SECTION_SECONDS)
+    return {"name": "slow", "data": {"value": 1}}
+
+
+async def failing_section(self, report):
+    raise RuntimeError("section source unavailable")
+
+
+class TestReportSections:
+    """Test ordering, concurrency, progress and optional sections."""
+
+    @pytest.fixture
+    async def report(self, test_db: AsyncSession) -> Report:
+        user = await create_user(test_db)
+        report = Report(
+            user_id=str(user.id),
+            title="Sections",
+            report_type=ReportType.CUSTOM,
+            report_config={}
+        )
+        test_db.add(report)
+        await test_db.commit()
+        return report
+
+    @pytest.fixture(autouse=True)
+    def generators(self):
+        with patch.object(ReportingService, "_slow_section", slow_section, create=True), \
+                patch.object(ReportingService, "_failing_section", failing_section, create=True):
+            yield
+
+    async def test_sections_run_concurrently_in_order(self, test_db: AsyncSession, report: Report):
+        """Test that three slow sections take about as long as one and keep their order."""
+        sections = [ReportSection(f"slow_{i}", "_slow_section") for i in range(3)]
+        progress = []
+        with patch.dict(REPORT_SECTIONS, {ReportType.CUSTOM: sections}):
+            started = time.perf_counter()
+            data = await ReportingService(test_db)._generate_report_data(
+                report, on_section=lambda name, done, total: progress.append((done, total))
+            )
+            elapsed = time.perf_counter() - started
+
+        assert elapsed < SECTION_SECONDS * 2
+        assert [section["order"] for section in data] == [1, 2, 3]
+        assert progress == [(1, 3), (2, 3), (3, 3)]
+
+        await test_db.refresh(report)
+        assert report.progress_percentage == pytest.approx(50.0)
+        status = await ReportingService(test_db).get_report_progress(report.id)
+        assert status.steps_completed == 3
+
+    async def test_optional_section_failure(self, test_db: AsyncSession, report: Report):
+        """Test that an optional section's error is kept and a required one fails the report."""
+        sections = [ReportSection("slow", "_slow_section"), ReportSection("failing", "_failing_section")]
+        report.report_config = {"optional_sections": ["failing"]}
+        await test_db.commit()
+        with patch.dict(REPORT_SECTIONS, {ReportType.CUSTOM: sections}):
+            data = await ReportingService(test_db)._generate_report_data(report)
+
+            assert data[1]["failed"]
+            assert data[1]["data"] == {"error": "section source unavailable"}
+            rows = (await test_db.execute(
+                select(ReportData).where(ReportData.report_id == report.id).order_by(ReportData.section_order)
+            )).scalars().all()
+            assert [row.data_completeness for row in rows] == [1.0, 0.0]
+
+            report.report_config = {}
+            with pytest.raises(RuntimeError, match="section source unavailable"):
+                await ReportingService(test_db)._generate_report_data(report)
@@ -0,0 +1,131 @@
+"""
+Tests for the streaming Excel and CSV report writers.
+
+Testy strumieniowego zapisu raportów Excel i CSV.
+"""
+
+import csv
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.optimization import OptimizationJob
+from app.models.reporting import Report, ReportFormat, ReportType
+from app.services.csv_generator import CSVGenerator
+from app.services.excel_generator import ExcelGenerator
+from app.services.reporting_service import OPTIMIZATION_JOB_COLUMNS, ReportingService
+from benchmarks.fixtures import create_user, report_file_sections, seed_job_history
+
+
+def csv_blocks(path):
+    """Blocks of a CSV report, each a list of rows starting with its header."""
+    blocks = [[]]
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if row:
+                blocks[-1].append(row)
+            else:
+                blocks.append([])
+    return blocks
+
+
+class TestReportWriters:
+    """Test the writers directly and through ReportingService."""
+
+    @pytest.fixture
+    async def job_report(self, test_db: AsyncSession, tmp_path):
+        user = await create_user(test_db)
+        scenario_ids = await seed_job_history(test_db, user, jobs=40, scenarios=2, seed=5)
+        report = Report(
+            user_id=str(user.id),
+            title="Job rows",
+            report_type=ReportType.OPTIMIZATION_SUMMARY,
+            report_config={"scenario_ids": scenario_ids, "include_job_rows": True},
+            date_range={
+                "start_date": (datetime.now(UTC) - timedelta(days=45)).date().isoformat(),
+                "end_date": datetime.now(UTC).date().isoformat()
+            }
+        )
+        test_db.add(report)
+        await test_db.commit()
+
+        service = ReportingService(test_db)
+        service.reports_dir = tmp_path
+        jobs = (await test_db.execute(
+            select(func.count()).select_from(OptimizationJob).where(
+                OptimizationJob.scenario_id.in_(scenario_ids),
+                *service._finished_between(
+                    datetime.fromisoformat(report.date_range["start_date"]).date(),
+                    datetime.fromisoformat(report.date_range["end_date"]).date()
+                )
+            )
+        )).scalar_one()
+        return service, report, jobs
+
+    async def test_excel_job_rows(self, test_db: AsyncSession, job_report):
+        """Test the summary, metrics, named styles and streamed job rows of a workbook."""
+        service, report, jobs = job_report
+        sections = await service._generate_report_data(report)
+
+        path = await service._create_excel_report(report, sections, "jobs")
+
+        assert path.suffix == ".xlsx"
+        workbook = load_workbook(path)
+        assert workbook.sheetnames == [
+            "Summary", "Optimization Summary", "Fuel Savings Distribution", "Charts"
+        ]
+        assert {"report_header", "report_percent", "report_percent_alt"} <= set(workbook.named_styles)
+
+        sheet = workbook["Optimization Summary"]
+        rows = list(sheet.iter_rows(values_only=True))
+        header = rows.index(OPTIMIZATION_JOB_COLUMNS)
+        assert len(rows) - header - 1 == jobs > 0
+        assert sheet.cell(row=header + 1, column=1).style == "report_header"
+
+        metrics = {row[0]: row[1] for row in rows[3:10]}
+        assert metrics["Total Optimizations"] == jobs
+        success_rate = next(cell for cell in sheet["B"] if cell.row > 3 and cell.number_format == "0.00%")
+        assert success_rate.style in ("report_percent", "report_percent_alt")
+        assert 0 < success_rate.value <= 1
+
+    async def test_csv_job_rows(self, test_db: AsyncSession, job_report):
+        """Test the metric and table blocks of a CSV report."""
+        service, report, jobs = job_report
+        sections = await service._generate_report_data(report)
+
+        path = await service._create_csv_report(report, sections, "jobs")
+
+        summary, table, distribution = csv_blocks(path)
+        assert summary[0] == ["section", "metric", "value"]
+        assert ["optimization_summary", "total_optimizations", str(jobs)] in summary
+        assert table[0] == ["section", *OPTIMIZATION_JOB_COLUMNS]
+        assert len(table) - 1 == jobs
+        assert {row[0] for row in table[1:]} == {"optimization_summary"}
+        assert distribution[1][:2] == ["fuel_savings_distribution", "fuel_savings_percentiles"]
+
+    async def test_job_rows_opt_in(self, test_db: AsyncSession, job_report):
+        """Test that reports without include_job_rows keep the metrics only."""
+        service, report, _ = job_report
+        report.report_config = {**report.report_config, "include_job_rows": False}
+        report.format = ReportFormat.CSV
+        await test_db.commit()
+
+        sections = await service._generate_report_data(report)
+        path = await service._create_report_file(report, sections)
+
+        assert [block[0] for block in csv_blocks(path)] == [["section", "metric", "value"]] * 2
+
+    async def test_writers_stream_batches(self, tmp_path):
+        """Test large generated tables through both writers."""
+        rows = 25_000
+        excel = await ExcelGenerator().write_report(
+            {"title": "Streamed"}, report_file_sections(rows, batch_size=4000), tmp_path / "rows.xlsx"
+        )
+        sheet_rows = list(load_workbook(excel, read_only=True)["Optimization Summary"].iter_rows(values_only=True))
+        assert len(sheet_rows) - sheet_rows.index(OPTIMIZATION_JOB_COLUMNS) - 1 == rows
+
+        text = await CSVGenerator().write_report(report_file_sections(rows, batch_size=4000), tmp_path / "rows.csv")
+        assert len(csv_blocks(text)[1]) - 1 == rows
@@ -0,0 +1,91 @@
+"""
+Tests for request metrics and multi-process metric collection.
+
+Testy metryk żądań API i zbierania metryk z wielu procesów.
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+from unittest.mock import patch
+from httpx import AsyncClient
+from prometheus_client import REGISTRY, generate_latest
+
+from app.core.metrics import mark_process_dead, metrics_registry
+from app.core.middleware import UNMATCHED_ROUTE
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestRequestMetricsMiddleware:
+    """Test the labels and values recorded per request."""
+
+    @pytest.fixture
+    def client(self, test_client: AsyncClient) -> AsyncClient:
+        """Test client on a host accepted by TrustedHostMiddleware."""
+        test_client.base_url = "http://localhost"
+        return test_client
+
+    async def test_route_labels(self, client: AsyncClient):
+        """Test route templates, status codes and response sizes."""
+        route = "/api/v1/optimize/jobs/{job_id}/progress"
+        before = {
+            "health": _sample("fro_api_requests_total", method="GET", endpoint="/health", status_code="200"),
+            "progress": _sample("fro_api_requests_total", method="GET", endpoint=route, status_code="401"),
+            "unmatched": _sample("fro_api_requests_total", method="GET", endpoint=UNMATCHED_ROUTE, status_code="404"),
+            "size": _sample("fro_api_response_size_bytes_sum", method="GET", endpoint="/health"),
+            "metrics": _sample("fro_api_requests_total", method="GET", endpoint="/metrics", status_code="200"),
+        }
+
+        health = await client.get("/health")
+        await client.get("/api/v1/optimize/jobs/123/progress")
+        await client.get("/no/such/path/123")
+        await client.get("/metrics")
+
+        assert _sample("fro_api_requests_total", method="GET", endpoint="/health", status_code="200") == before["health"] + 1
+        assert _sample("fro_api_requests_total", method="GET", endpoint=route, status_code="401") == before["progress"] + 1
+        assert _sample(
+            "fro_api_requests_total", method="GET", endpoint=UNMATCHED_ROUTE, status_code="404"
+        ) == before["unmatched"] + 1
+        assert _sample("fro_api_response_size_bytes_sum", method="GET", endpoint="/health") == \
+            before["size"] + len(health.content)
+        assert _sample("fro_api_requests_total", method="GET", endpoint="/metrics", status_code="200") == before["metrics"]
+        assert _sample("fro_api_requests_in_progress", method="GET") == 0
+        assert _sample("fro_api_request_duration_seconds_count", method="GET", endpoint="/health") > 0
+
+
+class TestMultiprocessMetrics:
+    """Test aggregation of metrics written by several processes."""
+
+    def _run_worker(self, directory: str) -> int:
+        script = (
+            "import os\n"
+            "from app.core.metrics import MetricsCollector, api_requests_in_progress\n"
+            "MetricsCollector.track_api_request('GET', '/api/v1/test', 200, 0.2, 512)\n"
+            "api_requests_in_progress.labels(method='GET').inc()\n"
+            "print(os.getpid())\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            env={**os.environ, "PROMETHEUS_MULTIPROC_DIR": directory},
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, check=True, timeout=60,
+        ).stdout
+        return int(output.strip().splitlines()[-1])
+
+    def test_workers_aggregated(self, tmp_path):
+        """Test that counters sum over workers and dead workers leave live gauges."""
+        pids = [self._run_worker(str(tmp_path)) for _ in range(2)]
+
+        with patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}):
+            text = generate_latest(metrics_registry()).decode()
+            assert 'fro_api_requests_total{endpoint="/api/v1/test",method="GET",status_code="200"} 2.0' in text
+            assert 'fro_api_requests_in_progress{method="GET"} 2.0' in text
+
+            mark_process_dead(pids[0])
+            text = generate_latest(metrics_registry()).decode()
+            assert 'fro_api_requests_in_progress{method="GET"} 1.0' in text
+            assert 'fro_api_requests_total{endpoint="/api/v1/test",method="GET",status_code="200"} 2.0' in text
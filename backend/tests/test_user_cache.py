@@ -0,0 +1,119 @@
+"""
+Tests for the authenticated-user principal cache.
+
+Testy pamięci podręcznej tożsamości uwierzytelnionych użytkowników.
+"""
+
+import time
+from uuid import uuid4
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.user import User, UserRole
+from app.services.auth_service import AuthService
+from app.services.user_cache import UserPrincipal, user_cache
+
+
+def principal(role: UserRole = UserRole.VIEWER) -> UserPrincipal:
+    return UserPrincipal(id=uuid4(), username="cached", role=role, is_active=True, is_verified=True)
+
+
+class TestUserPrincipalCache:
+    """Test the memory tier."""
+
+    async def test_roles_match_user_model(self):
+        """Test that the principal answers permission checks like User."""
+        for role in UserRole:
+            user = User(role=role)
+            cached = UserPrincipal.from_json(principal(role).to_json())
+            assert cached.is_admin == user.is_admin
+            assert cached.can_create_scenarios == user.can_create_scenarios
+            assert cached.can_manage_users == user.can_manage_users
+
+    async def test_ttl_and_size_bound(self):
+        """Test expiry and least-recently-used eviction."""
+        first, second, third = principal(), principal(), principal()
+        with patch.object(settings, "USER_CACHE_MAX_ENTRIES", 2):
+            for cached in (first, second):
+                await user_cache.set(cached, user_cache.version)
+            assert await user_cache.get(first.id) == first
+            await user_cache.set(third, user_cache.version)
+
+            assert await user_cache.get(second.id) is None
+            assert await user_cache.get(first.id) == first
+
+        with patch.object(settings, "USER_CACHE_TTL_SECONDS", 0.01):
+            await user_cache.set(second, user_cache.version)
+            time.sleep(0.02)
+            assert await user_cache.get(second.id) is None
+
+    async def test_invalidation_during_load(self):
+        """Test that a principal loaded before an invalidation is not cached."""
+        cached = principal()
+        version = user_cache.version
+        await user_cache.invalidate(cached.id)
+        await user_cache.set(cached, version)
+
+        assert await user_cache.get(cached.id) is None
+
+
+class TestCurrentUser:
+    """Test get_current_user with the cache."""
+
+    @pytest.fixture
+    def client(self, test_client: AsyncClient) -> AsyncClient:
+        """Test client on a host accepted by TrustedHostMiddleware."""
+        test_client.base_url = "http://localhost"
+        return test_client
+
+    @pytest.fixture
+    async def user(self, test_db: AsyncSession) -> User:
+        unique_id = uuid4().hex[:8]
+        user = User(
+            username=f"cached_{unique_id}",
+            email=f"cached_{unique_id}@example.com",
+            full_name="Cached User",
+            password_hash="hashed_password",
+            role=UserRole.VIEWER,
+            is_active=True,
+            is_verified=True
+        )
+        test_db.add(user)
+        await test_db.commit()
+        return user
+
+    async def test_repeat_request_skips_database(self, client: AsyncClient, user: User, query_budget):
+        """Test that only the first request loads the user."""
+        headers = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+        with query_budget(1):
+            response = await client.post("/api/v1/auth/verify-token", headers=headers)
+        assert response.status_code == 200, response.text
+
+        with query_budget(0):
+            response = await client.post("/api/v1/auth/verify-token", headers=headers)
+        assert response.json()["user_id"] == str(user.id)
+
+        response = await client.get("/api/v1/auth/me", headers=headers)
+        assert response.json()["email"] == user.email
+
+    async def test_writes_invalidate(self, client: AsyncClient, test_db: AsyncSession, user: User):
+        """Test that role changes and deactivation apply to the next request."""
+        headers = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+        auth_service = AuthService(test_db)
+
+        response = await client.get("/api/v1/system/db-pool", headers=headers)
+        assert response.status_code == 403
+
+        assert await auth_service.update_user_role(str(user.id), UserRole.ADMIN)
+        response = await client.get("/api/v1/system/db-pool", headers=headers)
+        assert response.status_code == 200, response.text
+
+        assert await auth_service.deactivate_user(str(user.id))
+        response = await client.get("/api/v1/system/db-pool", headers=headers)
+        assert response.status_code == 403
+        assert response.json()["detail"] == "User account is inactive"
@@ -26,6 +26,13 @@ class Settings:
     DEFAULT_MAX_ITERATIONS: int = 100
     DEFAULT_TOLERANCE: float = 1e-6
 
+    # Stagnation-based early stopping (see app/early_stopping.py); requests opt in with "early_stopping"
+    EARLY_STOPPING: bool = os.getenv("OPTIMIZER_EARLY_STOPPING", "false").lower() in ("1", "true", "yes")
+    STAGNATION_WINDOW: int = int(os.getenv("OPTIMIZER_STAGNATION_WINDOW", "5"))
+    STAGNATION_REL_TOL: float = float(os.getenv("OPTIMIZER_STAGNATION_REL_TOL", "1e-6"))
+    STAGNATION_X_TOL: float = float(os.getenv("OPTIMIZER_STAGNATION_X_TOL", "1e-6"))
+    CONSTRAINT_PLATEAU_TOL: float = float(os.getenv("OPTIMIZER_CONSTRAINT_PLATEAU_TOL", "1e-4"))
+
     # API settings
     API_TITLE: str = "SLSQP Optimizer Microservice"
     API_DESCRIPTION: str = "Thermal optimization for glass furnace regenerators using SLSQP algorithm"
@@ -0,0 +1,159 @@
+"""
+Stagnation-based early stopping of optimizer runs.
+
+SLSQP stops on ``ftol`` alone, which on the flat regions of the regenerator
+model keeps spending evaluations long after the result stopped changing.
+The monitor is fed every major iteration and reports the first criterion
+that fires:
+
+- ``relative_improvement``: the objective improved by less than
+  ``rel_improvement_tol`` (relative) over the last ``window`` iterations,
+  all of them feasible
+- ``x_distance``: the iterate moved less than ``x_tol`` (as a fraction of
+  each variable's bound range) for ``window`` consecutive iterations
+- ``constraint_plateau``: an infeasible run reduced its constraint violation
+  by less than ``constraint_plateau_tol`` (relative) over ``window`` iterations
+
+Early stopping is off unless OPTIMIZER_EARLY_STOPPING is set or the request
+opts in, so existing requests keep their ftol/maxiter results.
+
+Copy of backend/app/services/early_stopping.py. Apart from the module
+docstring, the settings import and ``_configured_settings`` the two files are
+identical; tests/test_early_stopping.py compares them.
+"""
+
+from collections import deque
+from dataclasses import dataclass, asdict, fields
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from app.config import settings
+
+
+CRITERION_RELATIVE_IMPROVEMENT = "relative_improvement"
+CRITERION_X_DISTANCE = "x_distance"
+CRITERION_CONSTRAINT_PLATEAU = "constraint_plateau"
+CRITERION_FTOL = "ftol"
+CRITERION_MAX_ITERATIONS = "max_iterations"
+
+# Constraint violation treated as feasible
+_FEASIBILITY_TOL = 1e-6
+
+
+def _configured_settings() -> Dict[str, Any]:
+    """Early stopping settings of the service configuration."""
+    return {
+        "enabled": settings.EARLY_STOPPING,
+        "window": settings.STAGNATION_WINDOW,
+        "rel_improvement_tol": settings.STAGNATION_REL_TOL,
+        "x_tol": settings.STAGNATION_X_TOL,
+        "constraint_plateau_tol": settings.CONSTRAINT_PLATEAU_TOL,
+    }
+
+
+@dataclass
+class EarlyStoppingConfig:
+    """Early stopping settings of one run."""
+
+    enabled: bool = True
+    window: int = 5
+    rel_improvement_tol: float = 1e-6
+    x_tol: float = 1e-6
+    constraint_plateau_tol: float = 1e-4
+
+    @classmethod
+    def from_settings(cls, overrides: Optional[Any] = None) -> "EarlyStoppingConfig":
+        """
+        Build the config from the configured settings.
+
+        ``overrides`` are the run's own settings (the scenario's
+        ``optimization_config["early_stopping"]`` in the backend, the request's
+        ``early_stopping`` field in the optimizer service): a bool switches early
+        stopping on or off, a dict enables it (unless it sets ``enabled``) and
+        replaces individual settings.
+        """
+        config = cls(**_configured_settings())
+        if isinstance(overrides, bool):
+            config.enabled = overrides
+        elif isinstance(overrides, dict):
+            config.enabled = True
+            known = {f.name for f in fields(cls)}
+            for key, value in overrides.items():
+                if key in known:
+                    setattr(config, key, bool(value) if key == "enabled" else type(getattr(config, key))(value))
+        config.window = max(1, config.window)
+        return config
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Settings as reported with the run's result."""
+        return asdict(self)
+
+
+class StagnationMonitor:
+    """Tracks major iterations of one run and detects stagnation."""
+
+    def __init__(self, config: EarlyStoppingConfig, lower: Sequence[float], upper: Sequence[float]):
+        self.config = config
+        self.lower = np.asarray(lower, dtype=float)
+        span = np.asarray(upper, dtype=float) - self.lower
+        self.span = np.where(np.isfinite(span) & (span > 0), span, 1.0)
+        self.iterations = 0
+        self.triggered: Optional[str] = None
+        self._objectives = deque(maxlen=config.window + 1)
+        self._violations = deque(maxlen=config.window + 1)
+        self._previous_x: Optional[np.ndarray] = None
+        self._small_steps = 0
+        self._last_step = None
+
+    @staticmethod
+    def constraint_violation(constraint_values: Sequence[float]) -> float:
+        """Total violation of ``g(x) >= 0`` constraints."""
+        values = np.asarray(constraint_values, dtype=float)
+        return float(np.sum(np.maximum(0.0, -values)))
+
+    def update(self, x: Sequence[float], objective: float, violation: float = 0.0) -> Optional[str]:
+        """
+        Record one major iteration.
+
+        Returns:
+            Name of the triggered criterion, or None to continue
+        """
+        self.iterations += 1
+        scaled = (np.asarray(x, dtype=float) - self.lower) / self.span
+        self._objectives.append(float(objective))
+        self._violations.append(float(violation))
+
+        if self._previous_x is not None:
+            self._last_step = float(np.max(np.abs(scaled - self._previous_x))) if scaled.size else 0.0
+            self._small_steps = self._small_steps + 1 if self._last_step < self.config.x_tol else 0
+        self._previous_x = scaled
+
+        if not self.config.enabled:
+            return None
+
+        window = self.config.window
+        if len(self._objectives) > window:
+            earlier_violation = self._violations[0]
+            if max(self._violations) <= _FEASIBILITY_TOL:
+                earlier = self._objectives[0]
+                improvement = (earlier - min(list(self._objectives)[1:])) / max(abs(earlier), 1e-12)
+                if improvement < self.config.rel_improvement_tol:
+                    self.triggered = CRITERION_RELATIVE_IMPROVEMENT
+            elif (earlier_violation - violation) / max(earlier_violation, 1e-12) < self.config.constraint_plateau_tol:
+                self.triggered = CRITERION_CONSTRAINT_PLATEAU
+
+        if self.triggered is None and self._small_steps >= window:
+            self.triggered = CRITERION_X_DISTANCE
+
+        return self.triggered
+
+    def summary(self) -> Dict[str, Any]:
+        """Diagnostics of the latest iterations, reported with the run's result."""
+        return {
+            "monitored_iterations": self.iterations,
+            "last_objective": self._objectives[-1] if self._objectives else None,
+            "last_constraint_violation": self._violations[-1] if self._violations else None,
+            "last_step": self._last_step,
+            "settings": self.config.to_dict(),
+        }
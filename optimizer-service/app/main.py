@@ -95,7 +95,8 @@ async def run_optimization(request: OptimizationRequest):
             bounds=request.bounds,
             objective_type=request.objective_type,
             max_iterations=request.max_iterations,
-            tolerance=request.tolerance
+            tolerance=request.tolerance,
+            early_stopping=request.early_stopping.model_dump(exclude_none=True) if request.early_stopping else None
         )
 
         # Extract final design variables
@@ -131,6 +132,8 @@ async def run_optimization(request: OptimizationRequest):
             objective_value=float(scipy_result.fun),
             iterations=int(scipy_result.nit),
             convergence_reached=bool(scipy_result.success),
+            stop_criterion=scipy_result.stop_criterion,
+            function_evaluations=scipy_result.function_evaluations,
             computation_time_seconds=computation_time,
             iteration_history=iteration_history[-10:] if len(iteration_history) > 10 else iteration_history
         )
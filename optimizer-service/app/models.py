@@ -51,6 +51,15 @@ class RegeneratorConfiguration(BaseModel):
     materials_config: Optional[Dict[str, Any]] = {}
 
 
+class EarlyStoppingOptions(BaseModel):
+    """Per-request overrides of stagnation-based early stopping."""
+    enabled: Optional[bool] = None
+    window: Optional[int] = Field(None, ge=1, le=100)
+    rel_improvement_tol: Optional[float] = Field(None, ge=0)
+    x_tol: Optional[float] = Field(None, ge=0)
+    constraint_plateau_tol: Optional[float] = Field(None, ge=0)
+
+
 class OptimizationRequest(BaseModel):
     """Request to run optimization."""
     configuration: RegeneratorConfiguration
@@ -59,6 +68,7 @@ class OptimizationRequest(BaseModel):
     objective_type: str = Field("minimize_fuel_consumption", description="Objective function type")
     max_iterations: int = Field(100, ge=10, le=1000)
     tolerance: float = Field(1e-6, ge=1e-10, le=1e-2)
+    early_stopping: Optional[EarlyStoppingOptions] = None
 
     class Config:
         json_schema_extra = {
@@ -111,6 +121,8 @@ class OptimizationResult(BaseModel):
     objective_value: float
     iterations: int
     convergence_reached: bool
+    stop_criterion: Optional[str] = None
+    function_evaluations: Optional[int] = None
     computation_time_seconds: float
     iteration_history: Optional[List[OptimizationIteration]] = []
 
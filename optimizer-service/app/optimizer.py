@@ -8,6 +8,9 @@ from scipy.optimize import minimize, OptimizeResult, NonlinearConstraint, Bounds
 import time
 import logging
 
+from app.early_stopping import (
+    EarlyStoppingConfig, StagnationMonitor, CRITERION_FTOL, CRITERION_MAX_ITERATIONS
+)
 from app.models import (
     RegeneratorConfiguration,
     DesignVariables,
@@ -178,7 +181,8 @@ class SLSQPOptimizer:
         bounds: BoundsConfig,
         objective_type: str,
         max_iterations: int,
-        tolerance: float
+        tolerance: float,
+        early_stopping: Optional[Dict[str, Any]] = None
     ) -> Tuple[OptimizeResult, List[OptimizationIteration]]:
         """
         Run SLSQP optimization.
@@ -189,9 +193,11 @@ class SLSQPOptimizer:
             objective_type: Type of objective function
             max_iterations: Maximum number of iterations
             tolerance: Convergence tolerance
+            early_stopping: Overrides of the early stopping settings
 
         Returns:
-            Tuple of (scipy OptimizeResult, iteration history)
+            Tuple of (scipy OptimizeResult, iteration history); the result
+            carries the reason the run ended in ``stop_criterion``
         """
         # Reset state
         self.iteration_history = []
@@ -229,6 +235,10 @@ class SLSQPOptimizer:
                 bounds.density[1]
             ])
         )
+        monitor = StagnationMonitor(
+            EarlyStoppingConfig.from_settings(early_stopping), bounds_array.lb, bounds_array.ub
+        )
+        last_evaluation: Dict[str, Any] = {}
 
         def objective_function(x: np.ndarray) -> float:
             """Objective function to minimize."""
@@ -266,6 +276,8 @@ class SLSQPOptimizer:
                 'performance': performance
             })
 
+            last_evaluation.update(x=np.array(x, copy=True), objective=obj_value, performance=performance)
+
             # Update best objective
             if obj_value < self.best_objective:
                 self.best_objective = obj_value
@@ -291,19 +303,22 @@ class SLSQPOptimizer:
                 "density": float(x[5])
             }
             performance = self.physics_model.calculate_thermal_performance(design_vars)
+            return self._constraint_values(performance)
 
-            constraints_values = []
-
-            # Pressure drop constraint (< 2000 Pa)
-            constraints_values.append(2000 - performance.pressure_drop)
-
-            # Thermal efficiency constraint (> 0.2)
-            constraints_values.append(performance.thermal_efficiency - 0.2)
-
-            # Heat transfer coefficient constraint (> 50 W/m²K)
-            constraints_values.append(performance.heat_transfer_coefficient - 50)
-
-            return np.array(constraints_values)
+        def iteration_callback(xk: np.ndarray) -> None:
+            """Called by SLSQP after each major iteration."""
+            # SLSQP has normally just evaluated the accepted iterate
+            if np.array_equal(last_evaluation.get("x"), xk):
+                obj_value, performance = last_evaluation["objective"], last_evaluation["performance"]
+            else:
+                performance = self.physics_model.calculate_thermal_performance(
+                    dict(zip(design_var_names, (float(v) for v in xk)))
+                )
+                obj_value = -performance.thermal_efficiency
+            violation = monitor.constraint_violation(self._constraint_values(performance))
+            if monitor.update(xk, obj_value, violation):
+                # scipy >= 1.11 ends the run cleanly on StopIteration from the callback
+                raise StopIteration
 
         # Set up constraints
         nonlinear_constraint = NonlinearConstraint(
@@ -322,6 +337,7 @@ class SLSQPOptimizer:
             method='SLSQP',
             bounds=bounds_array,
             constraints=[nonlinear_constraint],
+            callback=iteration_callback,
             options={
                 'maxiter': max_iterations,
                 'ftol': tolerance,
@@ -330,6 +346,22 @@ class SLSQPOptimizer:
         )
 
         computation_time = time.time() - start_time
+
+        if monitor.triggered:
+            result.success = True
+            result.status = 0
+            result.message = f"Early stopping: {monitor.triggered}"
+            result.fun = float(monitor.summary()["last_objective"])
+            result.stop_criterion = monitor.triggered
+        elif result.get("status") == 9:
+            result.stop_criterion = CRITERION_MAX_ITERATIONS
+        elif result.success:
+            result.stop_criterion = CRITERION_FTOL
+        else:
+            result.stop_criterion = None
+        result.function_evaluations = len(self.iteration_history)
+        logger.info(f"Stop criterion: {result.stop_criterion}, "
+                    f"function_evaluations={result.function_evaluations}")
         logger.info(f"Optimization completed in {computation_time:.2f}s, success={result.success}")
 
         # Convert iteration history to OptimizationIteration objects
@@ -345,6 +377,18 @@ class SLSQPOptimizer:
 
         return result, iteration_objects, computation_time
 
+    @staticmethod
+    def _constraint_values(performance: PerformanceMetrics) -> np.ndarray:
+        """Constraint values g(x) >= 0 for a performance evaluation."""
+        return np.array([
+            # Pressure drop constraint (< 2000 Pa)
+            2000 - performance.pressure_drop,
+            # Thermal efficiency constraint (> 0.2)
+            performance.thermal_efficiency - 0.2,
+            # Heat transfer coefficient constraint (> 50 W/m²K)
+            performance.heat_transfer_coefficient - 50
+        ])
+
     def set_progress_callback(self, callback: Callable):
         """Set progress callback function."""
         self.progress_callback = callback
@@ -0,0 +1,58 @@
+"""
+Tests for stagnation-based early stopping in the optimizer service.
+
+Testy wczesnego zatrzymywania optymalizacji w mikroserwisie optymalizatora.
+"""
+
+import ast
+from pathlib import Path
+from unittest.mock import patch
+
+from app.config import settings
+from app.early_stopping import EarlyStoppingConfig, StagnationMonitor, CRITERION_X_DISTANCE
+
+
+SERVICE_MODULE = Path(__file__).resolve().parents[1] / "app" / "early_stopping.py"
+BACKEND_MODULE = Path(__file__).resolve().parents[2] / "backend" / "app" / "services" / "early_stopping.py"
+
+
+def _shared_part(path: Path) -> str:
+    """Module code without its docstring, settings import and ``_configured_settings``."""
+    module = ast.parse(path.read_text(encoding="utf-8"))
+    module.body = [
+        node for node in module.body[1:]
+        if not (isinstance(node, ast.ImportFrom) and node.module in ("app.config", "app.core.config"))
+        and not (isinstance(node, ast.FunctionDef) and node.name == "_configured_settings")
+    ]
+    return ast.unparse(module)
+
+
+class TestEarlyStoppingConfig:
+    """Test the defaults and per-request overrides."""
+
+    def test_disabled_unless_opted_in(self):
+        """Test that requests keep ftol/maxiter stopping by default."""
+        assert settings.EARLY_STOPPING is False
+        assert EarlyStoppingConfig.from_settings(None).enabled is False
+        assert EarlyStoppingConfig.from_settings(True).enabled is True
+
+    def test_request_overrides(self):
+        """Test that an options object opts in and replaces individual settings."""
+        with patch.object(settings, "STAGNATION_WINDOW", 7):
+            assert EarlyStoppingConfig.from_settings(None).window == 7
+            config = EarlyStoppingConfig.from_settings({"window": 4, "x_tol": 1e-3})
+        assert config.enabled is True
+        assert config.window == 4
+        assert config.x_tol == 1e-3
+        assert EarlyStoppingConfig.from_settings({"enabled": False, "window": 4}).enabled is False
+
+    def test_monitor_stops_on_small_steps(self):
+        """Test the x-distance criterion of an enabled config."""
+        monitor = StagnationMonitor(EarlyStoppingConfig(window=3), [0.0, 0.0], [1.0, 1.0])
+        results = [monitor.update([0.5, 0.5], -1.0 - i) for i in range(4)]
+        assert results[-1] == CRITERION_X_DISTANCE
+
+
+def test_module_matches_backend_copy():
+    """Test that the service's copy has the same logic as the backend module."""
+    assert _shared_part(SERVICE_MODULE) == _shared_part(BACKEND_MODULE)